@@ -0,0 +1,30 @@
+"""tenant migration state
+
+Revision ID: 0011_tenant_migrations
+Revises: 0010_add_gateway_flag
+Create Date: 2025-09-10
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "0011_tenant_migrations"
+down_revision: str | None = "0010_add_gateway_flag"
+branch_labels: tuple[str, ...] | None = None
+depends_on: tuple[str, ...] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tenant_migrations",
+        sa.Column("tenant_id", sa.String(), primary_key=True),
+        sa.Column("revision", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False, server_default="pending"),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("tenant_migrations")
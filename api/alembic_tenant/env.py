@@ -46,7 +46,19 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    # In schema-per-tenant mode the tenant schema is passed by the caller;
+    # migrations use unqualified names, so point ``search_path`` at it and
+    # keep the version table inside the schema as well.
+    schema: str | None = config.attributes.get("schema")
+    options = {}
+    if schema is not None:
+        connection.exec_driver_sql(f'CREATE SCHEMA IF NOT EXISTS "{schema}"')
+        connection.exec_driver_sql(f'SET search_path TO "{schema}", public')
+        connection.commit()
+        options["version_table_schema"] = schema
+    context.configure(
+        connection=connection, target_metadata=target_metadata, **options
+    )
     with context.begin_transaction():
         context.run_migrations()
 
@@ -0,0 +1,41 @@
+"""hourly and payment-mode sales rollups
+
+Revision ID: 0016_sales_rollup_incremental
+Revises: 0015_menu_item_sort
+Create Date: 2025-09-01
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0016_sales_rollup_incremental"
+down_revision: str | None = "0015_menu_item_sort"
+branch_labels: tuple[str, ...] | None = None
+depends_on: tuple[str, ...] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sales_rollup_hourly",
+        sa.Column("d", sa.Date(), nullable=False),
+        sa.Column("h", sa.Integer(), nullable=False),
+        sa.Column("orders", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("sales", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column("tax", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column("tip", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("d", "h"),
+    )
+    op.create_table(
+        "sales_rollup_modes",
+        sa.Column("d", sa.Date(), nullable=False),
+        sa.Column("mode", sa.String(), nullable=False),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("d", "mode"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("sales_rollup_modes")
+    op.drop_table("sales_rollup_hourly")
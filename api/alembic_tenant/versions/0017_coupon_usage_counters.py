@@ -0,0 +1,33 @@
+"""coupon usage counters
+
+Revision ID: 0017_coupon_usage_counters
+Revises: 0016_sales_rollup_incremental
+Create Date: 2025-09-08
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0017_coupon_usage_counters"
+down_revision: str | None = "0016_sales_rollup_incremental"
+branch_labels: tuple[str, ...] | None = None
+depends_on: tuple[str, ...] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "coupon_usage_counters",
+        sa.Column(
+            "coupon_id", sa.Integer(), sa.ForeignKey("coupons.id"), nullable=False
+        ),
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("bucket", sa.String(), nullable=False),
+        sa.Column("used", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("coupon_id", "scope", "bucket"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("coupon_usage_counters")
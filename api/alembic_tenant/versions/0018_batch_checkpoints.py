@@ -0,0 +1,29 @@
+"""batch delete checkpoints
+
+Revision ID: 0018_batch_checkpoints
+Revises: 0017_coupon_usage_counters
+Create Date: 2025-09-15
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0018_batch_checkpoints"
+down_revision: str | None = "0017_coupon_usage_counters"
+branch_labels: tuple[str, ...] | None = None
+depends_on: tuple[str, ...] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "batch_checkpoints",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("last_key", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("batch_checkpoints")
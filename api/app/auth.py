@@ -58,35 +58,72 @@ class UserInDB(User):
     pin_hash: Optional[str] = None
 
 
+# Precomputed argon2 hashes of the demo credentials: hashing them on import
+# took over a second of every process start
+_DEMO_HASHES = {
+    "adminpass": (
+        "$argon2id$v=19$m=65536,t=3,p=4$cMwmBlCIllhQX6DkTD/x7A$"
+        "QmCuG6H8XgNzH+AyNc0jOBhtwx+LFil19j5VhCCZogc"
+    ),
+    "ownerpass": (
+        "$argon2id$v=19$m=65536,t=3,p=4$lahrkk/nox6uAXdjkqLNMg$"
+        "6FPJv/DELD2M4ceSF9VpV/TmOEQw7apO1b+92Z5MeaU"
+    ),
+    "cashierpass": (
+        "$argon2id$v=19$m=65536,t=3,p=4$cJuDlplqkvoQ14fVUOfmJA$"
+        "OXMRLteDS7gJdOazHn+khzyX/U5NMTvAB1iz8phMEpA"
+    ),
+    "1234": (
+        "$argon2id$v=19$m=65536,t=3,p=4$6gwqls3hZMq4ja2y9KQvAw$"
+        "2rsVXzaDfDLBoYN1b7TAUSpSrsmzbcHiFUeaW62qJpE"
+    ),
+    "kitchenpass": (
+        "$argon2id$v=19$m=65536,t=3,p=4$K/W3WmIwD38BcPjG4NqsUQ$"
+        "J1qpHSh9PAXDuNdBR2Z904UMXMIEe//Yzbln2xU0New"
+    ),
+    "5678": (
+        "$argon2id$v=19$m=65536,t=3,p=4$ZmwyUNPyw7TTvGv1PMt/5A$"
+        "1JUg5vqiCXdd6jt30seZBFwl7mmlycSh+ikke6rkVwg"
+    ),
+    "cleanpass": (
+        "$argon2id$v=19$m=65536,t=3,p=4$35/UiIBj6S9XQRCXf3tFPA$"
+        "cPvM5T5SW9caekEUoBSbaWX0l0OT5u9m2W8tTct1bAg"
+    ),
+    "4321": (
+        "$argon2id$v=19$m=65536,t=3,p=4$yBLrx2kA19By4DcR3dc7Xg$"
+        "zoWPQN3zSlRM/o1rEdBA9pAMapki7PouNQC6MEsTKAU"
+    ),
+}
+
 # In-memory user store; real apps should query a database
 fake_users_db: dict[str, UserInDB] = {
     "admin@example.com": UserInDB(
         username="admin@example.com",
         role="super_admin",
-        password_hash=ph.hash("adminpass"),
+        password_hash=_DEMO_HASHES["adminpass"],
     ),
     "owner@example.com": UserInDB(
         username="owner@example.com",
         role="owner",
-        password_hash=ph.hash("ownerpass"),
+        password_hash=_DEMO_HASHES["ownerpass"],
     ),
     "cashier1": UserInDB(
         username="cashier1",
         role="cashier",
-        password_hash=ph.hash("cashierpass"),
-        pin_hash=ph.hash("1234"),
+        password_hash=_DEMO_HASHES["cashierpass"],
+        pin_hash=_DEMO_HASHES["1234"],
     ),
     "kitchen1": UserInDB(
         username="kitchen1",
         role="kitchen",
-        password_hash=ph.hash("kitchenpass"),
-        pin_hash=ph.hash("5678"),
+        password_hash=_DEMO_HASHES["kitchenpass"],
+        pin_hash=_DEMO_HASHES["5678"],
     ),
     "cleaner1": UserInDB(
         username="cleaner1",
         role="cleaner",
-        password_hash=ph.hash("cleanpass"),
-        pin_hash=ph.hash("4321"),
+        password_hash=_DEMO_HASHES["cleanpass"],
+        pin_hash=_DEMO_HASHES["4321"],
     ),
 }
 
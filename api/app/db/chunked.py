@@ -0,0 +1,247 @@
+"""Chunked, throttled bulk deletes and updates.
+
+Retention and purge jobs used to issue one ``DELETE``/``UPDATE`` over a whole
+table, which holds locks for the length of a single long transaction and
+produces WAL bursts that replicas struggle to replay. :func:`run_chunked`
+instead walks the matching rows in primary-key order, ``chunk_size`` keys at
+a time, and commits after every chunk:
+
+1. ``SELECT id ... WHERE <predicate> AND id > :after ORDER BY id LIMIT :n``
+   picks the next chunk;
+2. dependent rows (``children``) and then the chunk itself are deleted or
+   updated with ``id > :after AND id <= :upto AND <predicate>``;
+3. the last key is saved to ``batch_checkpoints`` in the same transaction.
+
+When a run is interrupted the next run with the same ``checkpoint`` name
+resumes after the saved key; the checkpoint is removed once a pass
+completes. Between chunks a :class:`Throttle` sleeps for as long as a chunk
+overran its latency target and, when given a replica lag probe, until the
+replica is back within ``max_lag``.
+
+For tables partitioned by month (the ``{table}_YYYY_MM`` layout of tenant
+migration ``0010_hot_indexes_partitions``), :func:`drop_expired_partitions`
+(re-exported from :mod:`.partitions`) detaches and drops partitions that lie
+entirely before a cutoff, which is far cheaper than deleting their rows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Mapping
+
+from sqlalchemy import text
+
+from .partitions import drop_expired_partitions
+
+CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "1000"))
+CHUNK_TARGET_SECS = float(os.getenv("BATCH_CHUNK_TARGET_SECS", "0.5"))
+MAX_REPLICA_LAG_SECS = float(os.getenv("BATCH_MAX_REPLICA_LAG_SECS", "5"))
+
+_IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+_LOAD = text("SELECT last_key FROM batch_checkpoints WHERE name = :name")
+_SAVE = text(
+    "INSERT INTO batch_checkpoints (name, last_key, updated_at) "
+    "VALUES (:name, :last_key, :updated_at) "
+    "ON CONFLICT (name) DO UPDATE SET last_key = excluded.last_key, "
+    "updated_at = excluded.updated_at"
+)
+_CLEAR = text("DELETE FROM batch_checkpoints WHERE name = :name")
+
+
+def _ident(name: str) -> str:
+    if not _IDENT_RE.match(name):
+        raise ValueError(f"invalid SQL identifier: {name!r}")
+    return name
+
+
+@dataclass(frozen=True)
+class Chunked:
+    """A bulk statement over ``table`` rows matching ``where``.
+
+    ``assignments`` turns the statement into ``UPDATE ... SET assignments``;
+    without it matching rows are deleted. ``children`` lists
+    ``(table, foreign key column)`` pairs whose rows referencing a chunk are
+    deleted before the chunk itself.
+    """
+
+    table: str
+    where: str
+    params: Mapping[str, Any] = field(default_factory=dict)
+    assignments: str | None = None
+    children: tuple[tuple[str, str], ...] = ()
+    key: str = "id"
+
+    def _range(self, after: int | None) -> str:
+        key = _ident(self.key)
+        lower = f"{key} > :after AND " if after is not None else ""
+        return f"{lower}{key} <= :upto AND ({self.where})"
+
+    def select_keys(self, after: int | None) -> str:
+        key, table = _ident(self.key), _ident(self.table)
+        lower = f" AND {key} > :after" if after is not None else ""
+        return (
+            f"SELECT {key} FROM {table} WHERE ({self.where}){lower} "
+            f"ORDER BY {key} LIMIT :limit"
+        )  # nosec B608
+
+    def child_statements(self, after: int | None) -> list[str]:
+        key, table = _ident(self.key), _ident(self.table)
+        return [
+            f"DELETE FROM {_ident(child)} WHERE {_ident(fk)} IN ("
+            f"SELECT {key} FROM {table} WHERE {self._range(after)})"  # nosec B608
+            for child, fk in self.children
+        ]
+
+    def statement(self, after: int | None) -> str:
+        table = _ident(self.table)
+        if self.assignments is not None:
+            return (
+                f"UPDATE {table} SET {self.assignments} " f"WHERE {self._range(after)}"
+            )  # nosec B608
+        return f"DELETE FROM {table} WHERE {self._range(after)}"  # nosec B608
+
+
+class Throttle:
+    """Adaptive pause between chunks.
+
+    After a chunk that took longer than ``target_secs`` the throttle sleeps
+    for the overrun, giving the database (and its replicas) back the time the
+    chunk cost beyond its budget. With a ``lag_probe`` it also waits while the
+    probed replica lag exceeds ``max_lag``, re-probing up to ``max_sleep``
+    seconds in total. An unreachable replica (probe returns ``None``) counts
+    as lagging.
+    """
+
+    def __init__(
+        self,
+        *,
+        target_secs: float = CHUNK_TARGET_SECS,
+        max_lag: float = MAX_REPLICA_LAG_SECS,
+        max_sleep: float = 30.0,
+        lag_probe: Callable[[], Awaitable[float | None]] | None = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self.target_secs = target_secs
+        self.max_lag = max_lag
+        self.max_sleep = max_sleep
+        self.lag_probe = lag_probe
+        self._sleep = sleep
+
+    async def pause(self, elapsed: float) -> float:
+        """Sleep after a chunk that took ``elapsed`` seconds; return the pause."""
+
+        slept = 0.0
+        overrun = min(max(0.0, elapsed - self.target_secs), self.max_sleep)
+        if overrun:
+            await self._sleep(overrun)
+            slept += overrun
+        if self.lag_probe is None:
+            return slept
+        while slept < self.max_sleep:
+            lag = await self.lag_probe()
+            if lag is not None and lag <= self.max_lag:
+                break
+            wait = min(self.max_sleep - slept, self.max_lag if lag is None else lag)
+            await self._sleep(wait)
+            slept += wait
+        return slept
+
+
+def tenant_throttle(tenant_id: str) -> Throttle:
+    """Return a throttle probing ``tenant_id``'s replica when one is configured."""
+
+    from .replica import replicas
+
+    if replicas.dsn_for(tenant_id) is None:
+        return Throttle()
+
+    async def probe() -> float | None:
+        return await replicas.measure(tenant_id)
+
+    return Throttle(lag_probe=probe)
+
+
+async def load_checkpoint(session, name: str) -> int | None:
+    """Return the last key saved under ``name``."""
+
+    return (await session.execute(_LOAD, {"name": name})).scalar()
+
+
+async def run_chunked(
+    session,
+    stmt: Chunked,
+    *,
+    checkpoint: str | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    throttle: Throttle | None = None,
+    max_chunks: int | None = None,
+    clock: Callable[[], float] = time.monotonic,
+) -> int:
+    """Apply ``stmt`` in keyset-ordered chunks and return the rows affected.
+
+    Commits after every chunk. With ``checkpoint`` the pass resumes after the
+    key saved by an earlier interrupted run; rows matching the predicate
+    below that key are picked up by the next full pass. ``max_chunks`` stops
+    early, leaving the checkpoint in place.
+    """
+
+    after = await load_checkpoint(session, checkpoint) if checkpoint else None
+    total = 0
+    chunks = 0
+    while max_chunks is None or chunks < max_chunks:
+        started = clock()
+        params = {**stmt.params, "limit": chunk_size}
+        if after is not None:
+            params["after"] = after
+        keys = list(
+            (await session.execute(text(stmt.select_keys(after)), params)).scalars()
+        )
+        if not keys:
+            break
+        params = {**stmt.params, "upto": keys[-1]}
+        if after is not None:
+            params["after"] = after
+        for child in stmt.child_statements(after):
+            await session.execute(text(child), params)
+        result = await session.execute(text(stmt.statement(after)), params)
+        total += result.rowcount or 0
+        after = keys[-1]
+        if checkpoint:
+            await session.execute(
+                _SAVE,
+                {
+                    "name": checkpoint,
+                    "last_key": after,
+                    "updated_at": datetime.now(timezone.utc),
+                },
+            )
+        await session.commit()
+        chunks += 1
+        if len(keys) < chunk_size:
+            break
+        if throttle is not None:
+            await throttle.pause(clock() - started)
+    else:
+        return total
+
+    if checkpoint:
+        await session.execute(_CLEAR, {"name": checkpoint})
+        await session.commit()
+    return total
+
+
+__all__ = [
+    "CHUNK_SIZE",
+    "Chunked",
+    "Throttle",
+    "drop_expired_partitions",
+    "load_checkpoint",
+    "run_chunked",
+    "tenant_throttle",
+]
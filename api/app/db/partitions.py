@@ -0,0 +1,275 @@
+"""Monthly partition management for hot tenant tables.
+
+Tenant migration ``0010_hot_indexes_partitions`` creates the current month's
+partition for tables that were created ``PARTITION BY RANGE`` on a timestamp,
+using the ``{table}_YYYY_MM`` naming scheme. Nothing created the following
+months, so inserts failed (or landed in a default partition) once a month
+rolled over. :func:`ensure_partitions` keeps that layout maintained:
+
+* it pre-creates ``ahead`` future monthly partitions for every partitioned
+  table in :data:`HOT_TABLES`;
+* partitions whose range ends on or before the table's retention horizon are
+  detached and, unless ``drop=False``, dropped. Horizons are opt-in
+  (``ORDERS_RETENTION_MONTHS``, ``AUDIT_RETENTION_MONTHS``): tenants keep
+  their own retention rules, so nothing is expired unless one is configured.
+
+The DDL is produced by :func:`plan`, a pure function of the existing
+partitions and the current date, so it can be reviewed (``--dry-run`` of
+``scripts/partition_maintenance.py``) and tested without PostgreSQL. Tables
+that are not partitioned, and non-PostgreSQL databases, are left untouched.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Iterable, Sequence
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+
+_IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    """A table partitioned by month; ``retention_months=None`` keeps all data."""
+
+    name: str
+    retention_months: int | None = None
+
+
+def _retention_months(env: str) -> int | None:
+    """Return the horizon set in ``env``, or ``None`` to keep all partitions."""
+
+    value = os.getenv(env, "").strip()
+    return int(value) if value else None
+
+
+HOT_TABLES: tuple[PartitionedTable, ...] = (
+    PartitionedTable("orders", _retention_months("ORDERS_RETENTION_MONTHS")),
+    PartitionedTable("order_items", _retention_months("ORDERS_RETENTION_MONTHS")),
+    # invoices and payments are accounting records and are never expired here
+    PartitionedTable("invoices"),
+    PartitionedTable("payments"),
+    PartitionedTable("audit_tenant", _retention_months("AUDIT_RETENTION_MONTHS")),
+)
+
+
+def _ident(name: str) -> str:
+    if not _IDENT_RE.match(name):
+        raise ValueError(f"invalid SQL identifier: {name!r}")
+    return name
+
+
+def add_months(month: date, months: int) -> date:
+    """Return the first day of the month ``months`` after ``month``."""
+
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{_ident(table)}_{month:%Y_%m}"
+
+
+def partition_month(table: str, name: str) -> date | None:
+    """Return the month covered by partition ``name`` of ``table``."""
+
+    match = re.fullmatch(rf"{re.escape(table)}_(\d{{4}})_(\d{{2}})", name)
+    if not match or not 1 <= int(match.group(2)) <= 12:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def create_sql(table: str, month: date) -> str:
+    end = add_months(month, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, month)} "
+        f"PARTITION OF {_ident(table)} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{end.isoformat()}')"
+    )  # nosec B608
+
+
+def detach_sql(table: str, name: str) -> str:
+    return f"ALTER TABLE {_ident(table)} DETACH PARTITION {_ident(name)}"
+
+
+def drop_sql(name: str) -> str:
+    return f"DROP TABLE IF EXISTS {_ident(name)}"
+
+
+@dataclass
+class PartitionPlan:
+    """Partitions to create and expire for one table."""
+
+    table: str
+    create: list[date] = field(default_factory=list)
+    expire: list[str] = field(default_factory=list)
+
+    def statements(self, *, drop: bool = True) -> list[str]:
+        stmts = [create_sql(self.table, month) for month in self.create]
+        for name in self.expire:
+            stmts.append(detach_sql(self.table, name))
+            if drop:
+                stmts.append(drop_sql(name))
+        return stmts
+
+
+def plan(
+    table: PartitionedTable,
+    existing: Iterable[str],
+    today: date,
+    *,
+    ahead: int = MONTHS_AHEAD,
+) -> PartitionPlan:
+    """Return the partitions of ``table`` to create and expire on ``today``.
+
+    The current month and the ``ahead`` following months must exist.
+    Partitions ending on or before the first day of the month
+    ``retention_months`` ago are expired.
+    """
+
+    current = today.replace(day=1)
+    months = {
+        month: name
+        for name in existing
+        if (month := partition_month(table.name, name)) is not None
+    }
+    result = PartitionPlan(table.name)
+    for offset in range(ahead + 1):
+        month = add_months(current, offset)
+        if month not in months:
+            result.create.append(month)
+    if table.retention_months is not None:
+        horizon = add_months(current, -table.retention_months)
+        result.expire = [
+            months[month] for month in sorted(months) if add_months(month, 1) <= horizon
+        ]
+    return result
+
+
+# Resolve ``table`` through the search path, like the unqualified DDL above,
+# so a same-named table in another schema is never inspected or expired.
+_PARTITIONED_SQL = text(
+    "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table)"
+)
+_PARTITIONS_SQL = text(
+    "SELECT c.relname FROM pg_inherits i "
+    "JOIN pg_class c ON c.oid = i.inhrelid "
+    "WHERE i.inhparent = to_regclass(:table)"
+)
+
+
+def _is_postgres(session) -> bool:
+    return session.bind.dialect.name == "postgresql"
+
+
+async def is_partitioned(session, table: str) -> bool:
+    return (
+        await session.execute(_PARTITIONED_SQL, {"table": table})
+    ).first() is not None
+
+
+async def list_partitions(session, table: str) -> list[str]:
+    rows = await session.execute(_PARTITIONS_SQL, {"table": table})
+    return sorted(rows.scalars())
+
+
+async def _apply(session, statements: Sequence[str]) -> None:
+    for stmt in statements:
+        await session.execute(text(stmt))
+    await session.commit()
+
+
+async def ensure_partitions(
+    session,
+    tables: Iterable[PartitionedTable] = HOT_TABLES,
+    *,
+    today: date | None = None,
+    ahead: int = MONTHS_AHEAD,
+    drop: bool = True,
+    dry_run: bool = False,
+) -> list[PartitionPlan]:
+    """Create upcoming and expire old partitions of the partitioned ``tables``.
+
+    Each table is committed separately so a failure (for example rows for a
+    new month already sitting in a default partition) is logged and does not
+    block the other tables. Returns the plans of the partitioned tables.
+    """
+
+    if not _is_postgres(session):
+        return []
+    today = today or datetime.now(timezone.utc).date()
+    plans = []
+    for table in tables:
+        if not await is_partitioned(session, table.name):
+            continue
+        table_plan = plan(
+            table, await list_partitions(session, table.name), today, ahead=ahead
+        )
+        plans.append(table_plan)
+        statements = table_plan.statements(drop=drop)
+        if dry_run or not statements:
+            continue
+        try:
+            await _apply(session, statements)
+        except Exception:
+            await session.rollback()
+            logger.exception("partition maintenance failed for %s", table.name)
+            continue
+        logger.info(
+            "partitions %s: created %d, expired %d",
+            table.name,
+            len(table_plan.create),
+            len(table_plan.expire),
+        )
+    return plans
+
+
+async def drop_expired_partitions(session, table: str, cutoff: datetime) -> list[str]:
+    """Detach and drop monthly partitions of ``table`` that end by ``cutoff``.
+
+    Returns the dropped partition names; a no-op outside PostgreSQL or for
+    tables that are not partitioned.
+    """
+
+    if not _is_postgres(session):
+        return []
+    cutoff_day = cutoff.date() if isinstance(cutoff, datetime) else cutoff
+    dropped = [
+        name
+        for name in await list_partitions(session, _ident(table))
+        if (month := partition_month(table, name)) is not None
+        and add_months(month, 1) <= cutoff_day
+    ]
+    if dropped:
+        await _apply(
+            session,
+            [s for name in dropped for s in (detach_sql(table, name), drop_sql(name))],
+        )
+        logger.info("dropped partitions %s of %s", ", ".join(dropped), table)
+    return dropped
+
+
+__all__ = [
+    "HOT_TABLES",
+    "MONTHS_AHEAD",
+    "PartitionPlan",
+    "PartitionedTable",
+    "add_months",
+    "create_sql",
+    "drop_expired_partitions",
+    "ensure_partitions",
+    "is_partitioned",
+    "list_partitions",
+    "partition_month",
+    "partition_name",
+    "plan",
+]
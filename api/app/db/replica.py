@@ -1,21 +1,63 @@
+"""Read replica routing.
+
+Two kinds of replicas are supported:
+
+* a single master-database replica configured via ``READ_REPLICA_URL`` and
+  used by :func:`replica_session`;
+* per-tenant replicas held in :data:`replicas`, a :class:`ReplicaRegistry`.
+  A tenant's replica DSN is either registered explicitly or rendered from
+  ``POSTGRES_TENANT_REPLICA_DSN_TEMPLATE`` (same ``{tenant_id}`` placeholder
+  as the primary template).
+
+Endpoints decorated with :func:`read_only` open tenant sessions through
+:func:`tenant_session`, which routes them to the tenant's replica while its
+measured replay lag is within the endpoint's ``max_lag`` (default
+``REPLICA_MAX_LAG_SECS``) and to the primary otherwise. This also holds for
+sessions opened while a returned :class:`StreamingResponse` is being sent. Lag is refreshed by
+:func:`monitor` and measured on demand when the last sample is stale.
+"""
+
 from __future__ import annotations
 
 import asyncio
+import functools
+import inspect
+import logging
 import os
+import time
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from contextvars import ContextVar
+from typing import AsyncGenerator, AsyncIterator, Final
 
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from api.app.obs import add_query_logger
-from api.app.routes_metrics import db_replica_healthy
+from api.app.routes_metrics import (
+    db_replica_healthy,
+    db_replica_lag_seconds,
+    tenant_replica_reads_total,
+)
 
 from . import master
+from .tenant import get_tenant_session
+
+logger = logging.getLogger(__name__)
 
 READ_REPLICA_URL = os.getenv("READ_REPLICA_URL")
+TENANT_REPLICA_TEMPLATE_ENV: Final[str] = "POSTGRES_TENANT_REPLICA_DSN_TEMPLATE"
+MAX_LAG_SECS = float(os.getenv("REPLICA_MAX_LAG_SECS", "30"))
+LAG_SAMPLE_MAX_AGE_SECS = float(os.getenv("REPLICA_LAG_SAMPLE_MAX_AGE_SECS", "60"))
+MONITOR_INTERVAL_SECS = 30
+
+_REPLAY_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE COALESCE(EXTRACT(EPOCH FROM now() - "
+    "pg_last_xact_replay_timestamp()), 0) END"
+)
 
 _engine: AsyncEngine | None = None
 _sessionmaker: sessionmaker[AsyncSession] | None = None
@@ -53,11 +95,134 @@ async def check_replica(app: FastAPI) -> None:
     db_replica_healthy.set(int(healthy))
 
 
+async def _replay_lag(engine: AsyncEngine) -> float:
+    """Return the replay lag of ``engine`` in seconds.
+
+    Only PostgreSQL exposes replay timestamps; other backends are treated as
+    always caught up once they answer a ping.
+    """
+
+    async with engine.connect() as conn:
+        if engine.dialect.name != "postgresql":
+            await conn.execute(text("SELECT 1"))
+            return 0.0
+        lag = (await conn.execute(_REPLAY_LAG_SQL)).scalar()
+    return float(lag or 0)
+
+
+class ReplicaRegistry:
+    """Per-tenant replica DSNs, pooled engines and replay lag samples."""
+
+    def __init__(self) -> None:
+        self._dsns: dict[str, str] = {}
+        self._engines: dict[str, AsyncEngine] = {}
+        self._sessionmakers: dict[str, sessionmaker[AsyncSession]] = {}
+        # tenant -> (lag in seconds or None when unreachable, sampled at)
+        self._lag: dict[str, tuple[float | None, float]] = {}
+
+    def register(self, tenant_id: str, dsn: str) -> None:
+        """Use ``dsn`` as the replica of ``tenant_id``."""
+
+        if self._dsns.get(tenant_id) == dsn:
+            return
+        self._dsns[tenant_id] = dsn
+        self._drop(tenant_id)
+
+    def dsn_for(self, tenant_id: str) -> str | None:
+        """Return the replica DSN for ``tenant_id`` if one is configured."""
+
+        dsn = self._dsns.get(tenant_id)
+        if dsn is None:
+            template = os.getenv(TENANT_REPLICA_TEMPLATE_ENV)
+            if template:
+                dsn = template.format(tenant_id=tenant_id)
+        return dsn
+
+    def engine(self, tenant_id: str) -> AsyncEngine | None:
+        """Return the pooled replica engine for ``tenant_id``."""
+
+        engine = self._engines.get(tenant_id)
+        if engine is None:
+            dsn = self.dsn_for(tenant_id)
+            if dsn is None:
+                return None
+            engine = create_async_engine(dsn, pool_pre_ping=True)
+            add_query_logger(engine, f"{tenant_id}:replica")
+            self._engines[tenant_id] = engine
+            self._sessionmakers[tenant_id] = sessionmaker(
+                engine, expire_on_commit=False, class_=AsyncSession
+            )
+        return engine
+
+    def lag(self, tenant_id: str) -> float | None:
+        """Return the last measured lag, ``None`` if unknown or unreachable."""
+
+        sample = self._lag.get(tenant_id)
+        return sample[0] if sample else None
+
+    async def measure(self, tenant_id: str) -> float | None:
+        """Sample the replay lag of ``tenant_id``'s replica."""
+
+        engine = self.engine(tenant_id)
+        if engine is None:
+            return None
+        try:
+            lag: float | None = await _replay_lag(engine)
+        except Exception:
+            logger.warning("replica for tenant %s is unreachable", tenant_id)
+            lag = None
+        self._lag[tenant_id] = (lag, time.monotonic())
+        return lag
+
+    async def refresh(self) -> None:
+        """Measure every replica with an open engine and update metrics."""
+
+        tenant_ids = list(self._engines)
+        await asyncio.gather(*(self.measure(tid) for tid in tenant_ids))
+        lags = [lag for tid in tenant_ids if (lag := self.lag(tid)) is not None]
+        db_replica_lag_seconds.set(max(lags, default=0))
+
+    async def sessionmaker_for(
+        self, tenant_id: str, max_lag: float
+    ) -> sessionmaker[AsyncSession] | None:
+        """Return a replica session factory if the replica is fresh enough."""
+
+        if self.engine(tenant_id) is None:
+            return None
+        sample = self._lag.get(tenant_id)
+        if sample is None or time.monotonic() - sample[1] > LAG_SAMPLE_MAX_AGE_SECS:
+            await self.measure(tenant_id)
+        lag = self.lag(tenant_id)
+        if lag is None or lag > max_lag:
+            return None
+        return self._sessionmakers[tenant_id]
+
+    def _drop(self, tenant_id: str) -> AsyncEngine | None:
+        self._sessionmakers.pop(tenant_id, None)
+        self._lag.pop(tenant_id, None)
+        return self._engines.pop(tenant_id, None)
+
+    async def dispose(self) -> None:
+        """Dispose all pooled engines and forget registrations."""
+
+        engines = [self._drop(tid) for tid in list(self._engines)]
+        self._dsns.clear()
+        for engine in engines:
+            if engine is not None:
+                await engine.dispose()
+
+
+replicas = ReplicaRegistry()
+
+_max_lag: ContextVar[float | None] = ContextVar("replica_max_lag", default=None)
+
+
 async def monitor(app: FastAPI) -> None:
-    """Background task for periodic replica health checks."""
+    """Background task for periodic replica health and lag checks."""
     while True:
         await check_replica(app)
-        await asyncio.sleep(30)
+        await replicas.refresh()
+        await asyncio.sleep(MONITOR_INTERVAL_SECS)
 
 
 @asynccontextmanager
@@ -74,9 +239,79 @@ async def replica_session() -> AsyncGenerator[AsyncSession, None]:
         await session.close()
 
 
-def read_only(func):
-    """Placeholder decorator for marking read-only endpoints."""
-    return func
+@asynccontextmanager
+async def tenant_session(tenant_id: str) -> AsyncGenerator[AsyncSession, None]:
+    """Yield a session for ``tenant_id``.
+
+    Inside a :func:`read_only` endpoint the session is bound to the tenant's
+    replica when it is within the endpoint's lag budget; otherwise, and
+    outside read-only endpoints, it is bound to the tenant's primary.
+    """
+
+    max_lag = _max_lag.get()
+    if max_lag is not None:
+        factory = await replicas.sessionmaker_for(tenant_id, max_lag)
+        tenant_replica_reads_total.labels(
+            target="primary" if factory is None else "replica"
+        ).inc()
+        if factory is not None:
+            async with factory() as session:
+                yield session
+            return
+    async with get_tenant_session(tenant_id) as session:
+        yield session
+
+
+async def _stream_read_only(
+    body: AsyncIterator[bytes], max_lag: float
+) -> AsyncIterator[bytes]:
+    # Starlette sends the body after the endpoint returned, in another task
+    token = _max_lag.set(max_lag)
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        _max_lag.reset(token)
+
+
+def read_only(func=None, *, max_lag: float | None = None):
+    """Mark an endpoint as read-only so its tenant sessions use replicas.
+
+    ``max_lag`` is the highest replica replay lag in seconds the endpoint
+    tolerates before falling back to the primary; it defaults to
+    ``REPLICA_MAX_LAG_SECS``. Usable bare (``@read_only``) or with arguments
+    (``@read_only(max_lag=5)``). Generators behind a returned
+    :class:`StreamingResponse` are routed the same way while they run.
+    """
+
+    lag = MAX_LAG_SECS if max_lag is None else max_lag
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            token = _max_lag.set(lag)
+            try:
+                result = await fn(*args, **kwargs)
+            finally:
+                _max_lag.reset(token)
+            if isinstance(result, StreamingResponse):
+                result.body_iterator = _stream_read_only(result.body_iterator, lag)
+            return result
+
+        # Resolve postponed annotations against the endpoint's module so
+        # FastAPI does not look them up in this module's globals.
+        wrapper.__signature__ = inspect.signature(fn, eval_str=True)
+        return wrapper
+
+    return decorate(func) if func is not None else decorate
 
 
-__all__ = ["replica_session", "read_only", "monitor", "check_replica"]
+__all__ = [
+    "ReplicaRegistry",
+    "check_replica",
+    "monitor",
+    "read_only",
+    "replica_session",
+    "replicas",
+    "tenant_session",
+]
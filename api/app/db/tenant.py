@@ -10,6 +10,17 @@ If the template variable is unset, a fallback template is derived from
 
 Use :func:`build_dsn` to render a DSN for a tenant and :func:`get_engine` to
 create an :class:`~sqlalchemy.ext.asyncio.AsyncEngine` for it.
+
+Schema-per-tenant mode
+======================
+With ``TENANCY_MODE=schema`` tenants live in schemas of a shared database
+given by ``POSTGRES_TENANT_SCHEMA_DSN`` instead of in databases of their own.
+All tenants then share one pooled engine, so the number of server
+connections no longer grows with the number of tenants. :func:`get_engine`
+returns a lightweight view of the shared engine that maps unqualified tables
+to the tenant schema (``schema_translate_map``) and sets ``search_path`` on
+every checkout so raw SQL resolves to the same schema. The schema name is
+rendered from ``TENANT_SCHEMA_TEMPLATE`` (default ``tenant_{tenant_id}``).
 """
 
 from __future__ import annotations
@@ -17,12 +28,12 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
+import re
 from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import AsyncGenerator, Final
 
-from alembic import command
-from alembic.config import Config
+from sqlalchemy import event
 from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
@@ -31,6 +42,13 @@ from api.app.obs import add_query_logger
 
 TEMPLATE_ENV: Final[str] = "POSTGRES_TENANT_DSN_TEMPLATE"
 SYNC_URL_ENV: Final[str] = "SYNC_DATABASE_URL"
+MODE_ENV: Final[str] = "TENANCY_MODE"
+SCHEMA_DSN_ENV: Final[str] = "POSTGRES_TENANT_SCHEMA_DSN"
+SCHEMA_TEMPLATE_ENV: Final[str] = "TENANT_SCHEMA_TEMPLATE"
+
+_SCHEMA_RE = re.compile(r"^[a-z_][a-z0-9_]{0,62}$")
+_shared_engines: dict[str, AsyncEngine] = {}
+_schema_engines: dict[str, AsyncEngine] = {}
 
 
 def build_dsn(tenant_id: str) -> str:
@@ -69,18 +87,108 @@ def build_dsn(tenant_id: str) -> str:
         raise ValueError("Invalid DSN template") from exc
 
 
+def schema_mode() -> bool:
+    """Return ``True`` when tenants are stored as schemas of a shared database."""
+
+    return os.getenv(MODE_ENV, "database").lower() == "schema"
+
+
+def schema_name(tenant_id: str) -> str:
+    """Return the schema holding ``tenant_id``'s tables in schema mode.
+
+    Raises ``ValueError`` if the rendered name is not a plain lower-case
+    identifier, since it is interpolated into ``search_path``.
+    """
+
+    template = os.getenv(SCHEMA_TEMPLATE_ENV, "tenant_{tenant_id}")
+    name = template.format(tenant_id=tenant_id).lower().replace("-", "_")
+    if not _SCHEMA_RE.match(name):
+        raise ValueError(f"invalid tenant schema name: {name!r}")
+    return name
+
+
+def shared_dsn() -> str:
+    """Return the DSN of the shared database used in schema mode."""
+
+    dsn = os.getenv(SCHEMA_DSN_ENV)
+    if not dsn:
+        raise RuntimeError(f"{SCHEMA_DSN_ENV} must be set when {MODE_ENV}=schema")
+    return dsn
+
+
+def shared_engine() -> AsyncEngine:
+    """Return the pooled engine shared by all tenant schemas."""
+
+    dsn = shared_dsn()
+    engine = _shared_engines.get(dsn)
+    if engine is None:
+        engine = create_async_engine(
+            dsn,
+            pool_size=int(os.getenv("TENANT_POOL_SIZE", "20")),
+            max_overflow=int(os.getenv("TENANT_POOL_MAX_OVERFLOW", "10")),
+            pool_pre_ping=True,
+        )
+        _shared_engines[dsn] = engine
+    return engine
+
+
+class _SchemaEngine(AsyncEngine):
+    """View of the shared engine bound to one tenant schema.
+
+    Callers treat it like a per-tenant engine; :meth:`dispose` is a no-op
+    because the pool belongs to :func:`shared_engine`.
+    """
+
+    async def dispose(self, close: bool = True) -> None:  # noqa: D102
+        return None
+
+
+def _schema_engine(tenant_id: str) -> AsyncEngine:
+    schema = schema_name(tenant_id)
+    engine = _schema_engines.get(schema)
+    if engine is not None:
+        return engine
+    view = shared_engine().sync_engine.execution_options(
+        schema_translate_map={None: schema}
+    )
+    if view.dialect.name == "postgresql":
+
+        @event.listens_for(view, "engine_connect")
+        def _set_search_path(conn) -> None:
+            conn.exec_driver_sql(f'SET search_path TO "{schema}", public')
+            conn.commit()
+
+    engine = _SchemaEngine(view)
+    add_query_logger(engine, tenant_id)
+    _schema_engines[schema] = engine
+    return engine
+
+
 def get_engine(tenant_id: str) -> AsyncEngine:
     """Create and return an :class:`AsyncEngine` for ``tenant_id``.
 
     The returned engine is created using
-    :func:`sqlalchemy.ext.asyncio.create_async_engine`.
+    :func:`sqlalchemy.ext.asyncio.create_async_engine`. In schema mode the
+    tenant's view of the shared engine is returned instead.
     """
+    if schema_mode():
+        return _schema_engine(tenant_id)
     dsn = build_dsn(tenant_id)
     engine = create_async_engine(dsn)
     add_query_logger(engine, tenant_id)
     return engine
 
 
+async def dispose_shared_engines() -> None:
+    """Close the pools of the schema-mode shared engines."""
+
+    _schema_engines.clear()
+    engines = list(_shared_engines.values())
+    _shared_engines.clear()
+    for engine in engines:
+        await engine.dispose()
+
+
 @asynccontextmanager
 async def get_tenant_session(
     tenant_id: str,
@@ -104,11 +212,15 @@ async def run_tenant_migrations(tenant_id: str) -> None:
     ``scripts/tenant_migrate.py`` helper.
     """
 
+    # Alembic pulls in mako and pygments; only migrations need it
+    from alembic import command
+    from alembic.config import Config
+
     logger = logging.getLogger(__name__)
 
     engine: AsyncEngine | None = None
     try:
-        dsn = build_dsn(tenant_id)
+        dsn = shared_dsn() if schema_mode() else build_dsn(tenant_id)
         engine = create_async_engine(dsn)
 
         cfg = Config()
@@ -118,6 +230,8 @@ async def run_tenant_migrations(tenant_id: str) -> None:
         )
         cfg.set_main_option("sqlalchemy.url", dsn)
         cfg.attributes["engine"] = engine
+        if schema_mode():
+            cfg.attributes["schema"] = schema_name(tenant_id)
 
         await asyncio.to_thread(command.upgrade, cfg, "head")
     except Exception as exc:  # pragma: no cover - runtime errors
@@ -130,7 +244,12 @@ async def run_tenant_migrations(tenant_id: str) -> None:
 
 __all__ = [
     "build_dsn",
+    "dispose_shared_engines",
     "get_engine",
     "get_tenant_session",
     "run_tenant_migrations",
+    "schema_mode",
+    "schema_name",
+    "shared_dsn",
+    "shared_engine",
 ]
@@ -0,0 +1,145 @@
+"""Per-item prep time quantiles kept as DDSketches in Redis.
+
+Every served KDS transition adds the prep time of each item to the sketch of
+that item for the current day, ``eta:sketch:{tenant}:{item_id}:{day}``, as
+``HINCRBY`` on the bucket fields (see :class:`~api.app.eta.sketch.DDSketch`).
+Workers therefore merge into the same hash without coordination, and the
+quantiles of the last ``PREP_STATS_WINDOW_DAYS`` days (default 30) are the
+merge of the daily hashes. Day keys expire after the window.
+
+Items with a sketch are registered in ``eta:sketch:items:{tenant}`` so the
+nightly ``scripts/refresh_prep_stats.py`` can copy the quantiles into
+``PrepStats`` without scanning keys or order history.
+
+Quantiles are cached in process for ``PREP_STATS_CACHE_SEC`` seconds, for at
+most ``PREP_STATS_CACHE_MAX`` (tenant, item) pairs; the least recently used
+pairs are dropped first.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Tuple
+
+from .sketch import DDSketch
+
+SKETCH_KEY = "eta:sketch:{tenant}:{item_id}:{day}"
+ITEMS_KEY = "eta:sketch:items:{tenant}"
+WINDOW_DAYS = int(os.getenv("PREP_STATS_WINDOW_DAYS", "30"))
+CACHE_TTL = float(os.getenv("PREP_STATS_CACHE_SEC", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("PREP_STATS_CACHE_MAX", "10000"))
+MIN_SAMPLES = 5
+QUANTILES = {"p50_s": 0.5, "p80_s": 0.8, "p95_s": 0.95}
+
+_cache: "OrderedDict[Tuple[str, str], Tuple[float, dict | None]]" = OrderedDict()
+
+
+def _day(now: datetime, offset: int = 0) -> str:
+    return (now - timedelta(days=offset)).strftime("%Y%m%d")
+
+
+async def record(
+    redis,
+    tenant: str,
+    samples: Iterable[Tuple[str | int, float]],
+    now: datetime | None = None,
+) -> None:
+    """Add ``(item_id, seconds)`` prep time samples to today's sketches."""
+
+    now = now or datetime.now(timezone.utc)
+    sketches: Dict[str, DDSketch] = defaultdict(DDSketch)
+    for item_id, seconds in samples:
+        sketches[str(item_id)].add(seconds)
+    if not sketches:
+        return
+    ttl = (WINDOW_DAYS + 1) * 86400
+    pipe = redis.pipeline(transaction=False)
+    for item_id, sketch in sketches.items():
+        key = SKETCH_KEY.format(tenant=tenant, item_id=item_id, day=_day(now))
+        for field, count in sketch.to_fields().items():
+            pipe.hincrby(key, field, count)
+        pipe.expire(key, ttl)
+    pipe.sadd(ITEMS_KEY.format(tenant=tenant), *sketches)
+    await pipe.execute()
+
+
+async def load(
+    redis,
+    tenant: str,
+    item_ids: Iterable[str | int],
+    now: datetime | None = None,
+) -> Dict[str, DDSketch]:
+    """Return the merged sketch of the window for every item in ``item_ids``."""
+
+    now = now or datetime.now(timezone.utc)
+    ids = list(dict.fromkeys(str(i) for i in item_ids))
+    if not ids:
+        return {}
+    pipe = redis.pipeline(transaction=False)
+    for item_id in ids:
+        for offset in range(WINDOW_DAYS):
+            day = _day(now, offset)
+            pipe.hgetall(SKETCH_KEY.format(tenant=tenant, item_id=item_id, day=day))
+    results = await pipe.execute()
+    merged: Dict[str, DDSketch] = {}
+    for n, item_id in enumerate(ids):
+        sketch = DDSketch()
+        for fields in results[n * WINDOW_DAYS : (n + 1) * WINDOW_DAYS]:
+            if fields:
+                sketch.merge(DDSketch.from_fields(fields))
+        merged[item_id] = sketch
+    return merged
+
+
+def summarize(sketch: DDSketch) -> dict | None:
+    """Return ``p50_s``/``p80_s``/``p95_s``/``sample_n`` or ``None`` if too small."""
+
+    if sketch.count < MIN_SAMPLES:
+        return None
+    stats = {name: int(round(sketch.quantile(q))) for name, q in QUANTILES.items()}
+    stats["sample_n"] = sketch.count
+    return stats
+
+
+async def quantiles(
+    redis,
+    tenant: str,
+    item_ids: Iterable[str | int],
+    now: datetime | None = None,
+) -> Dict[str, dict]:
+    """Return :func:`summarize` per item, cached for ``PREP_STATS_CACHE_SEC``."""
+
+    clock = time.monotonic()
+    result: Dict[str, dict] = {}
+    missing = []
+    for item_id in dict.fromkeys(str(i) for i in item_ids):
+        cached = _cache.get((tenant, item_id))
+        if cached is not None and clock - cached[0] < CACHE_TTL:
+            _cache.move_to_end((tenant, item_id))
+            if cached[1] is not None:
+                result[item_id] = cached[1]
+        else:
+            missing.append(item_id)
+    if missing:
+        for item_id, sketch in (await load(redis, tenant, missing, now)).items():
+            stats = summarize(sketch)
+            _cache[(tenant, item_id)] = (clock, stats)
+            _cache.move_to_end((tenant, item_id))
+            if stats is not None:
+                result[item_id] = stats
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return result
+
+
+async def items(redis, tenant: str) -> list[str]:
+    """Return the item ids of ``tenant`` that have sketches."""
+
+    members = await redis.smembers(ITEMS_KEY.format(tenant=tenant))
+    return sorted(m.decode() if isinstance(m, bytes) else m for m in members)
+
+
+__all__ = ["items", "load", "quantiles", "record", "summarize"]
@@ -7,6 +7,8 @@ from typing import Dict, List
 
 from config import get_settings
 
+from . import prep_stats
+
 
 def _queue_factor(active_tickets: int, max_factor: float) -> float:
     """Return queue multiplier capped by ``max_factor``."""
@@ -49,3 +51,20 @@ def eta_for_order(
         "promised_at": promised_at,
         "components": components,
     }
+
+
+async def eta_for_items(
+    redis,
+    tenant: str,
+    item_ids: List[str | int],
+    active_tickets: int,
+    now: datetime | None = None,
+) -> Dict[str, object]:
+    """Estimate ETA for ``item_ids`` from their prep time sketches.
+
+    Percentiles come from :func:`api.app.eta.prep_stats.quantiles`; items
+    with too few samples fall back to the prep SLA in :func:`eta_for_order`.
+    """
+    stats = await prep_stats.quantiles(redis, tenant, item_ids, now)
+    items = [{"item_id": i, **stats.get(str(i), {})} for i in item_ids]
+    return eta_for_order(items, active_tickets, now)
@@ -0,0 +1,120 @@
+"""Mergeable quantile sketch for prep times (DDSketch).
+
+A :class:`DDSketch` maps every positive value ``x`` to the bucket
+``ceil(log_gamma(x))`` with ``gamma = (1 + a) / (1 - a)`` and counts values
+per bucket. Any quantile is then answered within relative error ``a`` of the
+exact value, whatever the distribution, and two sketches merge by adding
+their bucket counts. That makes the buckets usable directly as Redis hash
+fields: every worker ``HINCRBY``s the buckets of its samples and the sketch
+read back is the merge of all of them (see :mod:`api.app.eta.prep_stats`).
+
+Values at or below ``min_value`` are counted in a separate zero bucket.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, Mapping
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+MIN_VALUE = 1e-3
+
+
+class DDSketch:
+    """Quantile sketch with relative accuracy ``relative_accuracy``."""
+
+    def __init__(
+        self,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        min_value: float = MIN_VALUE,
+    ) -> None:
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def key(self, value: float) -> int | None:
+        """Return the bucket of ``value`` or ``None`` for the zero bucket."""
+
+        if value <= self.min_value:
+            return None
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def value(self, key: int) -> float:
+        """Return the representative value of bucket ``key``."""
+
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def add(self, value: float, count: int = 1) -> None:
+        key = self.key(value)
+        if key is None:
+            self.zero_count += count
+        else:
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.count += count
+
+    def extend(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "DDSketch") -> None:
+        """Add the counts of ``other``, which must use the same accuracy."""
+
+        if other.gamma != self.gamma:
+            raise ValueError("cannot merge sketches with different accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> float | None:
+        """Return the estimated ``q`` quantile or ``None`` when empty."""
+
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                return self.value(key)
+        return self.value(max(self.bins))
+
+    def to_fields(self) -> Dict[str, int]:
+        """Return the buckets as ``{str(key): count}`` with ``z`` for zero."""
+
+        fields = {str(key): count for key, count in self.bins.items()}
+        if self.zero_count:
+            fields["z"] = self.zero_count
+        return fields
+
+    @classmethod
+    def from_fields(
+        cls,
+        fields: Mapping[bytes | str, bytes | str | int],
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+    ) -> "DDSketch":
+        """Build a sketch from :meth:`to_fields` output (e.g. ``HGETALL``)."""
+
+        sketch = cls(relative_accuracy)
+        for raw_key, raw_count in fields.items():
+            key = raw_key.decode() if isinstance(raw_key, bytes) else raw_key
+            count = int(raw_count)
+            if key == "z":
+                sketch.zero_count += count
+            else:
+                sketch.bins[int(key)] = sketch.bins.get(int(key), 0) + count
+            sketch.count += count
+        return sketch
+
+
+__all__ = ["DDSketch", "DEFAULT_RELATIVE_ACCURACY"]
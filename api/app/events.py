@@ -5,15 +5,35 @@
 from __future__ import annotations
 
 import asyncio
+import json
 from collections import defaultdict
 from typing import Any, Dict, List
 
+from .multiproc import host_id
+
+CHANNEL = "events:{host}:{name}"
+
 
 class EventBus:
-    """Dispatch events to subscribers via :class:`asyncio.Queue` instances."""
+    """Dispatch events to subscribers via :class:`asyncio.Queue` instances.
+
+    With several worker processes the bus is bound to Redis (:meth:`bind`):
+    events are published to the ``events:{host}:{name}`` channels and
+    delivered to the subscribers of the worker running :meth:`relay`. The
+    channels are scoped to the host, so when several hosts share Redis each
+    event is consumed once, by the host it was published on.
+    """
 
     def __init__(self) -> None:
         self._subs: Dict[str, List[asyncio.Queue]] = defaultdict(list)
+        self._redis = None
+        self._host = ""
+
+    def bind(self, redis, host: str | None = None) -> None:
+        """Publish events through ``redis`` instead of delivering them locally."""
+
+        self._redis = redis
+        self._host = host or host_id()
 
     def subscribe(self, name: str) -> asyncio.Queue:
         """Register interest in ``name`` events and return a queue."""
@@ -25,9 +45,34 @@ class EventBus:
     async def publish(self, name: str, payload: Dict[str, Any]) -> None:
         """Broadcast ``payload`` to all subscribers of ``name``."""
 
+        if self._redis is not None:
+            message = json.dumps(payload, default=str)
+            channel = CHANNEL.format(host=self._host, name=name)
+            await self._redis.publish(channel, message)
+            return
+        await self._deliver(name, payload)
+
+    async def _deliver(self, name: str, payload: Dict[str, Any]) -> None:
         for queue in self._subs.get(name, []):
             await queue.put(payload)
 
+    async def relay(self, redis) -> None:
+        """Deliver events published by the workers of this host to local subscribers."""
+
+        pubsub = redis.pubsub()
+        await pubsub.psubscribe(CHANNEL.format(host=self._host, name="*"))
+        prefix = len(CHANNEL.format(host=self._host, name=""))
+        try:
+            async for message in pubsub.listen():
+                if message["type"] != "pmessage":
+                    continue
+                channel = message["channel"]
+                if isinstance(channel, bytes):
+                    channel = channel.decode()
+                await self._deliver(channel[prefix:], json.loads(message["data"]))
+        finally:
+            await pubsub.aclose()
+
 
 event_bus = EventBus()
 
@@ -0,0 +1,231 @@
+"""Cached admission state for guest writes.
+
+Guest POSTs used to pass three guards that each paid for their own lookups:
+a blocking ``SessionLocal`` query for the table (plus a ``Tenant`` get for the
+error language), another for the room, and two Redis round-trips for the IP
+reputation and the tenant blocklist. :class:`GuestAdmission` answers all of
+them with one Redis pipeline:
+
+* table and room state live in the hashes ``admission:table:{code}`` and
+  ``admission:room:{token}``; the code paths that change state write them
+  through :func:`record_table` / :func:`record_room` (the table map hook,
+  table lock/unlock and housekeeping);
+* a hash that is missing (expired or never written) is filled from the
+  database once by the caller-supplied loader;
+* the verdict is kept in a small in-process TTL cache
+  (``ADMISSION_LOCAL_TTL`` seconds, default 1) so bursts from one table do
+  not reach Redis at all. Writers drop the local entry of their own process;
+  other processes see a state change after at most that TTL.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Mapping
+
+from .security.blocklist import BLOCK_KEY
+from .security.ip_reputation import REP_KEY
+
+TABLE_KEY = "admission:table:{token}"
+ROOM_KEY = "admission:room:{token}"
+
+STATE_TTL = int(os.getenv("ADMISSION_STATE_TTL", "3600"))
+MISSING_TTL = 60
+LOCAL_TTL = float(os.getenv("ADMISSION_LOCAL_TTL", "1"))
+LOCAL_MAX_ENTRIES = 10_000
+
+Loader = Callable[[str], Awaitable[Mapping[str, str] | None]]
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+@dataclass(frozen=True)
+class Verdict:
+    """Everything a guest write is admitted or denied on.
+
+    ``state`` is ``None`` when the request does not address a table or room,
+    and ``""`` when the table or room does not exist.
+    """
+
+    state: str | None = None
+    lang: str | None = None
+    ip_bad: bool = False
+    block_ttl: int = 0
+
+    @property
+    def locked(self) -> bool:
+        return bool(self.state) and self.state != "AVAILABLE"
+
+
+class GuestAdmission:
+    """Answer the guest pre-checks from Redis with one pipeline per request."""
+
+    def __init__(
+        self,
+        redis,
+        *,
+        local_ttl: float = LOCAL_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.redis = redis
+        self.local_ttl = local_ttl
+        self._clock = clock
+        self._local: dict[tuple, tuple[float, Verdict]] = {}
+        _live.add(self)
+
+    async def check(
+        self,
+        tenant: str,
+        ip: str,
+        *,
+        kind: str | None = None,
+        token: str | None = None,
+        loader: Loader | None = None,
+    ) -> Verdict:
+        """Return the verdict for a guest write by ``ip`` to ``kind``/``token``.
+
+        ``kind`` is ``"table"`` or ``"room"``; ``loader`` returns the
+        ``state`` (and for tables ``lang``) fields from the database when the
+        Redis hash is missing, or ``None`` if the table or room does not
+        exist.
+        """
+
+        local_key = (tenant, ip, kind, token)
+        now = self._clock()
+        cached = self._local.get(local_key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        state_key = _state_key(kind, token) if kind and token else None
+        pipe = self.redis.pipeline(transaction=False)
+        if state_key:
+            pipe.hgetall(state_key)
+        pipe.get(REP_KEY.format(ip=ip))
+        pipe.ttl(BLOCK_KEY.format(tenant=tenant, ip=ip))
+        results = await pipe.execute()
+        fields = _decode(results.pop(0)) if state_key else {}
+        rep, ttl = results
+
+        state = lang = None
+        if state_key:
+            if "state" not in fields or (kind == "table" and "lang" not in fields):
+                fields = await self._fill(kind, token, loader)
+            state = fields.get("state", "")
+            lang = fields.get("lang") or None
+        verdict = Verdict(
+            state=state,
+            lang=lang,
+            ip_bad=rep is not None and _text(rep) == "bad",
+            block_ttl=max(int(ttl or 0), 0),
+        )
+        if self.local_ttl > 0:
+            if len(self._local) >= LOCAL_MAX_ENTRIES:
+                self._local.clear()
+            self._local[local_key] = (now + self.local_ttl, verdict)
+        return verdict
+
+    async def _fill(self, kind: str, token: str, loader: Loader | None) -> dict:
+        if loader is None:
+            return {"state": ""}
+        loaded = await loader(token)
+        fields = dict(loaded) if loaded is not None else {"state": ""}
+        if kind == "table":
+            fields.setdefault("lang", "")
+        ttl = STATE_TTL if loaded is not None else MISSING_TTL
+        await write_state(self.redis, kind, [token], fields, ttl=ttl)
+        return fields
+
+    def forget(self, kind: str | None = None, tokens: list[str] | None = None) -> None:
+        """Drop local verdicts for ``tokens`` of ``kind`` (all when omitted)."""
+
+        if kind is None or tokens is None:
+            self._local.clear()
+            return
+        wanted = set(tokens)
+        for key in [k for k in self._local if k[2] == kind and k[3] in wanted]:
+            del self._local[key]
+
+
+_live: weakref.WeakSet[GuestAdmission] = weakref.WeakSet()
+
+
+def _state_key(kind: str, token: str) -> str:
+    return (TABLE_KEY if kind == "table" else ROOM_KEY).format(token=token)
+
+
+def _decode(fields: Mapping) -> dict[str, str]:
+    return {_text(k): _text(v) for k, v in (fields or {}).items()}
+
+
+async def write_state(
+    redis,
+    kind: str,
+    tokens: list[str],
+    fields: Mapping[str, str],
+    *,
+    ttl: int = STATE_TTL,
+) -> None:
+    """Write ``fields`` to the admission hashes of ``tokens``."""
+
+    pipe = redis.pipeline(transaction=False)
+    for token in tokens:
+        key = _state_key(kind, token)
+        pipe.hset(key, mapping=dict(fields))
+        pipe.expire(key, ttl)
+    await pipe.execute()
+
+
+def admission_for(app) -> GuestAdmission:
+    """Return the :class:`GuestAdmission` bound to ``app.state.redis``."""
+
+    redis = app.state.redis
+    admission = getattr(app.state, "guest_admission", None)
+    if admission is None or admission.redis is not redis:
+        admission = app.state.guest_admission = GuestAdmission(redis)
+    return admission
+
+
+async def _record(kind: str, tokens: list[str], state: str, redis) -> None:
+    tokens = [t for t in tokens if t]
+    if not tokens:
+        return
+    # Update every admission bound in this process, not only the caller's
+    # client: embedded apps and tests run with their own Redis clients.
+    clients = {id(redis): redis}
+    for admission in list(_live):
+        admission.forget(kind, tokens)
+        clients[id(admission.redis)] = admission.redis
+    for client in clients.values():
+        try:
+            await write_state(client, kind, tokens, {"state": state})
+        except Exception:  # pragma: no cover - readers refill from the database
+            pass
+
+
+async def record_table(table, redis) -> None:
+    """Store the current state of ``table`` for guest admission in ``redis``."""
+
+    await _record("table", [table.code], table.state, redis)
+
+
+async def record_room(room, redis) -> None:
+    """Store the current state of ``room`` for guest admission in ``redis``."""
+
+    await _record("room", [room.code, room.qr_token], room.state, redis)
+
+
+__all__ = [
+    "GuestAdmission",
+    "ROOM_KEY",
+    "TABLE_KEY",
+    "Verdict",
+    "admission_for",
+    "record_room",
+    "record_table",
+    "write_state",
+]
@@ -1,13 +1,19 @@
 import json
 from datetime import datetime, timezone
 
+from ..guest_admission import record_table
 from ..models_tenant import Table
 
 
 async def publish_table_state(table: Table) -> None:
-    """Publish table position and state to the real-time map channel."""
+    """Publish table position and state to the real-time map channel.
+
+    The state is also recorded for guest admission checks.
+    """
     from ..main import redis_client  # lazy import to avoid circular deps
 
+    await record_table(table, redis_client)
+
     channel = f"rt:table_map:{table.tenant_id}"
     payload = {
         "table_id": str(table.id),
@@ -0,0 +1,21 @@
+"""Scheduled per-tenant maintenance jobs."""
+
+from .scheduler import (
+    EnginePool,
+    JobContext,
+    LEASE_FRACTION,
+    LEASE_PREFIX,
+    Scheduler,
+    TenantJob,
+    load_active_tenants,
+)
+
+__all__ = [
+    "EnginePool",
+    "JobContext",
+    "LEASE_FRACTION",
+    "LEASE_PREFIX",
+    "Scheduler",
+    "TenantJob",
+    "load_active_tenants",
+]
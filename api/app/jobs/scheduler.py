@@ -0,0 +1,332 @@
+"""Single asyncio runner for per-tenant maintenance jobs.
+
+Maintenance scripts (rollups, digests, KDS SLA scans, purges and retention)
+used to be started per tenant by systemd timers, each building its own
+engines. :class:`Scheduler` runs them all from one process instead:
+
+* the active tenant list is loaded once and refreshed every
+  ``tenant_refresh`` seconds;
+* tenant sessions come from an :class:`EnginePool` so engines (and their
+  connection pools) are reused across runs;
+* every :class:`TenantJob` has its own interval, start jitter and
+  concurrency limit;
+* a tenant run starts only once its replica holds the Redis lease
+  ``jobs:lease:{job}:{tenant}`` (``SET NX PX``), taken after queueing on the
+  concurrency limit and renewed while the job runs. After a run the lease
+  is kept for :data:`LEASE_FRACTION` of the interval, which covers the ticks
+  of other replicas in between; the replica holding it takes it over again
+  at its own next tick. Only one replica runs each pair at a time, and once
+  per interval. The lease is released on failure so another replica may
+  retry.
+
+While running, the scheduler writes the worker heartbeat
+``jobs:heartbeat:scheduler-{owner}`` shown by ``/api/admin/jobs/status``. It
+expires after two of the longest naps, so a stopped replica drops out.
+Each tenant run is observed in the ``tenant_job_duration_seconds``
+histogram and counted in ``tenant_job_runs_total``. The clock and sleep
+functions are injectable so tests can drive the scheduler with a fake clock.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from ..db.tenant import get_engine
+from ..models_master import Tenant
+from ..redis_registry import HEARTBEAT_TTL, record_heartbeat
+from ..routes_metrics import tenant_job_duration_seconds, tenant_job_runs_total
+
+logger = logging.getLogger(__name__)
+
+LEASE_PREFIX = "jobs:lease:"
+# Leases left by a replica that stopped must run out before the next tick
+LEASE_FRACTION = 0.9
+
+
+@dataclass(frozen=True)
+class TenantJob:
+    """A maintenance job run for every active tenant.
+
+    ``run`` receives a :class:`JobContext`. ``lease_ttl`` defaults to
+    :data:`LEASE_FRACTION` of ``interval``.
+    """
+
+    name: str
+    run: Callable[["JobContext"], Awaitable[None]]
+    interval: float
+    concurrency: int = 4
+    jitter: float = 0.0
+    lease_ttl: float | None = None
+
+    @property
+    def lease_ms(self) -> int:
+        ttl = self.lease_ttl
+        if ttl is None:
+            ttl = self.interval * LEASE_FRACTION
+        return max(1, int(ttl * 1000))
+
+
+class EnginePool:
+    """Tenant engines kept open for the lifetime of the scheduler."""
+
+    def __init__(self, factory: Callable[[str], AsyncEngine] = get_engine) -> None:
+        self._factory = factory
+        self._engines: dict[str, AsyncEngine] = {}
+
+    def engine(self, tenant_id: str) -> AsyncEngine:
+        engine = self._engines.get(tenant_id)
+        if engine is None:
+            engine = self._engines[tenant_id] = self._factory(tenant_id)
+        return engine
+
+    @asynccontextmanager
+    async def session(self, tenant_id: str) -> AsyncIterator[AsyncSession]:
+        async with AsyncSession(
+            self.engine(tenant_id), expire_on_commit=False
+        ) as session:
+            yield session
+
+    async def dispose(self) -> None:
+        engines = list(self._engines.values())
+        self._engines.clear()
+        for engine in engines:
+            await engine.dispose()
+
+
+@dataclass
+class JobContext:
+    """What a job needs to process one tenant."""
+
+    job: str
+    tenant: Any
+    redis: Any
+    engines: EnginePool
+
+    @property
+    def tenant_id(self) -> str:
+        return self.tenant.name
+
+    def session(self, tenant_id: str | None = None):
+        """Return a session on the pooled engine of ``tenant_id``.
+
+        Defaults to the tenant name, which is how the maintenance scripts
+        address tenant databases.
+        """
+
+        return self.engines.session(tenant_id or self.tenant_id)
+
+
+async def load_active_tenants(master_engine: AsyncEngine) -> list[Tenant]:
+    """Return all active tenants from the master database."""
+
+    async with AsyncSession(master_engine, expire_on_commit=False) as session:
+        rows = await session.scalars(
+            select(Tenant).where(Tenant.status == "active").order_by(Tenant.name)
+        )
+        return list(rows)
+
+
+def _decode(value) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class Scheduler:
+    """Run :class:`TenantJob` definitions for all active tenants."""
+
+    def __init__(
+        self,
+        jobs: Iterable[TenantJob],
+        redis,
+        load_tenants: Callable[[], Awaitable[Sequence[Any]]],
+        *,
+        engines: EnginePool | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        rng: random.Random | None = None,
+        owner: str | None = None,
+        tenant_refresh: float = 300.0,
+    ) -> None:
+        self.jobs = list(jobs)
+        self.redis = redis
+        self.engines = engines or EnginePool()
+        self.owner = owner or uuid.uuid4().hex
+        self._load_tenants = load_tenants
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._tenant_refresh = tenant_refresh
+        self._tenants: list[Any] = []
+        self._tenants_at: float | None = None
+        self._next: dict[str, float] = {}
+        self._running: dict[str, asyncio.Task] = {}
+        self._limits = {
+            job.name: asyncio.Semaphore(job.concurrency) for job in self.jobs
+        }
+
+    def _jitter(self, job: TenantJob) -> float:
+        return self._rng.uniform(0, job.jitter) if job.jitter else 0.0
+
+    async def tenants(self) -> list[Any]:
+        """Return the cached tenant list, reloading it when stale."""
+
+        now = self._clock()
+        if self._tenants_at is None or now - self._tenants_at >= self._tenant_refresh:
+            self._tenants = list(await self._load_tenants())
+            self._tenants_at = now
+        return self._tenants
+
+    def next_run(self, job: str) -> float | None:
+        """Return the clock time ``job`` is next due, if scheduled."""
+
+        return self._next.get(job)
+
+    async def tick(self) -> float:
+        """Start every due job and return the seconds until the next one."""
+
+        now = self._clock()
+        for job in self.jobs:
+            due = self._next.setdefault(job.name, now + self._jitter(job))
+            if due > now:
+                continue
+            self._next[job.name] = now + job.interval + self._jitter(job)
+            running = self._running.get(job.name)
+            if running is not None and not running.done():
+                logger.warning("job %s still running, skipping this interval", job.name)
+                continue
+            tenants = await self.tenants()
+            self._running[job.name] = asyncio.create_task(self._run_job(job, tenants))
+        return max(0.0, min(self._next.values(), default=now) - self._clock())
+
+    async def drain(self) -> None:
+        """Wait for all started job passes to finish."""
+
+        await asyncio.gather(*self._running.values(), return_exceptions=True)
+
+    async def run_forever(self, stop: asyncio.Event | None = None) -> None:
+        """Tick until ``stop`` is set, then wait for running jobs."""
+
+        stop = stop or asyncio.Event()
+        stopped = asyncio.ensure_future(stop.wait())
+        try:
+            while not stop.is_set():
+                await self._heartbeat()
+                delay = await self.tick()
+                delay = min(delay, self._tenant_refresh)
+                nap = asyncio.ensure_future(self._sleep(delay))
+                await asyncio.wait({nap, stopped}, return_when=asyncio.FIRST_COMPLETED)
+                nap.cancel()
+        finally:
+            stopped.cancel()
+            await self.drain()
+
+    async def run_once(self, names: Iterable[str] | None = None) -> dict[str, str]:
+        """Run the selected jobs for every tenant now and return the outcomes."""
+
+        wanted = set(names) if names is not None else None
+        tenants = await self.tenants()
+        results: dict[str, str] = {}
+        for job in self.jobs:
+            if wanted is None or job.name in wanted:
+                for tenant, outcome in zip(tenants, await self._run_job(job, tenants)):
+                    results[f"{job.name}:{tenant.name}"] = outcome
+        return results
+
+    async def _run_job(self, job: TenantJob, tenants: Sequence[Any]) -> list[str]:
+        return await asyncio.gather(*(self._run_tenant(job, t) for t in tenants))
+
+    async def _run_tenant(self, job: TenantJob, tenant: Any) -> str:
+        ctx = JobContext(job.name, tenant, self.redis, self.engines)
+        key = f"{LEASE_PREFIX}{job.name}:{ctx.tenant_id}"
+        async with self._limits[job.name]:
+            if not await self._lease(key, job):
+                tenant_job_runs_total.labels(job=job.name, outcome="skipped").inc()
+                return "skipped"
+            renew = asyncio.create_task(self._renew(key, job))
+            started = self._clock()
+            outcome = "ok"
+            try:
+                await job.run(ctx)
+            except Exception:
+                outcome = "error"
+                logger.exception("job %s failed for tenant %s", job.name, ctx.tenant_id)
+            finally:
+                renew.cancel()
+            if outcome == "ok":
+                await self._extend(key, job)
+            else:
+                await self._release(key)
+            tenant_job_duration_seconds.labels(job=job.name).observe(
+                self._clock() - started
+            )
+            tenant_job_runs_total.labels(job=job.name, outcome=outcome).inc()
+            return outcome
+
+    async def _heartbeat(self) -> None:
+        try:
+            await record_heartbeat(
+                self.redis,
+                f"scheduler-{self.owner[:8]}",
+                ttl=max(HEARTBEAT_TTL, int(2 * self._tenant_refresh)),
+            )
+        except Exception:  # pragma: no cover - a missed beat is harmless
+            logger.warning("failed to write scheduler heartbeat", exc_info=True)
+
+    async def _lease(self, key: str, job: TenantJob) -> bool:
+        """Take the lease ``key``, or keep it if this replica already holds it."""
+
+        if await self.redis.set(key, self.owner, nx=True, px=job.lease_ms):
+            return True
+        value = await self.redis.get(key)
+        if value is None:
+            return bool(await self.redis.set(key, self.owner, nx=True, px=job.lease_ms))
+        if _decode(value) != self.owner:
+            return False
+        # left by this replica's previous run of the pair
+        return bool(await self.redis.set(key, self.owner, xx=True, px=job.lease_ms))
+
+    async def _extend(self, key: str, job: TenantJob) -> bool:
+        try:
+            value = await self.redis.get(key)
+            if value is None or _decode(value) != self.owner:
+                return False
+            return bool(await self.redis.pexpire(key, job.lease_ms))
+        except Exception:  # pragma: no cover - renewed on the next beat
+            logger.warning("failed to renew lease %s", key, exc_info=True)
+            return True
+
+    async def _renew(self, key: str, job: TenantJob) -> None:
+        # Redis expires the lease in real time, whatever clock drives the ticks
+        while True:
+            await asyncio.sleep(job.lease_ms / 3000)
+            if not await self._extend(key, job):
+                logger.warning("lost lease %s while running", key)
+                return
+
+    async def _release(self, key: str) -> None:
+        try:
+            value = await self.redis.get(key)
+            if value is not None and _decode(value) == self.owner:
+                await self.redis.delete(key)
+        except Exception:  # pragma: no cover - lease expires on its own
+            logger.warning("failed to release lease %s", key, exc_info=True)
+
+
+__all__ = [
+    "EnginePool",
+    "JobContext",
+    "LEASE_FRACTION",
+    "LEASE_PREFIX",
+    "Scheduler",
+    "TenantJob",
+    "load_active_tenants",
+]
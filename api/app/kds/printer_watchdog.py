@@ -7,6 +7,8 @@ import logging
 from datetime import datetime, timezone
 from typing import Tuple
 
+from ..redis_registry import register_print_retry
+
 HEARTBEAT_KEY = "print:hb:{tenant}"
 RETRY_QUEUE_KEY = "print:retry:{tenant}"
 DEFAULT_TIMEOUT = 60 * 5  # 5 minutes
@@ -48,6 +50,8 @@ async def check(
     qlen = await redis.llen(q_key)
     oldest_age = 0
     if qlen:
+        # queues written by the printer agent are registered for /metrics
+        await register_print_retry(redis, tenant)
         head = await redis.lindex(q_key, 0)
         if head:
             if isinstance(head, bytes):
@@ -0,0 +1,151 @@
+"""Register route modules by path and import them on first use.
+
+Importing every route module at startup also imports what they depend on
+(weasyprint, qrcode, boto3, pyarrow, ...), which made cold starts, blue/green
+switches and test collection slow. :func:`register` instead adds one
+placeholder route per :class:`Router` of :mod:`.router_manifest`, matching
+the path templates recorded there. The first request for one of those paths
+imports the module, splices its routes in at the placeholder's position, so
+route precedence is the same as with eager registration, and dispatches the
+request again.
+
+:meth:`LazyRouters.warm_up` imports the remaining modules in the background
+once the app has started and :meth:`LazyRouters.load_all` imports them at
+once, as building the OpenAPI schema requires. ``LAZY_ROUTERS=0`` registers
+every router eagerly.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import os
+from typing import Iterable, List, NamedTuple, Tuple
+
+from fastapi import FastAPI
+from starlette.routing import (
+    BaseRoute,
+    Match,
+    NoMatchFound,
+    compile_path,
+    get_route_path,
+)
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("LAZY_ROUTERS", "1").lower() not in {"0", "false", "no"}
+
+
+class Router(NamedTuple):
+    """A route module, the paths its router serves and the router attribute."""
+
+    module: str
+    paths: Tuple[str, ...]
+    attr: str = "router"
+
+
+class _Placeholder(BaseRoute):
+    """Route standing in for a :class:`Router` until its module is imported."""
+
+    def __init__(self, owner: "LazyRouters", spec: Router) -> None:
+        self.owner = owner
+        self.spec = spec
+        self.regexes = [compile_path(path)[0] for path in spec.paths]
+        self.loaded = False
+
+    def matches(self, scope: Scope) -> Tuple[Match, Scope]:
+        if scope["type"] in ("http", "websocket") and not self.loaded:
+            path = get_route_path(scope)
+            if any(regex.match(path) for regex in self.regexes):
+                return Match.FULL, {}
+        return Match.NONE, {}
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.owner.load(self)
+        await self.owner.app.router(scope, receive, send)
+
+    def url_path_for(self, name: str, /, **path_params):
+        raise NoMatchFound(name, path_params)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(module={self.spec.module!r})"
+
+
+class LazyRouters:
+    """Placeholders of one app, loaded on first match or by warm-up."""
+
+    def __init__(self, app: FastAPI, package: str) -> None:
+        self.app = app
+        self.package = package
+        self.placeholders: List[_Placeholder] = []
+
+    def add(self, specs: Iterable[Router]) -> None:
+        for spec in specs:
+            placeholder = _Placeholder(self, spec)
+            self.placeholders.append(placeholder)
+            self.app.router.routes.append(placeholder)
+            if not ENABLED:
+                self.load(placeholder)
+
+    @property
+    def pending(self) -> List[_Placeholder]:
+        return [p for p in self.placeholders if not p.loaded]
+
+    def load(self, placeholder: _Placeholder) -> None:
+        """Import the module of ``placeholder`` and put its routes in its place."""
+
+        if placeholder.loaded:
+            return
+        spec = placeholder.spec
+        module = importlib.import_module(f"{self.package}.{spec.module}")
+        routes = self.app.router.routes
+        start = len(routes)
+        self.app.include_router(getattr(module, spec.attr))
+        added = routes[start:]
+        del routes[start:]
+        index = routes.index(placeholder)
+        routes[index : index + 1] = added
+        placeholder.loaded = True
+        self.app.openapi_schema = None
+
+    def load_all(self) -> None:
+        for placeholder in self.pending:
+            self.load(placeholder)
+
+    async def warm_up(self) -> None:
+        """Load the pending modules one at a time without stalling requests."""
+
+        for placeholder in self.pending:
+            name = f"{self.package}.{placeholder.spec.module}"
+            try:
+                # The import runs on a thread; only the splice needs the loop
+                await asyncio.to_thread(importlib.import_module, name)
+                self.load(placeholder)
+            except Exception:  # pragma: no cover - surfaced on first request
+                logger.exception("router warm-up failed for %s", name)
+            await asyncio.sleep(0)
+
+
+def register(app: FastAPI, specs: Iterable[Router], package: str) -> LazyRouters:
+    """Add placeholders for ``specs`` to ``app`` and return their loader.
+
+    Also makes ``app.openapi()`` load every pending router first.
+    """
+
+    lazy = getattr(app.state, "lazy_routers", None)
+    if lazy is None:
+        lazy = app.state.lazy_routers = LazyRouters(app, package)
+        openapi = app.openapi
+
+        def _openapi():
+            lazy.load_all()
+            return openapi()
+
+        app.openapi = _openapi  # type: ignore[method-assign]
+    lazy.add(specs)
+    return lazy
+
+
+__all__ = ["ENABLED", "LazyRouters", "Router", "register"]
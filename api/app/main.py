@@ -6,7 +6,6 @@
 from __future__ import annotations
 
 import asyncio
-import importlib
 import json
 import logging
 import os
@@ -74,9 +73,16 @@ from .auth import (
     rotate_refresh_token,
 )
 from .config.validate import validate_on_boot
+from . import multiproc, redis_registry
 from .db import SessionLocal, replica
+from .db.tenant import dispose_shared_engines
+from . import lazy_routers
+from .router_manifest import ROUTERS
+from .storage import storage as media_storage
+from .media import images as media_images
 from .dunning import build_renew_url
 from .events import alerts_sender, ema_updater, event_bus, report_aggregator
+from .guest_admission import record_table
 from .hooks import order_rejection
 from .hooks.table_map import publish_table_state
 from .i18n import get_msg, resolve_lang
@@ -86,10 +92,10 @@ template_globals = {"build_renew_url": build_renew_url}
 from .menu import router as menu_router
 from .middleware.cors import CORSMiddleware
 from .middlewares.csp import CSPMiddleware
-from .middleware.rate_limit import SlidingWindowRateLimitMiddleware
+from .middleware.rate_limit import AuthRateLimitMiddleware
 from .middlewares import (
     APIKeyAuthMiddleware,
-    GuestBlockMiddleware,
+    GuestAdmissionMiddleware,
     GuestRateLimitMiddleware,
     HTMLErrorPagesMiddleware,
     HttpErrorCounterMiddleware,
@@ -102,124 +108,22 @@ from .middlewares import (
     PinSecurityMiddleware,
     PrometheusMiddleware,
     RequestIdMiddleware,
-    TableStateGuardMiddleware,
     realtime_guard,
 )
 from .middlewares.license_gate import LicenseGate, license_required
-from .middlewares.room_state_guard import RoomStateGuard
 from .middlewares.security import SecurityMiddleware
 from .models_tenant import Table
 from .obs import capture_exception, init_sentry
 from .obs.logging import configure_logging
 from .otel import init_tracing
-from .routes_ab_report import router as ab_report_router
-from .routes_ab_tests import router as ab_tests_router
-from .routes_accounting_exports import router as accounting_exports_router
-from .routes_admin_audit import router as admin_audit_router
-from .routes_admin_billing import router as admin_billing_router
-from .routes_admin_billing import webhook_router as billing_webhook_router
-from .routes_admin_devices import router as admin_devices_router
-from .routes_admin_export import router as admin_export_router
-from .routes_admin_flags import router as admin_flags_router
-from .routes_admin_menu import router as admin_menu_router
-from .routes_admin_onboarding import router as admin_onboarding_router
-from .routes_admin_ops import router as admin_ops_router
-from .routes_admin_privacy import router as admin_privacy_router
-from .routes_admin_qrpack import router as admin_qrpack_router
-from .routes_admin_qrposter_pack import router as admin_qrposter_router
-from .routes_admin_support import router as admin_support_router
-from .routes_admin_webhooks import router as admin_webhooks_router
-from .routes_alerts import router as alerts_router
-from .routes_analytics_outlets import router as analytics_outlets_router
-from .routes_api_keys import router as api_keys_router
-from .routes_auth_2fa import router as auth_2fa_router
-from .routes_auth_jwks import router as auth_jwks_router
-from .routes_auth_magic import router as auth_magic_router
-from .routes_backup import router as backup_router
-from .routes_billing import router as billing_router
-from .routes_checkout_gateway import router as checkout_router
-from .routes_counter_admin import router as counter_admin_router
-from .routes_counter_guest import router as counter_guest_router
-from .routes_csp_report import router as csp_router
-from .routes_dashboard import router as dashboard_router
-from .routes_dashboard_charts import router as dashboard_charts_router
-from .routes_daybook_pdf import router as daybook_pdf_router
-from .routes_digest import router as digest_router
-from .routes_dlq import router as dlq_router
-from .routes_eta import router as eta_router
-from .routes_export_all import router as export_all_router
-from .routes_exports import router as exports_router
-from .routes_feedback import router as feedback_router
-from .routes_floor import router as floor_router
-from .routes_gst_monthly import router as gst_monthly_router
-from .routes_guest_bill import router as guest_bill_router
-from .routes_guest_consent import router as guest_consent_router
-from .routes_guest_menu import router as guest_menu_router
-from .routes_guest_order import router as guest_order_router
-from .routes_guest_receipts import router as guest_receipts_router
-from .routes_help import router as help_router
-from .routes_hotel_guest import router as hotel_guest_router
-from .routes_hotel_housekeeping import router as hotel_hk_router
-from .routes_housekeeping import router as housekeeping_router
-from .routes_integrations import router as integrations_router
-from .routes_integrations_marketplace import router as integrations_marketplace_router
-from .routes_invoice_pdf import router as invoice_pdf_router
-from .routes_jobs_status import router as jobs_status_router
-from .routes_kot import router as kot_router
-from .routes_legal import router as legal_router
-from .routes_limits_usage import router as limits_router
-from .routes_maintenance import router as maintenance_router
-from .routes_media import router as media_router
-from .routes_menu_i18n import router as menu_i18n_router
-from .routes_menu_import import router as menu_import_router
-from .routes_metrics import router as metrics_router
-from .routes_metrics import ws_messages_total
-from .routes_onboarding import router as onboarding_router
-from .routes_order_void import router as order_void_router
-from .routes_orders_batch import router as orders_batch_router
-from .routes_outbox_admin import router as outbox_admin_router
-from .routes_owner_aggregate import router as owner_aggregate_router
-from .routes_owner_analytics import router as owner_analytics_router
-from .routes_owner_sla import router as owner_sla_router
-from .routes_pilot_feedback import router as pilot_feedback_router
-from .routes_pilot_telemetry import router as pilot_telemetry_router
-from .routes_postman import router as postman_router
-from .routes_preflight import router as preflight_router
-from .routes_print import router as print_router
-from .routes_print_bridge import router as print_bridge_router
-from .routes_print_test import router as print_test_router
-from .routes_privacy_dsar import router as privacy_dsar_router
-from .routes_push import router as push_router
-from .routes_pwa_version import router as pwa_version_router
-from .routes_qrpack import router as qrpack_router
-from .routes_ready import router as ready_router
-from .routes_refunds import router as refunds_router
-from .routes_reports import router as reports_router
-from .routes_retention import router as retention_router
-from .routes_rum_vitals import router as rum_router
-from .routes_sandbox_bootstrap import router as sandbox_bootstrap_router
-from .routes_security import router as security_router
-from .routes_slo import router as slo_router
-from .routes_staff import router as staff_router
-from .routes_staff_support import router as staff_support_router
-from .routes_stats import router as stats_router
-from .routes_status import router as status_router
-from .routes_status_json import router as status_json_router
-from .routes_support import router as support_router
-from .routes_support_bundle import router as support_bundle_router
-from .routes_support_console import router as support_console_router
-from .routes_tables_map import router as tables_map_router
-from .routes_tables_qr_rotate import router as tables_qr_rotate_router
-from .routes_tables_sse import router as tables_sse_router
-from .routes_tenant_close import router as tenant_close_router
-from .routes_tenant_sandbox import router as tenant_sandbox_router
-from .routes_time_skew import router as time_skew_router
-from .routes_troubleshoot import router as troubleshoot_router
-from .routes_vapid import router as vapid_router
-from .routes_version import router as version_router
-from .routes_webhook_tools import router as webhook_tools_router
-from .routes_whatsapp_status import router as whatsapp_status_router
+from .routes_metrics import (
+    refresh_query_metrics_forever,
+    refresh_redis_gauges_forever,
+    ws_messages_total,
+)
 from .services import notifications
+from .shared_state import PrepEMAs, TableCarts
+from .slo import slo_tracker
 from .utils import PrepTimeTracker
 from .utils.responses import err, ok
 
@@ -246,11 +150,6 @@ def _sanitize_sys_modules() -> None:
 
 
 _sanitize_sys_modules()
-kds_router = importlib.import_module(".routes_kds", __package__).router
-kds_expo_router = importlib.import_module(".routes_kds_expo", __package__).router
-kds_sla_router = importlib.import_module(".routes_kds_sla", __package__).router
-kds_expo_router = importlib.import_module(".routes_kds_expo", __package__).router
-superadmin_router = importlib.import_module(".routes_superadmin", __package__).router
 
 
 class SWStaticFiles(StaticFiles):
@@ -263,20 +162,45 @@ class SWStaticFiles(StaticFiles):
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    asyncio.create_task(alerts_sender(event_bus.subscribe("order.placed")))
-    asyncio.create_task(ema_updater(event_bus.subscribe("payment.verified")))
-    asyncio.create_task(report_aggregator(event_bus.subscribe("table.cleaned")))
+    if hasattr(media_storage, "bind"):
+        media_storage.bind(app.state.redis)
+    if multiproc.enabled():
+        # Several workers: share state through Redis and run the host-wide
+        # background tasks in the worker holding the host lock only.
+        for store in (event_bus, carts, prep_emas):
+            store.bind(app.state.redis)
+        slo_tracker.shared = True
+        asyncio.create_task(slo_tracker.flush_forever(app.state.redis))
     await replica.check_replica(app)
-    asyncio.create_task(replica.monitor(app))
+    if multiproc.acquire_host_lock("background"):
+        asyncio.create_task(alerts_sender(event_bus.subscribe("order.placed")))
+        asyncio.create_task(ema_updater(event_bus.subscribe("payment.verified")))
+        asyncio.create_task(report_aggregator(event_bus.subscribe("table.cleaned")))
+        if multiproc.enabled():
+            asyncio.create_task(event_bus.relay(app.state.redis))
+        asyncio.create_task(replica.monitor(app))
+        asyncio.create_task(redis_registry.rebuild(app.state.redis))
+    asyncio.create_task(refresh_redis_gauges_forever(app))
+    asyncio.create_task(refresh_query_metrics_forever())
+    warm_up = asyncio.create_task(app.state.lazy_routers.warm_up())
     try:
         yield
     finally:
+        warm_up.cancel()
         redis_conn = getattr(app.state, "redis", None)
         if redis_conn:
             await redis_conn.close()
         pubsub = getattr(app.state, "pubsub", None)
         if pubsub and hasattr(pubsub, "aclose"):
             await pubsub.aclose()
+        await replica.replicas.dispose()
+        await dispose_shared_engines()
+        egress = sys.modules.get(f"{__package__}.security.egress_client")
+        if egress is not None:
+            await egress.close_shared_client()
+        if hasattr(media_storage, "aclose"):
+            await media_storage.aclose()
+        media_images.shutdown()
 
 validate_on_boot()
 settings = get_settings()
@@ -329,10 +253,8 @@ app.add_middleware(PrometheusMiddleware)
 app.add_middleware(HttpErrorCounterMiddleware)
 app.add_middleware(HTMLErrorPagesMiddleware, static_dir=static_dir)
 app.add_middleware(RequestIdMiddleware)
-app.add_middleware(SlidingWindowRateLimitMiddleware)
-app.add_middleware(GuestBlockMiddleware)
-app.add_middleware(TableStateGuardMiddleware)
-app.add_middleware(RoomStateGuard)
+app.add_middleware(AuthRateLimitMiddleware)
+app.add_middleware(GuestAdmissionMiddleware)
 app.add_middleware(GuestRateLimitMiddleware)
 app.add_middleware(I18nMiddleware)
 app.add_middleware(LicensingMiddleware)
@@ -550,12 +472,9 @@ class StaffOrder(BaseModel):
 
 
 tables: Dict[str, Dict[str, List[CartItem]]] = {}  # table_id -> cart and orders
-
-
-def _tracker(table_code: str) -> PrepTimeTracker:
-    """Return the EMA tracker for ``table_code``."""
-
-    return prep_trackers.setdefault(table_code, PrepTimeTracker(window=10))
+# Bound to Redis in lifespan when several workers serve the API
+carts = TableCarts(CartItem, tables)
+prep_emas = PrepEMAs(prep_trackers, window=10)
 
 
 async def _broadcast(table_code: str, data: dict) -> None:
@@ -684,7 +603,7 @@ async def table_ws(websocket: WebSocket, table_code: str) -> None:
 
     ip = websocket.client.host if websocket.client else "?"
     try:
-        realtime_guard.register(ip)
+        await realtime_guard.acquire(ip, redis_client)
     except HTTPException:
         await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
         return
@@ -694,7 +613,6 @@ async def table_ws(websocket: WebSocket, table_code: str) -> None:
     pubsub = redis_client.pubsub()
     websocket.app.state.pubsubs.add(pubsub)
     await pubsub.subscribe(channel)
-    tracker = _tracker(table_code)
     queue: asyncio.Queue[dict | None] = realtime_guard.queue()
 
     async def reader():
@@ -729,7 +647,7 @@ async def table_ws(websocket: WebSocket, table_code: str) -> None:
                 break
             prep_time = item.get("prep_time")
             if prep_time is not None:
-                item["eta"] = tracker.add_prep_time(float(prep_time))
+                item["eta"] = await prep_emas.add(table_code, float(prep_time))
             await websocket.send_json(item)
             ws_messages_total.inc()
     except WebSocketDisconnect:  # pragma: no cover - network disconnect
@@ -741,13 +659,16 @@ async def table_ws(websocket: WebSocket, table_code: str) -> None:
         await pubsub.aclose()
         websocket.app.state.pubsubs.discard(pubsub)
 
-        realtime_guard.unregister(ip)
+        await realtime_guard.release(ip, redis_client)
 
 
-def _table_state(table_id: str) -> Dict[str, List[CartItem]]:
-    """Return the mutable state dictionary for a table."""
+def _order_line(state: Dict[str, List[CartItem]], index: int) -> CartItem:
+    """Return order line ``index`` of a table state or raise a 404."""
 
-    return tables.setdefault(table_id, {"cart": [], "orders": []})
+    try:
+        return state["orders"][index]
+    except IndexError as exc:
+        raise HTTPException(status_code=404, detail="Order item not found") from exc
 
 
 def _guard_table_open(table_id: str, lang: str):
@@ -792,8 +713,7 @@ async def add_to_cart(
     lang = resolve_lang(accept_language)
     if (resp := _guard_table_open(table_id, lang)) is not None:
         return resp
-    table = _table_state(table_id)
-    table["cart"].append(item)
+    table = await carts.update(table_id, lambda state: state["cart"].append(item))
     await _broadcast(table_id, {"status": "cart"})
     return ok({"cart": table["cart"]})
 
@@ -808,9 +728,12 @@ async def place_order(
     lang = resolve_lang(accept_language)
     if (resp := _guard_table_open(table_id, lang)) is not None:
         return resp
-    table = _table_state(table_id)
-    table["orders"].extend(table["cart"])
-    table["cart"] = []  # cart is cleared so guests cannot modify placed items
+
+    def _place(state: Dict[str, List[CartItem]]) -> None:
+        state["orders"].extend(state["cart"])
+        state["cart"] = []  # cart is cleared so guests cannot modify placed items
+
+    table = await carts.update(table_id, _place)
     await event_bus.publish("order.placed", {"table_id": table_id})
     await _broadcast(table_id, {"status": "placed"})
 
@@ -825,16 +748,16 @@ async def place_order(
 async def update_order(table_id: str, index: int, payload: UpdateQuantity) -> dict:
     """Allow an admin to soft-cancel an order line by setting ``quantity`` to 0."""
 
-    table = _table_state(table_id)
-    try:
-        order_item = table["orders"][index]
-    except IndexError as exc:  # pragma: no cover - simple bounds check
-        raise HTTPException(status_code=404, detail="Order item not found") from exc
-    if not payload.admin:
-        raise HTTPException(status_code=403, detail="Edits restricted")
-    if payload.quantity != 0:
-        raise HTTPException(status_code=400, detail="Only soft-cancel allowed")
-    order_item.quantity = 0  # mark as cancelled but retain entry for audit
+
+    def _cancel(state: Dict[str, List[CartItem]]) -> None:
+        order_item = _order_line(state, index)
+        if not payload.admin:
+            raise HTTPException(status_code=403, detail="Edits restricted")
+        if payload.quantity != 0:
+            raise HTTPException(status_code=400, detail="Only soft-cancel allowed")
+        order_item.quantity = 0  # mark as cancelled but retain entry for audit
+
+    table = await carts.update(table_id, _cancel)
     await _broadcast(table_id, {"status": "updated"})
     log_event("system", "order_update", table_id)
 
@@ -849,8 +772,9 @@ async def update_order(table_id: str, index: int, payload: UpdateQuantity) -> di
 async def staff_place_order(table_id: str, item: StaffOrder) -> dict:
     """Staff directly place an order for a guest without a phone."""
 
-    table = _table_state(table_id)
-    table["orders"].append(CartItem(**item.model_dump()))
+    table = await carts.update(
+        table_id, lambda state: state["orders"].append(CartItem(**item.model_dump()))
+    )
     await _broadcast(table_id, {"status": "staff_order"})
     return ok({"orders": table["orders"]})
 
@@ -860,7 +784,7 @@ async def list_orders() -> dict[str, list[dict]]:
     """Return all orders across tables for staff views."""
 
     data: list[dict] = []
-    for table_id, state in tables.items():
+    for table_id, state in await carts.items():
         for idx, item in enumerate(state["orders"]):
             entry = item.model_dump()
             entry.update({"table_id": table_id, "index": idx})
@@ -876,12 +800,11 @@ async def list_orders() -> dict[str, list[dict]]:
 async def accept_order(table_id: str, index: int) -> dict[str, str]:
     """Mark an order line as accepted."""
 
-    table = _table_state(table_id)
-    try:
-        order_item = table["orders"][index]
-    except IndexError as exc:
-        raise HTTPException(status_code=404, detail="Order item not found") from exc
-    order_item.status = "accepted"
+
+    def _mark(state: Dict[str, List[CartItem]]) -> None:
+        _order_line(state, index).status = "accepted"
+
+    await carts.update(table_id, _mark)
     await _broadcast(table_id, {"status": "accepted", "index": index})
     return {"status": "accepted"}
 
@@ -894,12 +817,11 @@ async def accept_order(table_id: str, index: int) -> dict[str, str]:
 async def reject_order(table_id: str, index: int, request: Request) -> dict[str, str]:
     """Mark an order line as rejected."""
 
-    table = _table_state(table_id)
-    try:
-        order_item = table["orders"][index]
-    except IndexError as exc:
-        raise HTTPException(status_code=404, detail="Order item not found") from exc
-    order_item.status = "rejected"
+
+    def _mark(state: Dict[str, List[CartItem]]) -> None:
+        _order_line(state, index).status = "rejected"
+
+    await carts.update(table_id, _mark)
     await _broadcast(table_id, {"status": "rejected", "index": index})
 
     ip = request.client.host if request.client else "unknown"
@@ -915,7 +837,7 @@ async def reject_order(table_id: str, index: int, request: Request) -> dict[str,
 async def bill(table_id: str) -> dict:
     """Return the running bill for a table."""
 
-    table = _table_state(table_id)
+    table = await carts.update(table_id)
     total = sum(i.price * i.quantity for i in table["orders"] if i.quantity > 0)
     return ok({"total": total, "orders": table["orders"]})
 
@@ -924,9 +846,14 @@ async def bill(table_id: str) -> dict:
 async def pay_now(table_id: str) -> dict:
     """Settle the current bill and clear outstanding orders."""
 
-    table = _table_state(table_id)
-    total = sum(i.price * i.quantity for i in table["orders"] if i.quantity > 0)
-    table["orders"] = []  # clearing orders resets table state for next guests
+    settled: list[CartItem] = []
+
+    def _settle(state: Dict[str, List[CartItem]]) -> None:
+        settled[:] = state["orders"]
+        state["orders"] = []  # clearing orders resets table state for next guests
+
+    await carts.update(table_id, _settle)
+    total = sum(i.price * i.quantity for i in settled if i.quantity > 0)
     try:
         tid = uuid.UUID(table_id)
     except ValueError:
@@ -937,6 +864,7 @@ async def pay_now(table_id: str) -> dict:
             if db_table is not None:
                 db_table.state = "LOCKED"
                 session.commit()
+                await record_table(db_table, app.state.redis)
     log_event("system", "payment", table_id)
     return ok({"total": total})
 
@@ -1006,128 +934,9 @@ async def mark_clean(table_id: str) -> dict:
     return ok({"table_id": table_id, "state": table.state})
 
 
-# Router wiring
-
-# Auth domain
-app.include_router(auth_magic_router)
-app.include_router(auth_2fa_router)
-app.include_router(auth_jwks_router)
-
-# Guest domain
-app.include_router(guest_menu_router)
-app.include_router(guest_order_router)
-app.include_router(guest_bill_router)
-app.include_router(guest_consent_router)
-app.include_router(guest_receipts_router)
-app.include_router(counter_guest_router)
-app.include_router(hotel_guest_router)
-app.include_router(invoice_pdf_router)
-app.include_router(billing_router)
-app.include_router(admin_billing_router)
-app.include_router(billing_webhook_router)
-app.include_router(onboarding_router)
-app.include_router(qrpack_router)
-app.include_router(order_void_router)
-
-# KDS/KOT domain
-app.include_router(kot_router)
-app.include_router(kds_router)
-app.include_router(kds_expo_router)
-app.include_router(kds_sla_router)
-app.include_router(kds_expo_router)
-
-# Admin domain
-app.include_router(counter_admin_router)
-app.include_router(staff_router)
-app.include_router(admin_menu_router)
-app.include_router(admin_audit_router)
-app.include_router(menu_i18n_router)
-app.include_router(admin_onboarding_router)
-app.include_router(slo_router)
-app.include_router(admin_ops_router)
-app.include_router(limits_router)
-app.include_router(menu_import_router)
-app.include_router(alerts_router)
-app.include_router(security_router)
-app.include_router(jobs_status_router)
-app.include_router(dlq_router)
-app.include_router(admin_privacy_router)
-app.include_router(privacy_dsar_router)
-app.include_router(retention_router)
-app.include_router(outbox_admin_router)
-app.include_router(webhook_tools_router)
-app.include_router(orders_batch_router)
-app.include_router(housekeeping_router)
-app.include_router(hotel_hk_router)
-app.include_router(metrics_router)
-app.include_router(ab_tests_router)
-app.include_router(ab_report_router)
-app.include_router(rum_router)
-app.include_router(analytics_outlets_router)
-app.include_router(owner_analytics_router)
-app.include_router(owner_sla_router)
-app.include_router(dashboard_router)
-app.include_router(dashboard_charts_router)
-app.include_router(owner_aggregate_router)
-app.include_router(preflight_router)
-app.include_router(tables_map_router)
-app.include_router(tables_qr_rotate_router)
-app.include_router(tables_sse_router)
-app.include_router(floor_router)
-app.include_router(time_skew_router)
-app.include_router(pwa_version_router)
-app.include_router(status_json_router)
-app.include_router(status_router)
-app.include_router(stats_router)
-app.include_router(version_router)
-app.include_router(ready_router)
-app.include_router(eta_router)
-app.include_router(troubleshoot_router)
-app.include_router(help_router)
-app.include_router(support_router)
-app.include_router(admin_support_router)
-app.include_router(admin_flags_router)
-app.include_router(staff_support_router)
-app.include_router(support_console_router)
-app.include_router(admin_webhooks_router)
-app.include_router(print_test_router)
-app.include_router(integrations_router)
-app.include_router(integrations_marketplace_router)
-app.include_router(slo_router)
-app.include_router(support_bundle_router)
-app.include_router(legal_router)
-app.include_router(maintenance_router)
-app.include_router(tenant_close_router)
-app.include_router(tenant_sandbox_router)
-app.include_router(sandbox_bootstrap_router)
-app.include_router(backup_router)
-app.include_router(print_router)
-app.include_router(print_bridge_router)
-app.include_router(push_router)
-app.include_router(whatsapp_status_router)
-app.include_router(checkout_router)
-app.include_router(refunds_router)
-app.include_router(feedback_router)
-app.include_router(pilot_feedback_router)
-app.include_router(pilot_telemetry_router)
-app.include_router(media_router)
-app.include_router(api_keys_router)
-app.include_router(vapid_router)
-app.include_router(postman_router)
-app.include_router(admin_qrpack_router)
-app.include_router(admin_qrposter_router)
-app.include_router(admin_devices_router)
-app.include_router(admin_export_router)
-
-# Reports domain
-app.include_router(daybook_pdf_router)
-app.include_router(digest_router)
-app.include_router(reports_router)
-app.include_router(csp_router)
-app.include_router(accounting_exports_router)
-app.include_router(gst_monthly_router)
-app.include_router(exports_router)
-app.include_router(export_all_router)
-
-if os.getenv("ADMIN_API_ENABLED", "").lower() in {"1", "true", "yes"}:
-    app.include_router(superadmin_router)
+# Router wiring: route modules are imported on first request for one of their
+# paths or by the warm-up after startup, see lazy_routers
+admin_api_enabled = os.getenv("ADMIN_API_ENABLED", "").lower() in {"1", "true", "yes"}
+for group, specs in ROUTERS.items():
+    if group != "superadmin" or admin_api_enabled:
+        lazy_routers.register(app, specs, __package__)
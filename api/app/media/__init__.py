@@ -0,0 +1 @@
+"""Media processing helpers shared by the upload routes and benchmarks."""
@@ -0,0 +1,317 @@
+"""Bulk menu import: parse a CSV, diff it against the menu and apply the diff.
+
+The CSV has one row per item with ``name`` and ``price`` required and
+``category``, ``sort``, ``is_veg``, ``gst_rate``, ``hsn_sac``,
+``out_of_stock``, ``dietary``, ``allergens`` and ``modifiers`` optional.
+List columns are ``|`` separated; modifiers are ``Name:delta`` pairs such as
+``Extra cheese:20|Large:50``.
+
+Items are matched on their natural key, the case-folded ``(category, name)``
+pair, and modifiers of an item on their name so re-imports keep modifier ids
+stable. Columns missing from the header are left untouched on existing
+items. :func:`apply` writes every change with batched ``executemany``
+statements in one transaction and bumps the menu version once, so importing
+the same file twice is a no-op the second time.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal, InvalidOperation
+from typing import IO, Dict, Iterable, List, Tuple
+
+from sqlalchemy import Row, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models_tenant import Category, MenuItem
+from ..repos_sqlalchemy.menu_repo_sql import MenuRepoSQL
+
+REQUIRED_FIELDS = ["name", "price"]
+DEFAULT_CATEGORY = "Menu"
+BATCH_SIZE = 1000
+TRUE_VALUES = {"1", "true", "yes", "y"}
+FALSE_VALUES = {"", "0", "false", "no", "n"}
+Key = Tuple[str, str]
+
+
+@dataclass
+class ParsedMenu:
+    """Rows of a menu CSV keyed by natural key, plus any validation errors."""
+
+    columns: List[str]
+    rows: Dict[Key, dict] = field(default_factory=dict)
+    errors: List[str] = field(default_factory=list)
+    missing_fields: List[str] = field(default_factory=list)
+
+
+@dataclass
+class MenuDiff:
+    """Changes needed to make the menu match a :class:`ParsedMenu`."""
+
+    categories: List[str] = field(default_factory=list)
+    inserts: List[dict] = field(default_factory=list)
+    updates: List[dict] = field(default_factory=list)
+    deletes: List[int] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.categories or self.inserts or self.updates or self.deletes)
+
+    def summary(self) -> dict:
+        return {
+            "categories": len(self.categories),
+            "inserted": len(self.inserts),
+            "updated": len(self.updates),
+            "deleted": len(self.deletes),
+            "unchanged": self.unchanged,
+        }
+
+
+def natural_key(category: str, name: str) -> Key:
+    return (category.strip().casefold(), name.strip().casefold())
+
+
+def _flag(value: str) -> bool:
+    value = value.strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(value)
+
+
+def _decimal(value: str) -> Decimal:
+    number = Decimal(value.strip()).quantize(Decimal("0.01"))
+    if not number.is_finite() or number < 0:
+        raise ValueError(value)
+    return number
+
+
+def _tags(value: str) -> List[str]:
+    return [tag.strip() for tag in value.split("|") if tag.strip()]
+
+
+def _modifiers(value: str) -> List[dict]:
+    mods = []
+    for part in _tags(value):
+        name, sep, delta = part.rpartition(":")
+        if not sep or not name.strip():
+            raise ValueError(part)
+        mods.append({"name": name.strip(), "delta": float(_decimal(delta))})
+    return mods
+
+
+_CONVERTERS = {
+    "sort": int,
+    "price": _decimal,
+    "is_veg": _flag,
+    "gst_rate": lambda v: _decimal(v) if v.strip() else None,
+    "hsn_sac": lambda v: v.strip() or None,
+    "out_of_stock": _flag,
+    "dietary": _tags,
+    "allergens": _tags,
+    "modifiers": _modifiers,
+}
+
+
+def parse(stream: IO[bytes], encoding: str = "utf-8-sig") -> ParsedMenu:
+    """Parse a menu CSV from the binary ``stream`` one row at a time.
+
+    The upload is never decoded as a whole; only the parsed rows are kept.
+    Errors are reported as ``row {n} ...`` with ``n`` the CSV line number.
+    """
+
+    text = io.TextIOWrapper(stream, encoding=encoding, newline="")
+    try:
+        reader = csv.DictReader(text)
+        header = [name.strip() for name in reader.fieldnames or []]
+        reader.fieldnames = header
+        columns = [name for name in header if name in _CONVERTERS]
+        parsed = ParsedMenu(columns=columns)
+        parsed.missing_fields = [f for f in REQUIRED_FIELDS if f not in header]
+        if parsed.missing_fields:
+            parsed.errors.append("missing_required_fields")
+            return parsed
+        for idx, raw in enumerate(reader, start=2):
+            missing = [f for f in REQUIRED_FIELDS if not (raw.get(f) or "").strip()]
+            for name in missing:
+                parsed.errors.append(f"row {idx} missing {name}")
+            if missing:
+                continue
+            category = (raw.get("category") or "").strip() or DEFAULT_CATEGORY
+            row = {"category": category, "name": raw["name"].strip()}
+            invalid = False
+            for name in columns:
+                try:
+                    row[name] = _CONVERTERS[name](raw.get(name) or "")
+                except (ArithmeticError, InvalidOperation, ValueError):
+                    parsed.errors.append(f"row {idx} invalid {name}")
+                    invalid = True
+            if invalid:
+                continue
+            key = natural_key(category, row["name"])
+            if key in parsed.rows:
+                parsed.errors.append(f"row {idx} duplicate item {row['name']}")
+                continue
+            parsed.rows[key] = row
+    except UnicodeDecodeError:
+        parsed = ParsedMenu(columns=[], errors=["invalid_encoding"])
+    finally:
+        text.detach()
+    return parsed
+
+
+def _merge_modifiers(new: List[dict], old: Iterable[dict] | None) -> List[dict]:
+    """Give ``new`` modifiers the ids of same-named ``old`` ones."""
+
+    by_name = {str(m.get("name", "")).casefold(): m for m in old or []}
+    next_id = max((int(m.get("id", 0)) for m in old or []), default=0) + 1
+    merged = []
+    for mod in new:
+        previous = by_name.get(mod["name"].casefold())
+        if previous is not None and "id" in previous:
+            mod_id = previous["id"]
+        else:
+            mod_id, next_id = next_id, next_id + 1
+        merged.append({"id": mod_id, "name": mod["name"], "delta": mod["delta"]})
+    return merged
+
+
+def _same(column: str, old, new) -> bool:
+    if column in {"price", "gst_rate"} and old is not None and new is not None:
+        return Decimal(str(old)).quantize(Decimal("0.01")) == new
+    return (old or None) == (new or None) if column != "sort" else old == new
+
+
+async def diff(
+    session: AsyncSession, parsed: ParsedMenu, *, delete_missing: bool = True
+) -> MenuDiff:
+    """Compare ``parsed`` with the current menu of ``session``."""
+
+    categories = {
+        name.strip().casefold() for name in await session.scalars(select(Category.name))
+    }
+    result = await session.execute(
+        select(
+            MenuItem.id,
+            MenuItem.name,
+            MenuItem.deleted_at,
+            *(getattr(MenuItem, column) for column in _CONVERTERS),
+            Category.name.label("category"),
+        )
+        .join(Category, MenuItem.category_id == Category.id)
+        .order_by(MenuItem.deleted_at.is_not(None), MenuItem.id)
+    )
+    existing: Dict[Key, Row] = {}
+    for item in result.all():
+        existing.setdefault(natural_key(item.category, item.name), item)
+
+    changes = MenuDiff()
+    positions: Dict[str, int] = {}
+    for key, row in parsed.rows.items():
+        position = positions.get(key[0], 0)
+        positions[key[0]] = position + 1
+        item = existing.get(key)
+        if item is None:
+            if key[0] not in categories:
+                categories.add(key[0])
+                changes.categories.append(row["category"])
+            values = {"category": key[0], "name": row["name"], "sort": position}
+            values.update({c: row[c] for c in parsed.columns})
+            if "modifiers" in values:
+                values["modifiers"] = _merge_modifiers(values["modifiers"], [])
+            changes.inserts.append(values)
+            continue
+        values = {}
+        for column in parsed.columns:
+            new = row[column]
+            if column == "modifiers":
+                new = _merge_modifiers(new, item.modifiers)
+            if not _same(column, getattr(item, column), new):
+                values[column] = new
+        if item.deleted_at is not None:
+            values["deleted_at"] = None
+        if values:
+            values["id"] = item.id
+            changes.updates.append(values)
+        else:
+            changes.unchanged += 1
+    if delete_missing:
+        changes.deletes = [
+            item.id
+            for key, item in existing.items()
+            if key not in parsed.rows and item.deleted_at is None
+        ]
+    return changes
+
+
+def _batches(rows: List, size: int = BATCH_SIZE) -> Iterable[List]:
+    for start in range(0, len(rows), size):
+        yield rows[start : start + size]
+
+
+async def apply(session: AsyncSession, changes: MenuDiff) -> bool:
+    """Write ``changes`` in one transaction and bump the menu version once.
+
+    Returns ``False`` without touching the database when there is nothing to
+    change. Nothing is committed unless every statement succeeds.
+    """
+
+    if not changes.changed:
+        return False
+    now = datetime.now(timezone.utc)
+    if changes.categories:
+        top = await session.scalar(select(func.max(Category.sort))) or 0
+        await session.execute(
+            insert(Category),
+            [
+                {"name": name, "sort": top + n}
+                for n, name in enumerate(changes.categories, start=1)
+            ],
+        )
+    category_ids = {
+        name.strip().casefold(): cat_id
+        for cat_id, name in (
+            await session.execute(
+                select(Category.id, Category.name).order_by(Category.id.desc())
+            )
+        ).all()
+    }
+    for batch in _batches(changes.inserts):
+        rows = []
+        for values in batch:
+            row = {k: v for k, v in values.items() if k != "category"}
+            row["category_id"] = category_ids[values["category"]]
+            row.setdefault("modifiers", [])
+            row.setdefault("combos", [])
+            row["updated_at"] = now
+            rows.append(row)
+        await session.execute(insert(MenuItem), rows)
+    for batch in _batches(changes.updates):
+        await session.execute(
+            update(MenuItem), [dict(values, updated_at=now) for values in batch]
+        )
+    for batch in _batches(changes.deletes):
+        await session.execute(
+            update(MenuItem)
+            .where(MenuItem.id.in_(batch))
+            .values(deleted_at=now, updated_at=now)
+        )
+    await MenuRepoSQL()._bump_menu_version(session)
+    await session.commit()
+    return True
+
+
+__all__ = [
+    "MenuDiff",
+    "ParsedMenu",
+    "REQUIRED_FIELDS",
+    "apply",
+    "diff",
+    "natural_key",
+    "parse",
+]
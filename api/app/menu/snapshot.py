@@ -0,0 +1,153 @@
+"""Prebuilt, versioned menu response bodies.
+
+Guest-facing menu endpoints serve the same body to every guest of an outlet,
+so instead of querying the database and serialising on each request the
+rendered JSON body is stored in Redis together with its ETag under
+``menu:snap:{scope}:{lang}``. Each scope (usually a tenant id) has a version
+counter ``menu:ver:{scope}``; :func:`invalidate` bumps it after menu writes
+which makes every stored snapshot for the scope stale at once.
+
+Hotel rooms are not linked to a tenant and read the menu of the shared
+database under :data:`SHARED_SCOPE`, so every invalidation also bumps that
+scope.
+
+A read is a single ``MGET`` of the version and the snapshot. The ETag is the
+SHA-1 of the body, so it is a strong validator and conditional requests that
+match it get a ``304`` without the body being sent.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from fastapi import Response
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_TTL_SECS = int(os.getenv("MENU_SNAPSHOT_TTL_SECS", "300"))
+SHARED_SCOPE = "default"
+
+
+@dataclass(frozen=True)
+class MenuSnapshot:
+    """A rendered menu body with its strong ETag."""
+
+    etag: str
+    body: bytes
+
+
+def _version_key(scope: str) -> str:
+    return f"menu:ver:{scope}"
+
+
+def _snapshot_key(scope: str, lang: str) -> str:
+    return f"menu:snap:{scope}:{lang}"
+
+
+def _decode(value) -> str | None:
+    if value is None:
+        return None
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def render(payload: dict) -> MenuSnapshot:
+    """Serialise ``payload`` and compute its ETag."""
+
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    digest = hashlib.sha1(body, usedforsecurity=False).hexdigest()
+    return MenuSnapshot(etag=f'"{digest}"', body=body)
+
+
+async def get_or_build(
+    redis,
+    scope: str,
+    lang: str,
+    build: Callable[[], Awaitable[dict]],
+    *,
+    ttl: int = SNAPSHOT_TTL_SECS,
+) -> MenuSnapshot:
+    """Return the current snapshot for ``scope``/``lang``.
+
+    ``build`` is awaited only when no snapshot exists for the current menu
+    version; it must return the JSON-serialisable response payload. Cache
+    errors fall back to building the body directly.
+    """
+
+    version = "0"
+    try:
+        raw_version, raw = await redis.mget(
+            [_version_key(scope), _snapshot_key(scope, lang)]
+        ) or (None, None)
+        version = _decode(raw_version) or "0"
+        stored = _decode(raw)
+        if stored:
+            stored_version, etag, body = stored.split("\n", 2)
+            if stored_version == version:
+                return MenuSnapshot(etag=etag, body=body.encode())
+    except Exception:  # pragma: no cover - cache is best effort
+        logger.warning("menu snapshot cache unavailable", exc_info=True)
+
+    snapshot = render(await build())
+    try:
+        value = f"{version}\n{snapshot.etag}\n{snapshot.body.decode()}"
+        await redis.set(_snapshot_key(scope, lang), value, ex=ttl)
+    except Exception:  # pragma: no cover - cache is best effort
+        logger.warning("failed to store menu snapshot", exc_info=True)
+    return snapshot
+
+
+async def invalidate(redis, scope: str) -> None:
+    """Mark all menu snapshots (and the legacy item cache) of ``scope`` stale.
+
+    The shared scope is bumped as well, see the module docstring.
+    """
+
+    for name in dict.fromkeys((scope, SHARED_SCOPE)):
+        await redis.incr(_version_key(name))
+        await redis.delete(f"menu:{name}")
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Return ``True`` if an ``If-None-Match`` header matches ``etag``."""
+
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag.strip('"')
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"') == bare:
+            return True
+    return False
+
+
+def respond(snapshot: MenuSnapshot, if_none_match: str | None) -> Response:
+    """Return the snapshot body, or ``304`` if the client already has it."""
+
+    headers = {
+        "ETag": snapshot.etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Language",
+    }
+    if etag_matches(if_none_match, snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(snapshot.body, media_type="application/json", headers=headers)
+
+
+__all__ = [
+    "SHARED_SCOPE",
+    "MenuSnapshot",
+    "etag_matches",
+    "get_or_build",
+    "invalidate",
+    "render",
+    "respond",
+]
@@ -2,8 +2,6 @@ from __future__ import annotations
 
 import os
 import re
-import time
-import uuid
 from typing import Callable
 
 from redis.asyncio import Redis
@@ -11,6 +9,7 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
 
+from ..security import ratelimit
 from ..utils.rate_limit import rate_limited
 
 _TIME_UNITS = {"s": 1, "m": 60, "h": 3600}
@@ -18,14 +17,18 @@ _TIME_UNITS = {"s": 1, "m": 60, "h": 3600}
 
 def _parse_limit(value: str, default: tuple[int, int]) -> tuple[int, int]:
     match = re.fullmatch(r"(\d+)/(\d+)([smh])", value)
-    if not match:
+    if not match or 0 in (int(match.group(1)), int(match.group(2))):
         return default
     count, span, unit = match.groups()
     return int(count), int(span) * _TIME_UNITS[unit]
 
 
-class SlidingWindowRateLimitMiddleware(BaseHTTPMiddleware):
-    """Sliding window rate limiter for authentication endpoints."""
+class AuthRateLimitMiddleware(BaseHTTPMiddleware):
+    """Token bucket rate limiter for authentication endpoints.
+
+    A limit of ``count/span`` allows a burst of ``count`` requests refilled
+    at ``count`` per ``span``.
+    """
 
     def __init__(self, app: Callable) -> None:
         super().__init__(app)
@@ -45,17 +48,11 @@ class SlidingWindowRateLimitMiddleware(BaseHTTPMiddleware):
         ip = request.client[0] if request.client else "unknown"
         tenant = request.headers.get("X-Tenant-ID", "-")
         key = f"ratelimit:{request.url.path}:{tenant}:{ip}"
-        now = int(time.time())
-        pipe = redis.pipeline()
-        pipe.zadd(key, {str(uuid.uuid4()): now})
-        pipe.zremrangebyscore(key, 0, now - window)
-        pipe.zcard(key)
-        pipe.expire(key, window)
-        _, _, count, _ = await pipe.execute()
-        if count and count > limit:
-            retry = await redis.ttl(key)
-            retry_after = retry if retry and retry > 0 else window
-            response = rate_limited(retry_after)
-            response.headers["Retry-After"] = str(retry_after)
+        result = await ratelimit.consume(
+            redis, key, rate_per_min=limit * 60 / window, burst=limit
+        )
+        if not result.allowed:
+            response = rate_limited(result.retry_after)
+            response.headers["Retry-After"] = str(result.retry_after)
             return response
         return await call_next(request)
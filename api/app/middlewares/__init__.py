@@ -1,6 +1,7 @@
 from .api_key_auth import APIKeyAuthMiddleware
 from .error_pages import HTMLErrorPagesMiddleware
 from .feature_flags import FeatureFlagsMiddleware
+from .guest_admission import GuestAdmissionMiddleware
 from .guest_block import GuestBlockMiddleware
 from .guest_ratelimit import GuestRateLimitMiddleware
 from .http_errors import HttpErrorCounterMiddleware
@@ -21,6 +22,7 @@ __all__ = [
     "LoggingMiddleware",
     "GuestRateLimitMiddleware",
     "GuestBlockMiddleware",
+    "GuestAdmissionMiddleware",
     "LanguageMiddleware",
     "I18nMiddleware",
     "PrometheusMiddleware",
@@ -7,7 +7,7 @@ from starlette.requests import Request
 from starlette.responses import JSONResponse
 from starlette.status import HTTP_429_TOO_MANY_REQUESTS
 
-from ..routes_metrics import abuse_ip_cooldown
+from ..routes_metrics import set_abuse_cooldown
 from ..security import blocklist, ip_reputation
 from ..security.ua_denylist import is_denied
 from ..utils.responses import err
@@ -44,7 +44,7 @@ class GuestBlockMiddleware(BaseHTTPMiddleware):
                 )
             ttl = await blocklist.block_ttl(redis, tenant, ip)
             if ttl > 0:
-                abuse_ip_cooldown.labels(ip=ip).set(ttl)
+                set_abuse_cooldown(ip, ttl)
                 return JSONResponse(
                     err(
                         "ABUSE_COOLDOWN",
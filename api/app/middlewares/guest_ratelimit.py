@@ -22,10 +22,9 @@ class GuestRateLimitMiddleware(BaseHTTPMiddleware):
         redis = request.app.state.redis
 
         policy = ratelimits.guest_order()
-        allowed = await ratelimit.allow(
+        rl = await ratelimit.hit(
             redis, ip, "guest", rate_per_min=policy.rate_per_min, burst=policy.burst
         )
-        if not allowed:
-            retry_after = await redis.ttl(f"ratelimit:{ip}:guest")
-            return rate_limited(retry_after)
+        if not rl.allowed:
+            return rate_limited(rl.retry_after)
         return await call_next(request)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 """Middleware to enforce tenant licensing constraints."""
 
+import asyncio
 import os
 from datetime import datetime
 from pathlib import Path
@@ -84,6 +85,43 @@ def storage_bytes(tenant_id: str) -> int:
     return sum(p.stat().st_size for p in base.rglob("*") if p.is_file())
 
 
+MEDIA_BYTES_KEY = "usage:{tenant}:media_bytes"
+
+
+async def media_bytes(tenant_id: str, redis=None) -> int:
+    """Return stored media bytes for ``tenant_id`` without walking storage.
+
+    Reads the counter kept by :func:`add_media_bytes`. A tenant without a
+    counter, e.g. one with media uploaded before counters existed, is seeded
+    once from :func:`storage_bytes`; without Redis every call walks storage.
+    """
+
+    if redis is None:
+        return await asyncio.to_thread(storage_bytes, tenant_id)
+    key = MEDIA_BYTES_KEY.format(tenant=tenant_id)
+    value = await redis.get(key)
+    if value is None:
+        seeded = await asyncio.to_thread(storage_bytes, tenant_id)
+        if await redis.set(key, seeded, nx=True):
+            return seeded
+        value = await redis.get(key)
+    return int(value)
+
+
+async def add_media_bytes(tenant_id: str, delta: int, redis=None) -> int:
+    """Adjust the stored media bytes of ``tenant_id`` by ``delta``.
+
+    Seeding walks storage, so callers read :func:`media_bytes` before they
+    store or delete the files ``delta`` accounts for.
+    """
+
+    if redis is None:
+        return await asyncio.to_thread(storage_bytes, tenant_id)
+    # Seed first so the increment is not mistaken for the tenant's total
+    await media_bytes(tenant_id, redis)
+    return int(await redis.incrby(MEDIA_BYTES_KEY.format(tenant=tenant_id), delta))
+
+
 class LicensingMiddleware(BaseHTTPMiddleware):
     """Validate tenant plan and feature access."""
 
@@ -1,31 +1,95 @@
-"""Prometheus middleware for HTTP request metrics."""
+"""Prometheus middleware for HTTP request metrics.
+
+Requests are labelled by the matched route template (``/g/{table_token}/bill``)
+rather than the raw URL so path parameters never create new time series.
+Label children are resolved once per ``(route, method, status)`` and cached,
+leaving only a few counter increments and one histogram observation on the
+request path.
+
+The middleware also scopes per-request query counting
+(:func:`~api.app.obs.query_stats.track_request`) so requests repeating one
+statement fingerprint are counted in ``db_n_plus_one_total``.
+"""
 
 from __future__ import annotations
 
+import os
+import time
+
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 
-from ..routes_metrics import http_requests_total, slo_errors_total, slo_requests_total
+from ..obs.cardinality import OTHER, LabelGuard
+from ..obs.query_stats import query_stats, track_request
+from ..routes_metrics import (
+    db_n_plus_one_total,
+    http_request_duration_seconds,
+    http_requests_total,
+    slo_errors_total,
+    slo_requests_total,
+)
 from ..slo import slo_tracker
 
+MAX_ROUTE_LABELS = int(os.getenv("METRICS_MAX_ROUTES", "500"))
+UNMATCHED = "unmatched"
+_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+_route_guard = LabelGuard(MAX_ROUTE_LABELS)
+_instruments: dict[tuple[str, str, int], tuple] = {}
+
+
+def route_template(request: Request) -> str:
+    """Return the route template matched for ``request``."""
+
+    route = request.scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    return template or UNMATCHED
+
+
+def _resolve(route: str, method: str, status: int) -> tuple:
+    key = (route, method, status)
+    inst = _instruments.get(key)
+    if inst is None:
+        label = _route_guard(route)
+        method_label = method if method in _METHODS else OTHER
+        inst = (
+            label,
+            http_requests_total.labels(
+                path=label, method=method_label, status=str(status)
+            ),
+            http_request_duration_seconds.labels(route=label, method=method_label),
+            slo_requests_total.labels(route=label),
+            slo_errors_total.labels(route=label) if status >= 500 else None,
+        )
+        # Keys are bounded by the route guard, method set and status codes.
+        if len(_instruments) < MAX_ROUTE_LABELS * 16:
+            _instruments[key] = inst
+    return inst
 
 
 class PrometheusMiddleware(BaseHTTPMiddleware):
-    """Increment HTTP request counters."""
+    """Increment HTTP request counters and observe latency per route."""
 
     async def dispatch(self, request: Request, call_next):
-        response = await call_next(request)
-        path = request.url.path
+        start = time.perf_counter()
+        token = track_request()
+        try:
+            response = await call_next(request)
+        finally:
+            route = route_template(request)
+            if query_stats.finish_request(token, route):
+                db_n_plus_one_total.labels(route=_route_guard(route)).inc()
+        elapsed = time.perf_counter() - start
         status = response.status_code
-        http_requests_total.labels(
-            path=path,
-            method=request.method,
-            status=str(status),
-        ).inc()
-        slo_requests_total.labels(route=path).inc()
-        error = status >= 500
+        label, requests, latency, slo_requests, slo_errors = _resolve(
+            route_template(request), request.method, status
+        )
+        requests.inc()
+        latency.observe(elapsed)
+        slo_requests.inc()
+        error = slo_errors is not None
         if error:
-            slo_errors_total.labels(route=path).inc()
-        slo_tracker.record(path, error=error)
+            slo_errors.inc()
+        slo_tracker.record(label, error=error)
 
         return response
@@ -6,6 +6,10 @@ Environment variables provide tunables:
 - ``MAX_CONN_PER_IP`` (default ``20``)
 - ``HEARTBEAT_TIMEOUT_SEC`` (default ``30``)
 - ``QUEUE_MAX`` (default ``100``)
+
+With several worker processes the per-IP counts are kept in Redis
+(``rt:conn:{ip}``) by :func:`acquire` and :func:`release`, so the limit
+applies per host rather than per worker.
 """
 
 from __future__ import annotations
@@ -18,10 +22,16 @@ from typing import Any
 from fastapi import HTTPException
 from starlette.websockets import WebSocket
 
+from .. import multiproc
+
 MAX_CONN_PER_IP = int(os.getenv("MAX_CONN_PER_IP", "20"))
 HEARTBEAT_TIMEOUT_SEC = int(os.getenv("HEARTBEAT_TIMEOUT_SEC", "30"))
 QUEUE_MAX = int(os.getenv("QUEUE_MAX", "100"))
 
+CONN_KEY = "rt:conn:{ip}"
+# Bounds leaked counts of workers that died with connections open.
+CONN_TTL = 3600
+
 connections: dict[str, int] = defaultdict(int)
 
 
@@ -38,6 +48,31 @@ def unregister(ip: str) -> None:
         connections[ip] -= 1
 
 
+async def acquire(ip: str, redis) -> None:
+    """Like :func:`register`, counting in ``redis`` with several workers."""
+    if not multiproc.enabled():
+        register(ip)
+        return
+    key = CONN_KEY.format(ip=ip)
+    pipe = redis.pipeline(transaction=False)
+    pipe.incr(key)
+    pipe.expire(key, CONN_TTL)
+    count, _ = await pipe.execute()
+    if int(count) > MAX_CONN_PER_IP:
+        await redis.decr(key)
+        raise HTTPException(status_code=429, detail="RETRY")
+
+
+async def release(ip: str, redis) -> None:
+    """Undo :func:`acquire` for ``ip``."""
+    if not multiproc.enabled():
+        unregister(ip)
+        return
+    key = CONN_KEY.format(ip=ip)
+    if int(await redis.decr(key)) <= 0:
+        await redis.delete(key)
+
+
 def queue(maxsize: int | None = None) -> asyncio.Queue[Any]:
     """Return an ``asyncio.Queue`` enforcing ``QUEUE_MAX`` by default."""
     return asyncio.Queue(maxsize=maxsize or QUEUE_MAX)
@@ -13,21 +13,31 @@ from ..utils.responses import err
 from ..routes_metrics import room_locked_denied_total
 
 
+def load_room_state(token: str) -> dict[str, str] | None:
+    """Return the ``state`` of the room with code or QR token ``token``."""
+
+    with SessionLocal() as session:
+        room = (
+            session.query(Room)
+            .filter(or_(Room.code == token, Room.qr_token == token))
+            .one_or_none()
+        )
+        return None if room is None else {"state": room.state}
+
+
 class RoomStateGuard(BaseHTTPMiddleware):
-    """Deny guest POST requests for rooms that aren't AVAILABLE."""
+    """Deny guest POST requests for rooms that aren't AVAILABLE.
+
+    The application uses :class:`GuestAdmissionMiddleware`, which serves the
+    same check from Redis.
+    """
 
     async def dispatch(self, request: Request, call_next):
         if request.method == "POST" and request.url.path.startswith("/h/"):
             parts = request.url.path.split("/")
             if len(parts) > 2 and parts[2]:
-                token = parts[2]
-                with SessionLocal() as session:
-                    room = (
-                        session.query(Room)
-                        .filter(or_(Room.code == token, Room.qr_token == token))
-                        .one_or_none()
-                    )
-                if room is not None and room.state != "AVAILABLE":
+                room = load_room_state(parts[2])
+                if room is not None and room["state"] != "AVAILABLE":
                     room_locked_denied_total.inc()
                     return JSONResponse(
                         err("ROOM_LOCKED", "Room not ready"), status_code=423
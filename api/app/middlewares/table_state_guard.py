@@ -14,31 +14,42 @@ from ..routes_metrics import table_locked_denied_total
 from ..i18n import resolve_lang, get_msg
 
 
+def load_table_state(token: str) -> dict[str, str] | None:
+    """Return the ``state`` and tenant ``lang`` of table ``token``."""
+
+    with SessionLocal() as session:
+        table = (
+            session.query(Table)
+            .filter_by(code=token, deleted_at=None)
+            .one_or_none()
+        )
+        if table is None:
+            return None
+        tenant_lang = None
+        try:
+            tenant = session.get(Tenant, getattr(table, "tenant_id", None))
+            tenant_lang = getattr(tenant, "default_language", None)
+        except Exception:
+            tenant_lang = None
+        return {"state": table.state, "lang": tenant_lang or ""}
+
+
 class TableStateGuardMiddleware(BaseHTTPMiddleware):
-    """Deny guest POST requests for tables that aren't AVAILABLE."""
+    """Deny guest POST requests for tables that aren't AVAILABLE.
+
+    The application uses :class:`GuestAdmissionMiddleware`, which serves the
+    same check from Redis.
+    """
 
     async def dispatch(self, request: Request, call_next):
         if request.method == "POST" and request.url.path.startswith("/g/"):
             parts = request.url.path.split("/")
             if len(parts) > 2 and parts[2]:
-                token = parts[2]
-                with SessionLocal() as session:
-                    table = (
-                        session.query(Table)
-                        .filter_by(code=token, deleted_at=None)
-                        .one_or_none()
-                    )
-                    tenant_lang = None
-                    if table is not None:
-                        try:
-                            tenant = session.get(Tenant, getattr(table, "tenant_id", None))
-                            tenant_lang = getattr(tenant, "default_language", None)
-                        except Exception:
-                            tenant_lang = None
-                if table is not None and table.state != "AVAILABLE":
+                table = load_table_state(parts[2])
+                if table is not None and table["state"] != "AVAILABLE":
                     table_locked_denied_total.inc()
                     lang = resolve_lang(
-                        request.headers.get("Accept-Language"), tenant_lang
+                        request.headers.get("Accept-Language"), table["lang"] or None
                     )
                     msg = get_msg(lang, "errors.TABLE_LOCKED")
                     return JSONResponse(
@@ -263,6 +263,19 @@ class FeedbackNPS(Base):
     created_at = Column(DateTime, server_default=func.now())
 
 
+class TenantMigration(Base):
+    """Outcome of the last tenant schema migration run per tenant."""
+
+    __tablename__ = "tenant_migrations"
+
+    tenant_id = Column(String, primary_key=True)
+    revision = Column(String, nullable=True)
+    status = Column(String, nullable=False, default="pending")
+    error = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+
 class Device(Base):
     """Registered staff devices."""
 
@@ -288,4 +301,5 @@ __all__ = [
     "SupportMessage",
     "FeedbackNPS",
     "Device",
+    "TenantMigration",
 ]
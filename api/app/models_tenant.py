@@ -280,6 +280,21 @@ class CouponUsage(Base):
     used_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+class CouponUsageCounter(Base):
+    """Running coupon redemption counts per cap scope and bucket.
+
+    ``scope`` is ``day``, ``guest`` or ``outlet`` and ``bucket`` the UTC day
+    (``YYYY-MM-DD``), guest id or outlet id respectively.
+    """
+
+    __tablename__ = "coupon_usage_counters"
+
+    coupon_id = Column(ForeignKey("coupons.id"), primary_key=True)
+    scope = Column(String, primary_key=True)
+    bucket = Column(String, primary_key=True)
+    used = Column(Integer, nullable=False, default=0, server_default="0")
+
+
 class Customer(Base):
     """End customers."""
 
@@ -446,6 +461,48 @@ class SalesRollup(Base):
     modes_json = Column(JSON, nullable=False, default=dict, server_default="{}")
 
 
+class SalesRollupHourly(Base):
+    """Hourly sales aggregates maintained incrementally on billing events.
+
+    Tenant databases are isolated, so unlike :class:`SalesRollup` the rows are
+    keyed by the local day and hour only.
+    """
+
+    __tablename__ = "sales_rollup_hourly"
+
+    d = Column(Date, primary_key=True)
+    h = Column(Integer, primary_key=True)
+    orders = Column(Integer, nullable=False, default=0, server_default="0")
+    sales = Column(Numeric(12, 2), nullable=False, default=0, server_default="0")
+    tax = Column(Numeric(12, 2), nullable=False, default=0, server_default="0")
+    tip = Column(Numeric(12, 2), nullable=False, default=0, server_default="0")
+
+
+class SalesRollupMode(Base):
+    """Daily payment totals per mode maintained incrementally on payments."""
+
+    __tablename__ = "sales_rollup_modes"
+
+    d = Column(Date, primary_key=True)
+    mode = Column(String, primary_key=True)
+    amount = Column(Numeric(12, 2), nullable=False, default=0, server_default="0")
+
+
+class BatchCheckpoint(Base):
+    """Last key processed by an interrupted chunked delete or update.
+
+    Written in the same transaction as each chunk by
+    :func:`api.app.db.chunked.run_chunked` and removed once the pass
+    completes.
+    """
+
+    __tablename__ = "batch_checkpoints"
+
+    name = Column(String, primary_key=True)
+    last_key = Column(Integer, nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+
 class InvoiceCounter(Base):
     """Counters for generating sequential invoice numbers."""
 
@@ -471,6 +528,7 @@ __all__ = [
     "Invoice",
     "Payment",
     "Coupon",
+    "CouponUsageCounter",
     "Customer",
     "Counter",
     "CounterOrderStatus",
@@ -484,6 +542,9 @@ __all__ = [
     "Staff",
     "ApiKey",
     "SalesRollup",
+    "SalesRollupHourly",
+    "SalesRollupMode",
     "InvoiceCounter",
+    "BatchCheckpoint",
     "TenantMeta",
 ]
@@ -0,0 +1,102 @@
+"""Serve the API from several worker processes on one host.
+
+``WEB_CONCURRENCY`` (read by uvicorn and gunicorn alike) sets the number of
+worker processes. With a single worker nothing changes. With more:
+
+* :func:`prepare` points ``PROMETHEUS_MULTIPROC_DIR`` at a fresh directory
+  before the workers start, so every worker writes its metrics there and
+  ``/metrics`` aggregates them (see :func:`api.app.routes_metrics.collector_registry`);
+* state that used to live in process memory (legacy table carts, prep time
+  EMAs, batch op ids, realtime connection counts, SLO windows and events) is
+  kept in Redis instead;
+* host-wide background tasks (event consumers, the replica monitor) only run
+  in the worker holding the host lock (:func:`acquire_host_lock`); Redis keys
+  meant for one host only are scoped by :func:`host_id`.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import socket
+import tempfile
+
+try:  # pragma: no cover - not available on Windows
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+WORKERS_ENV = "WEB_CONCURRENCY"
+METRICS_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+HOST_ID_ENV = "HOST_ID"
+
+_held: dict[str, int] = {}
+
+
+def workers() -> int:
+    """Return the configured number of worker processes."""
+
+    try:
+        return max(int(os.getenv(WORKERS_ENV, "1")), 1)
+    except ValueError:
+        return 1
+
+
+def enabled() -> bool:
+    """Return ``True`` when the API runs in more than one worker process."""
+
+    return workers() > 1
+
+
+def host_id() -> str:
+    """Return the name shared by the workers of this host.
+
+    ``HOST_ID`` overrides the hostname, e.g. for containers sharing one.
+    """
+
+    return os.getenv(HOST_ID_ENV) or socket.gethostname()
+
+
+def prepare(count: int, metrics_dir: str | None = None) -> None:
+    """Set up the environment for ``count`` workers before they are started.
+
+    Must run in the parent process: workers inherit the environment, and the
+    metrics directory is emptied so values of a previous run are not summed.
+    """
+
+    os.environ[WORKERS_ENV] = str(count)
+    if count <= 1:
+        return
+    metrics_dir = (
+        metrics_dir
+        or os.getenv(METRICS_DIR_ENV)
+        or os.path.join(tempfile.gettempdir(), "neo-prometheus")
+    )
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+    os.environ[METRICS_DIR_ENV] = metrics_dir
+
+
+def acquire_host_lock(name: str) -> bool:
+    """Return ``True`` if this process holds the host-wide lock ``name``.
+
+    The lock is an ``flock`` on ``HOST_LOCK_DIR/neo-{name}.lock`` (default
+    the temp directory) and is released by the kernel when the process
+    exits, so a restarted worker can take over. With a single worker the
+    lock is not needed and this always returns ``True``.
+    """
+
+    if not enabled() or fcntl is None or name in _held:
+        return True
+    lock_dir = os.getenv("HOST_LOCK_DIR", tempfile.gettempdir())
+    fd = os.open(os.path.join(lock_dir, f"neo-{name}.lock"), os.O_CREAT | os.O_RDWR)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    _held[name] = fd
+    return True
+
+
+__all__ = ["acquire_host_lock", "enabled", "host_id", "prepare", "workers"]
@@ -0,0 +1,34 @@
+"""Guards that keep Prometheus label cardinality bounded."""
+
+from __future__ import annotations
+
+OTHER = "other"
+
+
+class LabelGuard:
+    """Admit at most ``limit`` distinct label values.
+
+    Values seen before the limit is reached pass through unchanged; any new
+    value after that is bucketed into :data:`OTHER` so a flood of unique
+    values cannot create unbounded time series.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._seen: set[str] = set()
+
+    def __call__(self, value: str) -> str:
+        if value in self._seen:
+            return value
+        if len(self._seen) >= self.limit:
+            return OTHER
+        self._seen.add(value)
+        return value
+
+    def reset(self) -> None:
+        """Forget admitted values."""
+
+        self._seen.clear()
+
+
+__all__ = ["LabelGuard", "OTHER"]
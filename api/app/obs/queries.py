@@ -9,14 +9,25 @@ import time
 from sqlalchemy import event
 from sqlalchemy.engine import Engine
 
+from .query_stats import fingerprint_for, query_stats
+
 SLOW_QUERY_MS = int(os.getenv("DB_SLOW_QUERY_MS", "200"))
 SAMPLE_RATE = 0.01
 
 logger = logging.getLogger("obs")
 
 
+def _params_hash(parameters) -> str:
+    return hashlib.sha256(repr(parameters).encode()).hexdigest()[:8]
+
+
 def add_query_logger(engine: Engine, tenant: str) -> None:
-    """Attach timing-based logging to ``engine`` for ``tenant``."""
+    """Attach timing-based logging and query statistics to ``engine``.
+
+    Every statement is recorded in :data:`~api.app.obs.query_stats.query_stats`
+    under its cached fingerprint; the parameters are only hashed for the slow
+    and sampled queries that are logged.
+    """
     target = engine.sync_engine if hasattr(engine, "sync_engine") else engine
 
     def before_cursor_execute(
@@ -28,25 +39,25 @@ def add_query_logger(engine: Engine, tenant: str) -> None:
         conn, cursor, statement, parameters, context, executemany
     ):  # type: ignore[no-untyped-def]
         total_ms = (time.perf_counter() - context._query_start_time) * 1000
-        sql = " ".join(statement.split())
-        if len(sql) > 200:
-            sql = sql[:197] + "..."
-        params_hash = hashlib.sha256(repr(parameters).encode()).hexdigest()[:8]
+        fp = fingerprint_for(statement, getattr(context, "compiled", None))
+        query_stats.record(fp, tenant, total_ms, cursor.rowcount)
         if total_ms > SLOW_QUERY_MS:
             logger.warning(
-                "slow query %dms tenant=%s sql=%s params=%s",
+                "slow query %dms tenant=%s fp=%s sql=%s params=%s",
                 int(total_ms),
                 tenant,
-                sql,
-                params_hash,
+                fp.id,
+                fp.sql,
+                _params_hash(parameters),
             )
         elif random.random() < SAMPLE_RATE:
             logger.info(
-                "query %dms tenant=%s sql=%s params=%s",
+                "query %dms tenant=%s fp=%s sql=%s params=%s",
                 int(total_ms),
                 tenant,
-                sql,
-                params_hash,
+                fp.id,
+                fp.sql,
+                _params_hash(parameters),
             )
 
     event.listen(target, "before_cursor_execute", before_cursor_execute)
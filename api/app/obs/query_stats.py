@@ -0,0 +1,225 @@
+"""In-process query fingerprint statistics and N+1 detection.
+
+:func:`api.app.obs.queries.add_query_logger` feeds every executed statement
+into :data:`query_stats`. The per-query cost is kept small:
+
+* the fingerprint (normalized SQL with literals and ``IN`` lists collapsed,
+  plus a short hash) is computed once per compiled statement and cached on
+  the ``Compiled`` object, which SQLAlchemy itself caches and reuses; raw
+  driver SQL falls back to a bounded cache keyed by the statement string;
+* each execution then only updates one row of a bounded
+  ``(fingerprint, tenant)`` table: count, total and max time, and rows.
+  Once ``QUERY_STATS_MAX_ENTRIES`` rows exist, new pairs are folded into an
+  ``other`` row.
+
+While a request is tracked (see :func:`track_request`), statements are also
+counted per fingerprint for that request. :meth:`QueryStats.finish_request` flags any
+fingerprint executed at least ``QUERY_N_PLUS_ONE_THRESHOLD`` times as a
+likely N+1 pattern, such as a ``session.get`` per table in a loop.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import deque
+from contextvars import ContextVar, Token
+from dataclasses import dataclass
+
+from .cardinality import OTHER
+
+logger = logging.getLogger("obs")
+
+MAX_ENTRIES = int(os.getenv("QUERY_STATS_MAX_ENTRIES", "500"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("QUERY_N_PLUS_ONE_THRESHOLD", "10"))
+SQL_LABEL_CHARS = 200
+_RAW_CACHE_MAX = 1000
+_RECENT_N_PLUS_ONE = 50
+
+_WS_RE = re.compile(r"\s+")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"%\(\w+\)s|:\w+|\$\d+|\?|%s")
+_IN_LIST_RE = re.compile(r"\bIN \((?:\?|__\[POSTCOMPILE_\w+\])(?:, ?\?)*\)", re.I)
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    """A normalized statement and its short hash."""
+
+    id: str
+    sql: str
+
+
+def normalize(statement: str) -> str:
+    """Return ``statement`` with whitespace, literals and IN lists collapsed."""
+
+    sql = _WS_RE.sub(" ", statement).strip()
+    sql = _STRING_RE.sub("?", sql)
+    sql = _PARAM_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    return _IN_LIST_RE.sub("IN (...)", sql)
+
+
+def fingerprint(statement: str) -> Fingerprint:
+    sql = normalize(statement)
+    digest = hashlib.blake2b(sql.encode(), digest_size=6).hexdigest()
+    if len(sql) > SQL_LABEL_CHARS:
+        sql = sql[: SQL_LABEL_CHARS - 3] + "..."
+    return Fingerprint(digest, sql)
+
+
+_raw_cache: dict[str, Fingerprint] = {}
+
+
+def fingerprint_for(statement: str, compiled=None) -> Fingerprint:
+    """Return the cached fingerprint of ``compiled`` or ``statement``."""
+
+    if compiled is not None:
+        fp = getattr(compiled, "_query_fingerprint", None)
+        if fp is None:
+            fp = fingerprint(statement)
+            try:
+                compiled._query_fingerprint = fp
+            except AttributeError:  # pragma: no cover - slotted compilers
+                pass
+        return fp
+    fp = _raw_cache.get(statement)
+    if fp is None:
+        fp = fingerprint(statement)
+        if len(_raw_cache) >= _RAW_CACHE_MAX:
+            _raw_cache.clear()
+        _raw_cache[statement] = fp
+    return fp
+
+
+class _Entry:
+    __slots__ = ("sql", "count", "total_ms", "max_ms", "rows")
+
+    def __init__(self, sql: str) -> None:
+        self.sql = sql
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+
+
+_request_counts: ContextVar[dict[str, int] | None] = ContextVar(
+    "query_counts", default=None
+)
+
+
+class QueryStats:
+    """Bounded per ``(fingerprint, tenant)`` execution statistics."""
+
+    def __init__(
+        self,
+        max_entries: int = MAX_ENTRIES,
+        n_plus_one_threshold: int = N_PLUS_ONE_THRESHOLD,
+    ) -> None:
+        self.max_entries = max_entries
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._entries: dict[tuple[str, str], _Entry] = {}
+        self._lock = threading.Lock()
+        self.n_plus_one: deque[dict] = deque(maxlen=_RECENT_N_PLUS_ONE)
+
+    def record(
+        self, fp: Fingerprint, tenant: str, elapsed_ms: float, rows: int
+    ) -> None:
+        key = (fp.id, tenant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    key = (OTHER, OTHER)
+                    entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._entries[key] = _Entry(
+                        OTHER if key[0] == OTHER else fp.sql
+                    )
+            entry.count += 1
+            entry.total_ms += elapsed_ms
+            if elapsed_ms > entry.max_ms:
+                entry.max_ms = elapsed_ms
+            if rows > 0:
+                entry.rows += rows
+        counts = _request_counts.get()
+        if counts is not None:
+            counts[fp.id] = counts.get(fp.id, 0) + 1
+
+    def top(self, limit: int = 20, by: str = "total_ms") -> list[dict]:
+        """Return the ``limit`` heaviest fingerprints ordered by ``by``."""
+
+        if by not in {"count", "total_ms", "max_ms", "rows"}:
+            raise ValueError(f"unknown sort key {by!r}")
+        with self._lock:
+            rows = [
+                {
+                    "fingerprint": fp_id,
+                    "tenant": tenant,
+                    "sql": entry.sql,
+                    "count": entry.count,
+                    "total_ms": round(entry.total_ms, 3),
+                    "max_ms": round(entry.max_ms, 3),
+                    "mean_ms": round(entry.total_ms / entry.count, 3),
+                    "rows": entry.rows,
+                }
+                for (fp_id, tenant), entry in self._entries.items()
+            ]
+        rows.sort(key=lambda row: row[by], reverse=True)
+        return rows[:limit]
+
+    def sql_for(self, fp_id: str) -> str | None:
+        with self._lock:
+            for (entry_id, _), entry in self._entries.items():
+                if entry_id == fp_id:
+                    return entry.sql
+        return None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        self.n_plus_one.clear()
+
+    def finish_request(self, token: Token, route: str) -> list[tuple[str, int]]:
+        """Stop tracking a request and return its repeated fingerprints."""
+
+        counts = _request_counts.get() or {}
+        _request_counts.reset(token)
+        repeated = [
+            (fp_id, count)
+            for fp_id, count in counts.items()
+            if count >= self.n_plus_one_threshold
+        ]
+        for fp_id, count in repeated:
+            sql = self.sql_for(fp_id)
+            self.n_plus_one.append(
+                {"route": route, "fingerprint": fp_id, "count": count, "sql": sql}
+            )
+            logger.warning(
+                "possible N+1: %d x %s on %s sql=%s", count, fp_id, route, sql
+            )
+        return repeated
+
+
+def track_request() -> Token:
+    """Start counting statements per fingerprint for the current request."""
+
+    return _request_counts.set({})
+
+
+query_stats = QueryStats()
+
+
+__all__ = [
+    "Fingerprint",
+    "QueryStats",
+    "fingerprint",
+    "fingerprint_for",
+    "normalize",
+    "query_stats",
+    "track_request",
+]
@@ -0,0 +1,158 @@
+"""Registries of Redis keys written by agents and workers.
+
+Readers used to find these keys with ``KEYS pattern``, which blocks Redis
+for a walk of the whole keyspace. Writers now also record each key in a
+small registry that readers iterate instead:
+
+* ``print:retries`` -- set of tenants with a ``print:retry:{tenant}`` queue;
+* ``jobs:workers`` -- set of workers writing ``jobs:heartbeat:{name}``;
+* ``cb:open`` -- hash of ``url_hash -> until`` for opened webhook breakers.
+
+Heartbeats expire after ``HEARTBEAT_TTL`` seconds unless renewed. Entries
+whose key is gone, and breakers whose cooldown has passed, are pruned by the
+readers. :func:`rebuild`
+registers keys written before the registries existed with an incremental
+``SCAN``, which does not block Redis.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Iterable
+
+PRINT_RETRY_QUEUE = "print:retry:{tenant}"
+PRINT_RETRY_TENANTS = "print:retries"
+JOB_HEARTBEAT = "jobs:heartbeat:{name}"
+JOB_WORKERS = "jobs:workers"
+BREAKER_UNTIL = "cb:{url_hash}:until"
+OPEN_BREAKERS = "cb:open"
+HEARTBEAT_TTL = 120
+
+
+def _text(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def _members(values: Iterable[bytes | str]) -> list[str]:
+    return sorted(_text(v) for v in values)
+
+
+async def enqueue_print_retry(redis, tenant: str, entry: str) -> None:
+    """Append ``entry`` to the retry queue of ``tenant`` and register it."""
+
+    pipe = redis.pipeline(transaction=True)
+    pipe.rpush(PRINT_RETRY_QUEUE.format(tenant=tenant), entry)
+    pipe.sadd(PRINT_RETRY_TENANTS, tenant)
+    await pipe.execute()
+
+
+async def register_print_retry(redis, tenant: str) -> None:
+    """Register the retry queue of ``tenant`` written by a printer agent."""
+
+    await redis.sadd(PRINT_RETRY_TENANTS, tenant)
+
+
+async def print_retry_totals(redis, now: datetime | None = None) -> tuple[int, int]:
+    """Return the queued print jobs of all tenants and the oldest age in seconds.
+
+    Queue heads are ISO timestamps; tenants with an empty queue are dropped
+    from the registry.
+    """
+
+    now = now or datetime.now(timezone.utc)
+    tenants = _members(await redis.smembers(PRINT_RETRY_TENANTS))
+    if not tenants:
+        return 0, 0
+    pipe = redis.pipeline(transaction=False)
+    for tenant in tenants:
+        key = PRINT_RETRY_QUEUE.format(tenant=tenant)
+        pipe.llen(key)
+        pipe.lindex(key, 0)
+    results = await pipe.execute()
+    total = 0
+    max_age = 0
+    empty = []
+    for tenant, length, head in zip(tenants, results[::2], results[1::2]):
+        if not length:
+            empty.append(tenant)
+            continue
+        total += int(length)
+        try:
+            ts = datetime.fromisoformat(_text(head))
+        except (TypeError, ValueError):
+            continue
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        max_age = max(max_age, int((now - ts).total_seconds()))
+    if empty:
+        await redis.srem(PRINT_RETRY_TENANTS, *empty)
+    return total, max_age
+
+
+async def record_heartbeat(
+    redis, name: str, when: datetime | None = None, ttl: int = HEARTBEAT_TTL
+) -> None:
+    """Write the heartbeat of worker ``name`` and register the worker.
+
+    The heartbeat expires after ``ttl`` seconds, so a worker that stops
+    beating drops out of the registry instead of being listed forever.
+    """
+
+    when = when or datetime.now(timezone.utc)
+    pipe = redis.pipeline(transaction=True)
+    pipe.set(JOB_HEARTBEAT.format(name=name), when.isoformat(), ex=ttl)
+    pipe.sadd(JOB_WORKERS, name)
+    await pipe.execute()
+
+
+async def job_workers(redis) -> list[str]:
+    """Return the names of registered workers."""
+
+    return _members(await redis.smembers(JOB_WORKERS))
+
+
+async def open_breaker_seconds(redis, now: int) -> int:
+    """Return the remaining cooldown seconds summed over opened breakers.
+
+    Breakers whose cooldown has passed are removed from the registry.
+    """
+
+    until = await redis.hgetall(OPEN_BREAKERS)
+    expired = [field for field, value in until.items() if int(value) <= now]
+    if expired:
+        await redis.hdel(OPEN_BREAKERS, *expired)
+    return sum(max(0, int(value) - now) for value in until.values())
+
+
+async def rebuild(redis, count: int = 1000) -> dict[str, int]:
+    """Register keys matching the legacy patterns and return counts per registry."""
+
+    found = {PRINT_RETRY_TENANTS: 0, JOB_WORKERS: 0, OPEN_BREAKERS: 0}
+    async for key in redis.scan_iter(match="print:retry:*", count=count):
+        tenant = _text(key).split(":", 2)[2]
+        await redis.sadd(PRINT_RETRY_TENANTS, tenant)
+        found[PRINT_RETRY_TENANTS] += 1
+    async for key in redis.scan_iter(match="jobs:heartbeat:*", count=count):
+        await redis.sadd(JOB_WORKERS, _text(key).split(":", 2)[2])
+        found[JOB_WORKERS] += 1
+    async for key in redis.scan_iter(match="cb:*:until", count=count):
+        until = await redis.get(key)
+        if until is not None:
+            await redis.hset(OPEN_BREAKERS, _text(key).split(":")[1], _text(until))
+            found[OPEN_BREAKERS] += 1
+    return found
+
+
+__all__ = [
+    "HEARTBEAT_TTL",
+    "JOB_WORKERS",
+    "OPEN_BREAKERS",
+    "PRINT_RETRY_TENANTS",
+    "enqueue_print_retry",
+    "job_workers",
+    "open_breaker_seconds",
+    "print_retry_totals",
+    "rebuild",
+    "record_heartbeat",
+    "register_print_retry",
+]
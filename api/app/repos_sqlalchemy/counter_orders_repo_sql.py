@@ -81,7 +81,11 @@ async def create_order(
 async def update_status(
     session: AsyncSession, order_id: int, new_status: str
 ) -> int | None:
-    """Update ``order_id`` to ``new_status``. Return invoice id if generated."""
+    """Update ``order_id`` to ``new_status``. Return invoice id if generated.
+
+    A generated invoice changes the outlet's sales, so callers pass a non-None
+    result to :func:`utils.fanout.invalidate_outlet`.
+    """
 
     values = {"status": new_status}
     if new_status == CounterOrderStatus.DELIVERED.value:
@@ -101,10 +105,9 @@ async def update_status(
         )
         items = result.all()
         total = sum(row.price_snapshot * row.qty for row in items)
-        number = await invoice_counter.next_invoice_number(session, "80mm")
         invoice = Invoice(
             order_group_id=order_id,
-            number=number,
+            number=invoice_counter.pending_number(),
             bill_json={
                 "items": [
                     {
@@ -120,6 +123,9 @@ async def update_status(
         )
         session.add(invoice)
         await session.flush()
+        # allocate last so the counter row is locked only until the commit
+        invoice.number = await invoice_counter.allocate_invoice_number(session, "80mm")
+        await session.flush()
         invoice_id = invoice.id
 
     await session.commit()
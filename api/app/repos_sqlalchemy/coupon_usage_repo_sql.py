@@ -0,0 +1,151 @@
+"""Incremental maintenance of coupon redemption counters.
+
+Coupon caps used to be enforced with ``COUNT(*)`` queries over
+``coupon_usage``. Billing now keeps one
+:class:`~api.app.models_tenant.CouponUsageCounter` row per coupon, cap scope
+and bucket, and :func:`claim` takes a redemption with a single conditional
+``INSERT ... ON CONFLICT DO UPDATE ... WHERE used < cap`` inside the billing
+transaction. The statement locks only the counter row, so concurrent
+redemptions of the same coupon serialise on it and can never overshoot the
+cap. :func:`reconcile` rebuilds the rows from ``coupon_usage``.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from datetime import date, datetime, time, timezone
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models_tenant import CouponUsage, CouponUsageCounter
+
+SCOPE_DAY = "day"
+SCOPE_GUEST = "guest"
+SCOPE_OUTLET = "outlet"
+
+_CLAIM = """
+    INSERT INTO coupon_usage_counters (coupon_id, scope, bucket, used)
+    VALUES (:coupon_id, :scope, :bucket, 1)
+    ON CONFLICT (coupon_id, scope, bucket)
+    DO UPDATE SET used = coupon_usage_counters.used + 1
+    {where}
+    RETURNING used
+"""
+_CLAIM_UNCAPPED = text(_CLAIM.format(where=""))
+_CLAIM_CAPPED = text(_CLAIM.format(where="WHERE coupon_usage_counters.used < :cap"))
+
+_RELEASE = text(
+    """
+    UPDATE coupon_usage_counters
+    SET used = used - 1
+    WHERE coupon_id = :coupon_id AND scope = :scope AND bucket = :bucket
+    """
+)
+
+
+def day_bucket(ts: datetime) -> str:
+    """Return the ``day`` scope bucket (UTC date) for ``ts``."""
+
+    return ts.astimezone(timezone.utc).date().isoformat()
+
+
+async def claim(
+    session: AsyncSession,
+    coupon_id: int,
+    scope: str,
+    bucket: str,
+    cap: int | None = None,
+) -> bool:
+    """Count one redemption in ``scope``/``bucket`` unless ``cap`` is reached.
+
+    Returns ``False`` without changing the counter when ``cap`` redemptions
+    were already recorded. Counters are maintained even when ``cap`` is
+    ``None`` so a cap configured later starts from the true usage.
+    """
+
+    if cap is not None and cap <= 0:
+        return False
+    params = {"coupon_id": coupon_id, "scope": scope, "bucket": bucket}
+    if cap is None:
+        result = await session.execute(_CLAIM_UNCAPPED, params)
+    else:
+        result = await session.execute(_CLAIM_CAPPED, {**params, "cap": cap})
+    return result.scalar() is not None
+
+
+async def release(
+    session: AsyncSession, coupon_id: int, scope: str, bucket: str
+) -> None:
+    """Undo a successful :func:`claim` of the same transaction."""
+
+    await session.execute(
+        _RELEASE, {"coupon_id": coupon_id, "scope": scope, "bucket": bucket}
+    )
+
+
+async def reconcile(
+    session: AsyncSession, since: date, coupon_ids: list[int] | None = None
+) -> int:
+    """Rebuild counters from ``coupon_usage`` and return the rows written.
+
+    Guest and outlet counters are lifetime totals and are rebuilt completely;
+    day counters are rebuilt from ``since`` (UTC) onwards, older day buckets
+    are left untouched. The caller commits.
+    """
+
+    start = datetime.combine(since, time.min, tzinfo=timezone.utc)
+    counters = delete(CouponUsageCounter).where(
+        (CouponUsageCounter.scope != SCOPE_DAY)
+        | (CouponUsageCounter.bucket >= since.isoformat())
+    )
+    if coupon_ids is not None:
+        counters = counters.where(CouponUsageCounter.coupon_id.in_(coupon_ids))
+
+    def _usage(*columns):
+        stmt = select(*columns)
+        if coupon_ids is not None:
+            stmt = stmt.where(CouponUsage.coupon_id.in_(coupon_ids))
+        return stmt
+
+    totals: Counter[tuple[int, str, str]] = Counter()
+    for column, scope in (
+        (CouponUsage.guest_id, SCOPE_GUEST),
+        (CouponUsage.outlet_id, SCOPE_OUTLET),
+    ):
+        rows = await session.execute(
+            _usage(CouponUsage.coupon_id, column, func.count())
+            .where(column.is_not(None))
+            .group_by(CouponUsage.coupon_id, column)
+        )
+        for coupon_id, key, count in rows.all():
+            totals[(coupon_id, scope, str(key))] += count
+
+    rows = await session.execute(
+        _usage(CouponUsage.coupon_id, CouponUsage.used_at).where(
+            CouponUsage.used_at >= start
+        )
+    )
+    for coupon_id, used_at in rows.all():
+        if used_at.tzinfo is None:
+            used_at = used_at.replace(tzinfo=timezone.utc)
+        totals[(coupon_id, SCOPE_DAY, day_bucket(used_at))] += 1
+
+    await session.execute(counters)
+    session.add_all(
+        CouponUsageCounter(coupon_id=coupon_id, scope=scope, bucket=bucket, used=used)
+        for (coupon_id, scope, bucket), used in totals.items()
+    )
+    await session.flush()
+    return len(totals)
+
+
+__all__ = [
+    "SCOPE_DAY",
+    "SCOPE_GUEST",
+    "SCOPE_OUTLET",
+    "claim",
+    "day_bucket",
+    "reconcile",
+    "release",
+]
@@ -8,7 +8,15 @@ from sqlalchemy import select, func, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 from zoneinfo import ZoneInfo
 
-from ..models_tenant import Order, OrderItem, Invoice, Payment, SalesRollup
+from ..models_tenant import (
+    Order,
+    OrderItem,
+    Invoice,
+    Payment,
+    SalesRollup,
+    SalesRollupHourly,
+    SalesRollupMode,
+)
 from . import ema_repo_sql
 
 
@@ -59,8 +67,9 @@ async def charts_range(
     """Return time-series metrics and payment mix for ``start``–``end``.
 
     ``start`` and ``end`` are inclusive and interpreted in ``tz`` timezone.
-    When ``use_rollup`` is true, precomputed values from ``sales_rollup`` are
-    used and missing days are backfilled from live data.
+    When ``use_rollup`` is true, precomputed values from ``sales_rollup``,
+    ``sales_rollup_modes`` and ``sales_rollup_hourly`` are used and only days
+    missing from those tables are backfilled from live data.
     """
 
     tzinfo = ZoneInfo(tz)
@@ -73,6 +82,8 @@ async def charts_range(
     heatmap: dict[tuple[str, int], float] = {}
 
     rollups: dict[date, SalesRollup] = {}
+    rollup_modes: dict[date, dict[str, float]] = {}
+    hourly_days: set[date] = set()
     missing: list[date] = []
     if use_rollup:
         result = await session.execute(
@@ -80,6 +91,24 @@ async def charts_range(
         )
         rollups = {row.d: row for row in result.scalars()}
 
+        result = await session.execute(
+            select(
+                SalesRollupMode.d, SalesRollupMode.mode, SalesRollupMode.amount
+            ).where(SalesRollupMode.d >= start, SalesRollupMode.d <= end)
+        )
+        for d, mode, amt in result.all():
+            rollup_modes.setdefault(d, {})[mode] = float(amt or 0)
+
+        result = await session.execute(
+            select(
+                SalesRollupHourly.d, SalesRollupHourly.h, SalesRollupHourly.sales
+            ).where(SalesRollupHourly.d >= start, SalesRollupHourly.d <= end)
+        )
+        for d, h, v in result.all():
+            hourly_days.add(d)
+            key = (d.isoformat(), h)
+            heatmap[key] = heatmap.get(key, 0.0) + float(v or 0)
+
     for i in range(days):
         day = start + timedelta(days=i)
         ds = day.isoformat()
@@ -91,7 +120,8 @@ async def charts_range(
             sales_series.append({"d": ds, "v": sales})
             orders_series.append({"d": ds, "v": orders})
             avg_series.append({"d": ds, "v": avg})
-            for mode, amt in (row.modes_json or {}).items():
+            day_modes = rollup_modes.get(day) or row.modes_json or {}
+            for mode, amt in day_modes.items():
                 modes[mode] = modes.get(mode, 0.0) + float(amt or 0)
         else:
             missing.append(day)
@@ -100,18 +130,14 @@ async def charts_range(
         s = datetime.combine(day, time.min, tzinfo).astimezone(timezone.utc)
         e = datetime.combine(day, time.max, tzinfo).astimezone(timezone.utc)
 
-        orders = await session.scalar(
-            select(func.count())
-            .select_from(Order)
-            .where(Order.placed_at >= s, Order.placed_at <= e)
+        # orders are billed invoices, as in the rollups
+        result = await session.execute(
+            select(
+                func.count(Invoice.id), func.coalesce(func.sum(Invoice.total), 0)
+            ).where(Invoice.created_at >= s, Invoice.created_at <= e)
         )
+        orders, sales = result.one()
         orders = int(orders or 0)
-
-        sales = await session.scalar(
-            select(func.coalesce(func.sum(Invoice.total), 0)).where(
-                Invoice.created_at >= s, Invoice.created_at <= e
-            )
-        )
         sales = float(sales or 0)
 
         avg_ticket = float(sales / orders) if orders else 0.0
@@ -132,18 +158,31 @@ async def charts_range(
     orders_series.sort(key=lambda x: x["d"])
     avg_series.sort(key=lambda x: x["d"])
 
-    range_start = datetime.combine(start, time.min, tzinfo).astimezone(timezone.utc)
-    range_end = datetime.combine(end, time.max, tzinfo).astimezone(timezone.utc)
+    # Only days without hourly rollups need a scan of raw invoices.
+    scan_days = {
+        start + timedelta(days=i)
+        for i in range(days)
+        if start + timedelta(days=i) not in hourly_days
+    }
+    if scan_days:
+        range_start = datetime.combine(min(scan_days), time.min, tzinfo).astimezone(
+            timezone.utc
+        )
+        range_end = datetime.combine(max(scan_days), time.max, tzinfo).astimezone(
+            timezone.utc
+        )
 
-    result = await session.execute(
-        select(Invoice.created_at, Invoice.total).where(
-            Invoice.created_at >= range_start, Invoice.created_at <= range_end
+        result = await session.execute(
+            select(Invoice.created_at, Invoice.total).where(
+                Invoice.created_at >= range_start, Invoice.created_at <= range_end
+            )
         )
-    )
-    for created_at, total in result.all():
-        local_dt = created_at.astimezone(tzinfo)
-        key = (local_dt.date().isoformat(), local_dt.hour)
-        heatmap[key] = heatmap.get(key, 0.0) + float(total or 0)
+        for created_at, total in result.all():
+            local_dt = created_at.astimezone(tzinfo)
+            if local_dt.date() not in scan_days:
+                continue
+            key = (local_dt.date().isoformat(), local_dt.hour)
+            heatmap[key] = heatmap.get(key, 0.0) + float(total or 0)
 
     heatmap_series = []
     for i in range(days):
@@ -25,6 +25,7 @@ from ..models_tenant import (
 )
 from ..services import billing_service
 from ..utils import invoice_counter
+from . import coupon_usage_repo_sql, rollup_repo_sql
 
 
 async def generate_invoice(
@@ -57,6 +58,11 @@ async def generate_invoice(
         master schema.
     tip:
         Optional tip amount added after tax.
+
+    The invoice number is allocated at the very end, after the coupon
+    checks, the invoice row and the rollups. Like the other helpers here this
+    does not commit: callers commit straight after it returns, which releases
+    the series counter row locked by the allocation.
     """
 
     result = await session.execute(
@@ -71,11 +77,6 @@ async def generate_invoice(
         for qty, price, gst in result.all()
     ]
 
-    if coupons:
-        await _enforce_coupon_caps(
-            session, coupons, guest_id=guest_id, outlet_id=outlet_id
-        )
-
     bill = billing_service.compute_bill(
         items, gst_mode, rounding, tip=tip, coupons=coupons
     )
@@ -83,25 +84,63 @@ async def generate_invoice(
     async with get_master_session() as m_session:
         tenant = await m_session.get(Tenant, tenant_id)
 
+    if coupons:
+        await _enforce_coupon_caps(
+            session, coupons, guest_id=guest_id, outlet_id=outlet_id
+        )
+
     prefix = tenant.inv_prefix or "GEN"
     reset = tenant.inv_reset or "never"
     series = invoice_counter.build_series(prefix, reset, date.today())
-    number = await invoice_counter.next_invoice_number(session, series)
 
+    created_at = datetime.now(timezone.utc)
     invoice = Invoice(
         order_group_id=order_group_id,
-        number=number,
+        number=invoice_counter.pending_number(),
         bill_lang=bill_lang,
         bill_json=bill,
         gst_breakup=bill.get("tax_breakup"),
         tip=Decimal(str(bill.get("tip", 0))),
         total=Decimal(str(bill["total"])),
+        created_at=created_at,
     )
     session.add(invoice)
     await session.flush()
+    await rollup_repo_sql.apply_invoice(
+        session,
+        tenant_id,
+        created_at,
+        invoice.total,
+        rollup_repo_sql.tax_total(invoice.gst_breakup),
+        invoice.tip,
+        tz=getattr(tenant, "timezone", None),
+    )
+    invoice.number = await invoice_counter.allocate_invoice_number(session, series)
+    await session.flush()
     return invoice.id
 
 
+_CAP_COLUMNS = {
+    coupon_usage_repo_sql.SCOPE_DAY: "per_day_cap",
+    coupon_usage_repo_sql.SCOPE_GUEST: "per_guest_cap",
+    coupon_usage_repo_sql.SCOPE_OUTLET: "per_outlet_cap",
+}
+
+
+def _cap_error(scope: str, code: str) -> billing_service.CouponError:
+    if scope == coupon_usage_repo_sql.SCOPE_DAY:
+        return billing_service.CouponError(
+            "DAILY_CAP", f"Coupon {code} limit reached today", hint="Try again tomorrow"
+        )
+    if scope == coupon_usage_repo_sql.SCOPE_GUEST:
+        return billing_service.CouponError(
+            "GUEST_CAP", f"Coupon {code} already used", hint="Limit 1 per guest"
+        )
+    return billing_service.CouponError(
+        "OUTLET_CAP", f"Outlet limit reached for {code}", hint="Outlet limit reached"
+    )
+
+
 async def _enforce_coupon_caps(
     session: AsyncSession,
     coupons: Sequence[Mapping[str, object]],
@@ -109,16 +148,21 @@ async def _enforce_coupon_caps(
     guest_id: int | None,
     outlet_id: int | None,
 ) -> None:
-    """Validate coupon caps and record usage."""
+    """Validate coupon windows, claim capped usage and record redemptions.
+
+    Caps are checked against :mod:`coupon_usage_repo_sql` counters with one
+    conditional upsert per scope. If any claim fails the claims already taken
+    by this call are released before :class:`~billing_service.CouponError`
+    is raised, so the caller's transaction is left unchanged.
+    """
 
     now = datetime.now(timezone.utc)
-    start = datetime.combine(now.date(), time.min, tzinfo=timezone.utc)
-    end = datetime.combine(now.date(), time.max, tzinfo=timezone.utc)
+    codes = [c["code"] for c in coupons]
+    rows = await session.scalars(select(Coupon).where(Coupon.code.in_(codes)))
+    by_code = {coupon.code: coupon for coupon in rows}
+    applied = [by_code[code] for code in codes if code in by_code]
 
-    for c in coupons:
-        coupon = await session.scalar(select(Coupon).where(Coupon.code == c["code"]))
-        if coupon is None:
-            continue
+    for coupon in applied:
         if coupon.valid_from and now < coupon.valid_from:
             raise billing_service.CouponError(
                 "NOT_ACTIVE",
@@ -132,72 +176,83 @@ async def _enforce_coupon_caps(
                 hint=f"Expired on {coupon.valid_to.date()}",
             )
 
-        if coupon.per_day_cap is not None:
-            day_count = await session.scalar(
-                select(func.count(CouponUsage.id)).where(
-                    CouponUsage.coupon_id == coupon.id,
-                    CouponUsage.used_at >= start,
-                    CouponUsage.used_at <= end,
-                )
-            )
-            if day_count >= coupon.per_day_cap:
-                raise billing_service.CouponError(
-                    "DAILY_CAP",
-                    f"Coupon {coupon.code} limit reached today",
-                    hint="Try again tomorrow",
-                )
-
-        if guest_id is not None and coupon.per_guest_cap is not None:
-            guest_count = await session.scalar(
-                select(func.count(CouponUsage.id)).where(
-                    CouponUsage.coupon_id == coupon.id,
-                    CouponUsage.guest_id == guest_id,
-                )
-            )
-            if guest_count >= coupon.per_guest_cap:
-                raise billing_service.CouponError(
-                    "GUEST_CAP",
-                    f"Coupon {coupon.code} already used",
-                    hint="Limit 1 per guest",
-                )
-
-        if outlet_id is not None and coupon.per_outlet_cap is not None:
-            outlet_count = await session.scalar(
-                select(func.count(CouponUsage.id)).where(
-                    CouponUsage.coupon_id == coupon.id,
-                    CouponUsage.outlet_id == outlet_id,
-                )
-            )
-            if outlet_count >= coupon.per_outlet_cap:
-                raise billing_service.CouponError(
-                    "OUTLET_CAP",
-                    f"Outlet limit reached for {coupon.code}",
-                    hint="Outlet limit reached",
-                )
-
-        session.add(
-            CouponUsage(coupon_id=coupon.id, guest_id=guest_id, outlet_id=outlet_id)
-        )
+    scopes = [(coupon_usage_repo_sql.SCOPE_DAY, coupon_usage_repo_sql.day_bucket(now))]
+    if guest_id is not None:
+        scopes.append((coupon_usage_repo_sql.SCOPE_GUEST, str(guest_id)))
+    if outlet_id is not None:
+        scopes.append((coupon_usage_repo_sql.SCOPE_OUTLET, str(outlet_id)))
+
+    claimed: list[tuple[int, str, str]] = []
+    try:
+        for coupon in applied:
+            for scope, bucket in scopes:
+                cap = getattr(coupon, _CAP_COLUMNS[scope])
+                if not await coupon_usage_repo_sql.claim(
+                    session, coupon.id, scope, bucket, cap
+                ):
+                    raise _cap_error(scope, coupon.code)
+                claimed.append((coupon.id, scope, bucket))
+    except billing_service.CouponError:
+        for coupon_id, scope, bucket in claimed:
+            await coupon_usage_repo_sql.release(session, coupon_id, scope, bucket)
+        raise
+
+    session.add_all(
+        CouponUsage(coupon_id=coupon.id, guest_id=guest_id, outlet_id=outlet_id)
+        for coupon in applied
+    )
 
 
-async def add_payment(
+async def record_payment(
     session: AsyncSession,
     invoice_id: int,
     mode: str,
-    amount: float,
+    amount: float | Decimal,
     utr: str | None = None,
     verified: bool = False,
-) -> None:
-    """Record a payment against ``invoice_id``."""
+    *,
+    tz: str | None,
+) -> Payment:
+    """Add a payment row and its delta to the payment-mode rollup.
+
+    Every payment write, refunds (negative ``amount``) included, goes through
+    here so ``sales_rollup_modes`` stays in step with ``payments``. ``tz`` is
+    the tenant's timezone from :func:`rollup_repo_sql.tenant_tz`.
+    """
 
+    created_at = datetime.now(timezone.utc)
     payment = Payment(
         invoice_id=invoice_id,
         mode=mode,
         amount=Decimal(str(amount)),
         utr=utr,
         verified=verified,
+        created_at=created_at,
     )
     session.add(payment)
+    await rollup_repo_sql.apply_payment(
+        session, created_at, mode, payment.amount, tz=tz
+    )
+    return payment
+
+
+async def add_payment(
+    session: AsyncSession,
+    invoice_id: int,
+    mode: str,
+    amount: float,
+    utr: str | None = None,
+    verified: bool = False,
+    *,
+    tz: str | None = None,
+) -> None:
+    """Record a payment against ``invoice_id`` and settle it once paid.
+
+    Callers pass the tenant's timezone as ``tz``, see :func:`record_payment`;
+    ``None`` falls back to ``DEFAULT_TZ``.
+    """
+
+    await record_payment(session, invoice_id, mode, amount, utr, verified, tz=tz)
     await session.flush()
 
     total_paid = await session.scalar(
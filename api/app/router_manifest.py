@@ -0,0 +1,405 @@
+"""Routers mounted by :mod:`.main`, in registration order.
+
+Each entry names a route module and the path templates its router serves,
+which lets :mod:`.lazy_routers` route requests without importing the module.
+Generated by ``scripts/gen_router_manifest.py``: add new routers to their
+group with any paths and run the script to fill them in.
+"""
+
+from .lazy_routers import Router
+
+ROUTERS = {
+    "auth": [
+        Router("routes_auth_magic", ("/auth/magic/start", "/auth/magic/consume")),
+        Router(
+            "routes_auth_2fa",
+            (
+                "/auth/2fa/setup",
+                "/auth/2fa/enable",
+                "/auth/2fa/disable",
+                "/auth/2fa/verify",
+                "/auth/2fa/stepup",
+                "/auth/2fa/backup",
+            ),
+        ),
+        Router("routes_auth_jwks", ("/auth/jwks.json",)),
+    ],
+    "guest": [
+        Router("routes_guest_menu", ("/g/{table_token}/menu",)),
+        Router("routes_guest_order", ("/g/{table_token}/order",)),
+        Router("routes_guest_bill", ("/g/{table_token}/bill",)),
+        Router("routes_guest_consent", ("/g/consent",)),
+        Router("routes_guest_receipts", ("/guest/receipts",)),
+        Router(
+            "routes_counter_guest",
+            ("/c/{counter_token}/menu", "/c/{counter_token}/order"),
+        ),
+        Router(
+            "routes_hotel_guest",
+            (
+                "/h/{room_token}/menu",
+                "/h/{room_token}/order",
+                "/h/{room_token}/request/cleaning",
+            ),
+        ),
+        Router("routes_invoice_pdf", ("/invoice/{invoice_id}/pdf",)),
+        Router("routes_billing", ("/billing",)),
+        Router(
+            "routes_admin_billing",
+            (
+                "/admin/billing/subscription",
+                "/admin/billing/checkout",
+                "/admin/billing/credits",
+                "/admin/billing/invoice/{invoice_id}.pdf",
+                "/admin/billing/credit-note/{credit_note_id}.pdf",
+                "/admin/billing/invoice/test-generate",
+                "/admin/billing/invoices.csv",
+            ),
+        ),
+        Router("routes_admin_billing", ("/billing/webhook/mock",), "webhook_router"),
+        Router(
+            "routes_onboarding",
+            (
+                "/api/onboarding/start",
+                "/api/onboarding/{onboarding_id}",
+                "/api/onboarding/{onboarding_id}/profile",
+                "/api/onboarding/{onboarding_id}/tax",
+                "/api/onboarding/{onboarding_id}/tables",
+                "/api/onboarding/{onboarding_id}/payments",
+                "/api/onboarding/{onboarding_id}/finish",
+            ),
+        ),
+        Router("routes_qrpack", ("/api/outlet/{tenant_id}/qrpack.pdf",)),
+        Router(
+            "routes_order_void",
+            (
+                "/api/outlet/{tenant_id}/orders/{order_id}/void/request",
+                "/api/outlet/{tenant_id}/orders/{order_id}/void/approve",
+            ),
+        ),
+    ],
+    "kds": [
+        Router("routes_kot", ("/api/outlet/{tenant_id}/kot/{order_id}.pdf",)),
+        Router(
+            "routes_kds",
+            (
+                "/api/outlet/{tenant_id}/kds/queue",
+                "/api/outlet/{tenant_id}/kds/order/{order_id}/accept",
+                "/api/outlet/{tenant_id}/kds/order/{order_id}/progress",
+                "/api/outlet/{tenant_id}/kds/order/{order_id}/ready",
+                "/api/outlet/{tenant_id}/kds/order/{order_id}/serve",
+                "/api/outlet/{tenant_id}/kds/order/{order_id}/reject",
+                "/api/outlet/{tenant_id}/kds/item/{order_item_id}/accept",
+                "/api/outlet/{tenant_id}/kds/item/{order_item_id}/progress",
+                "/api/outlet/{tenant_id}/kds/item/{order_item_id}/ready",
+                "/api/outlet/{tenant_id}/kds/item/{order_item_id}/serve",
+                "/api/outlet/{tenant_id}/kds/item/{order_item_id}/reject",
+            ),
+        ),
+        Router(
+            "routes_kds_expo",
+            (
+                "/api/outlet/{tenant_id}/kds/expo",
+                "/api/outlet/{tenant_id}/kds/expo/{order_id}/picked",
+            ),
+        ),
+        Router("routes_kds_sla", ("/api/outlet/{tenant_id}/kds/sla/breach",)),
+    ],
+    "admin": [
+        Router(
+            "routes_counter_admin",
+            ("/api/outlet/{tenant_id}/counters/{order_id}/status",),
+        ),
+        Router(
+            "routes_staff",
+            (
+                "/api/outlet/{tenant}/staff/login",
+                "/api/outlet/{tenant}/staff/{staff_id}/set_pin",
+                "/api/outlet/{tenant}/staff/me",
+                "/api/outlet/{tenant}/staff/shifts",
+            ),
+        ),
+        Router(
+            "routes_admin_menu",
+            (
+                "/api/outlet/{tenant_id}/menu/items",
+                "/api/outlet/{tenant_id}/menu/item/{item_id}/out_of_stock",
+                "/api/outlet/{tenant_id}/menu/items/{item_id}/delete",
+                "/api/outlet/{tenant_id}/menu/items/{item_id}/restore",
+                "/api/outlet/{tenant_id}/menu/i18n/import",
+                "/api/outlet/{tenant_id}/menu/i18n/export",
+            ),
+        ),
+        Router("routes_admin_audit", ("/admin/audit",)),
+        Router(
+            "routes_menu_i18n",
+            (
+                "/api/outlet/{tenant_id}/menu/i18n/import",
+                "/api/outlet/{tenant_id}/menu/i18n/export",
+                "/api/outlet/{tenant_id}/settings/i18n",
+            ),
+        ),
+        Router("routes_admin_onboarding", ("/admin/onboarding",)),
+        Router("routes_slo", ("/admin/ops/slo",)),
+        Router(
+            "routes_admin_ops",
+            ("/api/admin/ops/summary", "/api/admin/ops/queries"),
+        ),
+        Router("routes_limits_usage", ("/api/outlet/{tenant}/limits/usage",)),
+        Router(
+            "routes_menu_import",
+            (
+                "/api/outlet/{tenant_id}/menu/import/dryrun",
+                "/api/outlet/{tenant_id}/menu/import",
+            ),
+        ),
+        Router(
+            "routes_alerts",
+            (
+                "/api/outlet/{tenant_id}/alerts/rules",
+                "/api/outlet/{tenant_id}/alerts/outbox",
+            ),
+        ),
+        Router("routes_security", ("/api/outlet/{tenant}/security/unblock_ip",)),
+        Router("routes_jobs_status", ("/api/admin/jobs/status",)),
+        Router("routes_dlq", ("/api/admin/dlq", "/api/admin/dlq/replay")),
+        Router(
+            "routes_admin_privacy",
+            (
+                "/api/outlet/{tenant_id}/privacy/dsar/export",
+                "/api/outlet/{tenant_id}/privacy/dsar/delete",
+            ),
+        ),
+        Router("routes_privacy_dsar", ("/privacy/dsar/export", "/privacy/dsar/delete")),
+        Router(
+            "routes_retention",
+            ("/api/admin/retention/preview", "/api/admin/retention/apply"),
+        ),
+        Router(
+            "routes_outbox_admin",
+            (
+                "/api/outlet/{tenant_id}/outbox",
+                "/api/outlet/{tenant_id}/outbox/{item_id}/retry",
+                "/api/outlet/{tenant_id}/dlq",
+                "/api/outlet/{tenant_id}/dlq/{item_id}/requeue",
+                "/api/outlet/{tenant_id}/dlq/{item_id}",
+            ),
+        ),
+        Router(
+            "routes_webhook_tools",
+            (
+                "/api/outlet/{tenant_id}/webhooks/test",
+                "/api/outlet/{tenant_id}/webhooks/{item_id}/replay",
+            ),
+        ),
+        Router("routes_orders_batch", ("/api/outlet/{tenant_id}/orders/batch",)),
+        Router(
+            "routes_housekeeping",
+            (
+                "/api/outlet/{tenant}/housekeeping/table/{table_id}/start_clean",
+                "/api/outlet/{tenant}/housekeeping/room/{room_id}/start_clean",
+                "/api/outlet/{tenant}/housekeeping/table/{table_id}/ready",
+                "/api/outlet/{tenant}/housekeeping/room/{room_id}/ready",
+            ),
+        ),
+        Router(
+            "routes_hotel_housekeeping",
+            (
+                "/api/outlet/housekeeping/room/{room_id}/start_clean",
+                "/api/outlet/housekeeping/room/{room_id}/ready",
+            ),
+        ),
+        Router("routes_metrics", ("/metrics",)),
+        Router("routes_ab_tests", ("/api/ab/{experiment}",)),
+        Router("routes_ab_report", ("/exp/ab/report",)),
+        Router("routes_rum_vitals", ("/rum/vitals",)),
+        Router("routes_analytics_outlets", ("/api/analytics/outlets",)),
+        Router("routes_owner_analytics", ("/api/admin/analytics/owners",)),
+        Router("routes_owner_sla", ("/api/owner/sla",)),
+        Router("routes_dashboard", ("/api/outlet/{tenant_id}/dashboard/tiles",)),
+        Router(
+            "routes_dashboard_charts",
+            ("/api/outlet/{tenant_id}/dashboard/charts",),
+        ),
+        Router(
+            "routes_owner_aggregate",
+            (
+                "/api/owner/{owner_id}/dashboard/charts",
+                "/api/owner/{owner_id}/daybook.pdf",
+            ),
+        ),
+        Router("routes_preflight", ("/api/admin/preflight",)),
+        Router(
+            "routes_tables_map",
+            (
+                "/api/outlet/{tenant}/tables",
+                "/api/outlet/{tenant}/tables/{table_id}/position",
+                "/api/outlet/{tenant}/tables/map",
+                "/api/outlet/{tenant}/tables/{code}/delete",
+                "/api/outlet/{tenant}/tables/{code}/restore",
+            ),
+        ),
+        Router(
+            "routes_tables_qr_rotate",
+            ("/api/outlet/{tenant}/tables/{code}/qr/rotate",),
+        ),
+        Router("routes_tables_sse", ("/api/outlet/{tenant}/tables/map/stream",)),
+        Router(
+            "routes_floor",
+            ("/admin/floor-map", "/admin/floor-map/save", "/floor", "/floor/stream"),
+        ),
+        Router("routes_time_skew", ("/time/skew",)),
+        Router("routes_pwa_version", ("/pwa/version",)),
+        Router("routes_status_json", ("/status.json", "/admin/status")),
+        Router("routes_status", ("/status/deps", "/status")),
+        Router("routes_stats", ("/api/stats",)),
+        Router("routes_version", ("/version",)),
+        Router("routes_ready", ("/ready",)),
+        Router("routes_eta", ("/orders/{order_id}/eta",)),
+        Router("routes_troubleshoot", ("/admin/troubleshoot",)),
+        Router("routes_help", ("/help",)),
+        Router(
+            "routes_support",
+            (
+                "/support/contact",
+                "/support/tickets",
+                "/support/tickets/{ticket_id}",
+                "/support/tickets/{ticket_id}/reply",
+                "/support/feedback",
+            ),
+        ),
+        Router("routes_admin_support", ("/admin/support",)),
+        Router("routes_admin_flags", ("/admin/flags", "/admin/flags/{name}")),
+        Router(
+            "routes_staff_support",
+            (
+                "/staff/support",
+                "/staff/support/{ticket_id}",
+                "/staff/support/{ticket_id}/reply",
+                "/staff/support/{ticket_id}/close",
+                "/staff/support/{ticket_id}/reopen",
+            ),
+        ),
+        Router(
+            "routes_support_console",
+            (
+                "/admin/support/console",
+                "/admin/support/console/search",
+                "/admin/support/console/order/{order_id}/resend_invoice",
+                "/admin/support/console/order/{order_id}/reprint_kot",
+                "/admin/support/console/order/{order_id}/replay_webhook",
+                "/admin/support/console/staff/{staff_id}/unlock_pin",
+            ),
+        ),
+        Router("routes_admin_webhooks", ("/admin/webhooks/probe",)),
+        Router("routes_print_test", ("/admin/print/test",)),
+        Router(
+            "routes_integrations",
+            ("/admin/integrations", "/admin/integrations/{kind}/probe"),
+        ),
+        Router(
+            "routes_integrations_marketplace",
+            (
+                "/api/outlet/{tenant}/integrations/marketplace",
+                "/api/outlet/{tenant}/integrations/connect",
+            ),
+        ),
+        Router(
+            "routes_support_bundle",
+            ("/api/outlet/{tenant_id}/support/bundle.zip",),
+        ),
+        Router("routes_legal", ("/legal/{page}",)),
+        Router("routes_maintenance", ("/api/outlet/{tenant}/maintenance/schedule",)),
+        Router(
+            "routes_tenant_close",
+            ("/api/outlet/{tenant}/close", "/api/admin/tenants/{tenant}/restore"),
+        ),
+        Router("routes_tenant_sandbox", ("/api/admin/tenant/sandbox",)),
+        Router("routes_sandbox_bootstrap", ("/admin/tenant/sandbox",)),
+        Router("routes_backup", ("/api/outlet/{tenant_id}/backup",)),
+        Router("routes_print", ("/api/outlet/{tenant}/print/test",)),
+        Router(
+            "routes_print_bridge",
+            ("/api/outlet/{tenant}/print/notify", "/api/outlet/{tenant}/print/status"),
+        ),
+        Router("routes_push", ("/api/outlet/{tenant}/push/subscribe",)),
+        Router("routes_whatsapp_status", ("/api/outlet/{tenant}/whatsapp/status",)),
+        Router(
+            "routes_checkout_gateway",
+            (
+                "/api/outlet/{tenant}/checkout/start",
+                "/api/outlet/{tenant}/checkout/webhook",
+            ),
+        ),
+        Router("routes_refunds", ("/payments/{payment_id}/refund",)),
+        Router(
+            "routes_feedback",
+            ("/api/outlet/{tenant}/feedback", "/api/outlet/{tenant}/feedback/summary"),
+        ),
+        Router(
+            "routes_pilot_feedback",
+            ("/api/pilot/{tenant}/feedback", "/api/pilot/admin/feedback/summary"),
+        ),
+        Router("routes_pilot_telemetry", ("/api/admin/pilot/telemetry",)),
+        Router(
+            "routes_media",
+            (
+                "/api/outlet/{tenant}/media/upload",
+                "/api/outlet/{tenant}/media/{digest}",
+            ),
+        ),
+        Router(
+            "routes_api_keys",
+            (
+                "/api/outlet/{tenant_id}/api-keys",
+                "/api/outlet/{tenant_id}/api-keys/{key_id}",
+            ),
+        ),
+        Router("routes_vapid", ("/vapid/public_key",)),
+        Router("routes_postman", ("/postman/collection.json",)),
+        Router(
+            "routes_admin_qrpack",
+            ("/api/admin/qrpacks/logs", "/api/admin/qrpacks/export"),
+        ),
+        Router(
+            "routes_admin_qrposter_pack",
+            ("/api/admin/outlets/{tenant_id}/qrposters.zip",),
+        ),
+        Router(
+            "routes_admin_devices",
+            (
+                "/admin/devices/register",
+                "/admin/devices",
+                "/admin/staff/{username}/unlock_pin",
+            ),
+        ),
+        Router("routes_admin_export", ("/api/admin/export/data.zip",)),
+    ],
+    "reports": [
+        Router("routes_daybook_pdf", ("/api/outlet/{tenant_id}/reports/daybook.pdf",)),
+        Router("routes_digest", ("/api/outlet/{tenant_id}/digest/run",)),
+        Router("routes_reports", ("/api/outlet/{tenant_id}/reports/z",)),
+        Router("routes_csp_report", ("/csp/report", "/admin/csp/reports")),
+        Router(
+            "routes_accounting_exports",
+            (
+                "/api/outlet/{tenant_id}/accounting/sales_register.csv",
+                "/api/outlet/{tenant_id}/accounting/gst_summary.csv",
+            ),
+        ),
+        Router("routes_gst_monthly", ("/api/outlet/{tenant_id}/reports/gst/monthly",)),
+        Router(
+            "routes_exports",
+            (
+                "/api/outlet/{tenant_id}/exports/invoices.csv",
+                "/api/outlet/{tenant_id}/exports/invoices/progress/{job}",
+                "/api/outlet/{tenant_id}/exports/daily",
+                "/api/outlet/{tenant_id}/exports/daily/progress/{job}",
+            ),
+        ),
+        Router("routes_export_all", ("/api/outlet/{tenant_id}/export/all.zip",)),
+    ],
+    "superadmin": [
+        Router("routes_superadmin", ("/api/super/outlet",)),
+    ],
+}
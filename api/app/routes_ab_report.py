@@ -3,7 +3,8 @@ from __future__ import annotations
 from datetime import datetime
 
 from fastapi import APIRouter, Query
-from prometheus_client import REGISTRY
+
+from .routes_metrics import collector_registry
 
 router = APIRouter()
 
@@ -24,7 +25,7 @@ async def ab_report(
 
     exposures_samples = []
     conversions_samples = []
-    for metric in REGISTRY.collect():
+    for metric in collector_registry().collect():
         if metric.name == "ab_exposures":
             exposures_samples = [
                 s
@@ -9,17 +9,20 @@ from io import StringIO
 import csv
 
 from fastapi import APIRouter, HTTPException, Response, Query
+from fastapi.responses import StreamingResponse
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from .db.tenant import get_engine
 from .models_tenant import Invoice, MenuItem, OrderItem
-
-
+from .utils.csv_stream import stream_csv
 
 router = APIRouter()
 
+# Rows fetched per keyset page / server-side cursor partition.
+PAGE_SIZE = 1000
+
 
 @asynccontextmanager
 async def _session(tenant_id: str):
@@ -50,63 +53,111 @@ def _round(value: Decimal) -> Decimal:
     return value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
 
+def _accumulate(
+    summary: dict[str, dict[str, Decimal]],
+    gst_rate,
+    qty,
+    price,
+    bill: dict,
+    composition: bool,
+) -> None:
+    """Fold one order line into the per-rate GST ``summary``."""
+
+    qty_d = Decimal(str(qty))
+    price_d = Decimal(str(price))
+    taxable = _round(qty_d * price_d)
+    rate = Decimal(str(gst_rate or 0))
+
+    if composition or rate == 0:
+        cgst = sgst = igst = Decimal("0")
+    else:
+        if bill.get("inter_state"):
+            igst = _round(taxable * rate / Decimal("100"))
+            cgst = sgst = Decimal("0")
+        else:
+            cgst = _round(taxable * rate / Decimal("200"))
+            sgst = cgst
+            igst = Decimal("0")
+
+    rate_key = str(int(rate)) if rate == int(rate) else str(rate)
+    key = rate_key
+    entry = summary.setdefault(
+        key,
+        {"taxable": Decimal("0"), "cgst": Decimal("0"), "sgst": Decimal("0"), "igst": Decimal("0")},
+    )
+    entry["taxable"] += taxable
+    entry["cgst"] += cgst
+    entry["sgst"] += sgst
+    entry["igst"] += igst
+
+
 @router.get("/api/outlet/{tenant_id}/accounting/sales_register.csv")
 async def sales_register_csv(
     tenant_id: str,
     from_: str = Query(..., alias="from"),
     to: str = Query(..., alias="to"),
     composition: bool = False,
-) -> Response:
-    """Return per-invoice sales with GST split for the date range."""
-
-    start, end = _parse_range(from_, to)
-
-    async with _session(tenant_id) as session:
-        result = await session.execute(
-            select(Invoice.number, Invoice.created_at, Invoice.bill_json)
-            .where(Invoice.created_at >= start, Invoice.created_at < end)
-            .order_by(Invoice.id)
-        )
-        rows = result.all()
-
-    output = StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["date", "invoice_no", "subtotal", "tax", "total"])
-
-    total_subtotal = Decimal("0")
-    total_tax = Decimal("0")
-
-    for number, created_at, bill in rows:
-        subtotal = float(bill.get("subtotal", 0))
-        tax_breakup = bill.get("tax_breakup", {})
-        tax = 0.0 if composition else float(sum(tax_breakup.values()))
-        total = float(bill.get("total", subtotal + tax))
+) -> StreamingResponse:
+    """Stream per-invoice sales with GST split for the date range.
 
-        total_subtotal += Decimal(str(subtotal))
-        total_tax += Decimal(str(tax))
+    Invoices are read in keyset-ordered pages of :data:`PAGE_SIZE` rows so
+    memory stays flat regardless of how many invoices fall in the range.
+    """
 
-        writer.writerow(
-            [
-                created_at.date().isoformat(),
-                number,
-                str(subtotal),
-                str(tax),
-                str(total),
-            ]
-        )
+    start, end = _parse_range(from_, to)
 
-    grand_total = total_subtotal + total_tax
-    writer.writerow(
-        [
+    async def row_iter():
+        total_subtotal = Decimal("0")
+        total_tax = Decimal("0")
+        last_id = 0
+        async with _session(tenant_id) as session:
+            while True:
+                result = await session.execute(
+                    select(
+                        Invoice.id, Invoice.number, Invoice.created_at, Invoice.bill_json
+                    )
+                    .where(
+                        Invoice.created_at >= start,
+                        Invoice.created_at < end,
+                        Invoice.id > last_id,
+                    )
+                    .order_by(Invoice.id)
+                    .limit(PAGE_SIZE)
+                )
+                rows = result.all()
+                if not rows:
+                    break
+                for inv_id, number, created_at, bill in rows:
+                    last_id = inv_id
+                    subtotal = float(bill.get("subtotal", 0))
+                    tax_breakup = bill.get("tax_breakup", {})
+                    tax = 0.0 if composition else float(sum(tax_breakup.values()))
+                    total = float(bill.get("total", subtotal + tax))
+
+                    total_subtotal += Decimal(str(subtotal))
+                    total_tax += Decimal(str(tax))
+
+                    yield [
+                        created_at.date().isoformat(),
+                        number,
+                        str(subtotal),
+                        str(tax),
+                        str(total),
+                    ]
+                if len(rows) < PAGE_SIZE:
+                    break
+
+        grand_total = total_subtotal + total_tax
+        yield [
             "TOTAL",
             "",
             str(float(total_subtotal)),
             str(float(total_tax)),
             str(float(grand_total)),
         ]
-    )
 
-    resp = Response(content=output.getvalue(), media_type="text/csv")
+    headers = ["date", "invoice_no", "subtotal", "tax", "total"]
+    resp = StreamingResponse(stream_csv(headers, row_iter()), media_type="text/csv")
     resp.headers["Content-Disposition"] = "attachment; filename=sales_register.csv"
     return resp
 
@@ -123,7 +174,10 @@ async def gst_summary_csv(
     start, end = _parse_range(from_, to)
 
     async with _session(tenant_id) as session:
-        result = await session.execute(
+        # Line-level rounding and the per-invoice ``inter_state`` flag keep
+        # this summary in Python, but rows are consumed from a server-side
+        # cursor so only one partition is held in memory at a time.
+        result = await session.stream(
             select(
                 MenuItem.gst_rate,
                 OrderItem.qty,
@@ -133,37 +187,11 @@ async def gst_summary_csv(
             .join(Invoice, Invoice.order_group_id == OrderItem.order_id)
             .join(MenuItem, MenuItem.id == OrderItem.item_id)
             .where(Invoice.created_at >= start, Invoice.created_at < end)
+            .execution_options(yield_per=PAGE_SIZE)
         )
-        rows = result.all()
-
-    summary: dict[str, dict[str, Decimal]] = {}
-    for gst_rate, qty, price, bill in rows:
-        qty_d = Decimal(str(qty))
-        price_d = Decimal(str(price))
-        taxable = _round(qty_d * price_d)
-        rate = Decimal(str(gst_rate or 0))
-
-        if composition or rate == 0:
-            cgst = sgst = igst = Decimal("0")
-        else:
-            if bill.get("inter_state"):
-                igst = _round(taxable * rate / Decimal("100"))
-                cgst = sgst = Decimal("0")
-            else:
-                cgst = _round(taxable * rate / Decimal("200"))
-                sgst = cgst
-                igst = Decimal("0")
-
-        rate_key = str(int(rate)) if rate == int(rate) else str(rate)
-        key = rate_key
-        entry = summary.setdefault(
-            key,
-            {"taxable": Decimal("0"), "cgst": Decimal("0"), "sgst": Decimal("0"), "igst": Decimal("0")},
-        )
-        entry["taxable"] += taxable
-        entry["cgst"] += cgst
-        entry["sgst"] += sgst
-        entry["igst"] += igst
+        summary: dict[str, dict[str, Decimal]] = {}
+        async for gst_rate, qty, price, bill in result:
+            _accumulate(summary, gst_rate, qty, price, bill, composition)
 
     output = StringIO()
     writer = csv.writer(output)
@@ -30,12 +30,11 @@ async def admin_export(
     redis = request.app.state.redis
     ip = request.client.host if request.client else "unknown"
     policy = ratelimits.exports()
-    allowed = await ratelimit.allow(
+    rl = await ratelimit.hit(
         redis, ip, "exports", rate_per_min=policy.rate_per_min, burst=policy.burst
     )
-    if not allowed:
-        retry_after = await redis.ttl(f"ratelimit:{ip}:exports")
-        return rate_limited(retry_after)
+    if not rl.allowed:
+        return rate_limited(rl.retry_after)
 
     tenant_id = request.headers.get("X-Tenant-ID", "demo")
     bundle = BytesIO()
@@ -26,6 +26,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from .auth import User, role_required
 from .db.tenant import get_engine
+from .menu import snapshot as menu_snapshot
 from .models_tenant import MenuItem, TenantMeta
 from .repos_sqlalchemy.menu_repo_sql import MenuRepoSQL
 from .utils.audit import audit
@@ -115,7 +116,7 @@ async def toggle_out_of_stock(
     async with _session(tenant_id) as session:
         await repo.toggle_out_of_stock(session, item_id, payload.flag)
         items = await repo.list_items(session, include_hidden=True)
-    await request.app.state.redis.delete(f"menu:{tenant_id}")
+    await menu_snapshot.invalidate(request.app.state.redis, tenant_id)
     return ok(items)
 
 
@@ -132,7 +133,7 @@ async def delete_menu_item(
     async with _session(tenant_id) as session:
         await repo.soft_delete_item(session, item_id)
         item = await session.get(MenuItem, item_id)
-    await request.app.state.redis.delete(f"menu:{tenant_id}")
+    await menu_snapshot.invalidate(request.app.state.redis, tenant_id)
     return ok({"id": str(item.id), "name": item.name, "deleted_at": item.deleted_at})
 
 
@@ -152,7 +153,7 @@ async def restore_menu_item(
     async with _session(tenant_id) as session:
         await repo.restore_item(session, item_id)
         item = await session.get(MenuItem, item_id)
-    await request.app.state.redis.delete(f"menu:{tenant_id}")
+    await menu_snapshot.invalidate(request.app.state.redis, tenant_id)
     return ok({"id": str(item.id), "name": item.name, "deleted_at": item.deleted_at})
 
 
@@ -163,6 +164,7 @@ async def restore_menu_item(
 @audit("menu_i18n_import")
 async def import_menu_i18n(
     tenant_id: str,
+    request: Request,
     file: UploadFile = File(...),
     user: User = Depends(role_required("super_admin", "outlet_admin", "manager")),
 ) -> dict:
@@ -186,6 +188,7 @@ async def import_menu_i18n(
             item.name_i18n = ni
             item.desc_i18n = di
         await session.commit()
+    await menu_snapshot.invalidate(request.app.state.redis, tenant_id)
     return ok({"status": "imported"})
 
 
@@ -2,10 +2,15 @@ from __future__ import annotations
 
 import statistics
 import time
-from fastapi import APIRouter, Request
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from . import redis_registry
+from .auth import User, role_required
+from .obs.query_stats import query_stats
 from .routes_preflight import preflight
 from .routes_metrics import (
     webhook_attempts_total,
@@ -31,10 +36,7 @@ async def admin_ops_summary(request: Request) -> dict:
     now = int(time.time())
     open_seconds = 0
     if redis:
-        for key in await redis.keys("cb:*:until"):
-            until = await redis.get(key)
-            if until:
-                open_seconds += max(0, int(until) - now)
+        open_seconds = await redis_registry.open_breaker_seconds(redis, now)
 
     tenant = request.headers.get("X-Tenant-ID", "demo")
     engine = get_engine(tenant)
@@ -60,3 +62,17 @@ async def admin_ops_summary(request: Request) -> dict:
         "median_kot_prep_time": median_prep,
     }
     return ok(data)
+
+
+@router.get("/api/admin/ops/queries")
+async def admin_ops_queries(
+    limit: int = Query(20, ge=1, le=200),
+    by: Literal["count", "total_ms", "max_ms", "rows"] = "total_ms",
+    user: User = Depends(role_required("super_admin")),
+) -> dict:
+    """Return the heaviest query fingerprints and recent N+1 detections."""
+    data = {
+        "top": query_stats.top(limit, by),
+        "n_plus_one": list(query_stats.n_plus_one),
+    }
+    return ok(data)
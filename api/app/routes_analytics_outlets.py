@@ -13,27 +13,19 @@ from zoneinfo import ZoneInfo
 from fastapi import APIRouter, HTTPException, Query, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy import desc, func, select
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from .db.replica import read_only, replica_session
-from .db.tenant import get_engine
+from .db.replica import read_only, replica_session, tenant_session
 from .models_master import Tenant
 from .models_tenant import Invoice, Order, OrderItem, OrderStatus
+from .utils.fanout import cached_fan_out
 
 router = APIRouter()
 
 
 @asynccontextmanager
 async def _session(tenant_id: str):
-    engine = get_engine(tenant_id)
-    sessionmaker = async_sessionmaker(
-        engine, expire_on_commit=False, class_=AsyncSession
-    )
-    try:
-        async with sessionmaker() as session:
-            yield session
-    finally:
-        await engine.dispose()
+    async with tenant_session(tenant_id) as session:
+        yield session
 
 
 async def _get_tenants_info(tenant_ids: Iterable[str]) -> dict[str, dict]:
@@ -79,14 +71,8 @@ async def analytics_outlets(
         raise HTTPException(status_code=400, detail="invalid range")
 
     info = await _get_tenants_info(requested)
-    total_orders = 0
-    total_sales = 0.0
-    total_cancelled = 0
-    top: dict[str, int] = {}
-    durations: list[float] = []
-    per_outlet: list[dict] = []
 
-    for tid in requested:
+    async def _outlet_slice(tid: str) -> dict:
         tz = info.get(tid, {}).get("tz", "UTC")
         tzinfo = ZoneInfo(tz)
         start_dt = datetime.combine(start_date, time.min, tzinfo).astimezone(
@@ -135,14 +121,41 @@ async def analytics_outlets(
                 for accepted, ready in rows.all()
                 if accepted and ready
             ]
+        return {
+            "orders": int(orders or 0),
+            "cancelled": int(cancelled or 0),
+            "sales": float(sales or 0.0),
+            "items": items,
+            "durations": durs,
+        }
+
+    slices = await cached_fan_out(
+        request.app.state.redis,
+        "analytics",
+        f"{start_date.isoformat()}:{end_date.isoformat()}",
+        requested,
+        _outlet_slice,
+    )
 
-        o = int(orders or 0)
-        c = int(cancelled or 0)
-        s = float(sales or 0.0)
+    total_orders = 0
+    total_sales = 0.0
+    total_cancelled = 0
+    top: dict[str, int] = {}
+    durations: list[float] = []
+    per_outlet: list[dict] = []
+
+    for tid in requested:
+        outlet = slices.results.get(tid)
+        if outlet is None:
+            continue
+        o = outlet["orders"]
+        c = outlet["cancelled"]
+        s = outlet["sales"]
+        durs = outlet["durations"]
         total_orders += o
         total_sales += s
         total_cancelled += c
-        for name, qty in items:
+        for name, qty in outlet["items"]:
             top[name] = top.get(name, 0) + qty
         durations.extend(durs)
         per_outlet.append(
@@ -167,6 +180,7 @@ async def analytics_outlets(
         "top_items": [{"name": n, "qty": q} for n, q in top_items],
         "median_prep": median_prep,
         "voids_pct": voids_pct,
+        "failed": slices.failures(),
     }
 
     if export == "csv":
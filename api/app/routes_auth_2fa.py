@@ -132,12 +132,11 @@ async def verify_2fa(
     redis = request.app.state.redis
     ip = request.client.host if request.client else "unknown"
     policy = ratelimits.two_factor_verify()
-    allowed = await ratelimit.allow(
+    rl = await ratelimit.hit(
         redis, ip, "2fa-verify", rate_per_min=policy.rate_per_min, burst=policy.burst
     )
-    if not allowed:
-        retry_after = await redis.ttl(f"ratelimit:{ip}:2fa-verify")
-        return rate_limited(retry_after)
+    if not rl.allowed:
+        return rate_limited(rl.retry_after)
     with SessionLocal() as db:
         record = db.get(TwoFactorSecret, user.username)
         if not record or not record.confirmed_at:
@@ -47,28 +47,26 @@ async def magic_start(payload: StartPayload, request: Request) -> dict:
         return hmac.compare_digest(token, expected)
 
     policy_ip = ratelimits.magic_link_ip()
-    allowed_ip = await ratelimit.allow(
+    rl_ip = await ratelimit.hit(
         redis,
         ip,
         "magic-start",
         rate_per_min=policy_ip.rate_per_min,
         burst=policy_ip.burst,
     )
-    if not allowed_ip and not _captcha_ok():
-        retry_after = await redis.ttl(f"ratelimit:{ip}:magic-start")
-        return rate_limited(retry_after)
+    if not rl_ip.allowed and not _captcha_ok():
+        return rate_limited(rl_ip.retry_after)
 
     policy_email = ratelimits.magic_link_email()
-    allowed_email = await ratelimit.allow(
+    rl_email = await ratelimit.hit(
         redis,
         email,
         "magic-email",
         rate_per_min=policy_email.rate_per_min,
         burst=policy_email.burst,
     )
-    if not allowed_email and not _captcha_ok():
-        retry_after = await redis.ttl(f"ratelimit:{email}:magic-email")
-        return rate_limited(retry_after)
+    if not rl_email.allowed and not _captcha_ok():
+        return rate_limited(rl_email.retry_after)
 
     jti = str(uuid.uuid4())
     token = create_access_token(
@@ -15,6 +15,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from .db.master import get_session
 from .models_master import Tenant
 from .models_tenant import Invoice, Payment
+from .repos_sqlalchemy.invoices_repo_sql import record_payment
+from .utils.fanout import invalidate_outlet
 from .utils.responses import ok
 
 router = APIRouter()
@@ -82,6 +84,8 @@ async def checkout_webhook(
     if provider in (None, "none"):
         raise HTTPException(status_code=404)
     sandbox = _sandbox_enabled(tenant_row)
+    # The tenant row is at hand: same fallback as rollup_repo_sql.tenant_tz
+    tz = getattr(tenant_row, "timezone", None)
     secret_env = {
         "razorpay": "RAZORPAY_SECRET_TEST" if sandbox else "RAZORPAY_SECRET",
         "stripe": "STRIPE_SECRET_TEST" if sandbox else "STRIPE_SECRET",
@@ -103,17 +107,19 @@ async def checkout_webhook(
     if payload.status == "paid":
         if getattr(invoice, "settled", False):
             return ok({"attached": False})
-        payment = Payment(
-            invoice_id=payload.invoice_id,
-            mode="gateway",
-            amount=payload.amount,
-            utr=payload.event_id or payload.order_id,
+        await record_payment(
+            session,
+            payload.invoice_id,
+            "gateway",
+            payload.amount,
+            payload.event_id or payload.order_id,
             verified=True,
+            tz=tz,
         )
-        session.add(payment)
         invoice.settled = True
         invoice.settled_at = datetime.now(timezone.utc)
         await session.commit()
+        await invalidate_outlet(request.app.state.redis, tenant)
         async with get_session() as m_session:
             tenant_row = await m_session.get(Tenant, tenant)
             if tenant_row:
@@ -136,17 +142,19 @@ async def checkout_webhook(
             return ok({"refunded": True})
         if not getattr(invoice, "settled", False):
             return ok({"refunded": False})
-        payment = Payment(
-            invoice_id=payload.invoice_id,
-            mode="gateway_refund",
-            amount=-payload.amount,
-            utr=utr,
+        await record_payment(
+            session,
+            payload.invoice_id,
+            "gateway_refund",
+            -payload.amount,
+            utr,
             verified=True,
+            tz=tz,
         )
-        session.add(payment)
         invoice.settled = False
         invoice.settled_at = None
         await session.commit()
+        await invalidate_outlet(request.app.state.redis, tenant)
         return ok({"refunded": True})
     raise HTTPException(status_code=400, detail="unknown status")
 
@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import json
 from typing import AsyncGenerator, List
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
@@ -14,9 +13,11 @@ from .db.replica import read_only
 from .db.tenant import get_engine
 from .deps.tenant import get_tenant_id
 from .i18n import get_msg, resolve_lang
+from .menu import snapshot as menu_snapshot
 from .repos_sqlalchemy import counter_orders_repo_sql
 from .repos_sqlalchemy.menu_repo_sql import MenuRepoSQL
 from .utils.audit import audit
+from .utils.fanout import invalidate_outlet
 from .utils.responses import ok
 
 router = APIRouter(prefix="/c")
@@ -82,35 +83,35 @@ async def get_session_from_path(
 async def fetch_menu(
     counter_token: str,
     request: Request,
-    response: Response,
     if_none_match: str | None = Header(default=None, alias="If-None-Match"),
     accept_language: str | None = Header(default=None, alias="Accept-Language"),
     tenant_id: str = Depends(get_tenant_id),
     session: AsyncSession = Depends(get_tenant_session),
-) -> dict:
-    """Return menu categories and items for the counter."""
-
-    repo = MenuRepoSQL()
-    etag = await repo.menu_etag(session)
-    if if_none_match == etag:
-        return Response(status_code=304, headers={"ETag": etag})
-    cache_key = f"menu:{tenant_id}"
-    redis = request.app.state.redis
-    cached = await redis.get(cache_key)
-    if cached:
-        data = json.loads(cached)
-    else:
-        categories = await repo.list_categories(session)
-        items = await repo.list_items(session)
-        data = {"categories": categories, "items": items}
-        await redis.set(cache_key, json.dumps(data), ex=60)
+) -> Response:
+    """Return menu categories and items for the counter.
+
+    The body is served from the tenant's menu snapshot; the database is only
+    queried when the snapshot is missing or stale.
+    """
+
     lang = resolve_lang(accept_language)
-    data["labels"] = {
-        name: get_msg(lang, f"labels.{name}")
-        for name in ("menu", "order", "pay", "get_bill")
-    }
-    response.headers["ETag"] = etag
-    return ok(data)
+
+    async def build() -> dict:
+        repo = MenuRepoSQL()
+        data = {
+            "categories": await repo.list_categories(session),
+            "items": await repo.list_items(session),
+        }
+        data["labels"] = {
+            name: get_msg(lang, f"labels.{name}")
+            for name in ("menu", "order", "pay", "get_bill")
+        }
+        return ok(data)
+
+    snapshot = await menu_snapshot.get_or_build(
+        request.app.state.redis, tenant_id, lang, build
+    )
+    return menu_snapshot.respond(snapshot, if_none_match)
 
 
 @router.post("/{counter_token}/order")
@@ -137,6 +138,7 @@ async def update_status(
     tenant_id: str,
     order_id: int,
     payload: StatusPayload,
+    request: Request,
     session: AsyncSession = Depends(get_session_from_path),
     user: User = Depends(role_required("super_admin", "outlet_admin", "manager")),
 ) -> dict:
@@ -145,4 +147,6 @@ async def update_status(
     invoice_id = await counter_orders_repo_sql.update_status(
         session, order_id, payload.status
     )
+    if invoice_id is not None:
+        await invalidate_outlet(request.app.state.redis, tenant_id)
     return ok({"invoice_id": invoice_id})
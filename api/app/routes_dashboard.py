@@ -9,10 +9,8 @@ from datetime import datetime
 from zoneinfo import ZoneInfo
 
 from fastapi import APIRouter, HTTPException, Request
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from .db.replica import read_only, replica_session
-from .db.tenant import get_engine
+from .db.replica import read_only, replica_session, tenant_session
 from .models_master import Tenant
 from .repos_sqlalchemy import dashboard_repo_sql
 
@@ -21,15 +19,8 @@ router = APIRouter()
 
 @asynccontextmanager
 async def _session(tenant_id: str):
-    engine = get_engine(tenant_id)
-    sessionmaker = async_sessionmaker(
-        engine, expire_on_commit=False, class_=AsyncSession
-    )
-    try:
-        async with sessionmaker() as session:
-            yield session
-    finally:
-        await engine.dispose()
+    async with tenant_session(tenant_id) as session:
+        yield session
 
 
 async def _get_timezone(tenant_id: str) -> str:
@@ -41,7 +32,7 @@ async def _get_timezone(tenant_id: str) -> str:
 
 
 @router.get("/api/outlet/{tenant_id}/dashboard/tiles")
-@read_only
+@read_only(max_lag=5)
 async def owner_dashboard_tiles(tenant_id: str, request: Request, force: bool = False):
     tz = await _get_timezone(tenant_id)
     redis = request.app.state.redis
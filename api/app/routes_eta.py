@@ -2,18 +2,38 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy import select
 
+from .db.tenant import get_tenant_session
+from .deps.tenant import get_tenant_id
 from .eta import service
+from .models_tenant import OrderItem
 from .utils.responses import ok
 
 router = APIRouter()
 
 
+async def _order_item_ids(tenant_id: str, order_id: int) -> list[int]:
+    """Return the menu item ids of the lines of ``order_id``."""
+    async with get_tenant_session(tenant_id) as session:
+        result = await session.execute(
+            select(OrderItem.item_id).where(OrderItem.order_id == order_id)
+        )
+        return list(result.scalars())
+
+
 @router.get("/orders/{order_id}/eta")
-async def order_eta(order_id: int) -> dict:
-    """Return ETA information for ``order_id``."""
-    result = service.eta_for_order([], active_tickets=1)
+async def order_eta(
+    order_id: int,
+    request: Request,
+    tenant_id: str = Depends(get_tenant_id),
+) -> dict:
+    """Return ETA information for ``order_id`` from its items' prep times."""
+    item_ids = await _order_item_ids(tenant_id, order_id)
+    result = await service.eta_for_items(
+        request.app.state.redis, tenant_id, item_ids, active_tickets=1
+    )
     now = datetime.utcnow()
     late_by = max(0, int((now - result["promised_at"]).total_seconds() * 1000))
     data = {
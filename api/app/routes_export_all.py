@@ -93,12 +93,11 @@ async def export_all(
     redis = request.app.state.redis
     ip = request.client.host if request.client else "unknown"
     policy = ratelimits.exports()
-    allowed = await ratelimit.allow(
+    rl = await ratelimit.hit(
         redis, ip, "exports", rate_per_min=policy.rate_per_min, burst=policy.burst
     )
-    if not allowed:
-        retry_after = await redis.ttl(f"ratelimit:{ip}:exports")
-        return rate_limited(retry_after)
+    if not rl.allowed:
+        return rate_limited(rl.retry_after)
 
     bundle = BytesIO()
     async with _session(tenant_id) as session:
@@ -15,10 +15,8 @@ from zoneinfo import ZoneInfo
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from .db.replica import read_only
-from .db.tenant import get_engine
+from .db.replica import read_only, tenant_session
 from .models_tenant import Invoice, Payment
 from .pdf.render import render_invoice
 from .repos_sqlalchemy import invoices_repo_sql
@@ -35,15 +33,8 @@ router = APIRouter()
 @asynccontextmanager
 async def _session(tenant_id: str):
     """Yield an ``AsyncSession`` for the given tenant."""
-    engine = get_engine(tenant_id)
-    sessionmaker = async_sessionmaker(
-        engine, expire_on_commit=False, class_=AsyncSession
-    )
-    try:
-        async with sessionmaker() as session:
-            yield session
-    finally:
-        await engine.dispose()
+    async with tenant_session(tenant_id) as session:
+        yield session
 
 
 HARD_LIMIT = 100_000
@@ -82,18 +73,17 @@ async def invoices_export(
     redis = request.app.state.redis
     ip = request.client.host if request.client else "unknown"
     policy = ratelimits.exports()
-    allowed = await ratelimit.allow(
+    rl = await ratelimit.hit(
         redis, ip, "exports", rate_per_min=policy.rate_per_min, burst=policy.burst
     )
-    if not allowed:
-        retry_after = await redis.ttl(f"ratelimit:{ip}:exports")
-        return rate_limited(retry_after)
+    if not rl.allowed:
+        return rate_limited(rl.retry_after)
     if job:
         await redis.set(f"export:{job}:progress", 0)
 
-    async with _session(tenant_id) as session:
-
-        async def row_iter():
+    async def row_iter():
+        # The session lives as long as the stream, which outlasts this call
+        async with _session(tenant_id) as session:
             exported = 0
             last_id = cursor or 0
             try:
@@ -132,8 +122,8 @@ async def invoices_export(
                 if job:
                     await redis.delete(f"export:{job}:progress")
 
-        headers = ["id", "number", "total", "created_at"]
-        iterator = stream_csv(headers, row_iter(), chunk_size=chunk_size)
+    headers = ["id", "number", "total", "created_at"]
+    iterator = stream_csv(headers, row_iter(), chunk_size=chunk_size)
     return StreamingResponse(iterator, media_type="text/csv")
 
 
@@ -198,12 +188,11 @@ async def daily_export(
     redis = request.app.state.redis
     ip = request.client.host if request.client else "unknown"
     policy = ratelimits.exports()
-    allowed = await ratelimit.allow(
+    rl = await ratelimit.hit(
         redis, ip, "exports", rate_per_min=policy.rate_per_min, burst=policy.burst
     )
-    if not allowed:
-        retry_after = await redis.ttl(f"ratelimit:{ip}:exports")
-        return rate_limited(retry_after)
+    if not rl.allowed:
+        return rate_limited(rl.retry_after)
     if job:
         await redis.set(f"export:{job}:progress", 0)
 
@@ -9,7 +9,7 @@ from io import StringIO
 import csv
 
 from fastapi import APIRouter, HTTPException, Response
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from .db.tenant import get_engine
@@ -48,27 +48,35 @@ async def gst_monthly_report(tenant_id: str, month: str, gst_mode: str = "reg"):
     else:
         end = start.replace(month=start.month + 1)
 
-    async with _session(tenant_id) as session:
-        result = await session.execute(
-            select(
-                MenuItem.hsn_sac,
-                MenuItem.gst_rate,
-                OrderItem.qty,
-                OrderItem.price_snapshot,
-            )
-            .join(Invoice, Invoice.order_group_id == OrderItem.order_id)
-            .join(MenuItem, MenuItem.id == OrderItem.item_id)
-            .where(Invoice.created_at >= start, Invoice.created_at < end)
-        )
-        rows = result.all()
+    taxable_expr = func.sum(OrderItem.qty * OrderItem.price_snapshot)
 
     output = StringIO()
     writer = csv.writer(output)
 
+    async with _session(tenant_id) as session:
+        if gst_mode == "reg":
+            # Aggregate in SQL so the response size tracks distinct HSN/rate
+            # pairs rather than the number of order lines in the month.
+            result = await session.execute(
+                select(MenuItem.hsn_sac, MenuItem.gst_rate, taxable_expr)
+                .join(Invoice, Invoice.order_group_id == OrderItem.order_id)
+                .join(MenuItem, MenuItem.id == OrderItem.item_id)
+                .where(Invoice.created_at >= start, Invoice.created_at < end)
+                .group_by(MenuItem.hsn_sac, MenuItem.gst_rate)
+            )
+            groups = result.all()
+        else:
+            result = await session.execute(
+                select(taxable_expr)
+                .join(Invoice, Invoice.order_group_id == OrderItem.order_id)
+                .where(Invoice.created_at >= start, Invoice.created_at < end)
+            )
+            subtotal = Decimal(str(result.scalar() or 0))
+
     if gst_mode == "reg":
         summary: dict[str, dict[str, Decimal]] = {}
-        for hsn, gst_rate, qty, price in rows:
-            taxable = Decimal(str(qty)) * Decimal(str(price))
+        for hsn, gst_rate, taxable_sum in groups:
+            taxable = Decimal(str(taxable_sum or 0))
             rate = Decimal(str(gst_rate or 0))
             cgst = taxable * rate / Decimal("200")
             sgst = cgst
@@ -110,17 +118,11 @@ async def gst_monthly_report(tenant_id: str, month: str, gst_mode: str = "reg"):
             ]
         )
     elif gst_mode == "comp":
-        subtotal = sum(
-            Decimal(str(qty)) * Decimal(str(price)) for _, _, qty, price in rows
-        )
         writer.writerow(["description", "taxable_value", "total"])
         writer.writerow(["Total", f"{subtotal:.1f}", f"{subtotal:.1f}"])
     else:  # unregistered
-        total = sum(
-            Decimal(str(qty)) * Decimal(str(price)) for _, _, qty, price in rows
-        )
         writer.writerow(["description", "total"])
-        writer.writerow(["Total", f"{total:.1f}"])
+        writer.writerow(["Total", f"{subtotal:.1f}"])
 
     response = Response(content=output.getvalue(), media_type="text/csv")
     response.headers["Content-Disposition"] = "attachment; filename=gst-report.csv"
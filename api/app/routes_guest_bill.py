@@ -14,6 +14,7 @@ from .repos_sqlalchemy import invoices_repo_sql
 from .routes_metrics import record_ab_conversion
 from .services import billing_service, notifications
 from .services.receipt_vault import ReceiptVault
+from .utils.fanout import invalidate_outlet
 from .utils.responses import ok
 from .db import SessionLocal
 from .db.tenant import get_engine
@@ -84,6 +85,8 @@ async def generate_bill(
         outlet_id=outlet_id,
         bill_lang=getattr(request.state, "lang", None),
     )
+    await session.commit()
+    await invalidate_outlet(request.app.state.redis, tenant_id)
     settings = get_settings()
     invoice_payload = billing_service.compute_bill(
         [],
@@ -3,15 +3,16 @@ from __future__ import annotations
 """Guest-facing hotel room routes."""
 
 import asyncio
-import hashlib
-import json
+import time
 
 from fastapi import APIRouter, Header, HTTPException, Request, Response
 from pydantic import BaseModel, validator
-from sqlalchemy import func
+from sqlalchemy import func, select
 
 from .db import SessionLocal
 from .i18n import get_msg, resolve_lang
+from .menu import snapshot as menu_snapshot
+from .middlewares.sanitize import sanitize_html
 from .models_tenant import (
     Category,
     MenuItem,
@@ -48,67 +49,104 @@ class OrderPayload(BaseModel):
     items: list[OrderLine]
 
 
+HOTEL_MENU_SCOPE = menu_snapshot.SHARED_SCOPE
+HOTEL_MENU_TTL_SECS = 60
+ROOM_CACHE_TTL_SECS = 60
+_ROOM_CACHE_MAX = 10_000
+
+# room code -> (room id, expiry on the monotonic clock)
+_room_cache: dict[str, tuple[int, float]] = {}
+
+
+def _lookup_room(room_token: str) -> int | None:
+    with SessionLocal() as session:
+        return session.execute(
+            select(Room.id).where(Room.code == room_token)
+        ).scalar_one_or_none()
+
+
+async def resolve_room(room_token: str) -> int:
+    """Return the id of the room for ``room_token`` or raise ``404``.
+
+    Known rooms are cached in-process so repeated menu loads from the same
+    room do not hit the database; unknown tokens are not cached.
+    """
+
+    now = time.monotonic()
+    cached = _room_cache.get(room_token)
+    if cached and cached[1] > now:
+        return cached[0]
+    room_id = await asyncio.to_thread(_lookup_room, room_token)
+    if room_id is None:
+        raise HTTPException(status_code=404, detail="room not found")
+    if len(_room_cache) >= _ROOM_CACHE_MAX:
+        _room_cache.clear()
+    _room_cache[room_token] = (room_id, now + ROOM_CACHE_TTL_SECS)
+    return room_id
+
+
+def _load_menu() -> dict:
+    with SessionLocal() as session:
+        categories = [
+            {"id": c.id, "name": c.name, "sort": c.sort}
+            for c in session.scalars(select(Category).order_by(Category.sort))
+        ]
+        items = [
+            {
+                "id": i.id,
+                "category_id": i.category_id,
+                "name": i.name,
+                "name_i18n": i.name_i18n,
+                "desc_i18n": i.desc_i18n,
+                "price": float(i.price),
+                "is_veg": i.is_veg,
+                "gst_rate": float(i.gst_rate) if i.gst_rate is not None else None,
+                "hsn_sac": i.hsn_sac,
+                "show_fssai": i.show_fssai,
+                "out_of_stock": i.out_of_stock,
+            }
+            for i in session.scalars(
+                select(MenuItem).where(MenuItem.out_of_stock.is_(False))
+            )
+        ]
+    return {"categories": categories, "items": items}
+
+
 @router.get("/{room_token}/menu")
-def fetch_menu(
+async def fetch_menu(
     room_token: str,
     request: Request,
-    response: Response,
     if_none_match: str | None = Header(default=None, alias="If-None-Match"),
     accept_language: str | None = Header(default=None, alias="Accept-Language"),
-) -> dict:
+) -> Response:
     """Return menu categories and items for hotel rooms with ETag and caching."""
 
-    with SessionLocal() as session:
-        cat_ts = session.query(func.max(Category.updated_at)).scalar()
-        item_ts = session.query(func.max(MenuItem.updated_at)).scalar()
-    etag = hashlib.sha1(
-        f"{cat_ts}{item_ts}".encode(), usedforsecurity=False
-    ).hexdigest()
-    if if_none_match == etag:
-        return Response(status_code=304, headers={"ETag": etag})
-
-    cache_key = "menu:default"
-    redis = request.app.state.redis
-    cached = asyncio.run(redis.get(cache_key))
-    if cached:
-        data = json.loads(cached)
-    else:
-        with SessionLocal() as session:
-            categories = [
-                {"id": c.id, "name": c.name, "sort": c.sort}
-                for c in session.query(Category).order_by(Category.sort)
-            ]
-            items = [
-                {
-                    "id": i.id,
-                    "category_id": i.category_id,
-                    "name": i.name,
-                    "price": float(i.price),
-                    "is_veg": i.is_veg,
-                    "gst_rate": float(i.gst_rate) if i.gst_rate is not None else None,
-                    "hsn_sac": i.hsn_sac,
-                    "show_fssai": i.show_fssai,
-                    "out_of_stock": i.out_of_stock,
-                }
-                for i in session.query(MenuItem).filter(
-                    MenuItem.out_of_stock.is_(False)
-                )
-            ]
-        data = {"categories": categories, "items": items}
-        asyncio.run(redis.set(cache_key, json.dumps(data), ex=60))
+    await resolve_room(room_token)
     lang = resolve_lang(accept_language)
-    for item in data["items"]:
-        item["name"] = get_text(item.get("name"), lang, item.get("name_i18n"))
-        if item.get("description") or item.get("desc_i18n"):
-            item["description"] = get_text(
-                item.get("description"), lang, item.get("desc_i18n")
-            )
-    data["labels"] = {
-        name: get_msg(lang, f"labels.{name}")
-        for name in ("menu", "order", "pay", "get_bill")
-    }
-    response.headers["ETag"] = etag
-    return ok(data)
+
+    async def build() -> dict:
+        data = await asyncio.to_thread(_load_menu)
+        for item in data["items"]:
+            name_i18n = item.pop("name_i18n")
+            desc_i18n = item.pop("desc_i18n")
+            item["name"] = get_text(item["name"], lang, name_i18n)
+            description = get_text(None, lang, desc_i18n) if desc_i18n else None
+            if description:
+                item["description"] = sanitize_html(description)
+        data["labels"] = {
+            name: get_msg(lang, f"labels.{name}")
+            for name in ("menu", "order", "pay", "get_bill")
+        }
+        return ok(data)
+
+    snapshot = await menu_snapshot.get_or_build(
+        request.app.state.redis,
+        HOTEL_MENU_SCOPE,
+        lang,
+        build,
+        ttl=HOTEL_MENU_TTL_SECS,
+    )
+    return menu_snapshot.respond(snapshot, if_none_match)
 
 
 @router.post("/{room_token}/order")
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 """Endpoints for hotel room housekeeping and cleaning workflows."""
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import Generator
@@ -11,6 +11,7 @@ from .auth import User, role_required
 from .db import SessionLocal
 from .deps.tenant import get_tenant_id
 from .events import event_bus
+from .guest_admission import record_room
 from .models_tenant import Room
 from .utils.responses import ok
 from .utils.audit import audit
@@ -34,6 +35,7 @@ def get_tenant_session(tenant_id: str = Depends(get_tenant_id)) -> Generator[Ses
 @audit("start_clean_room")
 async def start_clean_room(
     room_id: int,
+    request: Request,
     user: User = Depends(role_required("cleaner", "admin")),
     session: Session = Depends(get_tenant_session),
 ) -> dict:
@@ -45,6 +47,7 @@ async def start_clean_room(
     room.state = "PENDING_CLEANING"
     session.commit()
     session.refresh(room)
+    await record_room(room, request.app.state.redis)
     return ok({"room_id": str(room_id), "state": room.state})
 
 
@@ -52,6 +55,7 @@ async def start_clean_room(
 @audit("mark_room_ready")
 async def mark_room_ready(
     room_id: int,
+    request: Request,
     user: User = Depends(role_required("cleaner", "admin")),
     session: Session = Depends(get_tenant_session),
 ) -> dict:
@@ -65,4 +69,5 @@ async def mark_room_ready(
     room.last_cleaned_at = func.now()
     session.commit()
     session.refresh(room)
+    await record_room(room, request.app.state.redis)
     return ok({"room_id": str(room_id), "state": room.state})
@@ -4,12 +4,13 @@ from __future__ import annotations
 
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy import func
 
 from .auth import User, role_required
 from .db import SessionLocal
 from .events import event_bus
+from .guest_admission import record_room
 from .hooks.table_map import publish_table_state
 from .models_tenant import Room, Table
 from .utils.audit import audit
@@ -48,6 +49,7 @@ async def start_clean(
 async def start_clean_room(
     tenant: str,
     room_id: int,
+    request: Request,
     user: User = Depends(role_required("cleaner", "super_admin")),
 ) -> dict:
     """Mark ``room_id`` as awaiting cleaning."""
@@ -59,6 +61,7 @@ async def start_clean_room(
         room.state = "PENDING_CLEANING"
         session.commit()
         session.refresh(room)
+        await record_room(room, request.app.state.redis)
         return ok({"room_id": str(room_id), "state": room.state})
 
 
@@ -94,6 +97,7 @@ async def mark_ready(
 async def mark_room_ready(
     tenant: str,
     room_id: int,
+    request: Request,
     user: User = Depends(role_required("cleaner", "super_admin")),
 ) -> dict:
     """Mark cleaning complete and reopen the room."""
@@ -106,4 +110,5 @@ async def mark_room_ready(
         room.state = "AVAILABLE"
         session.commit()
         session.refresh(room)
+        await record_room(room, request.app.state.redis)
         return ok({"room_id": str(room_id), "state": room.state})
@@ -7,6 +7,7 @@ from typing import Dict
 
 from fastapi import APIRouter, Depends, Request
 
+from . import redis_registry
 from .auth import User, role_required
 from .utils.responses import ok
 
@@ -18,33 +19,53 @@ async def jobs_status(
     request: Request,
     user: User = Depends(role_required("super_admin")),
 ) -> dict:
-    """Return status information for background workers."""
+    """Return status information for background workers.
+
+    Workers are listed from the ``jobs:workers`` registry and read with two
+    pipelined round trips instead of a ``KEYS`` scan.
+    """
 
     redis = request.app.state.redis
     now_ts = datetime.now(timezone.utc).timestamp()
     data: Dict[str, Dict[str, object]] = {}
-    keys = await redis.keys("jobs:heartbeat:*")
-    for key in keys:
-        name = key.split(":")[-1]
-        last = await redis.get(key)
+    names = await redis_registry.job_workers(redis)
+    if not names:
+        return ok(data)
+
+    pipe = redis.pipeline(transaction=False)
+    for name in names:
+        pipe.get(f"jobs:heartbeat:{name}")
+        pipe.get(f"jobs:processed:{name}")
+        pipe.zcount(f"jobs:failures:{name}", now_ts - 3600, "+inf")
+        pipe.smembers(f"jobs:queues:{name}")
+    results = await pipe.execute()
+    rows = [results[i : i + 4] for i in range(0, len(results), 4)]
+
+    # Workers without a heartbeat key are gone; drop them from the registry.
+    gone = [name for name, row in zip(names, rows) if row[0] is None]
+    if gone:
+        await redis.srem(redis_registry.JOB_WORKERS, *gone)
+    alive = [(name, row) for name, row in zip(names, rows) if row[0] is not None]
+
+    queues = sorted(
+        {q.decode() if isinstance(q, bytes) else q for _, row in alive for q in row[3]}
+    )
+    pipe = redis.pipeline(transaction=False)
+    for qname in queues:
+        pipe.llen(f"jobs:queue:{qname}")
+    depths = dict(zip(queues, await pipe.execute())) if queues else {}
+
+    for name, (last, processed_raw, failures, worker_queues) in alive:
         if isinstance(last, bytes):
             last = last.decode()
-        processed_raw = await redis.get(f"jobs:processed:{name}")
-        processed = int(processed_raw or 0)
-        failures = int(
-            await redis.zcount(
-                f"jobs:failures:{name}", now_ts - 3600, "+inf"
-            )
-        )
-        queue_depths: Dict[str, int] = {}
-        queues = await redis.smembers(f"jobs:queues:{name}")
-        for q in queues:
+        queue_depths = {}
+        for q in worker_queues:
             qname = q.decode() if isinstance(q, bytes) else q
-            queue_depths[qname] = await redis.llen(f"jobs:queue:{qname}")
+            queue_depths[qname] = int(depths[qname])
         data[name] = {
             "last_heartbeat": last,
-            "processed_count": processed,
-            "failures_1h": failures,
+            "processed_count": int(processed_raw or 0),
+            "failures_1h": int(failures),
             "queue_depths": queue_depths,
         }
     return ok(data)
@@ -17,6 +17,7 @@ from models_tenant import Order, OrderItem
 from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from .eta import prep_stats
 from .hooks import order_rejection
 from .services import ema as ema_service
 from .services import notifications, push, whatsapp
@@ -107,8 +108,24 @@ async def list_queue(tenant_id: str, request: Request) -> dict:
     return ok(data)
 
 
-async def _transition_order(tenant_id: str, order_id: int, dest: OrderStatus) -> dict:
-    """Transition an order to ``dest`` if allowed."""
+async def _record_prep_times(redis, tenant_id: str, samples) -> None:
+    """Add ``(item_id, seconds)`` samples to the item prep time sketches."""
+    if redis is None or not samples:
+        return
+    try:
+        await prep_stats.record(redis, tenant_id, samples)
+    except Exception:  # pragma: no cover - best effort
+        pass
+
+
+async def _transition_order(
+    tenant_id: str, order_id: int, dest: OrderStatus, redis=None
+) -> dict:
+    """Transition an order to ``dest`` if allowed.
+
+    Serving an order records its prep time for every item not served on its
+    own before (see :mod:`api.app.eta.prep_stats`).
+    """
     async with _session(tenant_id) as session:
         result = await session.execute(
             select(Order.status, Order.accepted_at).where(Order.id == order_id)
@@ -139,20 +156,35 @@ async def _transition_order(tenant_id: str, order_id: int, dest: OrderStatus) ->
                 accepted_at = accepted_at.replace(tzinfo=timezone.utc)
             sample_seconds = (now - accepted_at).total_seconds()
             await ema_service.record_sample(session, sample_seconds)
+            if redis is not None:
+                result = await session.execute(
+                    select(OrderItem.item_id).where(
+                        OrderItem.order_id == order_id,
+                        OrderItem.status != OrderStatus.SERVED.value,
+                    )
+                )
+                samples = [(item_id, sample_seconds) for item_id in result.scalars()]
+                await _record_prep_times(redis, tenant_id, samples)
     return ok({"status": dest.value})
 
 
 async def _transition_item(
-    tenant_id: str, order_item_id: int, dest: OrderStatus
+    tenant_id: str, order_item_id: int, dest: OrderStatus, redis=None
 ) -> dict:
-    """Transition an order item to ``dest`` if allowed."""
+    """Transition an order item to ``dest`` if allowed.
+
+    Serving an item records its prep time since the order was accepted.
+    """
     async with _session(tenant_id) as session:
         result = await session.execute(
-            select(OrderItem.status).where(OrderItem.id == order_item_id)
+            select(OrderItem.status, OrderItem.item_id, Order.accepted_at)
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(OrderItem.id == order_item_id)
         )
-        current = result.scalar_one_or_none()
-        if current is None:
+        row = result.first()
+        if row is None:
             raise HTTPException(status_code=404, detail="order item not found")
+        current, item_id, accepted_at = row
         if not can_transition(OrderStatus(current), dest):
             raise HTTPException(status_code=400, detail="invalid transition")
         await session.execute(
@@ -161,6 +193,11 @@ async def _transition_item(
             .values(status=dest.value)
         )
         await session.commit()
+    if dest is OrderStatus.SERVED and accepted_at is not None:
+        if accepted_at.tzinfo is None:
+            accepted_at = accepted_at.replace(tzinfo=timezone.utc)
+        sample_seconds = (datetime.now(timezone.utc) - accepted_at).total_seconds()
+        await _record_prep_times(redis, tenant_id, [(item_id, sample_seconds)])
     return ok({"status": dest.value})
 
 
@@ -190,9 +227,10 @@ async def ready_order(tenant_id: str, order_id: int) -> dict:
 
 @router.post("/api/outlet/{tenant_id}/kds/order/{order_id}/serve")
 @audit("serve_order")
-async def serve_order(tenant_id: str, order_id: int) -> dict:
+async def serve_order(tenant_id: str, order_id: int, request: Request) -> dict:
     """Mark an order as served."""
-    return await _transition_order(tenant_id, order_id, OrderStatus.SERVED)
+    redis = getattr(request.app.state, "redis", None)
+    return await _transition_order(tenant_id, order_id, OrderStatus.SERVED, redis)
 
 
 @router.post("/api/outlet/{tenant_id}/kds/order/{order_id}/reject")
@@ -231,9 +269,10 @@ async def ready_item(tenant_id: str, order_item_id: int) -> dict:
 
 @router.post("/api/outlet/{tenant_id}/kds/item/{order_item_id}/serve")
 @audit("serve_item")
-async def serve_item(tenant_id: str, order_item_id: int) -> dict:
+async def serve_item(tenant_id: str, order_item_id: int, request: Request) -> dict:
     """Mark an order item as served."""
-    return await _transition_item(tenant_id, order_item_id, OrderStatus.SERVED)
+    redis = getattr(request.app.state, "redis", None)
+    return await _transition_item(tenant_id, order_item_id, OrderStatus.SERVED, redis)
 
 
 @router.post("/api/outlet/{tenant_id}/kds/item/{order_item_id}/reject")
@@ -28,8 +28,8 @@ async def licensing_usage(
     limits = getattr(tenant_obj, "license_limits", {}) or {}
     tables = await lic_module._table_count(tenant_id)
     items = await lic_module._menu_item_count(tenant_id)
-    storage = lic_module.storage_bytes(tenant_id)
     redis = getattr(request.app.state, "redis", None)
+    storage = await lic_module.media_bytes(tenant_id, redis)
     today = datetime.utcnow().strftime("%Y%m%d")
     exports = 0
     if redis is not None:
@@ -1,14 +1,28 @@
-"""Media upload endpoint using pluggable storage backends."""
+"""Media upload endpoint using pluggable storage backends.
+
+Uploads are decoded and re-encoded by :mod:`.media.images` in a worker
+process, producing the full-size image plus WebP/AVIF width variants. The
+storage keys of the result are recorded in Redis under
+``media:hash:{tenant}:{sha256}`` so that uploading the same bytes again
+returns the stored media without processing or storing anything, and stored
+bytes are tracked by the tenant's media usage counter rather than by walking
+storage. URLs are not part of the record: S3 URLs are presigned and expire,
+so every response builds them from the keys with ``storage.urls_async``.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 from io import BytesIO
+from pathlib import PurePath
 
 from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, status
 from fastapi.responses import JSONResponse
-from PIL import Image, ImageOps
 
 from .auth import User, role_required
+from .media import images
 from .middlewares import licensing as lic_module
 from .storage import storage
 from .utils.responses import err, ok
@@ -21,7 +35,56 @@ ALLOWED_TYPES = {
     "image/webp": "WEBP",
 }
 MAX_BYTES = 2 * 1024 * 1024
-MAX_DIM = 4096
+MAX_DIM = images.MAX_DIM
+HASH_KEY = "media:hash:{tenant}:{digest}"
+
+
+async def _store(tenant: str, stem: str, processed: images.ProcessedImage) -> dict:
+    """Save every variant of ``processed`` and return the media record.
+
+    The record holds storage keys only; see :func:`_with_urls`.
+    """
+
+    names = [f"{stem}.{processed.original.ext}"] + [
+        f"{stem}-{v.width}w.{v.ext}" for v in processed.variants[1:]
+    ]
+    saved = await asyncio.gather(
+        *(
+            storage.save(
+                tenant,
+                UploadFile(
+                    filename=name,
+                    file=BytesIO(variant.data),
+                    headers={"content-type": variant.content_type},
+                ),
+            )
+            for name, variant in zip(names, processed.variants)
+        )
+    )
+    variants = [
+        {
+            "key": key,
+            "type": variant.content_type,
+            "width": variant.width,
+            "height": variant.height,
+            "bytes": len(variant.data),
+        }
+        for (_, key), variant in zip(saved, processed.variants)
+    ]
+    return {"key": variants[0]["key"], "bytes": processed.size, "variants": variants}
+
+
+async def _with_urls(record: dict) -> dict:
+    """Return ``record`` with a current URL for the media and each variant."""
+
+    urls = await storage.urls_async([v["key"] for v in record["variants"]])
+    # Records written before URLs were dropped still carry stale ones
+    variants = [{**v, "url": urls[v["key"]][0]} for v in record["variants"]]
+    return {**record, "url": urls[record["key"]][0], "variants": variants}
+
+
+async def _delete(record: dict) -> None:
+    await asyncio.gather(*(storage.delete(v["key"]) for v in record["variants"]))
 
 
 @router.post("/api/outlet/{tenant}/media/upload")
@@ -31,58 +94,74 @@ async def upload_media(
     file: UploadFile = File(...),
     user: User = Depends(role_required("super_admin", "outlet_admin", "manager")),
 ) -> dict:
-    """Validate and persist ``file`` and return its public URL and storage key."""
+    """Validate and persist ``file`` and return its public URLs and storage keys."""
 
     if file.content_type not in ALLOWED_TYPES:
         raise HTTPException(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, "bad type")
 
-    contents = await file.read()
+    contents = await file.read(MAX_BYTES + 1)
     if len(contents) > MAX_BYTES:
         raise HTTPException(status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, "too large")
 
+    redis = getattr(request.app.state, "redis", None)
+    digest = hashlib.sha256(contents).hexdigest()
+    hash_key = HASH_KEY.format(tenant=tenant, digest=digest)
+    if redis is not None:
+        existing = await redis.get(hash_key)
+        if existing is not None:
+            return ok({"hash": digest, **await _with_urls(json.loads(existing))})
+
     try:
-        img = Image.open(BytesIO(contents))
-    except Exception as exc:  # pragma: no cover - defensive
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, "invalid image") from exc
-
-    if img.width > MAX_DIM or img.height > MAX_DIM:
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, "too big")
-    if getattr(img, "is_animated", False) and getattr(img, "n_frames", 1) > 1:
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, "no animation")
-
-    img.info.pop("exif", None)
-    img = ImageOps.exif_transpose(img)
-    out = BytesIO()
-    fmt = ALLOWED_TYPES[file.content_type]
-    save_kwargs = {"format": fmt}
-    if fmt == "JPEG":
-        save_kwargs.update({"quality": 85, "optimize": True})
-    elif fmt == "PNG":
-        save_kwargs.update({"optimize": True})
-    else:  # WEBP
-        save_kwargs.update({"quality": 80})
-
-    img.save(out, **save_kwargs)
-    out.seek(0)
+        processed = await images.process(contents, ALLOWED_TYPES[file.content_type])
+    except images.ImageRejected as exc:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, str(exc)) from exc
 
     tenant_obj = getattr(request.state, "tenant", None)
-    limit_mb = (getattr(tenant_obj, "license_limits", {}) or {}).get(
-        "max_images_mb"
-    )
-    if limit_mb is not None:
-        used = lic_module.storage_bytes(tenant)
-        if used + len(out.getvalue()) > limit_mb * 1024 * 1024:
+    limit_mb = (getattr(tenant_obj, "license_limits", {}) or {}).get("max_images_mb")
+    if redis is not None or limit_mb is not None:
+        # Seeded before storing so a first seed cannot count this upload twice
+        used = await lic_module.media_bytes(tenant, redis)
+        if limit_mb is not None and used + processed.size > limit_mb * 1024 * 1024:
             return JSONResponse(
                 err("FEATURE_LIMIT", "image storage limit reached"),
                 status_code=status.HTTP_403_FORBIDDEN,
             )
 
-    processed = UploadFile(
-        filename=file.filename, file=out, headers={"content-type": file.content_type}
-    )
+    stem = PurePath(file.filename or "image").stem or "image"
+    record = await _store(tenant, stem, processed)
+    if redis is not None:
+        if not await redis.set(hash_key, json.dumps(record), nx=True):
+            # A concurrent upload of the same bytes won; keep its copy only
+            await _delete(record)
+            record = json.loads(await redis.get(hash_key))
+            return ok({"hash": digest, **await _with_urls(record)})
+        await lic_module.add_media_bytes(tenant, record["bytes"], redis)
+    return ok({"hash": digest, **await _with_urls(record)})
 
-    url, key = await storage.save(tenant, processed)
-    return ok({"url": url, "key": key})
+
+@router.delete("/api/outlet/{tenant}/media/{digest}")
+async def delete_media(
+    tenant: str,
+    digest: str,
+    request: Request,
+    user: User = Depends(role_required("super_admin", "outlet_admin", "manager")),
+) -> dict:
+    """Delete the media uploaded with content hash ``digest`` and its variants."""
+
+    redis = getattr(request.app.state, "redis", None)
+    hash_key = HASH_KEY.format(tenant=tenant, digest=digest)
+    raw = await redis.get(hash_key) if redis is not None else None
+    if raw is None or not await redis.delete(hash_key):
+        return JSONResponse(
+            err("NOT_FOUND", "media not found"),
+            status_code=status.HTTP_404_NOT_FOUND,
+        )
+    record = json.loads(raw)
+    # Seeded before the files go, as on upload
+    await lic_module.media_bytes(tenant, redis)
+    await _delete(record)
+    await lic_module.add_media_bytes(tenant, -record["bytes"], redis)
+    return ok({"hash": digest, "deleted": len(record["variants"])})
 
 
 __all__ = ["router"]
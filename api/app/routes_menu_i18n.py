@@ -6,7 +6,7 @@ import re
 from contextlib import asynccontextmanager
 from typing import List
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy import select
@@ -14,6 +14,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from .auth import User, role_required
 from .db.tenant import get_engine
+from .menu import snapshot as menu_snapshot
 from .models_tenant import MenuItem, TenantMeta
 from .utils.audit import audit
 from .utils.responses import ok
@@ -36,6 +37,7 @@ async def _session(tenant_id: str):
 @audit("i18n.import")
 async def import_menu_i18n(
     tenant_id: str,
+    request: Request,
     file: UploadFile = File(...),
     user: User = Depends(role_required("super_admin", "outlet_admin", "manager")),
 ) -> dict:
@@ -73,6 +75,9 @@ async def import_menu_i18n(
             item.desc_i18n = di
             updated += 1
         await session.commit()
+    redis = getattr(request.app.state, "redis", None)
+    if redis is not None:
+        await menu_snapshot.invalidate(redis, tenant_id)
     return ok({"updated_rows": updated, "skipped": skipped, "errors": errors})
 
 
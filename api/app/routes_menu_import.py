@@ -1,18 +1,47 @@
 from __future__ import annotations
 
-"""Admin endpoints for validating menu CSV uploads."""
+"""Admin endpoints for validating and applying menu CSV uploads."""
 
-import csv
-from io import StringIO
+import asyncio
+from contextlib import asynccontextmanager
 from typing import List
 
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from .auth import User, role_required
+from .db.tenant import get_engine
+from .menu import importer
+from .menu import snapshot as menu_snapshot
+from .middlewares.license_gate import license_required
+from .utils.audit import audit
+from .utils.responses import ok
 
 router = APIRouter()
 
-REQUIRED_FIELDS = ["name", "price"]
+REQUIRED_FIELDS = importer.REQUIRED_FIELDS
+
+
+@asynccontextmanager
+async def _session(tenant_id: str):
+    """Yield an ``AsyncSession`` for the given ``tenant_id``."""
+
+    engine = get_engine(tenant_id)
+    sessionmaker = async_sessionmaker(
+        engine, expire_on_commit=False, class_=AsyncSession
+    )
+    try:
+        async with sessionmaker() as session:
+            yield session
+    finally:
+        await engine.dispose()
+
+
+async def _parse(file: UploadFile) -> importer.ParsedMenu:
+    """Parse the spooled upload off the event loop."""
+
+    await file.seek(0)
+    return await asyncio.to_thread(importer.parse, file.file)
 
 
 @router.post("/api/outlet/{tenant_id}/menu/import/dryrun")
@@ -28,26 +57,48 @@ async def menu_import_dryrun(
     ``inferred_hsn`` list for future enhancements.
     """
 
-    content = (await file.read()).decode("utf-8")
-    reader = csv.DictReader(StringIO(content))
-
-    missing_fields = [f for f in REQUIRED_FIELDS if f not in (reader.fieldnames or [])]
+    parsed = await _parse(file)
     warnings: List[str] = []
-    errors: List[str] = []
     inferred_hsn: List[str] = []
 
-    if missing_fields:
-        errors.append("missing_required_fields")
-    else:
-        for idx, row in enumerate(reader, start=2):
-            for field in REQUIRED_FIELDS:
-                if not row.get(field):
-                    errors.append(f"row {idx} missing {field}")
-
     return {
         "ok": True,
         "warnings": warnings,
-        "errors": errors,
+        "errors": parsed.errors,
         "inferred_hsn": inferred_hsn,
-        "missing_fields": missing_fields,
+        "missing_fields": parsed.missing_fields,
     }
+
+
+@router.post(
+    "/api/outlet/{tenant_id}/menu/import",
+    dependencies=[license_required()],
+)
+@audit("menu_import")
+async def menu_import(
+    tenant_id: str,
+    request: Request,
+    file: UploadFile = File(...),
+    delete_missing: bool = True,
+    user: User = Depends(role_required("super_admin", "outlet_admin", "manager")),
+) -> dict:
+    """Make the menu match a CSV upload.
+
+    Items are matched on ``(category, name)``; new ones are inserted, changed
+    ones updated and, with ``delete_missing``, items absent from the file are
+    soft-deleted. Nothing is written when the file has errors, and the menu
+    version is bumped once for the whole import.
+    """
+
+    parsed = await _parse(file)
+    if parsed.errors:
+        raise HTTPException(
+            status_code=422,
+            detail={"errors": parsed.errors, "missing_fields": parsed.missing_fields},
+        )
+    async with _session(tenant_id) as session:
+        changes = await importer.diff(session, parsed, delete_missing=delete_missing)
+        changed = await importer.apply(session, changes)
+    if changed:
+        await menu_snapshot.invalidate(request.app.state.redis, tenant_id)
+    return ok(changes.summary())
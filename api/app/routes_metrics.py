@@ -4,15 +4,37 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import asyncio
+import logging
+import os
+import time
 
 from fastapi import APIRouter, Request, Response
-from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, generate_latest
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+from . import multiproc, redis_registry
+from .obs.cardinality import LabelGuard
+from .obs.query_stats import query_stats
 
 # Counters
+# ``path`` holds the matched route template, never the raw URL.
 http_requests_total = Counter(
     "http_requests_total", "Total HTTP requests", ["path", "method", "status"]
 )
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["route", "method"],
+)
 orders_created_total = Counter("orders_created_total", "Total orders created")
 orders_created_total.inc(0)
 
@@ -41,10 +63,16 @@ room_locked_denied_total = Counter(
 )
 room_locked_denied_total.inc(0)
 
+# ``multiprocess_mode`` sets how gauge values of several workers combine (see
+# :mod:`api.app.multiproc`); it has no effect with a single worker.
 abuse_ip_cooldown = Gauge(
-    "abuse_ip_cooldown", "Remaining cooldown seconds for abusive IP", ["ip"]
+    "abuse_ip_cooldown",
+    "Remaining cooldown seconds for abusive IP",
+    ["ip"],
+    multiprocess_mode="mostrecent",
 )
 abuse_ip_cooldown.labels(ip="sample").set(0)
+_abuse_ip_guard = LabelGuard(int(os.getenv("METRICS_MAX_IP_LABELS", "50")))
 
 http_errors_total = Counter("http_errors_total", "Total HTTP errors", ["status"])
 http_errors_total.labels(status="0").inc(0)
@@ -96,6 +124,7 @@ webhook_breaker_state = Gauge(
     "webhook_breaker_state",
     "Circuit breaker state for webhook destinations (0 closed, 1 open, 2 half-open)",
     ["url_hash"],
+    multiprocess_mode="mostrecent",
 )
 webhook_breaker_state.labels(url_hash="sample").set(0)
 
@@ -104,6 +133,7 @@ license_status_gauge = Gauge(
     "license_status",
     "Tenant license status",  # 1 when tenant in given status
     ["tenant", "status"],
+    multiprocess_mode="mostrecent",
 )
 license_status_gauge.labels(tenant="sample", status="ACTIVE").set(0)
 
@@ -115,12 +145,29 @@ blocked_actions_total = Counter(
 blocked_actions_total.labels(route="/sample").inc(0)
 
 db_replica_healthy = Gauge(
-    "db_replica_healthy", "Replica database health (1 healthy, 0 unhealthy)"
+    "db_replica_healthy",
+    "Replica database health (1 healthy, 0 unhealthy)",
+    multiprocess_mode="mostrecent",
 )
 db_replica_healthy.set(0)
 
+db_replica_lag_seconds = Gauge(
+    "db_replica_lag_seconds",
+    "Highest replay lag across tenant read replicas in seconds",
+    multiprocess_mode="mostrecent",
+)
+tenant_replica_reads_total = Counter(
+    "tenant_replica_reads_total",
+    "Tenant sessions opened by read-only endpoints by target",
+    ["target"],
+)
+tenant_replica_reads_total.labels(target="replica").inc(0)
+tenant_replica_reads_total.labels(target="primary").inc(0)
+
 sse_clients_gauge = Gauge(
-    "sse_clients_gauge", "Current number of connected SSE clients"
+    "sse_clients_gauge",
+    "Current number of connected SSE clients",
+    multiprocess_mode="livesum",
 )
 sse_clients_gauge.set(0)
 
@@ -136,11 +183,16 @@ rollup_runs_total.inc(0)
 rollup_failures_total = Counter("rollup_failures_total", "Total rollup failures")
 rollup_failures_total.inc(0)
 
-printer_retry_queue = Gauge("printer_retry_queue", "Queued print jobs awaiting retry")
+printer_retry_queue = Gauge(
+    "printer_retry_queue",
+    "Queued print jobs awaiting retry",
+    multiprocess_mode="mostrecent",
+)
 printer_retry_queue.set(0)
 printer_retry_queue_age = Gauge(
     "printer_retry_queue_age",
     "Age in seconds of the oldest job awaiting retry",
+    multiprocess_mode="mostrecent",
 )
 printer_retry_queue_age.set(0)
 
@@ -148,18 +200,130 @@ kds_oldest_kot_seconds = Gauge(
     "kds_oldest_kot_seconds",
     "Age in seconds of the oldest pending KOT",
     ["tenant"],
+    multiprocess_mode="mostrecent",
 )
 kds_oldest_kot_seconds.labels(tenant="sample").set(0)
 
 kot_delay_alerts_total = Counter("kot_delay_alerts_total", "Total KOT delay alerts")
 kot_delay_alerts_total.inc(0)
 
+# One observation per tenant run of a scheduled maintenance job.
+tenant_job_duration_seconds = Histogram(
+    "tenant_job_duration_seconds",
+    "Duration of a maintenance job for a single tenant",
+    ["job"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900),
+)
+tenant_job_runs_total = Counter(
+    "tenant_job_runs_total",
+    "Tenant maintenance job runs by outcome (ok, error, skipped)",
+    ["job", "outcome"],
+)
+
+# Heaviest query fingerprints, refreshed from the in-process statistics by
+# every worker on a timer (``refresh_query_metrics_forever``) and by the worker
+# serving a scrape; only the top ``QUERY_STATS_METRICS_TOP`` are exported.
+QUERY_STATS_METRICS_TOP = int(os.getenv("QUERY_STATS_METRICS_TOP", "20"))
+QUERY_METRICS_REFRESH_SEC = float(os.getenv("METRICS_QUERY_REFRESH_SEC", "15"))
+db_query_fingerprint_calls = Gauge(
+    "db_query_fingerprint_calls",
+    "Executions of the heaviest query fingerprints since process start",
+    ["fingerprint", "tenant"],
+    multiprocess_mode="livesum",
+)
+db_query_fingerprint_seconds = Gauge(
+    "db_query_fingerprint_seconds",
+    "Total execution time of the heaviest query fingerprints in seconds",
+    ["fingerprint", "tenant"],
+    multiprocess_mode="livesum",
+)
+db_n_plus_one_total = Counter(
+    "db_n_plus_one_total",
+    "Requests repeating one query fingerprint past the N+1 threshold",
+    ["route"],
+)
+
+
+def set_abuse_cooldown(ip: str, ttl: int) -> None:
+    """Record the cooldown for ``ip``, bucketing IPs past the label cap."""
+    abuse_ip_cooldown.labels(ip=_abuse_ip_guard(ip)).set(ttl)
+
 
 def record_ab_conversion(experiment: str, variant: str) -> None:
     """Increment conversion counter for an experiment variant."""
     ab_conversions_total.labels(experiment=experiment, variant=variant).inc()
 
 
+def refresh_query_metrics(limit: int = QUERY_STATS_METRICS_TOP) -> None:
+    """Export the ``limit`` heaviest query fingerprints."""
+    for gauge in (db_query_fingerprint_calls, db_query_fingerprint_seconds):
+        if os.getenv(multiproc.METRICS_DIR_ENV):
+            # Multiprocess files keep the values of cleared children.
+            for labels in list(gauge._metrics):
+                gauge.labels(*labels).set(0)
+        gauge.clear()
+    for row in query_stats.top(limit):
+        labels = {"fingerprint": row["fingerprint"], "tenant": row["tenant"]}
+        db_query_fingerprint_calls.labels(**labels).set(row["count"])
+        db_query_fingerprint_seconds.labels(**labels).set(row["total_ms"] / 1000)
+
+
+async def refresh_query_metrics_forever(
+    interval: float = QUERY_METRICS_REFRESH_SEC,
+) -> None:
+    """Refresh the query fingerprint gauges every ``interval`` seconds.
+
+    Each worker runs this so the summed multiprocess values never include a
+    snapshot that only changes when that worker happens to serve a scrape.
+    """
+    while True:
+        try:
+            refresh_query_metrics()
+        except Exception:  # pragma: no cover - retried on the next tick
+            logging.getLogger(__name__).warning(
+                "query metrics refresh failed", exc_info=True
+            )
+        await asyncio.sleep(interval)
+
+
+REDIS_GAUGES_REFRESH_SEC = float(os.getenv("METRICS_REDIS_REFRESH_SEC", "15"))
+
+
+async def refresh_redis_gauges(app) -> None:
+    """Set the gauges read from Redis registries (print retry queues)."""
+    total, max_age = await redis_registry.print_retry_totals(app.state.redis)
+    printer_retry_queue.set(total)
+    printer_retry_queue_age.set(max_age)
+    app.state.redis_gauges_at = time.monotonic()
+
+
+async def refresh_redis_gauges_forever(
+    app, interval: float = REDIS_GAUGES_REFRESH_SEC
+) -> None:
+    """Refresh the Redis gauges every ``interval`` seconds until cancelled."""
+    while True:
+        try:
+            await refresh_redis_gauges(app)
+        except Exception:  # pragma: no cover - retried on the next tick
+            logging.getLogger(__name__).warning(
+                "redis gauge refresh failed", exc_info=True
+            )
+        await asyncio.sleep(interval)
+
+
+def collector_registry() -> CollectorRegistry:
+    """Return the registry to read metrics from.
+
+    With several workers (:mod:`api.app.multiproc`) this aggregates the
+    values every worker wrote to ``PROMETHEUS_MULTIPROC_DIR``.
+    """
+    if not os.getenv(multiproc.METRICS_DIR_ENV):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
 router = APIRouter()
 
 
@@ -167,29 +331,14 @@ router = APIRouter()
 async def metrics_endpoint(request: Request) -> Response:
     """Expose Prometheus metrics."""
     http_requests_total.labels(path="/metrics", method="GET", status="200").inc(0)
-    redis = getattr(request.app.state, "redis", None)
-    if redis:
-        total = 0
-        max_age = 0
-        now = datetime.now(timezone.utc)
-        for key in await redis.keys("print:retry:*"):
-            length = await redis.llen(key)
-            total += length
-            head = await redis.lindex(key, 0)
-            if head:
-                if isinstance(head, bytes):
-                    head = head.decode()
-                try:
-                    ts = datetime.fromisoformat(head)
-                    if ts.tzinfo is None:
-                        ts = ts.replace(tzinfo=timezone.utc)
-                    age = (now - ts).total_seconds()
-                    if age > max_age:
-                        max_age = age
-                except ValueError:
-                    pass
-        printer_retry_queue.set(total)
-        printer_retry_queue_age.set(max_age)
-
-    data = generate_latest()
+    # Redis gauges are refreshed on a timer (``refresh_redis_gauges_forever``);
+    # a scrape only refreshes them itself when they are older than that.
+    refreshed = getattr(request.app.state, "redis_gauges_at", None)
+    if getattr(request.app.state, "redis", None) and (
+        refreshed is None or time.monotonic() - refreshed > REDIS_GAUGES_REFRESH_SEC
+    ):
+        await refresh_redis_gauges(request.app)
+
+    refresh_query_metrics()
+    data = generate_latest(collector_registry())
     return Response(data, media_type=CONTENT_TYPE_LATEST)
@@ -2,12 +2,14 @@ from __future__ import annotations
 
 """Routes for ingesting queued orders in batch."""
 
+import os
 from typing import List, Set
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, validator
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from . import multiproc
 from .db.tenant import get_engine
 from .repos_sqlalchemy import orders_repo_sql
 from .utils.responses import ok
@@ -15,8 +17,24 @@ from .utils.responses import ok
 router = APIRouter()
 
 
-# Track processed operation identifiers to dedupe repeats
+# Track processed operation identifiers to dedupe repeats. With several
+# worker processes they are claimed in Redis instead, for ``BATCH_OP_TTL``.
 _processed_ops: Set[str] = set()
+OP_KEY = "orders:batch:op:{tenant}:{op_id}"
+OP_TTL = int(os.getenv("BATCH_OP_TTL", "86400"))
+
+
+async def _claim(request: Request, tenant_id: str, op_id: str) -> bool:
+    """Return ``True`` if ``op_id`` has not been processed before."""
+
+    redis = getattr(request.app.state, "redis", None)
+    if multiproc.enabled() and redis is not None:
+        key = OP_KEY.format(tenant=tenant_id, op_id=op_id)
+        return bool(await redis.set(key, 1, nx=True, ex=OP_TTL))
+    if op_id in _processed_ops:
+        return False
+    _processed_ops.add(op_id)
+    return True
 
 
 class OrderLine(BaseModel):
@@ -54,7 +72,9 @@ class BatchPayload(BaseModel):
 
 
 @router.post("/api/outlet/{tenant_id}/orders/batch")
-async def ingest_orders_batch(tenant_id: str, payload: BatchPayload) -> dict:
+async def ingest_orders_batch(
+    tenant_id: str, payload: BatchPayload, request: Request
+) -> dict:
     """Persist multiple queued orders for ``tenant_id``.
 
     The batch is limited to 20 orders to bound request sizes.
@@ -72,9 +92,8 @@ async def ingest_orders_batch(tenant_id: str, payload: BatchPayload) -> dict:
             order_ids = []
             for order in payload.orders:
                 # Skip orders we've already processed
-                if order.op_id in _processed_ops:
+                if not await _claim(request, tenant_id, order.op_id):
                     continue
-                _processed_ops.add(order.op_id)
                 lines = [line.model_dump() for line in order.items]
                 try:
                     order_id = await orders_repo_sql.create_order(
@@ -2,35 +2,26 @@
 
 from __future__ import annotations
 
-import json
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from typing import Iterable
 
 from fastapi import APIRouter, HTTPException, Request, Response
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from .db.replica import read_only, replica_session
-from .db.tenant import get_engine
+from .db.replica import read_only, replica_session, tenant_session
 from .models_master import Tenant
 from .pdf.render import render_template
 from .repos_sqlalchemy import dashboard_repo_sql, invoices_repo_sql
+from .utils.fanout import cached_fan_out, fan_out
 
 router = APIRouter()
 
 
 @asynccontextmanager
 async def _session(tenant_id: str):
-    engine = get_engine(tenant_id)
-    sessionmaker = async_sessionmaker(
-        engine, expire_on_commit=False, class_=AsyncSession
-    )
-    try:
-        async with sessionmaker() as session:
-            yield session
-    finally:
-        await engine.dispose()
+    async with tenant_session(tenant_id) as session:
+        yield session
 
 
 async def _get_tenants_info(tenant_ids: Iterable[str]) -> dict[str, dict]:
@@ -61,26 +52,41 @@ async def owner_dashboard_charts(owner_id: str, request: Request, range: int = 7
         raise HTTPException(status_code=400, detail="invalid range")
     tenant_ids = _parse_scope(request)
     redis = request.app.state.redis
-    cache_key = f"owner:charts:{owner_id}:{range}"
-    cached = await redis.get(cache_key)
-    if cached:
-        return json.loads(cached)
 
     today = datetime.utcnow().date()
     start = today - timedelta(days=range - 1)
 
+    async def _outlet_slice(tenant_id: str) -> dict:
+        async with _session(tenant_id) as session:
+            data = await dashboard_repo_sql.charts_range(session, start, today, "UTC")
+        series = data.get("series", {})
+        return {
+            "sales": series.get("sales", []),
+            "orders": series.get("orders", []),
+            "modes": data.get("modes", {}),
+        }
+
+    slices = await cached_fan_out(
+        redis,
+        "charts",
+        f"{start.isoformat()}:{today.isoformat()}",
+        tenant_ids,
+        _outlet_slice,
+    )
+
     agg_sales: dict[str, float] = {}
     agg_orders: dict[str, int] = {}
     modes = {"cash": 0.0, "upi": 0.0, "card": 0.0}
 
     for tenant_id in tenant_ids:
-        async with _session(tenant_id) as session:
-            data = await dashboard_repo_sql.charts_range(session, start, today, "UTC")
-        for pt in data.get("series", {}).get("sales", []):
+        data = slices.results.get(tenant_id)
+        if data is None:
+            continue
+        for pt in data["sales"]:
             agg_sales[pt["d"]] = agg_sales.get(pt["d"], 0.0) + pt["v"]
-        for pt in data.get("series", {}).get("orders", []):
+        for pt in data["orders"]:
             agg_orders[pt["d"]] = agg_orders.get(pt["d"], 0) + pt["v"]
-        for mode, amt in data.get("modes", {}).items():
+        for mode, amt in data["modes"].items():
             modes[mode] = modes.get(mode, 0.0) + amt
 
     dates = sorted(agg_sales.keys())
@@ -99,8 +105,8 @@ async def owner_dashboard_charts(owner_id: str, request: Request, range: int = 7
             "avg_ticket": avg_series,
         },
         "modes": modes,
+        "failed": slices.failures(),
     }
-    await redis.set(cache_key, json.dumps(result), ex=300)
     return result
 
 
@@ -119,11 +125,18 @@ async def owner_daybook_pdf(owner_id: str, request: Request, date: str) -> Respo
     payments: dict[str, float] = {}
     outlet_totals: list[dict] = []
 
-    for tenant_id in tenant_ids:
+    async def _outlet_day(tenant_id: str) -> list[dict]:
         tz = info.get(tenant_id, {}).get("tz", "UTC")
-        name = info.get(tenant_id, {}).get("name", tenant_id)
         async with _session(tenant_id) as session:
-            rows = await invoices_repo_sql.list_day(session, day, tz, tenant_id)
+            return await invoices_repo_sql.list_day(session, day, tz, tenant_id)
+
+    per_outlet = await fan_out(tenant_ids, _outlet_day)
+
+    for tenant_id in tenant_ids:
+        rows = per_outlet.results.get(tenant_id)
+        if rows is None:
+            continue
+        name = info.get(tenant_id, {}).get("name", tenant_id)
         orders += len(rows)
         subtotal_t = sum(r["subtotal"] for r in rows)
         tax_t = sum(r["tax"] for r in rows)
@@ -140,6 +153,11 @@ async def owner_daybook_pdf(owner_id: str, request: Request, date: str) -> Respo
 
     outlet_totals.sort(key=lambda x: x["total"], reverse=True)
     top_outlets = outlet_totals[:5]
+    # Totals leave these outlets out; say so on the daybook itself
+    failed = [
+        {"name": info.get(f["id"], {}).get("name", f["id"]), "reason": f["reason"]}
+        for f in per_outlet.failures()
+    ]
 
     content, mimetype = render_template(
         "owner_daybook_a4.html",
@@ -152,6 +170,7 @@ async def owner_daybook_pdf(owner_id: str, request: Request, date: str) -> Respo
             "total": total,
             "payments": payments,
             "top_outlets": top_outlets,
+            "failed": failed,
         },
         nonce=request.state.csp_nonce,
     )
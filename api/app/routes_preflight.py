@@ -65,7 +65,7 @@ async def check_storage() -> dict:
     try:
         dummy = UploadFile(filename="ping.txt", file=BytesIO(b"ping"))
         url, key = await storage.save("__preflight__", dummy)
-        storage.read(key)
+        await storage.read_async(key)
         return {"name": "storage", "status": "ok", "detail": url}
     except Exception as exc:  # pragma: no cover - best effort
         return {"name": "storage", "status": "fail", "detail": str(exc)}
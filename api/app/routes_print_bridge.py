@@ -8,6 +8,7 @@ from fastapi import APIRouter, Depends, Request, Response
 from pydantic import BaseModel
 
 from .auth import User, role_required
+from .redis_registry import register_print_retry
 
 router = APIRouter(prefix="/api/outlet/{tenant}/print")
 
@@ -44,6 +45,8 @@ async def printer_status(tenant: str, request: Request) -> PrintStatus:
     q_key = f"print:retry:{tenant}"
     last = await redis.get(hb_key)
     queue_len = await redis.llen(q_key)
+    if queue_len:
+        await register_print_retry(redis, tenant)
     stale = True
     if last:
         try:
@@ -4,7 +4,6 @@ from __future__ import annotations
 
 import base64
 from io import BytesIO
-from math import ceil
 from pathlib import Path
 from typing import Literal
 
@@ -14,6 +13,7 @@ from fastapi import APIRouter, HTTPException, Request, Response
 from .audit import log_qr_pack
 from .pdf.render import render_template
 from .routes_onboarding import TENANTS
+from .security import ratelimit
 from .utils import ratelimits
 
 router = APIRouter()
@@ -66,9 +66,8 @@ async def qrpack_pdf(
             async def get(self, key):
                 return self.store.get(key)
 
-            async def incr(self, key):
-                self.store[key] = self.store.get(key, 0) + 1
-                return self.store[key]
+            async def set(self, key, value, ex=None):
+                self.store[key] = value
 
             async def hgetall(self, key):
                 return self.store.get(key, {})
@@ -83,12 +82,13 @@ async def qrpack_pdf(
 
     policy = ratelimits.qrpack()
     key = f"qrpack:rl:{tenant_id}"
-    count = await redis.incr(key)
-    if count == 1:
-        window = ceil(policy.burst / policy.rate_per_min * 60)
-        await redis.expire(key, window)
-    if count > policy.burst:
-        raise HTTPException(429, "Too many requests")
+    rl = await ratelimit.consume(
+        redis, key, rate_per_min=policy.rate_per_min, burst=policy.burst
+    )
+    if not rl.allowed:
+        raise HTTPException(
+            429, "Too many requests", headers={"Retry-After": str(rl.retry_after)}
+        )
 
     cache_key = (
         f"qrpack:cache:{tenant_id}:{size}:{per_page}:{int(show_logo)}:{label_fmt}"
@@ -11,6 +11,9 @@ from .db import SessionLocal
 from .db.tenant import get_engine
 from .deps.tenant import get_tenant_id
 from .models_tenant import AuditTenant, Invoice, Payment
+from .repos_sqlalchemy import rollup_repo_sql
+from .repos_sqlalchemy.invoices_repo_sql import record_payment
+from .utils.fanout import invalidate_outlet
 from .utils.responses import ok
 
 router = APIRouter()
@@ -34,6 +37,7 @@ async def get_tenant_session(
 async def refund_payment(
     payment_id: int,
     request: Request,
+    tenant_id: str = Depends(get_tenant_id),
     session: AsyncSession = Depends(get_tenant_session),
 ) -> dict:
     """Issue a refund for ``payment_id`` and cache the result for 24h."""
@@ -57,16 +61,18 @@ async def refund_payment(
     if invoice is None or not getattr(invoice, "settled", False):
         result = ok({"refunded": False})
     else:
-        refund = Payment(
-            invoice_id=payment.invoice_id,
-            mode=f"{payment.mode}_refund",
-            amount=-payment.amount,
+        await record_payment(
+            session,
+            payment.invoice_id,
+            f"{payment.mode}_refund",
+            -payment.amount,
             verified=True,
+            tz=await rollup_repo_sql.tenant_tz(tenant_id),
         )
-        session.add(refund)
         invoice.settled = False
         invoice.settled_at = None
         await session.commit()
+        await invalidate_outlet(redis, tenant_id)
         result = ok({"refunded": True})
 
     await redis.set(cache_key, json.dumps(result), ex=86400)
@@ -16,7 +16,7 @@ from fastapi.responses import StreamingResponse
 
 from .db import SessionLocal
 from .middlewares.realtime_guard import queue as rt_queue
-from .middlewares.realtime_guard import register, unregister
+from .middlewares.realtime_guard import acquire, release
 from .models_tenant import Table
 from .routes_metrics import sse_clients_gauge
 
@@ -40,7 +40,7 @@ async def stream_table_map(
     from .main import redis_client  # lazy import to avoid circular deps
 
     ip = request.client.host if request and request.client else "?"
-    register(ip)
+    await acquire(ip, redis_client)
 
     channel = f"rt:table_map:{tenant}"
     pubsub = redis_client.pubsub()
@@ -128,6 +128,6 @@ async def stream_table_map(
             app_state.pubsubs.discard(pubsub)
 
             sse_clients_gauge.dec()
-            unregister(ip)
+            await release(ip, redis_client)
 
     return StreamingResponse(event_gen(), media_type="text/event-stream")
@@ -15,7 +15,8 @@ from pydantic import AnyHttpUrl, BaseModel
 from .auth import User, role_required
 from .models_tenant import NotificationOutbox
 from .routes_outbox_admin import _session
-from .security.webhook_egress import is_allowed_url
+from .security.egress_client import EgressBlocked, shared_client
+from .security.webhook_egress import resolve_destination
 from .security import ratelimit
 from .utils import ratelimits
 from .utils.audit import audit
@@ -62,18 +63,17 @@ async def webhook_test(
     request: Request,
     user: User = Depends(role_required("super_admin", "outlet_admin")),
 ) -> dict:
-    if not is_allowed_url(str(body.url)):
+    if await resolve_destination(str(body.url)) is None:
         raise HTTPException(status_code=400, detail="EGRESS_BLOCKED")
 
     redis = request.app.state.redis
     ip = request.client.host if request.client else "unknown"
     policy = ratelimits.exports()
-    allowed = await ratelimit.allow(
+    rl = await ratelimit.hit(
         redis, ip, "webhook-test", rate_per_min=policy.rate_per_min, burst=policy.burst
     )
-    if not allowed:
-        retry_after = await redis.ttl(f"ratelimit:{ip}:webhook-test")
-        return rate_limited(retry_after)
+    if not rl.allowed:
+        return rate_limited(rl.retry_after)
 
     payload = {"event": body.event, "sample": True}
     data = json.dumps(payload, separators=(",", ":")).encode()
@@ -93,8 +93,7 @@ async def webhook_test(
     content_type: str | None = None
     content_encoding: str | None = None
     try:
-        async with httpx.AsyncClient(timeout=5) as client:
-            resp = await client.post(str(body.url), content=data, headers=headers)
+        resp = await shared_client().post(str(body.url), content=data, headers=headers)
         http_code = resp.status_code
         content_type = resp.headers.get("Content-Type")
         content_encoding = resp.headers.get("Content-Encoding")
@@ -102,7 +101,7 @@ async def webhook_test(
         body_b64 = base64.b64encode(body).decode()
         snippet = _log_snippet(body, content_type)
         status = "success" if resp.is_success else "error"
-    except httpx.HTTPError as exc:
+    except (httpx.HTTPError, EgressBlocked) as exc:
         snippet = str(exc)[:100]
     latency_ms = int((time.monotonic() - start) * 1000)
     return ok(
@@ -11,7 +11,7 @@ from fastapi import HTTPException, Request
 from redis.asyncio import Redis
 from starlette.status import HTTP_429_TOO_MANY_REQUESTS
 
-from ..routes_metrics import abuse_ip_cooldown
+from ..routes_metrics import set_abuse_cooldown
 from ..utils.responses import err
 from . import blocklist
 from .ua_denylist import is_denied
@@ -43,7 +43,7 @@ async def guard(request: Request, tenant: str, redis: Redis) -> None:
         )
     ttl = await blocklist.block_ttl(redis, tenant, ip)
     if ttl > 0:
-        abuse_ip_cooldown.labels(ip=ip).set(ttl)
+        set_abuse_cooldown(ip, ttl)
         raise HTTPException(
             status_code=HTTP_429_TOO_MANY_REQUESTS,
             detail=err(
@@ -0,0 +1,204 @@
+"""DNS resolution with a TTL cache for outbound egress checks.
+
+Egress checks used to call ``socket.getaddrinfo`` inline, which blocks the
+event loop for as long as a slow resolver takes. :class:`DNSCache` resolves
+through an async resolver instead and caches the answer per host:
+
+* positive answers for the record TTL, capped at ``EGRESS_DNS_MAX_TTL_SEC``
+  (default 300) and ``EGRESS_DNS_TTL_SEC`` (default 60) when the resolver
+  reports no TTL;
+* failed lookups for ``EGRESS_DNS_NEGATIVE_TTL_SEC`` (default 30).
+
+Concurrent lookups of the same host share one query. The async resolver is
+dnspython's when installed, which reports record TTLs, and the loop's
+``getaddrinfo`` executor otherwise. Synchronous callers such as the
+notification worker resolve with ``socket.getaddrinfo`` but share the cache.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import time
+from ipaddress import IPv4Address, IPv6Address, ip_address
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import dns.asyncresolver
+    import dns.exception
+    import dns.resolver
+except ImportError:  # pragma: no cover - dnspython is optional
+    dns = None  # type: ignore[assignment]
+
+IP = IPv4Address | IPv6Address
+Answer = Tuple[List[str], Optional[float]]
+Resolver = Callable[[str], Awaitable[Answer]]
+SyncResolver = Callable[[str], Answer]
+
+DEFAULT_TTL = float(os.getenv("EGRESS_DNS_TTL_SEC", "60"))
+NEGATIVE_TTL = float(os.getenv("EGRESS_DNS_NEGATIVE_TTL_SEC", "30"))
+MAX_TTL = float(os.getenv("EGRESS_DNS_MAX_TTL_SEC", "300"))
+
+
+def _addresses(infos: Iterable[tuple]) -> List[str]:
+    return [info[4][0] for info in infos]
+
+
+def system_resolve(host: str) -> Answer:
+    """Resolve ``host`` with the blocking ``socket.getaddrinfo``."""
+
+    try:
+        return _addresses(socket.getaddrinfo(host, None)), None
+    except socket.gaierror:
+        return [], None
+
+
+async def loop_resolve(host: str) -> Answer:
+    """Resolve ``host`` with ``getaddrinfo`` in the loop's executor."""
+
+    loop = asyncio.get_running_loop()
+    try:
+        return _addresses(await loop.getaddrinfo(host, None)), None
+    except socket.gaierror:
+        return [], None
+
+
+async def dnspython_resolve(host: str) -> Answer:
+    """Resolve the A and AAAA records of ``host`` and their smallest TTL.
+
+    Falls back to :func:`loop_resolve` when DNS has no address or no
+    nameserver answers, e.g. for names only present in ``/etc/hosts``.
+    """
+
+    try:
+        resolver = dns.asyncresolver.get_default_resolver()
+    except dns.exception.DNSException:  # pragma: no cover - no resolv.conf
+        return await loop_resolve(host)
+    answers = await asyncio.gather(
+        *(resolver.resolve(host, rdtype) for rdtype in ("A", "AAAA")),
+        return_exceptions=True,
+    )
+    addresses: List[str] = []
+    ttls: List[float] = []
+    for answer in answers:
+        if isinstance(answer, (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer)):
+            continue
+        if isinstance(answer, dns.exception.DNSException):
+            return await loop_resolve(host)
+        if isinstance(answer, BaseException):
+            raise answer
+        addresses.extend(rdata.address for rdata in answer)
+        ttls.append(answer.rrset.ttl)
+    if not addresses:
+        return await loop_resolve(host)
+    return addresses, min(ttls)
+
+
+class DNSCache:
+    """Cache of resolved addresses per host with positive and negative TTLs."""
+
+    def __init__(
+        self,
+        resolver: Resolver | None = None,
+        sync_resolver: SyncResolver | None = None,
+        *,
+        default_ttl: float = DEFAULT_TTL,
+        negative_ttl: float = NEGATIVE_TTL,
+        max_ttl: float = MAX_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if resolver is None:
+            resolver = dnspython_resolve if dns is not None else loop_resolve
+        self.resolver = resolver
+        self.sync_resolver = sync_resolver or system_resolve
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.max_ttl = max_ttl
+        self.clock = clock
+        self._entries: Dict[str, Tuple[float, List[IP]]] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def _cached(self, host: str) -> List[IP] | None:
+        entry = self._entries.get(host)
+        if entry is None:
+            return None
+        if entry[0] <= self.clock():
+            del self._entries[host]
+            return None
+        return entry[1]
+
+    def _store(self, host: str, answer: Answer) -> List[IP]:
+        raw, ttl = answer
+        ips: List[IP] = []
+        for addr in raw:
+            try:
+                ip = ip_address(addr.split("%", 1)[0])
+            except ValueError:
+                continue
+            if ip not in ips:
+                ips.append(ip)
+        if not ips:
+            ttl = self.negative_ttl
+        else:
+            ttl = min(self.default_ttl if ttl is None else ttl, self.max_ttl)
+        if ttl > 0:
+            self._entries[host] = (self.clock() + ttl, ips)
+        return ips
+
+    async def resolve(self, host: str) -> List[IP]:
+        """Return the addresses of ``host`` without blocking the event loop."""
+
+        host = host.lower()
+        cached = self._cached(host)
+        if cached is not None:
+            return cached
+        pending = self._pending.get(host)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[host] = future
+        try:
+            ips = self._store(host, await self.resolver(host))
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # waiters re-raise; don't warn when there are none
+            raise
+        else:
+            future.set_result(ips)
+            return ips
+        finally:
+            del self._pending[host]
+
+    def resolve_sync(self, host: str) -> List[IP]:
+        """Return the addresses of ``host`` for synchronous callers."""
+
+        host = host.lower()
+        cached = self._cached(host)
+        if cached is not None:
+            return cached
+        return self._store(host, self.sync_resolver(host))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_default: DNSCache | None = None
+
+
+def default_cache() -> DNSCache:
+    """Return the process-wide :class:`DNSCache`."""
+
+    global _default
+    if _default is None:
+        _default = DNSCache()
+    return _default
+
+
+__all__ = [
+    "DNSCache",
+    "default_cache",
+    "dnspython_resolve",
+    "loop_resolve",
+    "system_resolve",
+]
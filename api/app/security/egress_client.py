@@ -0,0 +1,190 @@
+"""Pooled HTTP clients for outbound webhooks with pinned destinations.
+
+Every request is checked with :mod:`.webhook_egress` first and then sent to
+the address that passed the check: the URL host is replaced by the IP while
+the ``Host`` header and the TLS server name (SNI and certificate checks)
+keep the original host name. A DNS answer that changes between the check
+and the connect therefore cannot redirect the request to an internal
+address.
+
+Clients are shared per destination host, so repeated deliveries reuse
+keep-alive connections, and speak HTTP/2 when the ``h2`` package is
+installed. :class:`EgressClient` serves request handlers and
+:class:`SyncEgressClient` the synchronous notification worker.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+from collections import OrderedDict
+from typing import Any, Callable, Generic, TypeVar
+
+import httpx
+
+from .dns_cache import DNSCache
+from .webhook_egress import Destination, pin_destination, resolve_destination
+
+HTTP2 = importlib.util.find_spec("h2") is not None
+TIMEOUT = float(os.getenv("EGRESS_TIMEOUT_SEC", "5"))
+MAX_HOSTS = int(os.getenv("EGRESS_POOL_HOSTS", "64"))
+MAX_CONNECTIONS = int(os.getenv("EGRESS_POOL_CONNECTIONS", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("EGRESS_KEEPALIVE_SEC", "30"))
+
+ClientT = TypeVar("ClientT", httpx.Client, httpx.AsyncClient)
+
+
+class EgressBlocked(PermissionError):
+    """Raised when a destination fails the egress check."""
+
+    def __init__(self, url: str) -> None:
+        super().__init__("EGRESS_BLOCKED")
+        self.url = url
+
+
+def _pinned(dest: Destination, kwargs: dict) -> dict:
+    headers = httpx.Headers(kwargs.pop("headers", None))
+    headers["Host"] = dest.host_header
+    extensions = dict(kwargs.pop("extensions", None) or {})
+    if dest.tls:
+        extensions["sni_hostname"] = dest.host
+    return {"headers": headers, "extensions": extensions, **kwargs}
+
+
+class _Pool(Generic[ClientT]):
+    """Least recently used clients keyed by destination host."""
+
+    def __init__(self, factory: Callable[[], ClientT], max_hosts: int) -> None:
+        self.factory = factory
+        self.max_hosts = max_hosts
+        self.clients: "OrderedDict[str, ClientT]" = OrderedDict()
+
+    def get(self, host: str) -> tuple[ClientT, ClientT | None]:
+        """Return the client of ``host`` and a client evicted to make room."""
+
+        client = self.clients.get(host)
+        if client is not None:
+            self.clients.move_to_end(host)
+            return client, None
+        evicted = None
+        if len(self.clients) >= self.max_hosts:
+            _, evicted = self.clients.popitem(last=False)
+        client = self.clients[host] = self.factory()
+        return client, evicted
+
+
+def _client_kwargs(transport: Any, timeout: float) -> dict:
+    kwargs: dict = {
+        "timeout": timeout,
+        "limits": httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        "follow_redirects": False,
+    }
+    if transport is not None:
+        kwargs["transport"] = transport
+    else:
+        kwargs["http2"] = HTTP2
+    return kwargs
+
+
+class EgressClient:
+    """Async pinned requests through one pooled client per destination host."""
+
+    def __init__(
+        self,
+        dns: DNSCache | None = None,
+        *,
+        timeout: float = TIMEOUT,
+        max_hosts: int = MAX_HOSTS,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.dns = dns
+        kwargs = _client_kwargs(transport, timeout)
+        self._pool: _Pool[httpx.AsyncClient] = _Pool(
+            lambda: httpx.AsyncClient(**kwargs), max_hosts
+        )
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """Send a request to ``url`` or raise :class:`EgressBlocked`."""
+
+        dest = await resolve_destination(url, self.dns)
+        if dest is None:
+            raise EgressBlocked(url)
+        client, evicted = self._pool.get(dest.host)
+        if evicted is not None:
+            await evicted.aclose()
+        return await client.request(method, dest.pinned_url, **_pinned(dest, kwargs))
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        while self._pool.clients:
+            _, client = self._pool.clients.popitem()
+            await client.aclose()
+
+
+class SyncEgressClient:
+    """Blocking counterpart of :class:`EgressClient`."""
+
+    def __init__(
+        self,
+        dns: DNSCache | None = None,
+        *,
+        timeout: float = TIMEOUT,
+        max_hosts: int = MAX_HOSTS,
+        transport: httpx.BaseTransport | None = None,
+    ) -> None:
+        self.dns = dns
+        kwargs = _client_kwargs(transport, timeout)
+        self._pool: _Pool[httpx.Client] = _Pool(
+            lambda: httpx.Client(**kwargs), max_hosts
+        )
+
+    def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        dest = pin_destination(url, self.dns)
+        if dest is None:
+            raise EgressBlocked(url)
+        client, evicted = self._pool.get(dest.host)
+        if evicted is not None:
+            evicted.close()
+        return client.request(method, dest.pinned_url, **_pinned(dest, kwargs))
+
+    def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        while self._pool.clients:
+            _, client = self._pool.clients.popitem()
+            client.close()
+
+
+_shared: EgressClient | None = None
+
+
+def shared_client() -> EgressClient:
+    """Return the process-wide :class:`EgressClient`."""
+
+    global _shared
+    if _shared is None:
+        _shared = EgressClient()
+    return _shared
+
+
+async def close_shared_client() -> None:
+    global _shared
+    if _shared is not None:
+        await _shared.aclose()
+        _shared = None
+
+
+__all__ = [
+    "EgressBlocked",
+    "EgressClient",
+    "SyncEgressClient",
+    "close_shared_client",
+    "shared_client",
+]
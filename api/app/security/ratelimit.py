@@ -1,47 +1,260 @@
-"""Token bucket helpers backed by Redis.
+"""Token bucket rate limiting backed by Redis.
 
-This module exposes a single :func:`allow` helper implementing a minimal
-Redis-based token bucket.  It relies only on ``INCR`` and ``EXPIRE`` and thus
-keeps state in a single counter per IP/key pair.  The approach approximates a
-leaky bucket: each request increments a counter and the counter automatically
-"leaks" once the TTL expires.  ``burst`` defines the bucket capacity while
-``rate_per_min`` controls how fast the bucket refills.
+Every rate limiter in the API goes through :func:`consume`, which implements a
+token bucket: a bucket holds at most ``burst`` tokens, refills continuously at
+``rate_per_min`` tokens per minute and every request takes one token.
 
 Algorithm
 =========
-1. Compose a bucket key ``ratelimit:{ip}:{key}``.
-2. ``INCR`` the counter.  If this is the first hit, set ``EXPIRE`` to a window
-   of ``burst / rate_per_min * 60`` seconds.  The window roughly represents the
-   time required to fully refill the bucket at the target rate.
-3. If the counter exceeds ``burst`` the request is denied.
-4. Once the key expires, the count resets, slowly leaking past requests.
-
-This simplistic design does not require Lua scripts or complex data structures
-and is sufficient for coarse rate limiting in front of higher level policies or
-blocklists.
+1. The bucket state (tokens left and the time of the last update) is kept in a
+   single Redis string ``"{tokens}:{timestamp_ms}"``.
+2. A Lua script reads the state, refills the tokens for the elapsed time,
+   takes a token if one is available, writes the state back with a TTL equal
+   to the time needed to fill the bucket again and returns the allow flag, the
+   remaining tokens and the wait until a token is available. A check is
+   therefore a single atomic round-trip.
+3. Servers or test doubles without scripting support fall back to the same
+   algorithm implemented with ``GET``/``SET``. The fallback is not atomic but
+   behaves identically for a single client.
+4. A bucket key holding another type (the sorted sets of the sliding window
+   limiter this replaced) is treated as a full bucket and overwritten, so
+   keys left over from before a deploy do not fail requests with
+   ``WRONGTYPE``.
+
+Local pre-check
+===============
+When ``RATE_LIMIT_LOCAL_LEASE`` is set to ``n > 0``, a client that is well
+below its limit (more than half the bucket left) reserves up to ``n`` extra
+tokens in the same script call. The process serves the following requests for
+that bucket from the lease without contacting Redis until the lease is used up
+or ``RATE_LIMIT_LOCAL_LEASE_MS`` elapses. Leased tokens are taken from the
+shared bucket so the limit still holds across processes; unused tokens simply
+expire with the lease.
 """
 
 from __future__ import annotations
 
-from math import ceil
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from math import ceil, floor
+
 from redis.asyncio import Redis
+from redis.exceptions import NoScriptError, ResponseError
 
+LOCAL_LEASE = int(os.getenv("RATE_LIMIT_LOCAL_LEASE", "0"))
+LOCAL_LEASE_MS = int(os.getenv("RATE_LIMIT_LOCAL_LEASE_MS", "1000"))
+_MAX_LEASES = 10_000
 
-async def allow(
+_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local lease = tonumber(ARGV[5])
+local tokens = burst
+local ts = now
+local raw = redis.pcall('GET', KEYS[1])
+if type(raw) == 'table' then
+  -- WRONGTYPE: a key of another type left by an older limiter
+  raw = false
+end
+if raw then
+  local sep = string.find(raw, ':', 1, true)
+  if sep then
+    tokens = tonumber(string.sub(raw, 1, sep - 1)) or burst
+    ts = tonumber(string.sub(raw, sep + 1)) or now
+  end
+end
+if now > ts then
+  tokens = math.min(burst, tokens + (now - ts) * rate)
+else
+  now = ts
+end
+local allowed = 0
+local extra = 0
+local wait = 0
+if tokens >= cost then
+  allowed = 1
+  tokens = tokens - cost
+  extra = math.min(lease, math.floor(tokens - burst / 2))
+  if extra > 0 then
+    tokens = tokens - extra
+  else
+    extra = 0
+  end
+else
+  wait = math.ceil((cost - tokens) / rate)
+end
+local ttl = math.ceil((burst - tokens) / rate) + 1000
+redis.call('SET', KEYS[1], string.format('%.6f:%d', tokens, now), 'PX', ttl)
+return {allowed, math.floor(tokens), wait, extra}
+"""
+_SHA = hashlib.sha1(_SCRIPT.encode()).hexdigest()
+
+# bucket -> [leased tokens, lease expiry (ms), shared tokens left]
+_leases: dict[str, list[int]] = {}
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """Outcome of a rate limit check."""
+
+    allowed: bool
+    remaining: int
+    retry_after: int
+    """Seconds until a token is available; ``0`` when allowed."""
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _take(
+    raw: str | bytes | None,
+    rate: float,
+    burst: int,
+    now: int,
+    cost: int,
+    lease: int,
+) -> tuple[int, int, int, int, str, int]:
+    """Python twin of :data:`_SCRIPT` used when scripting is unavailable."""
+
+    tokens, ts = float(burst), now
+    if raw:
+        if isinstance(raw, bytes):
+            raw = raw.decode()
+        head, sep, tail = str(raw).partition(":")
+        if sep:
+            try:
+                tokens, ts = float(head), int(tail)
+            except ValueError:
+                tokens, ts = float(burst), now
+    if now > ts:
+        tokens = min(burst, tokens + (now - ts) * rate)
+    else:
+        now = ts
+    allowed = extra = wait = 0
+    if tokens >= cost:
+        allowed = 1
+        tokens -= cost
+        extra = max(0, min(lease, floor(tokens - burst / 2)))
+        tokens -= extra
+    else:
+        wait = ceil((cost - tokens) / rate)
+    ttl = ceil((burst - tokens) / rate) + 1000
+    return allowed, floor(tokens), wait, extra, f"{tokens:.6f}:{now}", ttl
+
+
+async def _eval(redis: Redis, bucket: str, args: tuple) -> list | None:
+    try:
+        try:
+            return await redis.evalsha(_SHA, 1, bucket, *args)
+        except NoScriptError:
+            return await redis.eval(_SCRIPT, 1, bucket, *args)
+    except ResponseError as exc:
+        if "unknown command" not in str(exc).lower():
+            raise
+    except AttributeError:
+        pass
+    return None
+
+
+def _lease_from(bucket: str, now: int, cost: int) -> RateLimitResult | None:
+    held = _leases.get(bucket)
+    if held is None:
+        return None
+    if held[1] <= now:
+        del _leases[bucket]
+        return None
+    if held[0] < cost:
+        return None
+    held[0] -= cost
+    return RateLimitResult(True, held[0] + held[2], 0)
+
+
+def _store_lease(bucket: str, tokens: int, now: int, remaining: int) -> None:
+    if len(_leases) >= _MAX_LEASES:
+        for key in [k for k, v in _leases.items() if v[1] <= now]:
+            del _leases[key]
+        if len(_leases) >= _MAX_LEASES:
+            _leases.clear()
+    _leases[bucket] = [tokens, now + LOCAL_LEASE_MS, remaining]
+
+
+async def consume(
+    redis: Redis,
+    bucket: str,
+    *,
+    rate_per_min: float,
+    burst: int,
+    cost: int = 1,
+    lease: int | None = None,
+) -> RateLimitResult:
+    """Take ``cost`` tokens from ``bucket`` and report the outcome.
+
+    Parameters
+    ----------
+    redis:
+        Redis connection holding the bucket state.
+    bucket:
+        Redis key of the bucket.
+    rate_per_min:
+        Sustained refill rate in tokens per minute; must be positive.
+    burst:
+        Bucket capacity.
+    cost:
+        Tokens taken by this request.
+    lease:
+        Tokens to reserve for the in-process pre-check; defaults to
+        ``RATE_LIMIT_LOCAL_LEASE``.
+    """
+
+    if rate_per_min <= 0:
+        raise ValueError(f"rate_per_min must be positive, got {rate_per_min!r}")
+    now = _now_ms()
+    lease = LOCAL_LEASE if lease is None else lease
+    if lease > 0:
+        local = _lease_from(bucket, now, cost)
+        if local is not None:
+            return local
+
+    rate = rate_per_min / 60000
+    args = (rate, burst, now, cost, max(lease, 0))
+    reply = await _eval(redis, bucket, args)
+    if reply is None:
+        try:
+            raw = await redis.get(bucket)
+        except ResponseError as exc:
+            if "wrongtype" not in str(exc).lower():
+                raise
+            raw = None
+        *reply, state, ttl = _take(raw, *args)
+        await redis.set(bucket, state, ex=ceil(ttl / 1000))
+    allowed, remaining, wait_ms, extra = (int(v) for v in reply)
+    if extra > 0:
+        _store_lease(bucket, extra, now, remaining)
+    if allowed:
+        return RateLimitResult(True, remaining + extra, 0)
+    return RateLimitResult(False, remaining, max(1, ceil(wait_ms / 1000)))
+
+
+async def hit(
     redis: Redis,
     ip: str,
     key: str,
-    rate_per_min: int = 60,
+    rate_per_min: float = 60,
     burst: int = 100,
-) -> bool:
-    """Return ``True`` if the request is within the rate limit.
+) -> RateLimitResult:
+    """Consume a token from the ``ratelimit:{ip}:{key}`` bucket.
 
     Parameters
     ----------
     redis:
         Redis connection used for accounting.
     ip:
-        Client IP address.
+        Client IP address (or another client identifier).
     key:
         Additional bucket key (e.g. an endpoint name).
     rate_per_min:
@@ -50,10 +263,32 @@ async def allow(
         Maximum burst size allowed before throttling.
     """
 
-    bucket = f"ratelimit:{ip}:{key}"
-    count = await redis.incr(bucket)
-    if count == 1:
-        # Time for the bucket to completely refill at the desired rate.
-        window = ceil(burst / rate_per_min * 60)
-        await redis.expire(bucket, window)
-    return count <= burst
+    return await consume(
+        redis, f"ratelimit:{ip}:{key}", rate_per_min=rate_per_min, burst=burst
+    )
+
+
+async def allow(
+    redis: Redis,
+    ip: str,
+    key: str,
+    rate_per_min: float = 60,
+    burst: int = 100,
+) -> bool:
+    """Return ``True`` if the request is within the rate limit.
+
+    Thin wrapper around :func:`hit` for callers that do not need the retry
+    hint.
+    """
+
+    result = await hit(redis, ip, key, rate_per_min=rate_per_min, burst=burst)
+    return result.allowed
+
+
+def reset_local() -> None:
+    """Drop all in-process leases."""
+
+    _leases.clear()
+
+
+__all__ = ["RateLimitResult", "allow", "consume", "hit", "reset_local"]
@@ -2,16 +2,52 @@
 
 This module exposes :func:`is_allowed_url` used by the notification worker to
 validate webhook destinations and guard against SSRF or abuse.
+
+:func:`resolve_destination` and :func:`pin_destination` also return the
+checked address as a :class:`Destination` so the connection can be pinned
+to it; otherwise a second lookup at connect time could return a different,
+internal, address. Lookups go through :mod:`.dns_cache`, and the async
+variant does not block the event loop.
 """
 
 from __future__ import annotations
 
 import os
-import socket
+from dataclasses import dataclass
 from fnmatch import fnmatch
-from ipaddress import ip_address, ip_network
+from ipaddress import IPv6Address, ip_address, ip_network
 from typing import Iterable
-from urllib.parse import urlparse
+from urllib.parse import SplitResult, urlsplit
+
+from .dns_cache import IP, DNSCache, default_cache
+
+
+@dataclass(frozen=True)
+class Destination:
+    """An allowed egress URL with the address its host was checked against."""
+
+    url: str
+    host: str
+    ip: IP
+
+    @property
+    def pinned_url(self) -> str:
+        """Return ``url`` with the host replaced by the checked address."""
+
+        parts = urlsplit(self.url)
+        ip = f"[{self.ip}]" if isinstance(self.ip, IPv6Address) else str(self.ip)
+        netloc = ip if parts.port is None else f"{ip}:{parts.port}"
+        return parts._replace(netloc=netloc).geturl()
+
+    @property
+    def host_header(self) -> str:
+        host = f"[{self.host}]" if ":" in self.host else self.host
+        port = urlsplit(self.url).port
+        return host if port is None else f"{host}:{port}"
+
+    @property
+    def tls(self) -> bool:
+        return urlsplit(self.url).scheme == "https"
 
 
 def _host_allowed(host: str, patterns: Iterable[str]) -> bool:
@@ -41,41 +77,37 @@ def _load_deny_cidrs() -> list[ip_network]:
     return cidrs
 
 
-def _resolve_ips(host: str) -> list[ip_address]:
-    try:
-        infos = socket.getaddrinfo(host, None)
-    except socket.gaierror:
-        return []
-    ips: list[ip_address] = []
-    for info in infos:
-        addr = info[4][0]
-        try:
-            ip = ip_address(addr)
-        except ValueError:
-            continue
-        if ip not in ips:
-            ips.append(ip)
-    return ips
+def _resolve_ips(host: str, dns: DNSCache | None = None) -> list[IP]:
+    return (dns or default_cache()).resolve_sync(host)
 
 
-def is_allowed_url(url: str) -> bool:
-    """Return ``True`` if ``url`` is allowed for outbound webhook egress."""
-    parsed = urlparse(url)
+def _allowed_host(url: str) -> tuple[SplitResult, str] | None:
+    parsed = urlsplit(url)
     if parsed.scheme not in {"http", "https"}:
-        return False
+        return None
     host = parsed.hostname
     if not host:
-        return False
-    allow_hosts = _load_allow_hosts()
-    if not _host_allowed(host, allow_hosts):
-        return False
-    deny_cidrs = _load_deny_cidrs()
+        return None
+    try:
+        parsed.port
+    except ValueError:
+        return None
+    if not _host_allowed(host, _load_allow_hosts()):
+        return None
+    return parsed, host
+
+
+def _literal_ip(host: str) -> list[IP] | None:
     try:
-        ips = [ip_address(host)]
+        return [ip_address(host)]
     except ValueError:
-        ips = _resolve_ips(host)
+        return None
+
+
+def _ips_allowed(ips: list[IP]) -> bool:
     if not ips:
         return False
+    deny_cidrs = _load_deny_cidrs()
     for ip in ips:
         if not ip.is_global:
             return False
@@ -83,3 +115,37 @@ def is_allowed_url(url: str) -> bool:
             if ip in net:
                 return False
     return True
+
+
+def pin_destination(url: str, dns: DNSCache | None = None) -> Destination | None:
+    """Return the pinned :class:`Destination` of ``url`` or ``None`` if blocked.
+
+    Every address of the host must be allowed. Resolves synchronously.
+    """
+    checked = _allowed_host(url)
+    if checked is None:
+        return None
+    parsed, host = checked
+    ips = _literal_ip(host) or _resolve_ips(host, dns)
+    if not _ips_allowed(ips):
+        return None
+    return Destination(url=parsed.geturl(), host=host, ip=ips[0])
+
+
+async def resolve_destination(
+    url: str, dns: DNSCache | None = None
+) -> Destination | None:
+    """Async :func:`pin_destination` that does not block the event loop."""
+    checked = _allowed_host(url)
+    if checked is None:
+        return None
+    parsed, host = checked
+    ips = _literal_ip(host) or await (dns or default_cache()).resolve(host)
+    if not _ips_allowed(ips):
+        return None
+    return Destination(url=parsed.geturl(), host=host, ip=ips[0])
+
+
+def is_allowed_url(url: str) -> bool:
+    """Return ``True`` if ``url`` is allowed for outbound webhook egress."""
+    return pin_destination(url) is not None
@@ -0,0 +1,44 @@
+"""Launch the API with one or more uvicorn worker processes.
+
+Example::
+
+    WEB_CONCURRENCY=4 python -m api.app.serve --port 8000
+
+See :mod:`api.app.multiproc` for what changes with more than one worker.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+
+import uvicorn
+
+from . import multiproc
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="api.app.main:app", help="ASGI app path")
+    parser.add_argument("--host", default="0.0.0.0")  # nosec B104
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=multiproc.workers(),
+        help=f"Worker processes (default ${multiproc.WORKERS_ENV} or 1)",
+    )
+    args = parser.parse_args(argv)
+    workers = max(args.workers, 1)
+    multiproc.prepare(workers)
+    uvicorn.run(
+        args.app,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        log_level="info",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,12 @@ from typing import Dict
 
 from sqlalchemy import text
 
+from ..db.chunked import (
+    Chunked,
+    drop_expired_partitions,
+    run_chunked,
+    tenant_throttle,
+)
 from ..db.tenant import get_tenant_session
 from ..models_tenant import AuditTenant
 
@@ -34,53 +40,58 @@ async def preview(tenant: str, days: int) -> Dict[str, int]:
     }
 
 
-async def apply(tenant: str, days: int) -> Dict[str, int]:
-    """Anonymize PII and purge old orders for ``tenant``."""
+async def apply(
+    tenant: str, days: int, *, drop_partitions: bool = False
+) -> Dict[str, int]:
+    """Anonymize PII and purge old orders for ``tenant``.
+
+    Rows are processed in checkpointed chunks (see :mod:`..db.chunked`) so a
+    large backlog never runs as one long transaction. With
+    ``drop_partitions`` the monthly ``order_items`` and ``orders`` partitions
+    that end before the cutoff are dropped first, leaving only the partly
+    expired month to the chunked delete; the audit entry lists them.
+    """
     cutoff = datetime.utcnow() - timedelta(days=days)
+    params = {"cutoff": cutoff}
+    throttle = tenant_throttle(tenant)
+    scrub = "name = '', phone = '', email = ''"
     async with get_tenant_session(tenant) as session:
-        cust_res = await session.execute(
-            text(
-                "UPDATE customers SET name = '', phone = '', email = '' "
-                "WHERE created_at < :cutoff"
+        dropped: list[str] = []
+        if drop_partitions:
+            # order_items first: its rows reference orders
+            for table in ("order_items", "orders"):
+                dropped += await drop_expired_partitions(session, table, cutoff)
+        counts = {
+            "customers": await run_chunked(
+                session,
+                Chunked("customers", "created_at < :cutoff", params, scrub),
+                checkpoint="retention:customers",
+                throttle=throttle,
             ),
-            {"cutoff": cutoff},
-        )
-        inv_res = await session.execute(
-            text(
-                "UPDATE invoices SET name = '', phone = '', email = '' "
-                "WHERE created_at < :cutoff"
+            "invoices": await run_chunked(
+                session,
+                Chunked("invoices", "created_at < :cutoff", params, scrub),
+                checkpoint="retention:invoices",
+                throttle=throttle,
             ),
-            {"cutoff": cutoff},
-        )
-        await session.execute(
-            text(
-                "DELETE FROM order_items WHERE order_id IN ("
-                "SELECT id FROM orders WHERE placed_at < :cutoff)"
+            "orders": await run_chunked(
+                session,
+                Chunked(
+                    "orders",
+                    "placed_at < :cutoff",
+                    params,
+                    children=(("order_items", "order_id"),),
+                ),
+                checkpoint="retention:orders",
+                throttle=throttle,
             ),
-            {"cutoff": cutoff},
-        )
-        ord_res = await session.execute(
-            text("DELETE FROM orders WHERE placed_at < :cutoff"),
-            {"cutoff": cutoff},
-        )
-        session.add(
-            AuditTenant(
-                actor="system",
-                action="retention.purge",
-                meta={
-                    "cutoff": cutoff.isoformat(),
-                    "customers": cust_res.rowcount or 0,
-                    "invoices": inv_res.rowcount or 0,
-                    "orders": ord_res.rowcount or 0,
-                },
-            )
-        )
+        }
+        meta = {"cutoff": cutoff.isoformat(), **counts}
+        if dropped:
+            meta["partitions_dropped"] = dropped
+        session.add(AuditTenant(actor="system", action="retention.purge", meta=meta))
         await session.commit()
-    return {
-        "customers": cust_res.rowcount or 0,
-        "invoices": inv_res.rowcount or 0,
-        "orders": ord_res.rowcount or 0,
-    }
+    return counts
 
 
 __all__ = ["preview", "apply"]
@@ -0,0 +1,141 @@
+"""State of the legacy ``/tables`` endpoints shared between worker processes.
+
+Both stores keep their data in process memory until they are bound to Redis
+(:meth:`TableCarts.bind`, :meth:`PrepEMAs.bind`), which ``main`` does when
+the API runs in several worker processes (see :mod:`api.app.multiproc`).
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, List
+
+from redis.exceptions import WatchError
+
+from .utils import PrepTimeTracker
+
+CART_KEY = "legacy:table:{table_id}"
+CART_INDEX = "legacy:tables"
+PREP_KEY = "legacy:prep_ema"
+
+TableState = Dict[str, List[Any]]
+
+
+def _text(value: bytes | str) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class TableCarts:
+    """``cart`` and ``orders`` lists of ``model`` items per table.
+
+    ``local`` is the dictionary used while unbound; bound to Redis each table
+    is a JSON document updated under ``WATCH`` so concurrent updates from
+    different workers are retried instead of lost.
+    """
+
+    def __init__(self, model: type, local: Dict[str, TableState]) -> None:
+        self.model = model
+        self.local = local
+        self.redis = None
+
+    def bind(self, redis) -> None:
+        self.redis = redis
+
+    def _decode(self, raw: bytes | str | None) -> TableState:
+        state: TableState = {"cart": [], "orders": []}
+        if raw is not None:
+            for name, items in json.loads(raw).items():
+                state[name] = [self.model.model_validate(i) for i in items]
+        return state
+
+    @staticmethod
+    def _encode(state: TableState) -> str:
+        return json.dumps(
+            {name: [i.model_dump() for i in items] for name, items in state.items()}
+        )
+
+    async def update(
+        self, table_id: str, mutate: Callable[[TableState], Any] | None = None
+    ) -> TableState:
+        """Apply ``mutate`` to the state of ``table_id`` and return the state.
+
+        Exceptions raised by ``mutate`` propagate and leave the state unchanged
+        in Redis; without ``mutate`` the state is only read.
+        """
+
+        if self.redis is None:
+            state = self.local.setdefault(table_id, {"cart": [], "orders": []})
+            if mutate is not None:
+                mutate(state)
+            return state
+        key = CART_KEY.format(table_id=table_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    state = self._decode(await pipe.get(key))
+                    if mutate is None:
+                        return state
+                    mutate(state)
+                    pipe.multi()
+                    pipe.set(key, self._encode(state))
+                    pipe.sadd(CART_INDEX, table_id)
+                    await pipe.execute()
+                    return state
+                except WatchError:
+                    continue
+
+    async def items(self) -> list[tuple[str, TableState]]:
+        """Return ``(table_id, state)`` pairs of every known table."""
+
+        if self.redis is None:
+            return list(self.local.items())
+        ids = sorted(_text(i) for i in await self.redis.smembers(CART_INDEX))
+        if not ids:
+            return []
+        raw = await self.redis.mget([CART_KEY.format(table_id=i) for i in ids])
+        return [(i, self._decode(r)) for i, r in zip(ids, raw) if r is not None]
+
+
+class PrepEMAs:
+    """Prep time EMAs per table code.
+
+    ``trackers`` holds one :class:`PrepTimeTracker` per table; bound to Redis
+    the EMA is read from and written back to the ``legacy:prep_ema`` hash
+    under ``WATCH`` so every worker continues the same average without
+    losing concurrent samples, and the local tracker mirrors the last value
+    seen by this worker.
+    """
+
+    def __init__(self, trackers: Dict[str, PrepTimeTracker], window: int = 10) -> None:
+        self.trackers = trackers
+        self.window = window
+        self.redis = None
+
+    def bind(self, redis) -> None:
+        self.redis = redis
+
+    async def add(self, table_code: str, prep_time: float) -> float:
+        """Add ``prep_time`` to the EMA of ``table_code`` and return the EMA."""
+
+        tracker = self.trackers.setdefault(
+            table_code, PrepTimeTracker(window=self.window)
+        )
+        if self.redis is None:
+            return tracker.add_prep_time(prep_time)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(PREP_KEY)
+                    current = await pipe.hget(PREP_KEY, table_code)
+                    tracker.ema = float(current) if current is not None else None
+                    ema = tracker.add_prep_time(prep_time)
+                    pipe.multi()
+                    pipe.hset(PREP_KEY, table_code, ema)
+                    await pipe.execute()
+                    return ema
+                except WatchError:
+                    continue
+
+
+__all__ = ["PrepEMAs", "TableCarts"]
@@ -2,18 +2,32 @@
 
 from __future__ import annotations
 
-from collections import defaultdict, deque
+import asyncio
+from collections import Counter, defaultdict, deque
 from datetime import datetime, timedelta
 from typing import Deque, Dict, Tuple
 
+from .obs.cardinality import LabelGuard
+
 
 class SLOTracker:
-    """Track requests and errors per route within a rolling window."""
+    """Track requests and errors per route within a rolling window.
+
+    ``route`` should be a route template; at most ``max_routes`` distinct
+    routes are tracked and the rest are folded into ``other``.
+
+    With several worker processes each worker also counts its requests per
+    day until :meth:`flush` adds them to the ``slo:requests:{day}`` and
+    ``slo:errors:{day}`` Redis hashes, which :meth:`shared_report` reads.
+    """
 
-    def __init__(self, window_days: int = 30) -> None:
+    def __init__(self, window_days: int = 30, max_routes: int = 500) -> None:
         self.window = timedelta(days=window_days)
+        self._guard = LabelGuard(max_routes)
         self.requests: Dict[str, Deque[Tuple[datetime, int]]] = defaultdict(deque)
         self.errors: Dict[str, Deque[Tuple[datetime, int]]] = defaultdict(deque)
+        self.shared = False
+        self._pending: Counter[Tuple[str, str, str]] = Counter()
 
     def _prune(self, q: Deque[Tuple[datetime, int]], now: datetime) -> None:
         cutoff = now - self.window
@@ -30,6 +44,7 @@ class SLOTracker:
             q.append((now, count))
 
     def record(self, route: str, error: bool = False) -> None:
+        route = self._guard(route)
         now = datetime.utcnow()
         rq = self.requests[route]
         self._prune(rq, now)
@@ -38,6 +53,11 @@ class SLOTracker:
             er = self.errors[route]
             self._prune(er, now)
             self._add(er, now)
+        if self.shared:
+            day = now.date().isoformat()
+            self._pending[("requests", day, route)] += 1
+            if error:
+                self._pending[("errors", day, route)] += 1
 
     def report(self) -> dict[str, dict[str, float | int]]:
         now = datetime.utcnow()
@@ -56,5 +76,57 @@ class SLOTracker:
             }
         return result
 
+    async def flush(self, redis) -> None:
+        """Add the counts recorded since the last flush to Redis."""
+
+        pending, self._pending = self._pending, Counter()
+        if not pending:
+            return
+        ttl = int(self.window.total_seconds()) + 86400
+        pipe = redis.pipeline(transaction=False)
+        for (kind, day, route), count in pending.items():
+            key = f"slo:{kind}:{day}"
+            pipe.hincrby(key, route, count)
+            pipe.expire(key, ttl)
+        await pipe.execute()
+
+    async def flush_forever(self, redis, interval: float = 10.0) -> None:
+        """Flush every ``interval`` seconds until cancelled."""
+
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.flush(redis)
+            except Exception:  # pragma: no cover - retried on the next tick
+                pass
+
+    async def shared_report(self, redis) -> dict[str, dict[str, float | int]]:
+        """Return :meth:`report` computed from the counts of every worker."""
+
+        today = datetime.utcnow().date()
+        days = [
+            (today - timedelta(days=offset)).isoformat()
+            for offset in range(self.window.days + 1)
+        ]
+        pipe = redis.pipeline(transaction=False)
+        for day in days:
+            pipe.hgetall(f"slo:requests:{day}")
+            pipe.hgetall(f"slo:errors:{day}")
+        results = await pipe.execute()
+        totals: Dict[str, list[int]] = defaultdict(lambda: [0, 0])
+        for index, counts in enumerate(results):
+            for route, count in counts.items():
+                if isinstance(route, bytes):
+                    route = route.decode()
+                totals[route][index % 2] += int(count)
+        return {
+            route: {
+                "requests": total_r,
+                "errors": total_e,
+                "error_budget": 1 - (total_e / total_r) if total_r else 1.0,
+            }
+            for route, (total_r, total_e) in totals.items()
+        }
+
 
 slo_tracker = SLOTracker()
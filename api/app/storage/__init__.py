@@ -2,13 +2,15 @@
 
 Provides a unified interface to save media and fetch public URLs using either a
 local filesystem or S3-backed implementation. The backend is chosen via the
-``STORAGE_BACKEND`` environment variable (``local`` by default).
+``STORAGE_BACKEND`` environment variable (``local`` by default). ``s3`` selects
+:class:`~.s3_async.AsyncS3Backend`, which runs S3 calls on a thread pool and
+caches presigned URLs; request handlers should prefer the ``*_async`` methods.
 """
 
 from __future__ import annotations
 
 import os
-from typing import Protocol, Tuple
+from typing import Dict, Iterable, Protocol, Tuple
 from fastapi import UploadFile
 
 
@@ -24,11 +26,25 @@ class StorageBackend(Protocol):
     def url(self, key: str) -> Tuple[str, str | None]:
         """Return a public URL and optional ETag for ``key``."""
 
+    async def read_async(self, key: str) -> bytes:
+        """Return raw bytes for ``key`` without blocking the event loop."""
+
+    async def url_async(self, key: str) -> Tuple[str, str | None]:
+        """Return :meth:`url` without blocking the event loop."""
+
+    async def urls_async(
+        self, keys: Iterable[str]
+    ) -> Dict[str, Tuple[str, str | None]]:
+        """Return :meth:`url_async` for each of ``keys``."""
+
+    async def delete(self, key: str) -> None:
+        """Remove ``key``; missing keys are ignored."""
+
 
 backend = os.getenv("STORAGE_BACKEND", "local").lower()
 
 if backend == "s3":  # pragma: no cover - exercised via tests
-    from .s3_backend import S3Backend as _Backend
+    from .s3_async import AsyncS3Backend as _Backend
 else:
     from .local_backend import LocalBackend as _Backend
 
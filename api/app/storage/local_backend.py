@@ -2,9 +2,10 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, Iterable, Tuple
 from uuid import uuid4
 
 from fastapi import UploadFile
@@ -31,3 +32,17 @@ class LocalBackend:
 
     def url(self, key: str) -> Tuple[str, str | None]:
         return f"/media/{key}", None
+
+    async def read_async(self, key: str) -> bytes:
+        return await asyncio.to_thread(self.read, key)
+
+    async def url_async(self, key: str) -> Tuple[str, str | None]:
+        return self.url(key)
+
+    async def urls_async(
+        self, keys: Iterable[str]
+    ) -> Dict[str, Tuple[str, str | None]]:
+        return {key: self.url(key) for key in keys}
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread((self.base_dir / key).unlink, missing_ok=True)
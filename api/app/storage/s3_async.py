@@ -0,0 +1,224 @@
+"""S3 storage backend that keeps blocking S3 calls off the event loop.
+
+boto3 is synchronous, so every network call (``put_object``,
+``get_object`` and the fallback ``head_object``) runs on a dedicated thread
+pool of ``S3_MAX_WORKERS`` threads (default 8). The botocore connection pool
+is sized to match, which bounds the concurrent S3 requests per process.
+
+:meth:`AsyncS3Backend.save` uploads the object and records the ETag S3
+returns under ``media:etag:{key}`` in Redis, so :meth:`~AsyncS3Backend.url_async`
+never needs a ``HEAD``. Presigned GET URLs are valid for ``S3_URL_TTL_SEC``
+(default 3600) and cached in memory and in Redis (``media:url:{key}``, stored
+with the time they stop being served) until ``S3_URL_REFRESH_SEC`` (default
+300) before they expire; signing itself is local and does not touch the
+network. Objects uploaded before ETags were recorded are looked up with one
+``HEAD`` on first use. Without a bound Redis client the caches are per
+process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterable, Tuple
+from uuid import uuid4
+
+import boto3
+from botocore.config import Config
+from fastapi import UploadFile
+
+URL_KEY = "media:url:{key}"
+ETAG_KEY = "media:etag:{key}"
+CACHE_CONTROL = "public, max-age=86400"
+MAX_WORKERS = int(os.getenv("S3_MAX_WORKERS", "8"))
+URL_TTL = int(os.getenv("S3_URL_TTL_SEC", "3600"))
+URL_REFRESH = int(os.getenv("S3_URL_REFRESH_SEC", "300"))
+MEMORY_ENTRIES = 10000
+
+
+def _text(value) -> str | None:
+    if value is None:
+        return None
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+class AsyncS3Backend:
+    """Upload to S3 and serve cached presigned URLs without blocking the loop."""
+
+    def __init__(
+        self,
+        client=None,
+        redis=None,
+        *,
+        max_workers: int = MAX_WORKERS,
+        url_ttl: int = URL_TTL,
+        refresh: int = URL_REFRESH,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.bucket = os.getenv("S3_BUCKET", "")
+        self.client = client or boto3.client(
+            "s3",
+            endpoint_url=os.getenv("S3_ENDPOINT"),
+            region_name=os.getenv("S3_REGION"),
+            aws_access_key_id=os.getenv("S3_ACCESS_KEY"),
+            aws_secret_access_key=os.getenv("S3_SECRET_KEY"),
+            config=Config(max_pool_connections=max_workers),
+        )
+        self.redis = redis
+        self.url_ttl = url_ttl
+        self.refresh = min(refresh, url_ttl // 2)
+        self.clock = clock
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="s3"
+        )
+        self._urls: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._etags: "OrderedDict[str, str]" = OrderedDict()
+
+    def bind(self, redis) -> None:
+        """Share ETags and presigned URLs through ``redis``."""
+
+        self.redis = redis
+
+    async def _call(self, method: str, **params):
+        loop = asyncio.get_running_loop()
+        func = partial(getattr(self.client, method), **params)
+        return await loop.run_in_executor(self._executor, func)
+
+    @staticmethod
+    def _remember(cache: OrderedDict, key: str, value) -> None:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > MEMORY_ENTRIES:
+            cache.popitem(last=False)
+
+    def _sign(self, key: str) -> Tuple[float, str]:
+        url = self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": key,
+                "ResponseCacheControl": CACHE_CONTROL,
+            },
+            ExpiresIn=self.url_ttl,
+        )
+        return self.clock() + self.url_ttl - self.refresh, url
+
+    async def save(self, tenant: str, file: UploadFile) -> Tuple[str, str]:
+        """Upload ``file`` for ``tenant`` and return ``(url, key)``."""
+
+        key = f"{tenant}/{uuid4().hex}_{file.filename}"
+        body = await file.read()
+        params = {
+            "Bucket": self.bucket,
+            "Key": key,
+            "Body": body,
+            "CacheControl": CACHE_CONTROL,
+        }
+        if file.content_type:
+            params["ContentType"] = file.content_type
+        resp = await self._call("put_object", **params)
+        etag = str(resp.get("ETag", "")).strip('"')
+        self._remember(self._etags, key, etag)
+        if self.redis is not None:
+            await self.redis.set(ETAG_KEY.format(key=key), etag)
+        url, _ = await self.url_async(key)
+        return url, key
+
+    async def read_async(self, key: str) -> bytes:
+        obj = await self._call("get_object", Bucket=self.bucket, Key=key)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, obj["Body"].read
+        )
+
+    def read(self, key: str) -> bytes:  # pragma: no cover - passthrough
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+    async def url_async(self, key: str) -> Tuple[str, str | None]:
+        """Return a presigned GET URL and the ETag of ``key``."""
+
+        return (await self.urls_async([key]))[key]
+
+    async def urls_async(
+        self, keys: Iterable[str]
+    ) -> Dict[str, Tuple[str, str | None]]:
+        """Return :meth:`url_async` for many keys with one Redis round trip."""
+
+        keys = list(dict.fromkeys(keys))
+        now = self.clock()
+        urls: Dict[str, str] = {}
+        etags: Dict[str, str] = {}
+        for key in keys:
+            cached = self._urls.get(key)
+            if cached is not None and cached[0] > now:
+                urls[key] = cached[1]
+            if key in self._etags:
+                etags[key] = self._etags[key]
+        missing = [k for k in keys if k not in urls or k not in etags]
+        if missing and self.redis is not None:
+            fields = []
+            for key in missing:
+                fields += [URL_KEY.format(key=key), ETAG_KEY.format(key=key)]
+            values = await self.redis.mget(fields)
+            for key, stored, etag in zip(missing, values[::2], values[1::2]):
+                if key not in urls and stored is not None:
+                    expires, url = _text(stored).split(" ", 1)
+                    if float(expires) > now:
+                        urls[key] = url
+                        self._remember(self._urls, key, (float(expires), url))
+                if key not in etags and etag is not None:
+                    etags[key] = _text(etag)
+                    self._remember(self._etags, key, etags[key])
+        signed: Dict[str, Tuple[float, str]] = {}
+        for key in keys:
+            if key not in urls:
+                signed[key] = self._sign(key)
+                urls[key] = signed[key][1]
+                self._remember(self._urls, key, signed[key])
+        heads = [key for key in keys if key not in etags]
+        for key, resp in zip(
+            heads,
+            await asyncio.gather(
+                *(self._call("head_object", Bucket=self.bucket, Key=k) for k in heads)
+            ),
+        ):
+            etags[key] = resp.get("Metadata", {}).get("etag") or str(
+                resp.get("ETag", "")
+            ).strip('"')
+            self._remember(self._etags, key, etags[key])
+        if self.redis is not None and (signed or heads):
+            pipe = self.redis.pipeline(transaction=False)
+            ttl = self.url_ttl - self.refresh
+            for key, (expires, url) in signed.items():
+                pipe.set(URL_KEY.format(key=key), f"{expires} {url}", ex=ttl)
+            for key in heads:
+                pipe.set(ETAG_KEY.format(key=key), etags[key])
+            await pipe.execute()
+        return {key: (urls[key], etags.get(key)) for key in keys}
+
+    async def delete(self, key: str) -> None:
+        """Delete ``key`` and forget its cached URL and ETag."""
+
+        await self._call("delete_object", Bucket=self.bucket, Key=key)
+        self._urls.pop(key, None)
+        self._etags.pop(key, None)
+        if self.redis is not None:
+            await self.redis.delete(URL_KEY.format(key=key), ETAG_KEY.format(key=key))
+
+    def url(self, key: str) -> Tuple[str, str | None]:
+        """Synchronous :meth:`url_async` using the in-process caches only."""
+
+        cached = self._urls.get(key)
+        if cached is None or cached[0] <= self.clock():
+            cached = self._sign(key)
+            self._remember(self._urls, key, cached)
+        return cached[1], self._etags.get(key)
+
+    async def aclose(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+__all__ = ["AsyncS3Backend"]
@@ -1,9 +1,14 @@
-"""S3 storage backend using presigned URLs."""
+"""S3 storage backend using presigned URLs.
+
+Calls boto3 synchronously; ``STORAGE_BACKEND=s3`` now selects
+:class:`~.s3_async.AsyncS3Backend` instead.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import os
-from typing import Tuple
+from typing import Dict, Iterable, Tuple
 from uuid import uuid4
 
 import boto3
@@ -48,6 +53,22 @@ class S3Backend:
         obj = self.client.get_object(Bucket=self.bucket, Key=key)
         return obj["Body"].read()
 
+    async def read_async(self, key: str) -> bytes:  # pragma: no cover
+        return await asyncio.to_thread(self.read, key)
+
+    async def url_async(self, key: str) -> Tuple[str, str | None]:
+        return await asyncio.to_thread(self.url, key)
+
+    async def urls_async(
+        self, keys: Iterable[str]
+    ) -> Dict[str, Tuple[str, str | None]]:
+        keys = list(dict.fromkeys(keys))
+        urls = await asyncio.gather(*(self.url_async(key) for key in keys))
+        return dict(zip(keys, urls))
+
+    async def delete(self, key: str) -> None:  # pragma: no cover - passthrough
+        await asyncio.to_thread(self.client.delete_object, Bucket=self.bucket, Key=key)
+
     def url(self, key: str) -> Tuple[str, str | None]:
         obj = self.client.head_object(Bucket=self.bucket, Key=key)
         etag = obj.get("Metadata", {}).get("etag") or obj.get("ETag", "").strip('"')
@@ -23,6 +23,10 @@ class PrepTimeTracker:
     def ema(self) -> float | None:
         return self._ema
 
+    @ema.setter
+    def ema(self, value: float | None) -> None:
+        self._ema = value
+
     def add_prep_time(self, prep_time: float) -> float:
         """Update the moving average with ``prep_time`` and return the new EMA."""
 
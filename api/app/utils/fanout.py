@@ -0,0 +1,156 @@
+"""Concurrent cross-tenant reads with per-outlet result caching.
+
+Owner-level views aggregate data from several tenant databases. Querying
+them one after another makes latency grow linearly with the number of
+outlets, so :func:`fan_out` runs a per-tenant coroutine for every tenant with
+bounded concurrency and a per-tenant timeout. Tenants that fail or time out
+are reported separately instead of failing the whole request.
+
+:func:`cached_fan_out` layers a Redis cache on top where each tenant's result
+(an *outlet slice*) is cached on its own. Slice keys embed a per-tenant
+version number; :func:`invalidate_outlet` bumps that version whenever the
+outlet's rollups change so only that outlet is recomputed on the next read.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+FANOUT_CONCURRENCY = int(os.getenv("FANOUT_CONCURRENCY", "8"))
+FANOUT_TIMEOUT_SECS = float(os.getenv("FANOUT_TIMEOUT_SECS", "10"))
+SLICE_TTL_SECS = int(os.getenv("FANOUT_SLICE_TTL_SECS", "300"))
+
+
+@dataclass
+class FanoutResult:
+    """Per-tenant results of a fan-out along with tenants that failed."""
+
+    results: dict[str, Any] = field(default_factory=dict)
+    failed: dict[str, str] = field(default_factory=dict)
+
+    def failures(self) -> list[dict[str, str]]:
+        """Return failures as a JSON-friendly list ordered by tenant id."""
+
+        return [{"id": tid, "reason": why} for tid, why in sorted(self.failed.items())]
+
+
+async def fan_out(
+    tenant_ids: Iterable[str],
+    worker: Callable[[str], Awaitable[Any]],
+    *,
+    concurrency: int | None = None,
+    timeout: float | None = None,
+) -> FanoutResult:
+    """Run ``worker(tenant_id)`` for each tenant concurrently.
+
+    At most ``concurrency`` workers run at once and each is cancelled after
+    ``timeout`` seconds. Failures are recorded as ``"timeout"`` or ``"error"``
+    in :attr:`FanoutResult.failed`.
+    """
+
+    limit = asyncio.Semaphore(concurrency or FANOUT_CONCURRENCY)
+    per_tenant = timeout if timeout is not None else FANOUT_TIMEOUT_SECS
+    out = FanoutResult()
+
+    async def _run(tid: str) -> None:
+        async with limit:
+            try:
+                out.results[tid] = await asyncio.wait_for(worker(tid), per_tenant)
+            except asyncio.TimeoutError:
+                logger.warning("fan-out to tenant %s timed out", tid)
+                out.failed[tid] = "timeout"
+            except Exception:  # pragma: no cover - logged and reported
+                logger.exception("fan-out to tenant %s failed", tid)
+                out.failed[tid] = "error"
+
+    await asyncio.gather(*(_run(tid) for tid in dict.fromkeys(tenant_ids)))
+    return out
+
+
+def _version_key(tenant_id: str) -> str:
+    return f"outlet:ver:{tenant_id}"
+
+
+def _slice_key(kind: str, tenant_id: str, version: int, params: str) -> str:
+    return f"outlet:slice:{kind}:{tenant_id}:{version}:{params}"
+
+
+async def invalidate_outlet(redis, tenant_id: str) -> None:
+    """Invalidate all cached slices for ``tenant_id``."""
+
+    try:
+        await redis.incr(_version_key(tenant_id))
+    except Exception:  # pragma: no cover - cache is best effort
+        logger.warning("failed to invalidate outlet slices for %s", tenant_id)
+
+
+async def cached_fan_out(
+    redis,
+    kind: str,
+    params: str,
+    tenant_ids: Iterable[str],
+    worker: Callable[[str], Awaitable[Any]],
+    *,
+    ttl: int = SLICE_TTL_SECS,
+    concurrency: int | None = None,
+    timeout: float | None = None,
+) -> FanoutResult:
+    """Return per-tenant slices from cache, computing only the misses.
+
+    ``kind`` names the slice type and ``params`` encodes the request
+    parameters that make slices distinct (e.g. the date range). Slices must
+    be JSON serialisable. Cache errors degrade to an uncached fan-out.
+    """
+
+    tids = list(dict.fromkeys(tenant_ids))
+    out = FanoutResult()
+    keys: dict[str, str] = {}
+    try:
+        versions = await redis.mget([_version_key(t) for t in tids]) or [None] * len(
+            tids
+        )
+        keys = {
+            tid: _slice_key(kind, tid, int(ver or 0), params)
+            for tid, ver in zip(tids, versions)
+        }
+        cached = await redis.mget(list(keys.values())) or [None] * len(tids)
+        for tid, raw in zip(tids, cached):
+            if raw is not None:
+                out.results[tid] = json.loads(raw)
+    except Exception:  # pragma: no cover - cache is best effort
+        logger.warning("outlet slice cache unavailable", exc_info=True)
+        keys = {}
+
+    misses = [tid for tid in tids if tid not in out.results]
+    if not misses:
+        return out
+
+    fresh = await fan_out(misses, worker, concurrency=concurrency, timeout=timeout)
+    out.results.update(fresh.results)
+    out.failed.update(fresh.failed)
+    if keys:
+        try:
+            await asyncio.gather(
+                *(
+                    redis.set(keys[tid], json.dumps(value), ex=ttl)
+                    for tid, value in fresh.results.items()
+                )
+            )
+        except Exception:  # pragma: no cover - cache is best effort
+            logger.warning("failed to store outlet slices", exc_info=True)
+    return out
+
+
+__all__ = [
+    "FanoutResult",
+    "cached_fan_out",
+    "fan_out",
+    "invalidate_outlet",
+]
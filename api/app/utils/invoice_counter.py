@@ -1,18 +1,46 @@
-"""Utilities for managing invoice counters."""
+"""Utilities for managing invoice counters.
+
+Invoice numbers are gap-free per series: the counter is incremented in the
+same transaction that stores the invoice, so a rolled back bill also returns
+its number. The increment locks the series row until the transaction ends,
+which serialises every checkout of an outlet. Callers therefore allocate the
+number with :func:`allocate_invoice_number` as the *last* statement of the
+billing transaction, after all validation and other writes, and commit right
+away so the row lock is only held for the commit itself.
+"""
 
 from datetime import date
+from uuid import uuid4
 
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+_INCREMENT = text(
+    """
+    UPDATE invoice_counters
+    SET current = current + 1
+    WHERE series = :series
+    RETURNING current
+    """
+)
+
+_UPSERT = text(
+    """
+    INSERT INTO invoice_counters (series, current)
+    VALUES (:series, 1)
+    ON CONFLICT (series)
+    DO UPDATE SET current = invoice_counters.current + 1
+    RETURNING current
+    """
+)
+
 
 def build_series(prefix: str, reset: str, today: date | None = None) -> str:
     """Return the series string for ``prefix`` and ``reset`` policy.
 
     The resulting value acts as the persistence key in
     :mod:`invoice_counters`. It excludes the constant ``INV`` prefix and the
-    zero-padded counter suffix which are appended by
-    :func:`next_invoice_number`.
+    zero-padded counter suffix which are appended by :func:`format_number`.
     """
     today = today or date.today()
     if reset == "monthly":
@@ -22,24 +50,32 @@ def build_series(prefix: str, reset: str, today: date | None = None) -> str:
     return prefix
 
 
-async def next_invoice_number(session: AsyncSession, series: str) -> str:
-    """Return the next invoice number for ``series``.
+def format_number(series: str, current: int) -> str:
+    """Return the invoice number for counter value ``current`` of ``series``."""
 
-    ``series`` should already include any prefix and reset components, e.g.
-    ``PFX-202405`` for a monthly reset. The counter is created if missing and
-    atomically incremented. The resulting invoice number is formatted as
-    ``INV-SERIES-0001`` with a four-digit, zero-padded counter.
-    """
-    stmt = text(
-        """
-        INSERT INTO invoice_counters (series, current)
-        VALUES (:series, 1)
-        ON CONFLICT (series)
-        DO UPDATE SET current = invoice_counters.current + 1
-        RETURNING current
-        """
-    )
-    result = await session.execute(stmt, {"series": series})
-    current = result.scalar_one()
-    await session.commit()
     return f"INV-{series}-{current:04d}"
+
+
+def pending_number() -> str:
+    """Return a unique placeholder for an invoice whose number is not allocated.
+
+    Invoice rows are inserted with a placeholder and receive their real number
+    from :func:`allocate_invoice_number` just before the commit.
+    """
+
+    return f"PENDING-{uuid4().hex}"
+
+
+async def allocate_invoice_number(session: AsyncSession, series: str) -> str:
+    """Increment the counter of ``series`` and return the new invoice number.
+
+    The statement runs inside the caller's transaction and is not committed.
+    The common case is a single ``UPDATE ... RETURNING`` on the existing
+    series row; the first invoice of a series falls back to an upsert so two
+    terminals creating the row concurrently still get distinct numbers.
+    """
+
+    current = (await session.execute(_INCREMENT, {"series": series})).scalar()
+    if current is None:
+        current = (await session.execute(_UPSERT, {"series": series})).scalar_one()
+    return format_number(series, current)
@@ -9,14 +9,26 @@ from datetime import datetime, timezone
 
 import httpx
 
-from ..security.webhook_egress import is_allowed_url
+from ..security.webhook_egress import resolve_destination
 
 SLA_MS = 1000
 
 
 async def probe_webhook(url: str) -> dict:
-    """Probe ``url`` and return latency, TLS and status information."""
-    allowed = is_allowed_url(url)
+    """Probe ``url`` and return latency, TLS and status information.
+
+    Destinations that fail the egress check are not contacted; allowed ones
+    are probed at the address that was checked.
+    """
+    dest = await resolve_destination(url)
+    if dest is None:
+        return {
+            "tls": {"version": None, "expires_at": None},
+            "latency_ms": {"p50": 0, "p95": 0},
+            "status_codes": [],
+            "allowed": False,
+            "warnings": ["ip_not_allowed"],
+        }
     warnings: list[str] = []
     latencies: list[int] = []
     codes: list[int | None] = []
@@ -24,11 +36,15 @@ async def probe_webhook(url: str) -> dict:
     tls_expires_at: str | None = None
     tls_self_signed = False
 
+    headers = {"Host": dest.host_header}
+    extensions = {"sni_hostname": dest.host} if dest.tls else {}
     async with httpx.AsyncClient(timeout=5) as client:
         for _ in range(3):
             start = time.monotonic()
             try:
-                resp = await client.head(url)
+                resp = await client.head(
+                    dest.pinned_url, headers=headers, extensions=extensions
+                )
                 codes.append(resp.status_code)
                 stream = resp.extensions.get("network_stream")
                 if stream:
@@ -49,8 +65,6 @@ async def probe_webhook(url: str) -> dict:
             finally:
                 latencies.append(int((time.monotonic() - start) * 1000))
 
-    if not allowed:
-        warnings.append("ip_not_allowed")
     if tls_self_signed:
         warnings.append("tls_self_signed")
 
@@ -67,6 +81,6 @@ async def probe_webhook(url: str) -> dict:
         "tls": {"version": tls_version, "expires_at": tls_expires_at},
         "latency_ms": {"p50": p50, "p95": p95},
         "status_codes": codes,
-        "allowed": allowed,
+        "allowed": True,
         "warnings": warnings,
     }
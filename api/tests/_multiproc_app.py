@@ -0,0 +1,43 @@
+"""App served by the worker processes started in ``test_multiproc_workers``."""
+
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+from redis.asyncio import from_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from api.app import multiproc
+from api.app import routes_metrics
+from api.app import routes_orders_batch as batch
+from api.app.middlewares.prometheus import PrometheusMiddleware
+
+
+async def _create_order(session, table_code, lines):
+    return os.getpid()
+
+
+batch.get_engine = lambda tenant_id: create_async_engine("sqlite+aiosqlite://")
+batch.orders_repo_sql.create_order = _create_order
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.redis = from_url(os.environ["REDIS_URL"])
+    if multiproc.acquire_host_lock("background"):
+        await app.state.redis.incr("test:background_started")
+    yield
+    await app.state.redis.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(PrometheusMiddleware)
+app.include_router(routes_metrics.router)
+app.include_router(batch.router)
+
+
+@app.middleware("http")
+async def _worker_pid(request, call_next):
+    response = await call_next(request)
+    response.headers["X-Worker-Pid"] = str(os.getpid())
+    return response
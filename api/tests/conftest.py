@@ -12,4 +12,12 @@ os.environ.setdefault("ALLOWED_ORIGINS", "http://example.com")
 # import-time failures when DATABASE_URL or POSTGRES_MASTER_URL are missing.
 os.environ.setdefault("POSTGRES_MASTER_URL", "sqlite+aiosqlite:///:memory:")
 
-app_db.SessionLocal, app_db.engine = app_db.create_test_session()
+if app_db.SessionLocal is None:
+    app_db.SessionLocal, app_db.engine = app_db.create_test_session()
+
+# main imports route modules and Pillow lazily; import the real ones here so
+# the ``sys.modules.setdefault`` stubs in some test modules stay fallbacks
+import PIL.Image  # noqa: E402,F401
+import PIL.ImageOps  # noqa: E402,F401
+
+import api.app.routes_webhook_tools  # noqa: E402,F401
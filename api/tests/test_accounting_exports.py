@@ -198,3 +198,37 @@ async def test_gst_summary_csv(gst_seeded_session, monkeypatch):
         ]
         assert rows[1] == ["5", "200.0", "5.0", "5.0", "0.0", "210.0"]
         assert rows[2] == ["12", "200.0", "12.0", "12.0", "0.0", "224.0"]
+
+
+@pytest.mark.anyio
+async def test_sales_register_csv_pages(tenant_session, monkeypatch):
+    for idx in range(3):
+        tenant_session.add(
+            Invoice(
+                order_group_id=idx + 1,
+                number=f"INV{idx + 1}",
+                bill_json={"subtotal": 10.0, "tax_breakup": {5: 0.5}, "total": 10.5},
+                total=10.5,
+                created_at=datetime(2024, 1, 2, tzinfo=timezone.utc),
+            )
+        )
+    await tenant_session.commit()
+
+    @asynccontextmanager
+    async def fake_session(tenant_id: str):
+        yield tenant_session
+
+    monkeypatch.setattr(routes_accounting_exports, "_session", fake_session)
+    monkeypatch.setattr(routes_accounting_exports, "PAGE_SIZE", 2)
+
+    app = FastAPI()
+    app.include_router(routes_accounting_exports.router)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get(
+            "/api/outlet/demo/accounting/sales_register.csv?from=2024-01-02&to=2024-01-02"
+        )
+        assert resp.status_code == 200
+        rows = list(csv.reader(io.StringIO(resp.text)))
+        assert [r[1] for r in rows[1:4]] == ["INV1", "INV2", "INV3"]
+        assert rows[4] == ["TOTAL", "", "30.0", "1.5", "31.5"]
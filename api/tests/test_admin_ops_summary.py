@@ -25,7 +25,7 @@ def test_admin_ops_summary(tmp_path, monkeypatch):
     webhook_failures_total.labels(destination="x").inc(1)
 
     now = int(time.time())
-    asyncio.run(app.state.redis.set("cb:x:until", now + 30))
+    asyncio.run(app.state.redis.hset("cb:open", "x", now + 30))
 
     async def fake_preflight():
         return {"status": "ok"}
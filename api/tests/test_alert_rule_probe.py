@@ -10,6 +10,7 @@ import itertools  # noqa: E402
 import os  # noqa: E402
 import ssl  # noqa: E402
 import types  # noqa: E402
+from ipaddress import ip_address  # noqa: E402
 
 from fastapi import APIRouter  # noqa: E402
 
@@ -31,6 +32,7 @@ from httpx import ASGITransport, AsyncClient  # noqa: E402
 from api.app import routes_alerts  # noqa: E402
 from api.app.auth import create_access_token  # noqa: E402
 from api.app.main import app  # noqa: E402
+from api.app.security.webhook_egress import Destination  # noqa: E402
 from api.app.utils import webhook_probe  # noqa: E402
 
 app.state.redis = fakeredis.aioredis.FakeRedis()
@@ -100,11 +102,31 @@ def test_probe_webhook_warns(monkeypatch):
         async def __aexit__(self, exc_type, exc, tb):
             pass
 
-        async def head(self, url):
+        async def head(self, url, **kwargs):
             raise httpx.HTTPError("tls") from ssl.SSLCertVerificationError("bad cert")
 
+    async def fake_resolve(url):
+        return Destination(url=url, host="bad", ip=ip_address("93.184.216.34"))
+
     monkeypatch.setattr(webhook_probe.httpx, "AsyncClient", DummyClient)
-    monkeypatch.setattr(webhook_probe, "is_allowed_url", lambda url: True)
+    monkeypatch.setattr(webhook_probe, "resolve_destination", fake_resolve)
 
     report = asyncio.run(webhook_probe.probe_webhook("https://bad"))
     assert set(report["warnings"]) == {"tls_self_signed", "bad_status"}
+
+
+def test_probe_webhook_skips_blocked_destination(monkeypatch):
+    class FailingClient:
+        def __init__(self, *args, **kwargs):
+            raise AssertionError("blocked destinations must not be contacted")
+
+    async def blocked(url):
+        return None
+
+    monkeypatch.setattr(webhook_probe.httpx, "AsyncClient", FailingClient)
+    monkeypatch.setattr(webhook_probe, "resolve_destination", blocked)
+
+    report = asyncio.run(webhook_probe.probe_webhook("https://10.0.0.1/hook"))
+    assert report["allowed"] is False
+    assert report["warnings"] == ["ip_not_allowed"]
+    assert report["status_codes"] == []
@@ -1,3 +1,4 @@
+import asyncio
 import builtins
 import hashlib
 import hmac
@@ -75,6 +76,10 @@ def _master_session(provider: str | None = "razorpay", sandbox: bool = False):
     return _session
 
 
+def _outlet_version() -> int:
+    return int(asyncio.run(app.state.redis.get("outlet:ver:demo")) or 0)
+
+
 def test_start_disabled_env(client, monkeypatch):
     monkeypatch.delenv("ENABLE_GATEWAY", raising=False)
     monkeypatch.setattr(routes_checkout_gateway, "get_session", _master_session())
@@ -118,6 +123,7 @@ def test_webhook_signature_validation(provider, secret_env, client, monkeypatch)
     )
 
     payments: list = []
+    rollups: list = []
     invoice = types.SimpleNamespace(settled=False, settled_at=None)
 
     async def _tenant_session(tenant: str):
@@ -128,6 +134,9 @@ def test_webhook_signature_validation(provider, secret_env, client, monkeypatch)
             def add(self, obj):
                 payments.append(obj)
 
+            async def execute(self, stmt, params=None):
+                rollups.append(params)
+
             async def commit(self):
                 pass
 
@@ -179,6 +188,7 @@ def test_refund_requires_idempotency_key(client, monkeypatch):
     )
 
     payments: list = []
+    rollups: list = []
     invoice = types.SimpleNamespace(settled=True, settled_at=None)
 
     async def _tenant_session(tenant: str):
@@ -189,6 +199,9 @@ def test_refund_requires_idempotency_key(client, monkeypatch):
             def add(self, obj):
                 payments.append(obj)
 
+            async def execute(self, stmt, params=None):
+                rollups.append(params)
+
             async def commit(self):
                 pass
 
@@ -229,6 +242,7 @@ def test_refund_duplicate_no_new_payment(client, monkeypatch):
     )
 
     payments: list = []
+    rollups: list = []
     invoice = types.SimpleNamespace(settled=True, settled_at=None)
 
     order_id = "o1"
@@ -241,6 +255,9 @@ def test_refund_duplicate_no_new_payment(client, monkeypatch):
             def add(self, obj):
                 payments.append(obj)
 
+            async def execute(self, stmt, params=None):
+                rollups.append(params)
+
             async def commit(self):
                 pass
 
@@ -295,6 +312,7 @@ def test_e2e_start_webhook_flow(client, monkeypatch):
     monkeypatch.setattr(routes_checkout_gateway, "get_session", master_session)
 
     payments: list = []
+    rollups: list = []
     invoice = types.SimpleNamespace(settled=False, settled_at=None)
 
     async def _tenant_session(tenant: str):
@@ -305,6 +323,9 @@ def test_e2e_start_webhook_flow(client, monkeypatch):
             def add(self, obj):
                 payments.append(obj)
 
+            async def execute(self, stmt, params=None):
+                rollups.append(params)
+
             async def commit(self):
                 pass
 
@@ -345,6 +366,7 @@ def test_e2e_start_webhook_flow(client, monkeypatch):
     assert invoice.settled
     assert len(payments) == 1
     assert master_session.tenant.subscription_expires_at > old_expiry
+    assert _outlet_version() == 1
 
     # duplicate webhook should be idempotent
     resp2 = client.post(
@@ -359,6 +381,7 @@ def test_e2e_start_webhook_flow(client, monkeypatch):
     )
     assert resp2.status_code == 200
     assert len(payments) == 1
+    assert _outlet_version() == 1
 
     # refund webhook
     sig_refund = hmac.new(
@@ -382,6 +405,12 @@ def test_e2e_start_webhook_flow(client, monkeypatch):
     assert not invoice.settled
     assert len(payments) == 2
     assert payments[1].amount == -10
+    # both went through the payment-mode rollup
+    assert [(r["mode"], r["amount"]) for r in rollups] == [
+        ("gateway", 10),
+        ("gateway_refund", -10),
+    ]
+    assert _outlet_version() == 2
 
     resp4 = client.post(
         "/api/outlet/demo/checkout/webhook",
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from api.app.db.chunked import Chunked, Throttle, load_checkpoint, run_chunked
+from api.app.models_tenant import BatchCheckpoint
+
+
+async def _setup(tmp_path, rows: int = 25):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/chunked.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(BatchCheckpoint.__table__.create)
+        await conn.execute(
+            text("CREATE TABLE orders (id INTEGER PRIMARY KEY, old INTEGER, note TEXT)")
+        )
+        await conn.execute(
+            text("CREATE TABLE order_items (id INTEGER PRIMARY KEY, order_id INTEGER)")
+        )
+        for i in range(1, rows + 1):
+            await conn.execute(
+                text("INSERT INTO orders VALUES (:id, :old, 'x')"),
+                {"id": i, "old": int(i % 5 != 0)},
+            )
+            await conn.execute(
+                text("INSERT INTO order_items (order_id) VALUES (:id)"), {"id": i}
+            )
+    return engine
+
+
+async def _count(session, sql: str) -> int:
+    return (await session.execute(text(sql))).scalar()
+
+
+def test_chunked_delete_counts_and_children(tmp_path):
+    async def scenario():
+        engine = await _setup(tmp_path)
+        stmt = Chunked(
+            "orders", "old = :old", {"old": 1}, children=(("order_items", "order_id"),)
+        )
+        async with AsyncSession(engine) as session:
+            deleted = await run_chunked(session, stmt, checkpoint="t", chunk_size=4)
+            left = await _count(session, "SELECT COUNT(*) FROM orders")
+            items = await _count(session, "SELECT COUNT(*) FROM order_items")
+            saved = await load_checkpoint(session, "t")
+        await engine.dispose()
+        return deleted, left, items, saved
+
+    assert asyncio.run(scenario()) == (20, 5, 5, None)
+
+
+def test_chunked_delete_resumes_from_checkpoint(tmp_path):
+    async def scenario():
+        engine = await _setup(tmp_path)
+        stmt = Chunked("orders", "old = 1")
+        async with AsyncSession(engine) as session:
+            first = await run_chunked(
+                session, stmt, checkpoint="resume", chunk_size=3, max_chunks=2
+            )
+            saved = await load_checkpoint(session, "resume")
+            # rows at or below the checkpoint are not revisited
+            await session.execute(text("INSERT INTO orders VALUES (0, 1, 'x')"))
+            await session.commit()
+            second = await run_chunked(session, stmt, checkpoint="resume", chunk_size=3)
+            cleared = await load_checkpoint(session, "resume")
+            left = await _count(session, "SELECT COUNT(*) FROM orders WHERE old = 1")
+        await engine.dispose()
+        return first, saved, second, cleared, left
+
+    first, saved, second, cleared, left = asyncio.run(scenario())
+    assert first == 6
+    assert saved == 7  # ids 1-4, 6, 7 deleted
+    assert second == 14
+    assert cleared is None
+    assert left == 1
+
+
+def test_chunked_update(tmp_path):
+    async def scenario():
+        engine = await _setup(tmp_path, rows=10)
+        stmt = Chunked("orders", "old = 1", assignments="note = ''")
+        async with AsyncSession(engine) as session:
+            updated = await run_chunked(session, stmt, chunk_size=3)
+            blank = await _count(session, "SELECT COUNT(*) FROM orders WHERE note = ''")
+        await engine.dispose()
+        return updated, blank
+
+    assert asyncio.run(scenario()) == (8, 8)
+
+
+def test_chunked_rejects_bad_identifiers():
+    with pytest.raises(ValueError):
+        Chunked("orders; DROP TABLE x", "1 = 1").statement(None)
+
+
+def test_throttle_sleeps_for_overrun_and_replica_lag():
+    slept: list[float] = []
+    lags = iter([12.0, None, 1.0])
+
+    async def sleep(secs: float) -> None:
+        slept.append(secs)
+
+    async def probe():
+        return next(lags)
+
+    async def scenario():
+        plain = Throttle(target_secs=0.5, sleep=sleep)
+        assert await plain.pause(0.2) == 0
+        assert await plain.pause(1.5) == 1.0
+        lagging = Throttle(target_secs=0.5, max_lag=5, lag_probe=probe, sleep=sleep)
+        return await lagging.pause(0.1)
+
+    assert asyncio.run(scenario()) == 17.0
+    assert slept == [1.0, 12.0, 5.0]
+
+
+def test_throttle_caps_total_sleep():
+    slept: list[float] = []
+
+    async def sleep(secs: float) -> None:
+        slept.append(secs)
+
+    async def probe():
+        return 100.0
+
+    throttle = Throttle(max_sleep=30, lag_probe=probe, sleep=sleep)
+    assert asyncio.run(throttle.pause(0)) == 30
+    assert slept == [30]
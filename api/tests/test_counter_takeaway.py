@@ -86,6 +86,7 @@ async def test_takeaway_flow() -> None:
         assert order_resp.status_code == 200
         order_id = order_resp.json()["data"]["order_id"]
 
+        version = int(await app.state.redis.get("outlet:ver:demo") or 0)
         token = create_access_token({"sub": "admin@example.com", "role": "super_admin"})
         status_resp = await client.post(
             f"/api/outlet/demo/counters/{order_id}/status",
@@ -94,6 +95,7 @@ async def test_takeaway_flow() -> None:
         )
         assert status_resp.status_code == 200
         assert status_resp.json()["data"]["invoice_id"] is not None
+        assert int(await app.state.redis.get("outlet:ver:demo")) == version + 1
 
     async with Session() as session:
         count = await session.scalar(select(func.count()).select_from(Invoice))
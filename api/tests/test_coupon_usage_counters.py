@@ -0,0 +1,157 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from api.app import models_tenant
+from api.app.repos_sqlalchemy import coupon_usage_repo_sql, invoices_repo_sql
+from api.app.services import billing_service
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def sessions(tmp_path, monkeypatch):
+    @asynccontextmanager
+    async def fake_master_session():
+        class Dummy:
+            async def get(self, model, tenant_id):
+                class T:
+                    inv_prefix = "CPN"
+                    inv_reset = "never"
+
+                return T()
+
+        yield Dummy()
+
+    monkeypatch.setattr(invoices_repo_sql, "get_master_session", fake_master_session)
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/coupons.db", connect_args={"timeout": 30}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(models_tenant.Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    yield factory
+    await engine.dispose()
+
+
+async def _redeem(sessions, code: str, guest_id: int, outlet_id: int = 1) -> str:
+    async with sessions() as session:
+        try:
+            await invoices_repo_sql.generate_invoice(
+                session,
+                0,
+                "unreg",
+                "nearest_1",
+                "t",
+                coupons=[{"code": code, "percent": 10, "is_stackable": True}],
+                guest_id=guest_id,
+                outlet_id=outlet_id,
+            )
+            await session.commit()
+        except billing_service.CouponError as exc:
+            return exc.code
+    return "OK"
+
+
+async def _counters(sessions, coupon_id: int) -> dict[str, int]:
+    async with sessions() as session:
+        rows = await session.execute(
+            select(
+                models_tenant.CouponUsageCounter.scope,
+                models_tenant.CouponUsageCounter.bucket,
+                models_tenant.CouponUsageCounter.used,
+            ).where(models_tenant.CouponUsageCounter.coupon_id == coupon_id)
+        )
+        return {f"{scope}:{bucket}": used for scope, bucket, used in rows.all()}
+
+
+@pytest.mark.anyio
+async def test_daily_cap_holds_under_concurrent_redemptions(sessions):
+    async with sessions() as session:
+        coupon = models_tenant.Coupon(
+            code="RUSH", percent=10, is_stackable=True, per_day_cap=3
+        )
+        session.add(coupon)
+        await session.commit()
+
+    results = await asyncio.gather(
+        *(_redeem(sessions, "RUSH", guest_id=i) for i in range(10))
+    )
+
+    assert results.count("OK") == 3
+    assert results.count("DAILY_CAP") == 7
+    async with sessions() as session:
+        used = await session.scalar(select(func.count(models_tenant.CouponUsage.id)))
+        invoices = await session.scalar(select(func.count(models_tenant.Invoice.id)))
+    assert used == invoices == 3
+    today = coupon_usage_repo_sql.day_bucket(datetime.now(timezone.utc))
+    counters = await _counters(sessions, coupon.id)
+    assert counters[f"day:{today}"] == 3
+    assert counters["outlet:1"] == 3
+
+
+@pytest.mark.anyio
+async def test_failed_claim_releases_other_scopes(sessions):
+    async with sessions() as session:
+        coupon = models_tenant.Coupon(
+            code="ONE", percent=10, is_stackable=True, per_outlet_cap=1
+        )
+        session.add(coupon)
+        await session.commit()
+
+    results = await asyncio.gather(
+        *(_redeem(sessions, "ONE", guest_id=7) for _ in range(4))
+    )
+
+    assert sorted(results) == ["OK", "OUTLET_CAP", "OUTLET_CAP", "OUTLET_CAP"]
+    today = coupon_usage_repo_sql.day_bucket(datetime.now(timezone.utc))
+    assert await _counters(sessions, coupon.id) == {
+        f"day:{today}": 1,
+        "guest:7": 1,
+        "outlet:1": 1,
+    }
+
+
+@pytest.mark.anyio
+async def test_reconcile_rebuilds_counters(sessions):
+    now = datetime.now(timezone.utc)
+    async with sessions() as session:
+        coupon = models_tenant.Coupon(code="OLD", percent=5, per_guest_cap=2)
+        session.add(coupon)
+        await session.flush()
+        session.add_all(
+            [
+                models_tenant.CouponUsage(coupon_id=coupon.id, guest_id=1, used_at=now),
+                models_tenant.CouponUsage(
+                    coupon_id=coupon.id, guest_id=1, outlet_id=2, used_at=now
+                ),
+                models_tenant.CouponUsage(
+                    coupon_id=coupon.id, outlet_id=2, used_at=now - timedelta(days=9)
+                ),
+                models_tenant.CouponUsageCounter(
+                    coupon_id=coupon.id, scope="guest", bucket="1", used=40
+                ),
+            ]
+        )
+        await session.commit()
+
+        written = await coupon_usage_repo_sql.reconcile(session, now.date())
+        await session.commit()
+
+    today = coupon_usage_repo_sql.day_bucket(now)
+    assert written == 3
+    assert await _counters(sessions, coupon.id) == {
+        f"day:{today}": 2,
+        "guest:1": 2,
+        "outlet:2": 2,
+    }
+    # the backfilled guest counter now enforces the cap
+    assert await _redeem(sessions, "OLD", guest_id=1) == "GUEST_CAP"
+    assert await _redeem(sessions, "OLD", guest_id=3) == "OK"
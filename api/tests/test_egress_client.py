@@ -0,0 +1,183 @@
+import asyncio
+import pathlib
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ipaddress import ip_address
+
+import httpx
+import pytest
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+
+from api.app.security import webhook_egress  # noqa: E402
+from api.app.security.dns_cache import DNSCache  # noqa: E402
+from api.app.security.egress_client import (  # noqa: E402
+    EgressBlocked,
+    EgressClient,
+    SyncEgressClient,
+)
+
+
+class StubResolver:
+    """Async resolver returning canned ``(addresses, ttl)`` answers."""
+
+    def __init__(self, answers, delay=0.0):
+        self.answers = answers
+        self.delay = delay
+        self.calls = []
+
+    async def __call__(self, host):
+        self.calls.append(host)
+        await asyncio.sleep(self.delay)
+        return self.answers[host]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def _allow_hosts(monkeypatch):
+    monkeypatch.setenv("WEBHOOK_ALLOW_HOSTS", "hooks.example.com")
+
+
+@pytest.mark.anyio
+async def test_dns_cache_respects_record_ttl() -> None:
+    clock = Clock()
+    resolver = StubResolver({"hooks.example.com": (["1.2.3.4"], 30)})
+    cache = DNSCache(resolver, default_ttl=60, max_ttl=300, clock=clock)
+
+    assert await cache.resolve("hooks.example.com") == [ip_address("1.2.3.4")]
+    clock.now = 29
+    resolver.answers["hooks.example.com"] = (["5.6.7.8"], 30)
+    assert await cache.resolve("HOOKS.example.com") == [ip_address("1.2.3.4")]
+    clock.now = 31
+    assert await cache.resolve("hooks.example.com") == [ip_address("5.6.7.8")]
+    assert len(resolver.calls) == 2
+
+
+@pytest.mark.anyio
+async def test_dns_cache_caps_ttl_and_caches_failures() -> None:
+    clock = Clock()
+    resolver = StubResolver(
+        {"long.example.com": (["1.2.3.4"], 86400), "gone.example.com": ([], None)}
+    )
+    cache = DNSCache(resolver, negative_ttl=5, max_ttl=300, clock=clock)
+
+    await cache.resolve("long.example.com")
+    assert await cache.resolve("gone.example.com") == []
+    assert await cache.resolve("gone.example.com") == []
+    clock.now = 6
+    await cache.resolve("gone.example.com")
+    await cache.resolve("long.example.com")
+    clock.now = 301
+    await cache.resolve("long.example.com")
+    assert resolver.calls == [
+        "long.example.com",
+        "gone.example.com",
+        "gone.example.com",
+        "long.example.com",
+    ]
+
+
+@pytest.mark.anyio
+async def test_dns_cache_shares_concurrent_lookups() -> None:
+    resolver = StubResolver({"hooks.example.com": (["1.2.3.4"], 60)}, delay=0.05)
+    cache = DNSCache(resolver)
+
+    results = await asyncio.gather(
+        *(cache.resolve("hooks.example.com") for _ in range(20))
+    )
+    assert resolver.calls == ["hooks.example.com"]
+    assert all(r == [ip_address("1.2.3.4")] for r in results)
+
+
+@pytest.mark.anyio
+async def test_resolve_destination_pins_checked_address() -> None:
+    resolver = StubResolver({"hooks.example.com": (["93.184.216.34"], 60)})
+    dns = DNSCache(resolver)
+
+    dest = await webhook_egress.resolve_destination(
+        "https://hooks.example.com:8443/in?x=1", dns
+    )
+    assert dest.pinned_url == "https://93.184.216.34:8443/in?x=1"
+    assert dest.host_header == "hooks.example.com:8443"
+    assert dest.tls
+
+    resolver.answers["hooks.example.com"] = (["93.184.216.34", "10.0.0.1"], 60)
+    dns.clear()
+    assert await webhook_egress.resolve_destination(
+        "https://hooks.example.com/in", dns
+    ) is None
+
+
+@pytest.mark.anyio
+async def test_egress_client_pins_requests() -> None:
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(204)
+
+    dns = DNSCache(StubResolver({"hooks.example.com": (["93.184.216.34"], 60)}))
+    client = EgressClient(dns, transport=httpx.MockTransport(handler))
+    resp = await client.post("https://hooks.example.com/in", json={"a": 1})
+    assert resp.status_code == 204
+    assert str(seen[0].url) == "https://93.184.216.34/in"
+    assert seen[0].headers["Host"] == "hooks.example.com"
+    assert seen[0].extensions["sni_hostname"] == "hooks.example.com"
+
+    with pytest.raises(EgressBlocked):
+        await client.post("https://internal.example.com/in")
+    assert len(seen) == 1
+    await client.aclose()
+
+
+class _Recorder(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    peers: list = []
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.peers.append((self.client_address, self.headers["Host"]))
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+def test_sync_client_reuses_connections_to_local_server(monkeypatch) -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Recorder)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    # Loopback is never allowed for real egress; accept it for the local server
+    monkeypatch.setattr(webhook_egress, "_ips_allowed", lambda ips: bool(ips))
+    dns = DNSCache(sync_resolver=lambda host: (["127.0.0.1"], None))
+    client = SyncEgressClient(dns)
+    url = f"http://hooks.example.com:{server.server_port}/in"
+    try:
+        for _ in range(3):
+            assert client.post(url, content=b"{}").text == "ok"
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+    assert len(_Recorder.peers) == 3
+    assert len({peer for peer, _ in _Recorder.peers}) == 1
+    assert {host for _, host in _Recorder.peers} == {
+        f"hooks.example.com:{server.server_port}"
+    }
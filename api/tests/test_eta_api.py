@@ -1,23 +1,36 @@
-from datetime import datetime
+import asyncio
+from collections import OrderedDict
 
+import fakeredis.aioredis
+import pytest
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from api.app.eta import service as eta_service
+from api.app import routes_eta
+from api.app.eta import prep_stats
 from api.app.routes_eta import router as eta_router
 
 app = FastAPI()
 app.include_router(eta_router)
+app.state.redis = fakeredis.aioredis.FakeRedis()
 client = TestClient(app)
 
 
 def test_get_eta(monkeypatch):
-    now = datetime.utcnow()
-    fake = {"eta_ms": 1000, "promised_at": now, "components": []}
+    calls = []
 
-    monkeypatch.setattr(eta_service, "eta_for_order", lambda *a, **k: fake)
-    resp = client.get("/orders/1/eta")
+    async def item_ids(tenant_id, order_id):
+        calls.append((tenant_id, order_id))
+        return [7, 8]
+
+    monkeypatch.setattr(routes_eta, "_order_item_ids", item_ids)
+    monkeypatch.setattr(prep_stats, "_cache", OrderedDict())
+    asyncio.run(prep_stats.record(app.state.redis, "demo", [(7, 1200.0)] * 5))
+
+    resp = client.get("/orders/1/eta", headers={"X-Tenant-ID": "demo"})
     assert resp.status_code == 200
     body = resp.json()["data"]
-    assert body["eta_ms"] == 1000
+    assert calls == [("demo", 1)]
+    # item 7 has a sketch; its prep time outweighs the SLA default of item 8
+    assert body["eta_ms"] == pytest.approx(1200 * 1000, rel=0.02)
     assert "promised_at" in body
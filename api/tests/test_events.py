@@ -1,4 +1,5 @@
 # test_events.py
+import asyncio
 import pathlib
 import sys
 import time
@@ -8,7 +9,7 @@ sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
 import fakeredis.aioredis
 from fastapi.testclient import TestClient
 
-from api.app.events import ALERTS, EMA_UPDATES, REPORTS
+from api.app.events import ALERTS, EMA_UPDATES, REPORTS, EventBus
 from api.app.main import app
 
 app.state.redis = fakeredis.aioredis.FakeRedis()
@@ -52,3 +53,26 @@ def test_table_cleaned_event_dispatch():
         client.post("/tables/55/mark-clean")
         assert _wait_for(lambda: len(REPORTS) == 1)
     assert REPORTS[0]["table_id"] == "55"
+
+
+def test_relay_delivers_events_of_its_own_host_only():
+    redis = fakeredis.aioredis.FakeRedis()
+    first, second = EventBus(), EventBus()
+    first.bind(redis, host="host-a")
+    second.bind(redis, host="host-b")
+    got_first = first.subscribe("order.placed")
+    got_second = second.subscribe("order.placed")
+
+    async def scenario():
+        relays = [asyncio.create_task(bus.relay(redis)) for bus in (first, second)]
+        await asyncio.sleep(0.05)
+        await first.publish("order.placed", {"table_id": "1"})
+        await second.publish("order.placed", {"table_id": "2"})
+        await asyncio.sleep(0.05)
+        for task in relays:
+            task.cancel()
+        await asyncio.gather(*relays, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert [got_first.get_nowait()] == [{"table_id": "1"}] and got_first.empty()
+    assert [got_second.get_nowait()] == [{"table_id": "2"}] and got_second.empty()
@@ -1,4 +1,3 @@
-import asyncio
 import pathlib
 import sys
 
@@ -14,13 +13,10 @@ from api.app import routes_exports  # noqa: E402
 def test_exports_ratelimit(monkeypatch):
     app.state.redis = fakeredis.aioredis.FakeRedis()
 
-    async def _allow(redis, ip, key, rate_per_min=60, burst=1):
-        return False
+    async def _hit(redis, ip, key, rate_per_min=60, burst=1):
+        return routes_exports.ratelimit.RateLimitResult(False, 0, 15)
 
-    monkeypatch.setattr(routes_exports.ratelimit, "allow", _allow)
-
-    # simulate existing TTL for retry hint
-    asyncio.run(app.state.redis.setex("ratelimit:testclient:exports", 15, 1))
+    monkeypatch.setattr(routes_exports.ratelimit, "hit", _hit)
 
     client = TestClient(app)
     resp = client.get(
@@ -29,4 +25,4 @@ def test_exports_ratelimit(monkeypatch):
     assert resp.status_code == 429
     body = resp.json()
     assert body["code"] == "RATE_LIMIT"
-    assert "retry in" in body["hint"]
+    assert body["hint"] == "retry in 15s"
@@ -0,0 +1,70 @@
+import asyncio
+
+import fakeredis.aioredis
+import pytest
+
+from api.app.utils import fanout
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_fan_out_bounded_concurrency():
+    running = 0
+    peak = 0
+
+    async def worker(tid: str) -> str:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return tid.upper()
+
+    res = await fanout.fan_out([f"t{i}" for i in range(10)], worker, concurrency=3)
+    assert peak == 3
+    assert res.results["t7"] == "T7"
+    assert res.failed == {}
+
+
+@pytest.mark.anyio
+async def test_fan_out_reports_partial_results():
+    async def worker(tid: str) -> int:
+        if tid == "slow":
+            await asyncio.sleep(1)
+        if tid == "bad":
+            raise RuntimeError("boom")
+        return 1
+
+    res = await fanout.fan_out(["ok", "slow", "bad"], worker, timeout=0.05)
+    assert res.results == {"ok": 1}
+    assert res.failures() == [
+        {"id": "bad", "reason": "error"},
+        {"id": "slow", "reason": "timeout"},
+    ]
+
+
+@pytest.mark.anyio
+async def test_cached_slices_invalidate_per_outlet():
+    redis = fakeredis.aioredis.FakeRedis()
+    calls: list[str] = []
+
+    async def worker(tid: str) -> dict:
+        calls.append(tid)
+        return {"tid": tid}
+
+    res = await fanout.cached_fan_out(redis, "charts", "p", ["t1", "t2"], worker)
+    assert res.results == {"t1": {"tid": "t1"}, "t2": {"tid": "t2"}}
+    assert sorted(calls) == ["t1", "t2"]
+
+    calls.clear()
+    await fanout.cached_fan_out(redis, "charts", "p", ["t1", "t2"], worker)
+    assert calls == []
+
+    await fanout.invalidate_outlet(redis, "t2")
+    res = await fanout.cached_fan_out(redis, "charts", "p", ["t1", "t2"], worker)
+    assert calls == ["t2"]
+    assert res.results["t1"] == {"tid": "t1"}
@@ -68,6 +68,7 @@ def test_sandbox_e2e(client, monkeypatch):
     )
 
     payments: list = []
+    rollups: list = []
     invoice = types.SimpleNamespace(settled=False, settled_at=None)
 
     async def _tenant_session(tenant: str):
@@ -78,6 +79,9 @@ def test_sandbox_e2e(client, monkeypatch):
             def add(self, obj):
                 payments.append(obj)
 
+            async def execute(self, stmt, params=None):
+                rollups.append(params)
+
             async def commit(self):
                 pass
 
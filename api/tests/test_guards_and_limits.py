@@ -117,13 +117,13 @@ def test_guest_post_rate_limit(client, monkeypatch):
 
     monkeypatch.setattr(sg_module, "get_session", _valid_session)
 
-    orig_allow = ratelimit.allow
+    orig_hit = ratelimit.hit
 
-    async def _allow(redis, ip, key, rate_per_min=60, burst=100):
+    async def _hit(redis, ip, key, rate_per_min=60, burst=100):
         # limit to 2 requests by using a tiny burst
-        return await orig_allow(redis, ip, key, rate_per_min=60, burst=2)
+        return await orig_hit(redis, ip, key, rate_per_min=60, burst=2)
 
-    monkeypatch.setattr(ratelimit, "allow", _allow)
+    monkeypatch.setattr(ratelimit, "hit", _hit)
 
     headers = {"X-Tenant-ID": "demo"}
 
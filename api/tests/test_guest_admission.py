@@ -0,0 +1,176 @@
+import asyncio
+import pathlib
+import sys
+import threading
+from types import SimpleNamespace
+
+import fakeredis.aioredis
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+
+from api.app.guest_admission import (  # noqa: E402
+    GuestAdmission,
+    record_room,
+    record_table,
+    write_state,
+)
+from api.app.middlewares import guest_admission as admission_mw  # noqa: E402
+from api.app.middlewares.guest_admission import GuestAdmissionMiddleware  # noqa: E402
+from api.app.security import blocklist, ip_reputation  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _app(tables: dict, rooms: dict, loads: list):
+    async def load_table(token):
+        loads.append(("table", token))
+        return tables.get(token)
+
+    async def load_room(token):
+        loads.append(("room", token))
+        return rooms.get(token)
+
+    app = FastAPI()
+    app.add_middleware(
+        GuestAdmissionMiddleware, load_table=load_table, load_room=load_room
+    )
+
+    @app.post("/g/{token}/order")
+    async def _order(token: str):  # pragma: no cover - simple test helper
+        return {"ok": True}
+
+    @app.post("/h/{token}/request")
+    async def _request(token: str):  # pragma: no cover - simple test helper
+        return {"ok": True}
+
+    return app
+
+
+def test_table_state_loaded_once_then_served_from_redis():
+    loads: list = []
+    tables = {"T-1": {"state": "LOCKED", "lang": "hi"}, "T-2": {"state": "AVAILABLE"}}
+    app = _app(tables, {}, loads)
+    redis = fakeredis.aioredis.FakeRedis()
+    clock = FakeClock()
+    app.state.redis = redis
+    app.state.guest_admission = GuestAdmission(redis, clock=clock)
+    client = TestClient(app)
+
+    resp = client.post("/g/T-1/order")
+    assert resp.status_code == 423
+    assert resp.json()["error"]["code"] == "TABLE_LOCKED"
+    assert resp.json()["error"]["message"] == "टेबल तैयार नहीं है"
+    assert client.post("/g/T-2/order").status_code == 200
+    assert client.post("/g/unknown/order").status_code == 200
+    clock.now = 5  # past the local cache
+    assert client.post("/g/T-1/order").status_code == 423
+    assert client.post("/g/T-2/order").status_code == 200
+    assert loads == [("table", "T-1"), ("table", "T-2"), ("table", "unknown")]
+
+    # the unlock path writes the new state through
+    async def unlock():
+        await write_state(redis, "table", ["T-1"], {"state": "AVAILABLE"})
+
+    asyncio.run(unlock())
+    app.state.guest_admission.forget("table", ["T-1"])
+    assert client.post("/g/T-1/order").status_code == 200
+    assert len(loads) == 3
+
+
+def test_local_cache_hides_remote_changes_until_ttl():
+    loads: list = []
+    app = _app({"T-1": {"state": "AVAILABLE"}}, {}, loads)
+    redis = fakeredis.aioredis.FakeRedis()
+    clock = FakeClock()
+    app.state.redis = redis
+    app.state.guest_admission = GuestAdmission(redis, local_ttl=1, clock=clock)
+    client = TestClient(app)
+
+    assert client.post("/g/T-1/order").status_code == 200
+
+    async def lock():
+        await write_state(redis, "table", ["T-1"], {"state": "LOCKED"})
+
+    asyncio.run(lock())
+    assert client.post("/g/T-1/order").status_code == 200
+    clock.now = 1.5
+    assert client.post("/g/T-1/order").status_code == 423
+
+
+def test_room_and_ip_checks_share_one_pipeline():
+    loads: list = []
+    app = _app({}, {"R-1": {"state": "PENDING_CLEANING"}}, loads)
+    redis = fakeredis.aioredis.FakeRedis()
+    app.state.redis = redis
+    app.state.guest_admission = GuestAdmission(redis, local_ttl=0)
+    client = TestClient(app)
+
+    resp = client.post("/h/R-1/request")
+    assert resp.status_code == 423
+    assert resp.json()["error"]["code"] == "ROOM_LOCKED"
+
+    async def block():
+        await blocklist.block_ip(redis, "demo", "testclient", ttl=60)
+
+    asyncio.run(block())
+    resp = client.post("/g/T-9/order", headers={"X-Tenant-ID": "demo"})
+    assert resp.status_code == 429
+    assert resp.json()["error"]["code"] == "ABUSE_COOLDOWN"
+
+    async def mark_bad():
+        await ip_reputation.mark_bad(redis, "testclient")
+
+    asyncio.run(mark_bad())
+    resp = client.post("/g/T-9/order", headers={"X-Tenant-ID": "demo"})
+    assert resp.json()["error"]["code"] == "IP_BLOCKED"
+
+    resp = client.post("/g/T-9/order", headers={"User-Agent": "curl/7.79"})
+    assert resp.json()["error"]["code"] == "UA_BLOCKED"
+
+
+def test_default_loaders_run_off_the_event_loop(monkeypatch):
+    threads = []
+
+    def load_state(token):
+        threads.append(threading.get_ident())
+        return {"state": "AVAILABLE"}
+
+    monkeypatch.setattr(admission_mw, "load_table_state", load_state)
+    monkeypatch.setattr(admission_mw, "load_room_state", load_state)
+
+    async def main():
+        assert await admission_mw._load_table("T-1") == {"state": "AVAILABLE"}
+        assert await admission_mw._load_room("R-1") == {"state": "AVAILABLE"}
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+    assert len(threads) == 2
+    assert loop_thread not in threads
+
+
+def test_record_writes_to_the_callers_client_and_live_admissions():
+    caller = fakeredis.aioredis.FakeRedis()
+    other = fakeredis.aioredis.FakeRedis()
+    admission = GuestAdmission(other, clock=FakeClock())
+    admission._local[("demo", "1.2.3.4", "table", "T-1")] = (1.0, None)
+
+    async def main():
+        await record_table(SimpleNamespace(code="T-1", state="LOCKED"), caller)
+        room = SimpleNamespace(code="R-1", qr_token="qr-1", state="AVAILABLE")
+        await record_room(room, caller)
+        return (
+            await caller.hget("admission:table:T-1", "state"),
+            await other.hget("admission:table:T-1", "state"),
+            await caller.hget("admission:room:qr-1", "state"),
+        )
+
+    assert asyncio.run(main()) == (b"LOCKED", b"LOCKED", b"AVAILABLE")
+    assert admission._local == {}
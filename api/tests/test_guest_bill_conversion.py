@@ -29,7 +29,8 @@ async def _fake_generate_invoice(*args, **kwargs):
 
 async def _fake_get_tenant_session():
     class _Dummy:
-        pass
+        async def commit(self):
+            pass
     return _Dummy()
 
 
@@ -0,0 +1,85 @@
+"""Import-time budget for ``api.app.main``.
+
+Runs ``python -X importtime`` in a fresh interpreter so that startup
+regressions, such as an eagerly imported route module or a heavy library
+imported at module level, fail CI. The structural checks are the gate.
+Wall-clock time depends on the runner's load, so it is compared with the
+import of the frameworks alone, measured alongside: ``api.app.main`` may
+take at most ``IMPORT_BUDGET_RATIO`` (default 3) times as long.
+``IMPORT_BUDGET_MS`` additionally enforces an absolute budget when set.
+"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import re
+import subprocess
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+BUDGET_RATIO = float(os.getenv("IMPORT_BUDGET_RATIO", "3"))
+BUDGET_MS = os.getenv("IMPORT_BUDGET_MS")
+# Imported by the functions or route modules that use them, never at startup
+DEFERRED = ("PIL", "alembic", "boto3", "pyarrow", "qrcode", "weasyprint")
+# Route modules main itself needs; every other one is loaded lazily
+EAGER_ROUTES = {"api.app.routes_metrics"}
+# The floor every app built on this stack pays
+FRAMEWORKS = ("fastapi", "sqlalchemy.ext.asyncio")
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _importtime(code: str) -> dict[str, int]:
+    env = {
+        **os.environ,
+        "DATABASE_URL": os.getenv("DATABASE_URL", "sqlite+aiosqlite://"),
+        "ALLOWED_ORIGINS": os.getenv("ALLOWED_ORIGINS", "http://example.com"),
+        "SECRET_KEY": os.getenv("SECRET_KEY", "x" * 32),
+        "REDIS_URL": os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+    }
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    matches = map(LINE.match, proc.stderr.splitlines())
+    return {m.group(4): int(m.group(2)) for m in matches if m}
+
+
+def _frameworks_ms() -> float:
+    modules = _importtime("import " + ", ".join(FRAMEWORKS))
+    return sum(modules[name] for name in FRAMEWORKS) / 1000
+
+
+def test_main_import_budget():
+    modules = _importtime("import api.app.main")
+
+    route_modules = {
+        name for name in modules if name.startswith("api.app.routes_")
+    } - EAGER_ROUTES
+    assert not route_modules, f"import lazily via router_manifest: {route_modules}"
+    heavy = sorted(
+        name for name in modules if name.split(".")[0] in DEFERRED
+    )
+    assert not heavy, f"defer these imports to where they are used: {heavy}"
+
+    # best of two interleaved runs each, so a load spike hits both sides
+    elapsed_ms = modules["api.app.main"] / 1000
+    baseline_ms = _frameworks_ms()
+    rerun = _importtime("import api.app.main")
+    elapsed_ms = min(elapsed_ms, rerun["api.app.main"] / 1000)
+    baseline_ms = min(baseline_ms, _frameworks_ms())
+    assert elapsed_ms < BUDGET_RATIO * baseline_ms, (
+        f"importing api.app.main took {elapsed_ms:.0f}ms, "
+        f"{elapsed_ms / baseline_ms:.1f}x the {baseline_ms:.0f}ms of "
+        f"{', '.join(FRAMEWORKS)}; budget {BUDGET_RATIO:g}x"
+    )
+    if BUDGET_MS:
+        assert elapsed_ms < float(BUDGET_MS), (
+            f"importing api.app.main took {elapsed_ms:.0f}ms, budget {BUDGET_MS}ms"
+        )
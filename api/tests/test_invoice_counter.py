@@ -2,12 +2,16 @@ import pathlib
 import sys
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
 
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import date
 
 import pytest
 
 from api.app import models_tenant
+from api.app.repos_sqlalchemy import invoices_repo_sql
 from api.app.utils import invoice_counter
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -31,8 +35,9 @@ def anyio_backend():
 async def test_invoice_numbering_never_runs(session):
     jan = invoice_counter.build_series("NEV", "never", date(2024, 1, 1))
     feb = invoice_counter.build_series("NEV", "never", date(2024, 2, 1))
-    n1 = await invoice_counter.next_invoice_number(session, jan)
-    n2 = await invoice_counter.next_invoice_number(session, feb)
+    n1 = await invoice_counter.allocate_invoice_number(session, jan)
+    n2 = await invoice_counter.allocate_invoice_number(session, feb)
+    await session.commit()
     assert n1 == "INV-NEV-0001"
     assert n2 == "INV-NEV-0002"
 
@@ -42,10 +47,81 @@ async def test_invoice_numbering_monthly_reset(session):
     jan = invoice_counter.build_series("MON", "monthly", date(2024, 1, 1))
     feb = invoice_counter.build_series("MON", "monthly", date(2024, 2, 1))
 
-    jan_1 = await invoice_counter.next_invoice_number(session, jan)
-    jan_2 = await invoice_counter.next_invoice_number(session, jan)
-    feb_1 = await invoice_counter.next_invoice_number(session, feb)
+    jan_1 = await invoice_counter.allocate_invoice_number(session, jan)
+    jan_2 = await invoice_counter.allocate_invoice_number(session, jan)
+    feb_1 = await invoice_counter.allocate_invoice_number(session, feb)
+    await session.commit()
 
     assert jan_1 == "INV-MON-202401-0001"
     assert jan_2 == "INV-MON-202401-0002"
     assert feb_1 == "INV-MON-202402-0001"
+
+
+@pytest.mark.anyio
+async def test_allocation_rolls_back_with_transaction(session):
+    first = await invoice_counter.allocate_invoice_number(session, "RB")
+    await session.rollback()
+    again = await invoice_counter.allocate_invoice_number(session, "RB")
+    second = await invoice_counter.allocate_invoice_number(session, "RB")
+    await session.commit()
+    assert first == again == "INV-RB-0001"
+    assert second == "INV-RB-0002"
+
+
+@pytest.mark.anyio
+async def test_concurrent_invoices_are_gap_free(tmp_path, monkeypatch):
+    @asynccontextmanager
+    async def fake_master_session():
+        class Dummy:
+            async def get(self, model, tenant_id):
+                class T:
+                    inv_prefix = "CC"
+                    inv_reset = "never"
+
+                return T()
+
+        yield Dummy()
+
+    monkeypatch.setattr(invoices_repo_sql, "get_master_session", fake_master_session)
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path}/inv.db", connect_args={"timeout": 30}
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(models_tenant.Base.metadata.create_all)
+    async_session = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    async def checkout():
+        async with async_session() as sess:
+            invoice_id = await invoices_repo_sql.generate_invoice(
+                sess, 0, "unreg", "nearest_1", "t"
+            )
+            await sess.commit()
+            return invoice_id
+
+    await asyncio.gather(*(checkout() for _ in range(8)))
+    async with async_session() as sess:
+        numbers = (await sess.scalars(select(models_tenant.Invoice.number))).all()
+    await engine.dispose()
+    assert sorted(numbers) == [f"INV-CC-{i:04d}" for i in range(1, 9)]
+
+
+@pytest.mark.anyio
+async def test_generate_invoice_leaves_commit_to_caller(session, monkeypatch):
+    @asynccontextmanager
+    async def fake_master_session():
+        class Dummy:
+            async def get(self, model, tenant_id):
+                class T:
+                    inv_prefix = "RB"
+                    inv_reset = "never"
+
+                return T()
+
+        yield Dummy()
+
+    monkeypatch.setattr(invoices_repo_sql, "get_master_session", fake_master_session)
+    await invoices_repo_sql.generate_invoice(session, 0, "unreg", "nearest_1", "t")
+    await session.rollback()
+    assert (await session.scalars(select(models_tenant.Invoice))).all() == []
+    # the rolled back bill returned its number to the series
+    assert await invoice_counter.allocate_invoice_number(session, "RB") == "INV-RB-0001"
@@ -0,0 +1,297 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+import fakeredis.aioredis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from api.app.jobs import LEASE_PREFIX, EnginePool, Scheduler, TenantJob
+from api.app.routes_metrics import tenant_job_duration_seconds
+
+
+class FakeClock:
+    """Monotonic clock advanced only by ``sleep``."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, secs: float) -> None:
+        self.now += secs
+        await asyncio.sleep(0)
+
+
+def _tenants(*names):
+    async def load():
+        return [SimpleNamespace(name=name) for name in names]
+
+    return load
+
+
+def _histogram_count(job: str) -> float:
+    for metric in tenant_job_duration_seconds.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_count") and sample.labels == {"job": job}:
+                return sample.value
+    return 0.0
+
+
+class ClockRedis:
+    """Redis double whose keys expire on the scheduler's fake clock."""
+
+    def __init__(self, clock: FakeClock) -> None:
+        self.clock = clock
+        self.store: dict[str, tuple[str, float]] = {}
+
+    def _live(self, key):
+        entry = self.store.get(key)
+        # like Redis, a key lives until its deadline has passed
+        if entry is not None and entry[1] < self.clock():
+            del self.store[key]
+            entry = None
+        return entry
+
+    async def set(self, key, value, nx=False, xx=False, ex=None, px=None):
+        live = self._live(key) is not None
+        if (nx and live) or (xx and not live):
+            return None
+        ttl = px / 1000 if px is not None else ex
+        self.store[key] = (value, self.clock() + ttl)
+        return True
+
+    async def get(self, key):
+        entry = self._live(key)
+        return entry[0] if entry else None
+
+    async def pexpire(self, key, ms):
+        entry = self._live(key)
+        if entry is None:
+            return False
+        self.store[key] = (entry[0], self.clock() + ms / 1000)
+        return True
+
+    async def delete(self, key):
+        self.store.pop(key, None)
+
+
+def test_replicas_share_leases_and_respect_intervals():
+    clock = FakeClock()
+    redis = ClockRedis(clock)
+    runs: list[tuple[str, float]] = []
+
+    async def work(ctx):
+        runs.append((ctx.tenant_id, clock()))
+        # yield before the clock moves, so every tenant task starts at the tick
+        # as it would on a real clock
+        await asyncio.sleep(0)
+        await clock.sleep(4 if clock() < 60 else 1)
+
+    # More tenants than the limit, so the last ones queue behind the others,
+    # for longer in the first pass than in later ones
+    job = TenantJob("sched_lease", work, interval=60, concurrency=2)
+    tenants = _tenants("a", "b", "c", "d", "e")
+    first, second = (
+        Scheduler([job], redis, tenants, clock=clock, sleep=clock.sleep)
+        for _ in range(2)
+    )
+
+    async def scenario():
+        for start in (0, 60, 120):
+            clock.now = start
+            await first.tick()
+            await first.drain()
+            clock.now = start + 30
+            await second.tick()
+            await second.drain()
+
+    asyncio.run(scenario())
+    # every tenant runs once per interval, always on the replica that ticks
+    # first; the other one finds the leases still held
+    for tenant in "abcde":
+        times = [at for t, at in runs if t == tenant]
+        assert [int(at // 60) for at in times] == [0, 1, 2]
+        assert all(at % 60 < 30 for at in times)
+    assert _histogram_count("sched_lease") == 15
+
+
+def test_long_queued_runs_keep_their_lease():
+    clock = FakeClock()
+    redis = ClockRedis(clock)
+    runs: list[tuple[str, str, float, float]] = []
+
+    def work_for(replica):
+        async def work(ctx):
+            start = clock()
+            await asyncio.sleep(0)
+            await clock.sleep(50)
+            runs.append((replica, ctx.tenant_id, start, clock()))
+
+        return work
+
+    # b queues behind a for 50s and then runs for another 50s
+    first, second = (
+        Scheduler(
+            [TenantJob("sched_long", work_for(name), interval=60, concurrency=1)],
+            redis,
+            _tenants("a", "b"),
+            clock=clock,
+            sleep=clock.sleep,
+        )
+        for name in ("first", "second")
+    )
+
+    async def scenario():
+        await first.tick()
+        while clock() < 60:
+            await asyncio.sleep(0)
+        await second.tick()
+        await asyncio.gather(first.drain(), second.drain())
+
+    asyncio.run(scenario())
+    assert [(r, t) for r, t, _, _ in runs] == [("first", "a"), ("first", "b")]
+
+
+def test_lease_renewed_while_job_runs():
+    redis = fakeredis.aioredis.FakeRedis()
+    release = asyncio.Event()
+
+    async def work(ctx):
+        await release.wait()
+
+    job = TenantJob("sched_renew", work, interval=1, lease_ttl=0.05)
+    first = Scheduler([job], redis, _tenants("a"))
+    second = Scheduler([job], redis, _tenants("a"))
+
+    async def scenario():
+        running = asyncio.create_task(first.run_once())
+        await asyncio.sleep(0.2)
+        outcome = await asyncio.wait_for(second.run_once(), 1)
+        release.set()
+        return outcome, await running
+
+    outcome, done = asyncio.run(scenario())
+    assert outcome == {"sched_renew:a": "skipped"}
+    assert done == {"sched_renew:a": "ok"}
+
+
+def test_concurrency_limit_and_jitter():
+    clock = FakeClock()
+    redis = fakeredis.aioredis.FakeRedis()
+    active = 0
+    peak = 0
+
+    async def work(ctx):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    job = TenantJob("sched_limit", work, interval=100, concurrency=2, jitter=10)
+    tenants = _tenants(*(f"t{i}" for i in range(7)))
+    scheduler = Scheduler(
+        [job], redis, tenants, clock=clock, sleep=clock.sleep, rng=random.Random(1)
+    )
+
+    async def scenario():
+        delay = await scheduler.tick()
+        first = scheduler.next_run("sched_limit")
+        assert 0 <= first <= 10 and delay == first
+        clock.now = first
+        await scheduler.tick()
+        await scheduler.drain()
+        return first, scheduler.next_run("sched_limit")
+
+    first, second = asyncio.run(scenario())
+    assert peak == 2
+    assert first + 100 <= second <= first + 110
+
+
+def test_failed_run_releases_lease_for_retry():
+    clock = FakeClock()
+    redis = fakeredis.aioredis.FakeRedis()
+    attempts = []
+
+    async def flaky(ctx):
+        attempts.append(ctx.tenant_id)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+
+    job = TenantJob("sched_retry", flaky, interval=3600)
+    one = Scheduler([job], redis, _tenants("a"), clock=clock, sleep=clock.sleep)
+    two = Scheduler([job], redis, _tenants("a"), clock=clock, sleep=clock.sleep)
+
+    async def scenario():
+        assert await one.run_once() == {"sched_retry:a": "error"}
+        assert await two.run_once() == {"sched_retry:a": "ok"}
+        assert await one.run_once() == {"sched_retry:a": "skipped"}
+        return await redis.ttl(f"{LEASE_PREFIX}sched_retry:a")
+
+    ttl = asyncio.run(scenario())
+    assert attempts == ["a", "a"]
+    assert 0 < ttl <= 3600
+
+
+def test_overlapping_pass_is_skipped():
+    clock = FakeClock()
+    redis = fakeredis.aioredis.FakeRedis()
+    release = asyncio.Event()
+    runs = []
+
+    async def slow(ctx):
+        runs.append(clock())
+        await release.wait()
+
+    job = TenantJob("sched_overlap", slow, interval=10, lease_ttl=1)
+    scheduler = Scheduler(
+        [job], redis, _tenants("a"), clock=clock, sleep=clock.sleep
+    )
+
+    async def scenario():
+        await scheduler.tick()
+        while not runs:
+            await asyncio.sleep(0)
+        clock.now = 10
+        await scheduler.tick()
+        release.set()
+        await scheduler.drain()
+
+    asyncio.run(scenario())
+    assert runs == [0.0]
+    assert scheduler.next_run("sched_overlap") == 20
+
+
+def test_engine_pool_reuses_engines(tmp_path):
+    created = []
+
+    def factory(tenant_id):
+        created.append(tenant_id)
+        return create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/{tenant_id}.db")
+
+    clock = FakeClock()
+    redis = fakeredis.aioredis.FakeRedis()
+    seen = []
+
+    async def work(ctx):
+        async with ctx.session() as session:
+            seen.append((await session.execute(text("SELECT 1"))).scalar())
+
+    pool = EnginePool(factory)
+    job = TenantJob("sched_pool", work, interval=1)
+    scheduler = Scheduler(
+        [job], redis, _tenants("a", "b"), engines=pool, clock=clock, sleep=clock.sleep
+    )
+
+    async def scenario():
+        for _ in range(3):
+            await scheduler.run_once()
+            clock.now += 2
+            await redis.flushall()
+        await pool.dispose()
+
+    asyncio.run(scenario())
+    assert seen == [1] * 6
+    assert sorted(created) == ["a", "b"]
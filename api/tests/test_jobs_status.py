@@ -11,6 +11,7 @@ sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
 from api.app import main as app_main
 from api.app.main import app
 from api.app.auth import create_access_token
+from api.app.redis_registry import record_heartbeat
 
 app.state.redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
 
@@ -40,7 +41,7 @@ def test_jobs_status_endpoint():
     now = datetime.now(timezone.utc)
 
     async def seed() -> None:
-        await r.set("jobs:heartbeat:w1", now.isoformat())
+        await record_heartbeat(r, "w1", now)
         await r.set("jobs:processed:w1", 5)
         await r.zadd(
             "jobs:failures:w1",
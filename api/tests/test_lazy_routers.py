@@ -0,0 +1,148 @@
+"""Tests for lazily registered routers and the router manifest."""
+
+from __future__ import annotations
+
+import pathlib
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+
+ROOT = pathlib.Path(__file__).resolve().parents[2]
+sys.path.append(str(ROOT))
+
+from api.app import lazy_routers  # noqa: E402
+from api.app.lazy_routers import Router  # noqa: E402
+
+ROUTE_A = """
+from fastapi import APIRouter
+
+router = APIRouter()
+
+
+@router.get("/items/{item_id}")
+async def item(item_id: int):
+    return {"module": "a", "id": item_id}
+
+
+@router.get("/shadowed")
+async def shadowed():
+    return {"module": "a"}
+"""
+
+ROUTE_B = """
+from fastapi import APIRouter, WebSocket
+
+extra = APIRouter()
+
+
+@extra.get("/shadowed")
+async def shadowed():
+    return {"module": "b"}
+
+
+@extra.websocket("/ws")
+async def ws(socket: WebSocket):
+    await socket.accept()
+    await socket.send_json({"module": "b"})
+    await socket.close()
+"""
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    pkg = tmp_path / "lazy_pkg"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    (pkg / "routes_a.py").write_text(textwrap.dedent(ROUTE_A))
+    (pkg / "routes_b.py").write_text(textwrap.dedent(ROUTE_B))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "lazy_pkg"
+    for name in [m for m in sys.modules if m.startswith("lazy_pkg")]:
+        del sys.modules[name]
+
+
+SPECS = [
+    Router("routes_a", ("/items/{item_id}", "/shadowed")),
+    Router("routes_b", ("/shadowed", "/ws"), "extra"),
+]
+
+
+def _app(package):
+    app = FastAPI()
+
+    @app.get("/before")
+    async def before():
+        return {"module": "main"}
+
+    lazy_routers.register(app, SPECS, package)
+
+    @app.get("/items/special")
+    async def special():
+        return {"module": "main"}
+
+    return app
+
+
+def test_module_imported_on_first_matching_request(package):
+    app = _app(package)
+    client = TestClient(app)
+
+    assert client.get("/before").json() == {"module": "main"}
+    assert "lazy_pkg.routes_a" not in sys.modules
+
+    assert client.get("/items/7").json() == {"module": "a", "id": 7}
+    assert "lazy_pkg.routes_a" in sys.modules
+    assert "lazy_pkg.routes_b" not in sys.modules
+    # Spliced in at the placeholder: still ahead of routes added after it
+    assert client.get("/items/special").status_code == 422
+    assert client.get("/shadowed").json() == {"module": "a"}
+    assert client.get("/missing").status_code == 404
+
+    with client.websocket_connect("/ws") as socket:
+        assert socket.receive_json() == {"module": "b"}
+    assert [p.loaded for p in app.state.lazy_routers.placeholders] == [True, True]
+    paths = [r.path for r in app.router.routes if isinstance(r, APIRoute)]
+    assert paths[-4:] == [
+        "/items/{item_id}",
+        "/shadowed",
+        "/shadowed",
+        "/items/special",
+    ]
+
+
+def test_openapi_and_warm_up_load_pending_routers(package):
+    app = _app(package)
+    assert "/items/{item_id}" in app.openapi()["paths"]
+    assert not app.state.lazy_routers.pending
+
+    app = _app(package)
+    for name in ("lazy_pkg.routes_a", "lazy_pkg.routes_b"):
+        sys.modules.pop(name, None)
+    with TestClient(app) as client:
+        client.portal.call(app.state.lazy_routers.warm_up)
+    assert not app.state.lazy_routers.pending
+    assert "lazy_pkg.routes_b" in sys.modules
+
+
+def test_eager_registration_when_disabled(package, monkeypatch):
+    monkeypatch.setattr(lazy_routers, "ENABLED", False)
+    app = _app(package)
+    assert not app.state.lazy_routers.pending
+    assert "lazy_pkg.routes_a" in sys.modules
+
+
+def test_router_manifest_is_current():
+    # A fresh interpreter: other test modules stub route modules in sys.modules
+    proc = subprocess.run(
+        [sys.executable, "scripts/gen_router_manifest.py", "--check"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert proc.returncode == 0, proc.stdout + proc.stderr[-2000:]
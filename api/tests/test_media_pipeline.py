@@ -0,0 +1,222 @@
+"""Tests for the off-loop media pipeline, dedupe and usage counter."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import pathlib
+import sys
+from io import BytesIO
+
+import fakeredis.aioredis
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+
+os.environ.setdefault("ALLOWED_ORIGINS", "http://example.com")
+os.environ.setdefault("DB_URL", "postgresql://user@localhost/db")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+os.environ.setdefault("SECRET_KEY", "x" * 32)
+
+from api.app import routes_media  # noqa: E402
+from api.app.main import app  # noqa: E402
+from api.app.media import images  # noqa: E402
+from api.app.middlewares import licensing as lic_module  # noqa: E402
+from api.app.storage.local_backend import LocalBackend  # noqa: E402
+
+
+def _image(fmt: str, size=(1000, 500), **kwargs) -> bytes:
+    buf = BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buf, format=fmt, **kwargs)
+    return buf.getvalue()
+
+
+def test_process_image_variants_in_one_pass():
+    processed = images.process_image(_image("JPEG"), "JPEG", widths=(320, 640, 1280))
+
+    assert [(v.format, v.width, v.height) for v in processed.variants] == [
+        ("JPEG", 1000, 500),
+        ("WEBP", 320, 160),
+        ("AVIF", 320, 160),
+        ("WEBP", 640, 320),
+        ("AVIF", 640, 320),
+        ("WEBP", 1000, 500),
+        ("AVIF", 1000, 500),
+    ]
+    assert processed.size == sum(len(v.data) for v in processed.variants)
+    webp = Image.open(BytesIO(processed.variants[1].data))
+    assert webp.format == "WEBP" and webp.size == (320, 160)
+
+
+def test_process_image_applies_and_strips_exif():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotate 90 degrees clockwise
+    processed = images.process_image(
+        _image("JPEG", (40, 20), exif=exif), "JPEG", widths=()
+    )
+
+    original = Image.open(BytesIO(processed.original.data))
+    assert original.size == (20, 40)
+    assert 0x0112 not in original.getexif()
+
+
+@pytest.mark.parametrize(
+    "contents, message",
+    [
+        (b"not an image", "invalid image"),
+        (_image("PNG", (images.MAX_DIM + 1, 1)), "too big"),
+    ],
+)
+def test_process_image_rejects(contents, message):
+    with pytest.raises(images.ImageRejected, match=message):
+        images.process_image(contents, "PNG")
+
+
+def test_process_runs_in_worker_processes(monkeypatch):
+    monkeypatch.setattr(images, "WORKERS", 1)
+    monkeypatch.setattr(images, "WIDTHS", (8,))
+    monkeypatch.setattr(images, "FORMATS", ("WEBP",))
+    try:
+        processed = asyncio.run(images.process(_image("PNG", (16, 16)), "PNG"))
+        with pytest.raises(images.ImageRejected):
+            asyncio.run(images.process(b"junk", "PNG"))
+    finally:
+        images.shutdown()
+    assert [(v.format, v.width) for v in processed.variants] == [
+        ("PNG", 16),
+        ("WEBP", 8),
+        ("WEBP", 16),
+    ]
+
+
+def test_media_bytes_seeds_counter_once(monkeypatch):
+    calls = []
+
+    def walk(tenant_id):
+        calls.append(tenant_id)
+        return 100
+
+    monkeypatch.setattr(lic_module, "storage_bytes", walk)
+    redis = fakeredis.aioredis.FakeRedis()
+
+    async def run():
+        assert await lic_module.media_bytes("demo", redis) == 100
+        assert await lic_module.add_media_bytes("demo", 50, redis) == 150
+        assert await lic_module.add_media_bytes("demo", -20, redis) == 130
+        return await lic_module.media_bytes("demo", redis)
+
+    assert asyncio.run(run()) == 130
+    assert calls == ["demo"]
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    app.state.redis = fakeredis.aioredis.FakeRedis()
+    monkeypatch.setattr(images, "WORKERS", 0)
+    monkeypatch.setattr(images, "WIDTHS", (320,))
+    backend = LocalBackend(str(tmp_path))
+    monkeypatch.setattr(routes_media, "storage", backend)
+    monkeypatch.setattr(lic_module, "storage_bytes", lambda tenant_id: 0)
+
+    from api.app import auth
+
+    class DummyUser:
+        role = "super_admin"
+
+    app.dependency_overrides[auth.get_current_user] = lambda: DummyUser()
+    yield TestClient(app, raise_server_exceptions=False), tmp_path
+    app.dependency_overrides.pop(auth.get_current_user, None)
+
+
+def test_upload_dedupes_and_delete_releases_bytes(client):
+    client, media_dir = client
+    headers = {"Authorization": "Bearer t"}
+    files = {"file": ("dish.png", _image("PNG", (640, 480)), "image/png")}
+    redis = app.state.redis
+
+    first = client.post("/api/outlet/demo/media/upload", headers=headers, files=files)
+    assert first.status_code == 200
+    data = first.json()["data"]
+    assert data["key"].endswith("_dish.png")
+    assert [v["type"] for v in data["variants"]] == [
+        "image/png",
+        "image/webp",
+        "image/avif",
+        "image/webp",
+        "image/avif",
+    ]
+    assert [v["width"] for v in data["variants"]] == [640, 320, 320, 640, 640]
+    stored = sorted(p for p in media_dir.rglob("*") if p.is_file())
+    assert len(stored) == 5
+    assert sum(p.stat().st_size for p in stored) == data["bytes"]
+
+    again = client.post("/api/outlet/demo/media/upload", headers=headers, files=files)
+    assert again.json()["data"] == data
+    assert len([p for p in media_dir.rglob("*") if p.is_file()]) == 5
+    assert asyncio.run(lic_module.media_bytes("demo", redis)) == data["bytes"]
+
+    resp = client.delete(f"/api/outlet/demo/media/{data['hash']}", headers=headers)
+    assert resp.json()["data"]["deleted"] == 5
+    assert not [p for p in media_dir.rglob("*") if p.is_file()]
+    assert asyncio.run(lic_module.media_bytes("demo", redis)) == 0
+    resp = client.delete(f"/api/outlet/demo/media/{data['hash']}", headers=headers)
+    assert resp.status_code == 404
+
+
+def test_dedupe_record_keeps_keys_and_signs_urls_per_response(client, monkeypatch):
+    client, _ = client
+    headers = {"Authorization": "Bearer t"}
+    files = {"file": ("dish.png", _image("PNG", (640, 480)), "image/png")}
+
+    first = client.post("/api/outlet/demo/media/upload", headers=headers, files=files)
+    data = first.json()["data"]
+    assert data["url"] == f"/media/{data['key']}"
+    hash_key = routes_media.HASH_KEY.format(tenant="demo", digest=data["hash"])
+    record = json.loads(asyncio.run(app.state.redis.get(hash_key)))
+    assert "url" not in record
+    assert not [v for v in record["variants"] if "url" in v]
+
+    # presigned URLs expire: a repeat upload gets URLs signed now
+    monkeypatch.setattr(
+        routes_media.storage, "url", lambda key: (f"/signed/{key}?v=2", None)
+    )
+    again = client.post("/api/outlet/demo/media/upload", headers=headers, files=files)
+    again = again.json()["data"]
+    assert again["url"] == f"/signed/{data['key']}?v=2"
+    assert [v["url"] for v in again["variants"]] == [
+        f"/signed/{v['key']}?v=2" for v in data["variants"]
+    ]
+
+
+def test_counter_seeded_before_storage_changes(client, monkeypatch):
+    client, media_dir = client
+    headers = {"Authorization": "Bearer t"}
+    files = {"file": ("dish.png", _image("PNG", (640, 480)), "image/png")}
+    redis = app.state.redis
+    key = lic_module.MEDIA_BYTES_KEY.format(tenant="demo")
+
+    def walk(tenant_id):
+        return sum(p.stat().st_size for p in media_dir.rglob("*") if p.is_file())
+
+    monkeypatch.setattr(lic_module, "storage_bytes", walk)
+    resp = client.post("/api/outlet/demo/media/upload", headers=headers, files=files)
+    data = resp.json()["data"]
+    assert asyncio.run(lic_module.media_bytes("demo", redis)) == data["bytes"]
+
+    # a counter lost after the upload is re-seeded before the files go
+    asyncio.run(redis.delete(key))
+    client.delete(f"/api/outlet/demo/media/{data['hash']}", headers=headers)
+    assert asyncio.run(lic_module.media_bytes("demo", redis)) == 0
+
+
+def test_upload_rejects_invalid_image(client):
+    client, _ = client
+    resp = client.post(
+        "/api/outlet/demo/media/upload",
+        headers={"Authorization": "Bearer t"},
+        files={"file": ("x.png", b"not a png", "image/png")},
+    )
+    assert resp.status_code == 400
@@ -0,0 +1,198 @@
+import io
+import os
+import pathlib
+import sys
+from contextlib import asynccontextmanager
+
+import fakeredis.aioredis
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+
+os.environ.setdefault("ALLOWED_ORIGINS", "http://example.com")
+os.environ.setdefault("DB_URL", "postgresql://u:p@localhost/db")
+os.environ.setdefault("REDIS_URL", "redis://localhost")
+os.environ.setdefault("SECRET_KEY", "x" * 32)
+
+from api.app import routes_menu_import  # noqa: E402
+from api.app.auth import create_access_token  # noqa: E402
+from api.app.menu import importer  # noqa: E402
+from api.app.models_tenant import Base, Category, MenuItem, TenantMeta  # noqa: E402
+
+MENU = (
+    "category,name,price,is_veg,dietary,modifiers\n"
+    "Pizza,Margherita,250,yes,vegetarian,Extra cheese:40|Large:100\n"
+    "Pizza,Pepperoni,320,no,,Large:120\n"
+    '"Drinks",Lime Soda,"80.00",true,vegan|gluten_free,\n'
+)
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def client(monkeypatch):
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    @asynccontextmanager
+    async def fake_session(tenant_id: str):
+        async with Session() as session:
+            yield session
+
+    monkeypatch.setattr(routes_menu_import, "_session", fake_session)
+    app = FastAPI()
+    app.include_router(routes_menu_import.router)
+    app.state.redis = fakeredis.aioredis.FakeRedis()
+    app.state.sessionmaker = Session
+    token = create_access_token({"sub": "admin@example.com", "role": "super_admin"})
+    transport = ASGITransport(app=app)
+    async with AsyncClient(
+        transport=transport,
+        base_url="http://test",
+        headers={"Authorization": f"Bearer {token}"},
+    ) as c:
+        c.app = app
+        yield c
+    await engine.dispose()
+
+
+async def _import(client, csv: str, **params):
+    return await client.post(
+        "/api/outlet/demo/menu/import",
+        params=params,
+        files={"file": ("menu.csv", csv.encode(), "text/csv")},
+    )
+
+
+async def _items(client) -> dict:
+    async with client.app.state.sessionmaker() as session:
+        result = await session.execute(
+            select(MenuItem, Category.name).join(
+                Category, MenuItem.category_id == Category.id
+            )
+        )
+        return {(cat, item.name): item for item, cat in result.all()}
+
+
+async def _version(client) -> int:
+    async with client.app.state.sessionmaker() as session:
+        return await session.scalar(select(TenantMeta.menu_version)) or 0
+
+
+@pytest.mark.anyio
+async def test_import_inserts_items_and_bumps_version_once(client) -> None:
+    resp = await _import(client, MENU)
+    assert resp.status_code == 200
+    assert resp.json()["data"] == {
+        "categories": 2,
+        "inserted": 3,
+        "updated": 0,
+        "deleted": 0,
+        "unchanged": 0,
+    }
+    items = await _items(client)
+    pizza = items[("Pizza", "Margherita")]
+    assert float(pizza.price) == 250
+    assert pizza.is_veg is True
+    assert pizza.dietary == ["vegetarian"]
+    assert pizza.modifiers == [
+        {"id": 1, "name": "Extra cheese", "delta": 40.0},
+        {"id": 2, "name": "Large", "delta": 100.0},
+    ]
+    assert items[("Drinks", "Lime Soda")].dietary == ["vegan", "gluten_free"]
+    assert await _version(client) == 1
+    assert await client.app.state.redis.get("menu:ver:demo") == b"1"
+
+
+@pytest.mark.anyio
+async def test_reimport_is_idempotent(client) -> None:
+    await _import(client, MENU)
+    before = {key: item.updated_at for key, item in (await _items(client)).items()}
+
+    resp = await _import(client, MENU)
+    assert resp.status_code == 200
+    assert resp.json()["data"]["unchanged"] == 3
+    assert resp.json()["data"]["inserted"] == resp.json()["data"]["updated"] == 0
+    after = {key: item.updated_at for key, item in (await _items(client)).items()}
+    assert after == before
+    assert await _version(client) == 1
+    assert await client.app.state.redis.get("menu:ver:demo") == b"1"
+
+
+@pytest.mark.anyio
+async def test_reimport_applies_diff(client) -> None:
+    await _import(client, MENU)
+    changed = (
+        "category,name,price,modifiers\n"
+        "pizza,MARGHERITA,275,Large:110|Olives:30|Extra cheese:40\n"
+        "Pizza,Farmhouse,300,\n"
+        "Drinks,Lime Soda,80,\n"
+    )
+    resp = await _import(client, changed)
+    assert resp.json()["data"] == {
+        "categories": 0,
+        "inserted": 1,
+        "updated": 1,
+        "deleted": 1,
+        "unchanged": 1,
+    }
+    items = await _items(client)
+    pizza = items[("Pizza", "Margherita")]
+    assert float(pizza.price) == 275
+    assert pizza.is_veg is True  # column absent from the file
+    assert pizza.modifiers == [
+        {"id": 2, "name": "Large", "delta": 110.0},
+        {"id": 3, "name": "Olives", "delta": 30.0},
+        {"id": 1, "name": "Extra cheese", "delta": 40.0},
+    ]
+    assert items[("Pizza", "Pepperoni")].deleted_at is not None
+    assert items[("Pizza", "Farmhouse")].deleted_at is None
+    assert await _version(client) == 2
+
+    # Bringing the item back restores the soft-deleted row
+    resp = await _import(client, MENU, delete_missing="false")
+    assert resp.json()["data"]["deleted"] == 0
+    items = await _items(client)
+    assert items[("Pizza", "Pepperoni")].deleted_at is None
+    assert items[("Pizza", "Farmhouse")].deleted_at is None
+    assert len(items) == 4
+
+
+@pytest.mark.anyio
+async def test_invalid_rows_write_nothing(client) -> None:
+    bad = "name,price,is_veg\nSoup,abc,yes\nSoup,10,yes\nSalad,,no\nTea,5,maybe\n"
+    resp = await _import(client, bad)
+    assert resp.status_code == 422
+    assert resp.json()["detail"]["errors"] == [
+        "row 2 invalid price",
+        "row 4 missing price",
+        "row 5 invalid is_veg",
+    ]
+    assert await _items(client) == {}
+    assert await _version(client) == 0
+
+
+def test_parse_streams_binary_upload() -> None:
+    data = "\ufeffname,price,category\nTea,5,Hot\n".encode()
+    parsed = importer.parse(io.BytesIO(data))
+    assert parsed.errors == []
+    assert parsed.rows == {
+        ("hot", "tea"): {"category": "Hot", "name": "Tea", "price": 5}
+    }
+
+    parsed = importer.parse(io.BytesIO(b"name,price\nTea,5\ntea,6\n"))
+    assert parsed.errors == ["row 3 duplicate item tea"]
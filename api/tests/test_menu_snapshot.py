@@ -0,0 +1,130 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+import fakeredis.aioredis
+from fastapi.testclient import TestClient
+
+from api.app import main as app_main
+from api.app import routes_admin_menu
+from api.app.auth import create_access_token
+from api.app.main import SessionLocal, app
+from api.app.menu import snapshot
+from api.app.repos_sqlalchemy import menu_repo_sql
+from api.app.models_tenant import Category, MenuItem, Room
+
+client = TestClient(app)
+
+
+def setup_module():
+    app.state.redis = fakeredis.aioredis.FakeRedis()
+
+
+def _seed_room() -> tuple[str, int]:
+    with SessionLocal() as session:
+        category = Category(name="Snap", sort=1)
+        session.add(category)
+        session.flush()
+        session.add(
+            MenuItem(category_id=category.id, name="Soup", price=5, is_veg=True)
+        )
+        token = "r" + uuid.uuid4().hex[:6]
+        session.add(Room(code=token, qr_token=token))
+        session.commit()
+        return token, category.id
+
+
+def test_hotel_menu_snapshot_etag_and_invalidation(monkeypatch):
+    token, category_id = _seed_room()
+
+    first = client.get(f"/h/{token}/menu")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+    assert any(i["name"] == "Soup" for i in first.json()["data"]["items"])
+
+    not_modified = client.get(f"/h/{token}/menu", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == etag
+
+    with SessionLocal() as session:
+        salad = MenuItem(
+            category_id=category_id,
+            name="Salad",
+            price=7,
+            is_veg=True,
+            out_of_stock=True,
+        )
+        session.add(salad)
+        session.commit()
+        salad_id = salad.id
+    # the snapshot is served until a menu write invalidates it
+    stale = client.get(f"/h/{token}/menu", headers={"If-None-Match": etag})
+    assert stale.status_code == 304
+
+    # An admin toggles the item back in stock through the tenant route; the
+    # repository writes to the shared database the hotel menu is read from.
+    async def toggle(self, session, item_id, flag):
+        with SessionLocal() as db:
+            db.get(MenuItem, salad_id).out_of_stock = flag
+            db.commit()
+
+    async def list_items(self, session, include_hidden=False):
+        return []
+
+    @asynccontextmanager
+    async def tenant_session(tenant_id):
+        yield None
+
+    monkeypatch.setattr(menu_repo_sql.MenuRepoSQL, "toggle_out_of_stock", toggle)
+    monkeypatch.setattr(menu_repo_sql.MenuRepoSQL, "list_items", list_items)
+    monkeypatch.setattr(routes_admin_menu, "_session", tenant_session)
+    monkeypatch.setattr(app_main, "subscription_guard", _pass)
+    admin = create_access_token({"sub": "admin@example.com", "role": "super_admin"})
+    resp = client.post(
+        f"/api/outlet/demo/menu/item/{uuid.uuid4()}/out_of_stock",
+        headers={"Authorization": f"Bearer {admin}"},
+        json={"flag": False},
+    )
+    assert resp.status_code == 200
+
+    fresh = client.get(f"/h/{token}/menu", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["ETag"] != etag
+    assert any(i["name"] == "Salad" for i in fresh.json()["data"]["items"])
+
+
+async def _pass(request, call_next):
+    return await call_next(request)
+
+
+def test_hotel_menu_unknown_room():
+    assert client.get("/h/no-such-room/menu").status_code == 404
+
+
+def test_snapshot_skips_build_when_current():
+    redis = fakeredis.aioredis.FakeRedis()
+    calls = []
+
+    async def build():
+        calls.append(1)
+        return {"ok": True, "data": len(calls)}
+
+    async def scenario():
+        a = await snapshot.get_or_build(redis, "t1", "en", build)
+        b = await snapshot.get_or_build(redis, "t1", "en", build)
+        await snapshot.invalidate(redis, "t1")
+        c = await snapshot.get_or_build(redis, "t1", "en", build)
+        return a, b, c
+
+    a, b, c = asyncio.run(scenario())
+    assert a == b and a.etag != c.etag
+    assert len(calls) == 2
+
+
+def test_etag_matching():
+    assert snapshot.etag_matches('"abc"', '"abc"')
+    assert snapshot.etag_matches('W/"abc", "def"', '"abc"')
+    assert snapshot.etag_matches("*", '"abc"')
+    assert not snapshot.etag_matches('"abd"', '"abc"')
+    assert not snapshot.etag_matches(None, '"abc"')
@@ -0,0 +1,220 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import fakeredis.aioredis
+import pytest
+from fakeredis import TcpFakeServer
+from pydantic import BaseModel
+from prometheus_client.parser import text_string_to_metric_families
+
+from api.app.shared_state import PrepEMAs, TableCarts  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _request(url: str, payload: dict | None = None) -> tuple[int, str, bytes]:
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(
+        url, data=data, headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(req, timeout=10) as resp:
+        return resp.status, resp.headers.get("X-Worker-Pid", ""), resp.read()
+
+
+@pytest.fixture()
+def workers(tmp_path):
+    redis_port = _free_port()
+    server = TcpFakeServer(("127.0.0.1", redis_port), server_type="redis")
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    port = _free_port()
+    env = dict(
+        os.environ,
+        REDIS_URL=f"redis://127.0.0.1:{redis_port}/0",
+        HOST_LOCK_DIR=str(tmp_path),
+        PROMETHEUS_MULTIPROC_DIR=str(tmp_path / "metrics"),
+    )
+    env.pop("TESTING", None)
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "api.app.serve",
+            "--app",
+            "api.tests._multiproc_app:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            "2",
+        ],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                _request(f"{base}/metrics")
+                break
+            except OSError:
+                if time.monotonic() > deadline or proc.poll() is not None:
+                    raise
+                time.sleep(0.2)
+        yield base, env["REDIS_URL"]
+    finally:
+        proc.terminate()
+        proc.wait(timeout=20)
+        server.shutdown()
+        server.server_close()
+
+
+def _batch(op_id: str) -> dict:
+    return {
+        "orders": [
+            {"op_id": op_id, "table_code": "T1", "items": [{"item_id": 1, "qty": 1}]}
+        ]
+    }
+
+
+def test_two_workers_share_metrics_dedupe_and_background_lock(workers):
+    base, redis_url = workers
+    url = f"{base}/api/outlet/demo/orders/batch"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        unique = list(
+            pool.map(lambda _: _request(url, _batch(str(uuid.uuid4()))), range(40))
+        )
+        op_id = str(uuid.uuid4())
+        repeated = list(pool.map(lambda _: _request(url, _batch(op_id)), range(20)))
+
+    responses = unique + repeated
+    assert {status for status, _, _ in responses} == {200}
+    assert len({pid for _, pid, _ in responses}) == 2
+
+    # the repeated op id is processed once across both workers
+    processed = [json.loads(body)["data"]["order_ids"] for _, _, body in repeated]
+    assert sum(len(ids) for ids in processed) == 1
+
+    _, _, body = _request(f"{base}/metrics")
+    totals = {
+        sample.labels["path"]: sample.value
+        for family in text_string_to_metric_families(body.decode())
+        if family.name == "http_requests"
+        for sample in family.samples
+        if sample.name == "http_requests_total"
+    }
+    assert totals["/api/outlet/{tenant_id}/orders/batch"] == len(responses)
+
+    import redis
+
+    client = redis.Redis.from_url(redis_url)
+    assert client.get("test:background_started") == b"1"
+    client.close()
+
+
+class _Item(BaseModel):
+    item: str
+    quantity: int
+
+
+def test_table_carts_shared_through_redis():
+    redis = fakeredis.aioredis.FakeRedis()
+    first, second = TableCarts(_Item, {}), TableCarts(_Item, {})
+    first.bind(redis)
+    second.bind(redis)
+
+    async def scenario():
+        tea, jam = _Item(item="tea", quantity=1), _Item(item="jam", quantity=2)
+        await first.update("t1", lambda s: s["cart"].append(tea))
+        await second.update("t1", lambda s: s["cart"].append(jam))
+
+        def _place(state):
+            state["orders"].extend(state["cart"])
+            state["cart"] = []
+
+        await second.update("t1", _place)
+        with pytest.raises(IndexError):
+            await first.update("t1", lambda s: s["orders"][5])
+        return await first.items()
+
+    items = asyncio.run(scenario())
+    assert [(tid, [i.item for i in s["orders"]], s["cart"]) for tid, s in items] == [
+        ("t1", ["tea", "jam"], [])
+    ]
+
+
+def test_prep_emas_continue_across_workers():
+    redis = fakeredis.aioredis.FakeRedis()
+    first, second = PrepEMAs({}), PrepEMAs({})
+    first.bind(redis)
+    second.bind(redis)
+
+    async def scenario():
+        await first.add("T1", 10.0)
+        return await second.add("T1", 21.0)
+
+    assert asyncio.run(scenario()) == pytest.approx(12.0)
+
+
+class _YieldingRedis:
+    """Let other tasks run after every ``HGET``, like a networked server."""
+
+    def __init__(self, inner):
+        self._inner = inner
+
+    def __getattr__(self, name):
+        attr = getattr(self._inner, name)
+        if name == "hget":
+
+            async def hget(*args):
+                value = await attr(*args)
+                await asyncio.sleep(0)
+                return value
+
+            return hget
+        if name == "pipeline":
+            return lambda *args, **kwargs: _YieldingRedis(attr(*args, **kwargs))
+        return attr
+
+    async def __aenter__(self):
+        await self._inner.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        return await self._inner.__aexit__(*exc)
+
+
+def test_prep_emas_keep_concurrent_samples():
+    redis = fakeredis.aioredis.FakeRedis()
+    workers = [PrepEMAs({}) for _ in range(2)]
+    for worker in workers:
+        worker.bind(_YieldingRedis(redis))
+
+    async def scenario():
+        await workers[0].add("T1", 10.0)
+        await asyncio.gather(workers[0].add("T1", 21.0), workers[1].add("T1", 21.0))
+        return float(await redis.hget("legacy:prep_ema", "T1"))
+
+    # 10 -> 12 -> 13.64: neither concurrent sample is lost
+    assert asyncio.run(scenario()) == pytest.approx(12.0 + 2 / 11 * (21.0 - 12.0))
@@ -140,3 +140,43 @@ async def test_owner_daybook_pdf(app, seeded_sessions, monkeypatch):
     assert "Tax: 10.00" in body
     assert "Total: 300.00" in body
     assert "Outlet 1" in body and "Outlet 2" in body
+
+
+@pytest.mark.anyio
+async def test_owner_daybook_lists_outlets_left_out(app, seeded_sessions, monkeypatch):
+    @asynccontextmanager
+    async def fake_session(tid: str):
+        if tid == "t2":
+            raise RuntimeError("tenant database down")
+        yield seeded_sessions[tid]
+
+    async def fake_info(ids):
+        return {tid: {"name": f"Outlet {tid[1:]}", "tz": "UTC"} for tid in ids}
+
+    @app.middleware("http")
+    async def nonce(request, call_next):
+        request.state.csp_nonce = "n"
+        return await call_next(request)
+
+    monkeypatch.setattr(routes_owner_aggregate, "_session", fake_session)
+    monkeypatch.setattr(routes_owner_aggregate, "_get_tenants_info", fake_info)
+    monkeypatch.setattr(
+        routes_owner_aggregate,
+        "render_template",
+        lambda name, ctx, nonce=None: (repr(ctx), "text/html"),
+    )
+    from api.app import repos_sqlalchemy
+
+    monkeypatch.setattr(
+        repos_sqlalchemy.TenantGuard, "assert_tenant", lambda *args, **kwargs: None
+    )
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.get(
+            "/api/owner/owner1/daybook.pdf?date=2024-01-01",
+            headers={"x-tenant-ids": "t1,t2"},
+        )
+    assert resp.status_code == 200
+    assert "'orders': 1" in resp.text
+    assert "'failed': [{'name': 'Outlet 2', 'reason': 'error'}]" in resp.text
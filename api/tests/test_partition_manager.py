@@ -0,0 +1,85 @@
+import asyncio
+from datetime import date
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from api.app.db import partitions
+from api.app.db.partitions import (
+    PartitionedTable,
+    add_months,
+    ensure_partitions,
+    partition_month,
+    plan,
+)
+
+
+def test_add_months_wraps_years():
+    assert add_months(date(2025, 11, 1), 3) == date(2026, 2, 1)
+    assert add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert add_months(date(2025, 1, 1), -24) == date(2023, 1, 1)
+
+
+def test_plan_creates_missing_future_months():
+    existing = ["orders_2025_10", "orders_2025_12", "orders_default"]
+    result = plan(PartitionedTable("orders"), existing, date(2025, 10, 17), ahead=3)
+
+    assert result.create == [date(2025, 11, 1), date(2026, 1, 1)]
+    assert result.expire == []
+    assert result.statements() == [
+        "CREATE TABLE IF NOT EXISTS orders_2025_11 PARTITION OF orders "
+        "FOR VALUES FROM ('2025-11-01') TO ('2025-12-01')",
+        "CREATE TABLE IF NOT EXISTS orders_2026_01 PARTITION OF orders "
+        "FOR VALUES FROM ('2026-01-01') TO ('2026-02-01')",
+    ]
+
+
+def test_plan_expires_partitions_past_retention():
+    existing = [f"audit_tenant_2025_{m:02d}" for m in range(1, 13)]
+    table = PartitionedTable("audit_tenant", retention_months=6)
+    result = plan(table, existing, date(2025, 12, 3), ahead=0)
+
+    # horizon is 2025-06-01: January through May end on or before it
+    assert result.create == []
+    assert result.expire == [f"audit_tenant_2025_{m:02d}" for m in range(1, 6)]
+    assert result.statements(drop=False)[:2] == [
+        "ALTER TABLE audit_tenant DETACH PARTITION audit_tenant_2025_01",
+        "ALTER TABLE audit_tenant DETACH PARTITION audit_tenant_2025_02",
+    ]
+    assert result.statements()[:2] == [
+        "ALTER TABLE audit_tenant DETACH PARTITION audit_tenant_2025_01",
+        "DROP TABLE IF EXISTS audit_tenant_2025_01",
+    ]
+
+
+def test_plan_never_expires_tables_without_retention():
+    existing = ["invoices_2020_01", "invoices_2025_10"]
+    result = plan(PartitionedTable("invoices"), existing, date(2025, 10, 1), ahead=1)
+
+    assert result.expire == []
+    assert result.create == [date(2025, 11, 1)]
+
+
+def test_retention_horizons_are_opt_in(monkeypatch):
+    monkeypatch.delenv("AUDIT_RETENTION_MONTHS", raising=False)
+    assert partitions._retention_months("AUDIT_RETENTION_MONTHS") is None
+    monkeypatch.setenv("AUDIT_RETENTION_MONTHS", " ")
+    assert partitions._retention_months("AUDIT_RETENTION_MONTHS") is None
+    monkeypatch.setenv("AUDIT_RETENTION_MONTHS", "6")
+    assert partitions._retention_months("AUDIT_RETENTION_MONTHS") == 6
+
+
+def test_partition_month_ignores_foreign_names():
+    assert partition_month("orders", "orders_2025_07") == date(2025, 7, 1)
+    assert partition_month("orders", "order_items_2025_07") is None
+    assert partition_month("orders", "orders_2025_13") is None
+
+
+def test_ensure_partitions_is_noop_outside_postgres(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/p.db")
+        async with AsyncSession(engine) as session:
+            plans = await ensure_partitions(session)
+        await engine.dispose()
+        return plans
+
+    assert asyncio.run(scenario()) == []
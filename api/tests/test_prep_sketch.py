@@ -0,0 +1,145 @@
+import asyncio
+import random
+import statistics
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+import fakeredis.aioredis
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from api.app.eta import prep_stats
+from api.app.eta import service as eta_service
+from api.app.eta.sketch import DDSketch
+from api.app.models_master import Base as MasterBase, PrepStats
+from scripts import refresh_prep_stats
+
+
+def _exact(data, q):
+    ordered = sorted(data)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_sketch_quantiles_within_relative_accuracy(seed):
+    rng = random.Random(seed)
+    # skewed prep times: mostly a few minutes with a long tail
+    data = [rng.lognormvariate(5.5, 0.6) for _ in range(20000)]
+    sketch = DDSketch(relative_accuracy=0.01)
+    sketch.extend(data)
+    for q in (0.5, 0.8, 0.95, 0.99):
+        exact = _exact(data, q)
+        assert sketch.quantile(q) == pytest.approx(exact, rel=0.011)
+
+
+def test_merged_sketches_match_single_sketch():
+    rng = random.Random(7)
+    data = [rng.uniform(30, 1800) for _ in range(6000)]
+    whole = DDSketch()
+    whole.extend(data)
+    parts = [DDSketch() for _ in range(3)]
+    for i, value in enumerate(data):
+        parts[i % 3].add(value)
+    merged = DDSketch.from_fields(parts[0].to_fields())
+    for part in parts[1:]:
+        merged.merge(part)
+    assert merged.bins == whole.bins
+    assert merged.quantile(0.95) == whole.quantile(0.95)
+    exact = statistics.quantiles(data, n=100)[94]
+    assert merged.quantile(0.95) == pytest.approx(exact, rel=0.011)
+
+
+def test_sketch_add_throughput():
+    rng = random.Random(3)
+    data = [rng.lognormvariate(5.5, 0.6) for _ in range(100000)]
+    sketch = DDSketch()
+    started = time.perf_counter()
+    sketch.extend(data)
+    elapsed = time.perf_counter() - started
+    started = time.perf_counter()
+    for _ in range(1000):
+        sketch.quantile(0.95)
+    query_elapsed = time.perf_counter() - started
+    assert sketch.count == 100000
+    assert len(sketch.bins) < 500
+    # generous bounds: ~1us per add and well under 1ms per quantile here
+    assert elapsed < 2.0
+    assert query_elapsed < 2.0
+
+
+def test_workers_merge_in_redis_and_feed_eta(monkeypatch):
+    redis = fakeredis.aioredis.FakeRedis()
+    rng = random.Random(11)
+    now = datetime(2024, 1, 31, tzinfo=timezone.utc)
+    burger = [rng.uniform(300, 900) for _ in range(400)]
+    fries = [rng.uniform(60, 180) for _ in range(400)]
+
+    class Cfg:
+        prep_sla_min = 10
+        eta_confidence = "p80"
+        max_queue_factor = 1.6
+
+    monkeypatch.setattr(eta_service, "get_settings", lambda: Cfg)
+    monkeypatch.setattr(prep_stats, "_cache", OrderedDict())
+
+    async def scenario():
+        # two workers on different days of the window
+        for day, chunk in ((0, slice(0, 200)), (3, slice(200, 400))):
+            when = now - timedelta(days=day)
+            samples = [(1, s) for s in burger[chunk]] + [(2, s) for s in fries[chunk]]
+            await prep_stats.record(redis, "demo", samples, now=when)
+        # outside the window
+        old = now - timedelta(days=prep_stats.WINDOW_DAYS + 1)
+        await prep_stats.record(redis, "demo", [(1, 99999.0)] * 50, now=old)
+        stats = await prep_stats.quantiles(redis, "demo", [1, 2, 3], now=now)
+        eta = await eta_service.eta_for_items(redis, "demo", [1, 2], 1, now=now)
+        return stats, eta
+
+    stats, eta = asyncio.run(scenario())
+    assert set(stats) == {"1", "2"}
+    assert stats["1"]["sample_n"] == 400
+    assert stats["1"]["p80_s"] == pytest.approx(_exact(burger, 0.8), rel=0.02)
+    assert stats["2"]["p95_s"] == pytest.approx(_exact(fries, 0.95), rel=0.02)
+    assert eta["eta_ms"] == stats["1"]["p80_s"] * 1000
+
+
+def test_quantile_cache_keeps_recent_items_only(monkeypatch):
+    redis = fakeredis.aioredis.FakeRedis()
+    monkeypatch.setattr(prep_stats, "_cache", OrderedDict())
+    monkeypatch.setattr(prep_stats, "CACHE_MAX_ENTRIES", 2)
+
+    async def scenario():
+        await prep_stats.record(redis, "demo", [(1, 60.0)] * 5)
+        await prep_stats.quantiles(redis, "demo", [1, 2])
+        await prep_stats.quantiles(redis, "demo", [1])
+        await prep_stats.quantiles(redis, "demo", [3])
+
+    asyncio.run(scenario())
+    assert list(prep_stats._cache) == [("demo", "1"), ("demo", "3")]
+
+
+def test_refresh_copies_sketch_quantiles_into_prep_stats(tmp_path):
+    redis = fakeredis.aioredis.FakeRedis()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/master.db")
+
+    async def scenario():
+        async with engine.begin() as conn:
+            await conn.run_sync(
+                MasterBase.metadata.create_all, tables=[PrepStats.__table__]
+            )
+        samples = [(5, float(s)) for s in range(100, 200)]
+        await prep_stats.record(redis, "demo", samples)
+        await prep_stats.record(redis, "demo", [(6, 60.0)])
+        async with AsyncSession(engine) as session:
+            written = await refresh_prep_stats.refresh(session, redis, "demo", 1)
+            row = await session.get(PrepStats, ("5", 1))
+            skipped = await session.get(PrepStats, ("6", 1))
+            return written, row.p50_s, row.sample_n, skipped
+
+    written, p50, sample_n, skipped = asyncio.run(scenario())
+    asyncio.run(engine.dispose())
+    assert written == 1
+    assert p50 == pytest.approx(149, rel=0.02)
+    assert sample_n == 100
+    assert skipped is None
@@ -0,0 +1,145 @@
+import asyncio
+import pathlib
+import sys
+import uuid
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))
+
+from api.app import db as app_db  # noqa: E402
+from api.app import routes_admin_ops  # noqa: E402
+from api.app.auth import create_access_token  # noqa: E402
+from api.app.middlewares.prometheus import PrometheusMiddleware  # noqa: E402
+from api.app.models_tenant import Table  # noqa: E402
+from api.app.obs import query_stats as qs  # noqa: E402
+from api.app import routes_metrics  # noqa: E402
+from api.app.routes_metrics import db_n_plus_one_total  # noqa: E402
+
+
+def test_normalize_collapses_literals_and_in_lists():
+    sql = "SELECT *\n  FROM orders WHERE id IN (?, ?, ?) AND note = 'it''s' LIMIT 10"
+    assert qs.normalize(sql) == (
+        "SELECT * FROM orders WHERE id IN (...) AND note = ? LIMIT ?"
+    )
+    assert qs.fingerprint("SELECT 1").id == qs.fingerprint("SELECT   2").id
+    assert qs.fingerprint("SELECT a FROM t").id != qs.fingerprint("SELECT b FROM t").id
+
+
+def test_fingerprint_computed_once_per_compiled_statement(monkeypatch):
+    session_factory, engine = app_db.create_test_session()
+    calls = []
+    real = qs.fingerprint
+
+    def counting(statement):
+        calls.append(statement)
+        return real(statement)
+
+    monkeypatch.setattr(qs, "fingerprint", counting)
+    stats = qs.QueryStats()
+    monkeypatch.setattr(qs.query_stats, "record", stats.record)
+    with session_factory() as session:
+        for _ in range(5):
+            session.execute(select(Table).where(Table.code == str(uuid.uuid4())))
+    top = stats.top()
+    assert len(calls) == 1
+    assert top[0]["count"] == 5
+    assert top[0]["tenant"] == "test"
+    assert top[0]["sql"].startswith("SELECT tables.id")
+    engine.dispose()
+
+
+def test_stats_table_is_bounded():
+    stats = qs.QueryStats(max_entries=3)
+    for i in range(10):
+        stats.record(qs.fingerprint(f"SELECT c{i} FROM t"), "demo", 1.0, 1)
+    top = stats.top(limit=10, by="count")
+    assert len(top) == 4
+    assert top[0]["fingerprint"] == qs.OTHER
+    assert top[0]["count"] == 7
+
+
+def test_fingerprint_gauges_refresh_on_a_timer(monkeypatch):
+    stats = qs.QueryStats()
+    fp = qs.fingerprint("SELECT timer FROM t")
+    stats.record(fp, "demo", 250.0, 1)
+    monkeypatch.setattr(routes_metrics, "query_stats", stats)
+
+    async def main():
+        task = asyncio.create_task(routes_metrics.refresh_query_metrics_forever(0.01))
+        await asyncio.sleep(0.05)
+        stats.record(fp, "demo", 250.0, 1)
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(main())
+    labels = {"fingerprint": fp.id, "tenant": "demo"}
+    gauge = routes_metrics.db_query_fingerprint_calls.labels(**labels)
+    assert gauge._value.get() == 2
+    seconds = routes_metrics.db_query_fingerprint_seconds.labels(**labels)
+    assert seconds._value.get() == 0.5
+
+
+def test_repeated_fingerprint_in_request_flagged_as_n_plus_one():
+    session_factory, engine = app_db.create_test_session()
+    tenant_id = uuid.uuid4()
+    ids = [uuid.uuid4() for _ in range(12)]
+    with session_factory() as session:
+        for i, table_id in enumerate(ids):
+            session.add(
+                Table(id=table_id, tenant_id=tenant_id, name=f"T{i}", code=f"T{i}")
+            )
+        session.commit()
+
+    app = FastAPI()
+    app.add_middleware(PrometheusMiddleware)
+
+    @app.get("/tables/loop")
+    def _loop():  # pragma: no cover - simple test helper
+        with session_factory() as session:
+            return {"names": [session.get(Table, table_id).name for table_id in ids]}
+
+    @app.get("/tables/once")
+    def _once():  # pragma: no cover - simple test helper
+        with session_factory() as session:
+            rows = session.scalars(select(Table).where(Table.id.in_(ids))).all()
+            return {"names": [row.name for row in rows]}
+
+    qs.query_stats.reset()
+    counter = db_n_plus_one_total.labels(route="/tables/loop")
+    before = counter._value.get()
+    client = TestClient(app)
+    assert client.get("/tables/once").status_code == 200
+    assert not qs.query_stats.n_plus_one
+    assert client.get("/tables/loop").status_code == 200
+    detected = list(qs.query_stats.n_plus_one)
+    assert [(d["route"], d["count"]) for d in detected] == [("/tables/loop", 12)]
+    assert detected[0]["sql"].startswith("SELECT tables.id")
+    assert counter._value.get() == before + 1
+    engine.dispose()
+
+
+def test_admin_queries_endpoint_requires_super_admin():
+    app = FastAPI()
+    app.include_router(routes_admin_ops.router)
+    client = TestClient(app)
+    qs.query_stats.reset()
+    qs.query_stats.record(qs.fingerprint("SELECT 1"), "demo", 5.0, 1)
+
+    token = create_access_token({"sub": "owner@example.com", "role": "outlet_admin"})
+    resp = client.get(
+        "/api/admin/ops/queries", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert resp.status_code == 403
+
+    token = create_access_token({"sub": "admin@example.com", "role": "super_admin"})
+    resp = client.get(
+        "/api/admin/ops/queries?by=count",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert resp.status_code == 200
+    data = resp.json()["data"]
+    assert data["top"][0]["sql"] == "SELECT ?"
+    assert data["n_plus_one"] == []
@@ -0,0 +1,109 @@
+import asyncio
+import datetime
+
+import fakeredis.aioredis
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.app import redis_registry
+from api.app import routes_metrics
+from api.app.routes_metrics import router as metrics_router
+
+
+def _no_keys(*args, **kwargs):
+    raise AssertionError("KEYS must not be used")
+
+
+def test_print_retry_totals_prune_empty_queues():
+    redis = fakeredis.aioredis.FakeRedis()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    old = now - datetime.timedelta(seconds=90)
+
+    async def scenario():
+        await redis_registry.enqueue_print_retry(redis, "a", old.isoformat())
+        await redis_registry.enqueue_print_retry(redis, "a", now.isoformat())
+        await redis_registry.enqueue_print_retry(redis, "b", now.isoformat())
+        await redis.delete("print:retry:b")
+        totals = await redis_registry.print_retry_totals(redis, now=now)
+        return totals, await redis.smembers(redis_registry.PRINT_RETRY_TENANTS)
+
+    (total, age), tenants = asyncio.run(scenario())
+    assert (total, age) == (2, 90)
+    assert tenants == {b"a"}
+
+
+def test_rebuild_registers_legacy_keys():
+    redis = fakeredis.aioredis.FakeRedis()
+
+    async def scenario():
+        await redis.rpush("print:retry:demo", "x")
+        await redis.set("jobs:heartbeat:w1", "now")
+        await redis.set("cb:abcd1234:until", 123)
+        await redis.mset({f"unrelated:{i}": i for i in range(500)})
+        found = await redis_registry.rebuild(redis, count=50)
+        return found, await redis_registry.job_workers(redis), await redis.hgetall(
+            redis_registry.OPEN_BREAKERS
+        )
+
+    found, workers, breakers = asyncio.run(scenario())
+    assert found == {"print:retries": 1, "jobs:workers": 1, "cb:open": 1}
+    assert workers == ["w1"]
+    assert breakers == {b"abcd1234": b"123"}
+
+
+def test_heartbeats_expire():
+    redis = fakeredis.aioredis.FakeRedis()
+
+    async def scenario():
+        await redis_registry.record_heartbeat(redis, "w1")
+        await redis_registry.record_heartbeat(redis, "w2", ttl=600)
+        return await redis.ttl("jobs:heartbeat:w1"), await redis.ttl(
+            "jobs:heartbeat:w2"
+        )
+
+    ttl, longer = asyncio.run(scenario())
+    assert 0 < ttl <= redis_registry.HEARTBEAT_TTL
+    assert redis_registry.HEARTBEAT_TTL < longer <= 600
+
+
+def test_open_breaker_seconds_prunes_elapsed_breakers():
+    redis = fakeredis.aioredis.FakeRedis()
+
+    async def scenario():
+        await redis.hset(
+            redis_registry.OPEN_BREAKERS, mapping={"old": 90, "due": 100, "open": 130}
+        )
+        seconds = await redis_registry.open_breaker_seconds(redis, now=100)
+        return seconds, await redis.hgetall(redis_registry.OPEN_BREAKERS)
+
+    seconds, breakers = asyncio.run(scenario())
+    assert seconds == 30
+    assert breakers == {b"open": b"130"}
+
+
+def test_metrics_scrape_uses_cached_registry_gauges(monkeypatch):
+    app = FastAPI()
+    app.include_router(metrics_router)
+    redis = fakeredis.aioredis.FakeRedis()
+    app.state.redis = redis
+    monkeypatch.setattr(redis, "keys", _no_keys)
+    asyncio.run(redis_registry.enqueue_print_retry(redis, "demo", "2000-01-01"))
+
+    calls = []
+    real = redis_registry.print_retry_totals
+
+    async def counting(r, now=None):
+        calls.append(now)
+        return await real(r, now)
+
+    monkeypatch.setattr(redis_registry, "print_retry_totals", counting)
+    client = TestClient(app)
+    assert "printer_retry_queue 1.0" in client.get("/metrics").text
+    asyncio.run(redis_registry.enqueue_print_retry(redis, "demo", "2000-01-01"))
+    # served from the cache until the refresh interval has passed
+    assert "printer_retry_queue 1.0" in client.get("/metrics").text
+    assert len(calls) == 1
+
+    monkeypatch.setattr(routes_metrics, "REDIS_GAUGES_REFRESH_SEC", 0)
+    assert "printer_retry_queue 2.0" in client.get("/metrics").text
+    assert len(calls) == 2
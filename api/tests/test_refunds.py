@@ -1,3 +1,4 @@
+import asyncio
 import pathlib
 import sys
 from types import SimpleNamespace
@@ -34,6 +35,7 @@ def client(monkeypatch):
     class DummySession:
         def __init__(self):
             self.added = []
+            self.rollups = []
 
         async def get(self, model, pk):
             if model is Payment and pk == 1:
@@ -45,11 +47,19 @@ def client(monkeypatch):
         def add(self, obj):
             self.added.append(obj)
 
+        async def execute(self, stmt, params=None):
+            self.rollups.append(params)
+
         async def commit(self):
             pass
 
     session = DummySession()
 
+    async def _tenant_tz(tenant_id):
+        return "Asia/Kolkata"
+
+    monkeypatch.setattr(routes_refunds.rollup_repo_sql, "tenant_tz", _tenant_tz)
+
     async def _session():
         return session
 
@@ -77,6 +87,11 @@ def test_duplicate_key_no_double_refund(client):
     assert resp2.status_code == 200
     assert resp2.json() == resp1.json()
     assert len(session.added) == 1
+    assert [(r["mode"], r["amount"]) for r in session.rollups] == [
+        ("gateway_refund", -10)
+    ]
+    # only the refund that changed the rollups drops the cached outlet slices
+    assert asyncio.run(app.state.redis.get("outlet:ver:demo")) == b"1"
 
 
 def test_audit_idempotency_key(client):
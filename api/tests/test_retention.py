@@ -1,3 +1,4 @@
+import asyncio
 import os
 import pathlib
 import sys
@@ -144,3 +145,23 @@ def test_preview_and_apply() -> None:
         assert orders.scalar() == 1
         audit = session.query(AuditTenant).filter_by(action="retention.purge").count()
         assert audit == 1
+
+
+def test_apply_drops_expired_partitions_first(monkeypatch) -> None:
+    calls = []
+
+    async def _drop(session, table, cutoff):
+        calls.append(table)
+        return [f"{table}_2020_01"]
+
+    monkeypatch.setattr(retention_svc, "drop_expired_partitions", _drop)
+    counts = asyncio.run(retention_svc.apply("t1", 30, drop_partitions=True))
+    assert counts == {"customers": 1, "invoices": 1, "orders": 1}
+    assert calls == ["order_items", "orders"]
+
+    with SessionLocal() as session:
+        audit = session.query(AuditTenant).filter_by(action="retention.purge").one()
+        assert audit.meta["partitions_dropped"] == [
+            "order_items_2020_01",
+            "orders_2020_01",
+        ]
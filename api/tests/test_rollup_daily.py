@@ -41,9 +41,16 @@ async def test_rollup_daily_lock_and_metrics(monkeypatch):
     monkeypatch.setattr(rollup_daily, "async_sessionmaker", fake_sessionmaker)
 
     calls: list[date] = []
+    zones: set[str] = set()
+
+    async def fake_tenant_tz(tenant):
+        return "Asia/Kolkata"
+
+    monkeypatch.setattr(rollup_daily, "tenant_tz", fake_tenant_tz)
 
     async def fake_rollup_day(session, tenant, day, tz):
         calls.append(day)
+        zones.add(tz)
 
     monkeypatch.setattr(rollup_daily, "rollup_day", fake_rollup_day)
 
@@ -71,9 +78,11 @@ async def test_rollup_daily_lock_and_metrics(monkeypatch):
     await fake_redis.delete(f"rollup:demo:{today.isoformat()}")
     await rollup_daily.main("demo")
 
-    assert len(calls) == 2
+    # today's rows are left to billing's increments
+    assert calls == [yesterday]
+    assert zones == {"Asia/Kolkata"}
     if rollup_daily.rollup_runs_total:
-        assert rollup_daily.rollup_runs_total._value.get() == 2
+        assert rollup_daily.rollup_runs_total._value.get() == 1
     if rollup_daily.rollup_failures_total:
         assert rollup_daily.rollup_failures_total._value.get() == 0
 
@@ -0,0 +1,162 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from api.app import models_tenant
+from api.app.models_tenant import (
+    Invoice,
+    Order,
+    OrderStatus,
+    Payment,
+    SalesRollupHourly,
+)
+from api.app.repos_sqlalchemy import (
+    dashboard_repo_sql,
+    invoices_repo_sql,
+    rollup_repo_sql,
+)
+from scripts import rollup_daily
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def session() -> AsyncSession:
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(models_tenant.Base.metadata.create_all)
+    sessionmaker = async_sessionmaker(
+        engine, expire_on_commit=False, class_=AsyncSession
+    )
+    async with sessionmaker() as s:
+        yield s
+    await engine.dispose()
+
+
+async def _bill(session, at: datetime, total: str, tax: str, mode: str) -> None:
+    order = Order(table_id=1, status=OrderStatus.NEW, placed_at=at)
+    session.add(order)
+    await session.flush()
+    invoice = Invoice(
+        order_group_id=order.id,
+        number=f"INV{order.id}",
+        bill_json={"total": float(total)},
+        gst_breakup={"5": float(tax)},
+        tip=0,
+        total=Decimal(total),
+        created_at=at,
+    )
+    session.add(invoice)
+    session.add(
+        Payment(invoice_id=order.id, mode=mode, amount=Decimal(total), created_at=at)
+    )
+    await session.flush()
+    await rollup_repo_sql.apply_invoice(
+        session, "demo", at, Decimal(total), Decimal(tax), Decimal("0"), tz="UTC"
+    )
+    await rollup_repo_sql.apply_payment(session, at, mode, Decimal(total), tz="UTC")
+    await session.commit()
+
+
+@pytest.mark.anyio
+async def test_incremental_rollup_feeds_charts(session):
+    await _bill(session, datetime(2024, 1, 2, 9, 15, tzinfo=timezone.utc), "10", "1", "cash")
+    await _bill(session, datetime(2024, 1, 2, 9, 45, tzinfo=timezone.utc), "20", "2", "upi")
+    await _bill(session, datetime(2024, 1, 2, 20, 0, tzinfo=timezone.utc), "5", "0", "cash")
+
+    day = date(2024, 1, 2)
+    data = await dashboard_repo_sql.charts_range(session, day, day, "UTC")
+    heat = {pt["h"]: pt["v"] for pt in data["series"]["hourly_heatmap"]}
+    assert heat[9] == 30.0
+    assert heat[20] == 5.0
+    assert data["series"]["sales"] == [{"d": "2024-01-02", "v": 35.0}]
+    assert data["modes"]["cash"] == 15.0
+    assert data["modes"]["upi"] == 20.0
+
+    live = await dashboard_repo_sql.charts_range(
+        session, day, day, "UTC", use_rollup=False
+    )
+    assert live["series"]["hourly_heatmap"] == data["series"]["hourly_heatmap"]
+    assert live["modes"] == data["modes"]
+
+
+@pytest.mark.anyio
+async def test_reconcile_matches_incremental(session):
+    await _bill(session, datetime(2024, 1, 2, 9, 15, tzinfo=timezone.utc), "10", "1", "cash")
+    await _bill(session, datetime(2024, 1, 2, 11, 0, tzinfo=timezone.utc), "20", "2", "card")
+
+    async def hourly():
+        rows = await session.execute(
+            select(
+                SalesRollupHourly.h,
+                SalesRollupHourly.orders,
+                SalesRollupHourly.sales,
+                SalesRollupHourly.tax,
+            ).order_by(SalesRollupHourly.h)
+        )
+        return [(h, o, float(s), float(t)) for h, o, s, t in rows.all()]
+
+    # placed but not billed: not an order in any of the rollups
+    at = datetime(2024, 1, 2, 12, 0, tzinfo=timezone.utc)
+    session.add(Order(table_id=1, status=OrderStatus.NEW, placed_at=at))
+    await session.commit()
+    day = date(2024, 1, 2)
+
+    async def daily():
+        data = await dashboard_repo_sql.charts_range(session, day, day, "UTC")
+        return data["series"]["orders"], data["series"]["avg_ticket"]
+
+    incremental = await hourly()
+    incremental_daily = await daily()
+    await rollup_daily.rollup_day(session, "demo", day, "UTC")
+    assert await hourly() == incremental == [(9, 1, 10.0, 1.0), (11, 1, 20.0, 2.0)]
+    assert await daily() == incremental_daily
+    live = await dashboard_repo_sql.charts_range(
+        session, day, day, "UTC", use_rollup=False
+    )
+    assert (live["series"]["orders"], live["series"]["avg_ticket"]) == incremental_daily
+    assert incremental_daily[0] == [{"d": "2024-01-02", "v": 2}]
+
+
+@pytest.mark.anyio
+async def test_payments_and_refunds_reconcile_in_tenant_timezone(session):
+    tz = "Asia/Kolkata"
+    order = Order(table_id=1, status=OrderStatus.NEW)
+    session.add(order)
+    await session.flush()
+    session.add(
+        Invoice(
+            order_group_id=order.id,
+            number="INV1",
+            bill_json={"total": 30.0},
+            total=Decimal("30"),
+        )
+    )
+    await session.flush()
+    await invoices_repo_sql.add_payment(session, order.id, "gateway", 30, tz=tz)
+    await invoices_repo_sql.record_payment(
+        session, order.id, "gateway_refund", -30, tz=tz
+    )
+    await session.commit()
+
+    day = datetime.now(ZoneInfo(tz)).date()
+    incremental = await dashboard_repo_sql.charts_range(session, day, day, tz)
+    assert incremental["modes"]["gateway"] == 30.0
+    assert incremental["modes"]["gateway_refund"] == -30.0
+
+    await rollup_daily.rollup_day(session, "demo", day, tz)
+    reconciled = await dashboard_repo_sql.charts_range(session, day, day, tz)
+    assert reconciled["modes"] == incremental["modes"]
+
+
+@pytest.mark.anyio
+async def test_tenant_tz_defaults_for_non_uuid_tenants(monkeypatch):
+    monkeypatch.setenv("DEFAULT_TZ", "Asia/Kolkata")
+    assert await rollup_repo_sql.tenant_tz("demo") == "Asia/Kolkata"
@@ -38,3 +38,35 @@ def test_slo_counters():
     assert 'slo_requests_total{route="/g/test_ok"} 1.0' in body
     assert 'slo_requests_total{route="/g/test_fail"} 1.0' in body
     assert 'slo_errors_total{route="/g/test_fail"} 1.0' in body
+
+
+def test_labels_use_route_template():
+    app = FastAPI()
+    app.state.redis = fakeredis.aioredis.FakeRedis()
+    app.add_middleware(PrometheusMiddleware)
+    app.include_router(metrics_router)
+
+    @app.get("/g/{table_token}/tpl")
+    async def tpl(table_token: str):
+        return {"ok": True}
+
+    client = TestClient(app)
+    for token in ("aaa", "bbb", "ccc"):
+        client.get(f"/g/{token}/tpl")
+    body = client.get("/metrics").text
+    assert 'slo_requests_total{route="/g/{table_token}/tpl"} 3.0' in body
+    assert "/g/aaa/tpl" not in body
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/g/{table_token}/tpl"} 3.0'
+        in body
+    )
+
+
+def test_label_guard_buckets_overflow():
+    from api.app.obs.cardinality import OTHER, LabelGuard
+
+    guard = LabelGuard(2)
+    assert guard("a") == "a"
+    assert guard("b") == "b"
+    assert guard("c") == OTHER
+    assert guard("a") == "a"
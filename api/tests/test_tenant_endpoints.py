@@ -48,7 +48,8 @@ async def _fake_generate_invoice(
 
 async def _fake_get_tenant_session():
     class _DummySession:
-        pass
+        async def commit(self):
+            pass
 
     return _DummySession()
 
@@ -67,7 +68,8 @@ async def _fake_menu_etag(self, session):
 @asynccontextmanager
 async def _fake_kds_session(tenant_id: str):
     class _DummySession:
-        pass
+        async def commit(self):
+            pass
 
     yield _DummySession()
 
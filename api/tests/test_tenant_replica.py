@@ -0,0 +1,103 @@
+import asyncio
+from datetime import datetime, timezone
+
+import fakeredis.aioredis
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from api.app import routes_exports
+from api.app.db import replica
+from api.app.models_tenant import Base, Invoice
+
+
+def _seed(url: str, invoices: int) -> None:
+    async def _run() -> None:
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            for idx in range(invoices):
+                await conn.execute(
+                    Invoice.__table__.insert().values(
+                        order_group_id=idx + 1,
+                        number=f"INV{idx}",
+                        bill_json={},
+                        total=1,
+                        created_at=datetime.now(timezone.utc),
+                    )
+                )
+        await engine.dispose()
+
+    asyncio.run(_run())
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    primary = f"sqlite+aiosqlite:///{tmp_path}/tenant_{{tenant_id}}.db"
+    replica_url = f"sqlite+aiosqlite:///{tmp_path}/replica_t1.db"
+    _seed(primary.format(tenant_id="t1"), 1)
+    _seed(replica_url, 2)
+    monkeypatch.setenv("POSTGRES_TENANT_DSN_TEMPLATE", primary)
+    monkeypatch.delenv(replica.TENANT_REPLICA_TEMPLATE_ENV, raising=False)
+    reg = replica.ReplicaRegistry()
+    reg.register("t1", replica_url)
+    monkeypatch.setattr(replica, "replicas", reg)
+    yield reg
+    asyncio.run(reg.dispose())
+
+
+async def _count(tenant_id: str) -> int:
+    async with routes_exports._session(tenant_id) as session:
+        return (await session.execute(select(func.count(Invoice.id)))).scalar_one()
+
+
+def test_read_only_routes_to_tenant_replica(registry, tmp_path):
+    read = replica.read_only(_count)
+    assert asyncio.run(read("t1")) == 2
+    # outside read-only endpoints sessions stay on the primary
+    assert asyncio.run(_count("t1")) == 1
+    # tenants without a replica use their primary
+    _seed(f"sqlite+aiosqlite:///{tmp_path}/tenant_t2.db", 3)
+    assert asyncio.run(read("t2")) == 3
+
+
+def test_lagging_replica_falls_back_to_primary(registry, monkeypatch):
+    lag = {"secs": 12.0}
+
+    async def _lag(engine):
+        return lag["secs"]
+
+    monkeypatch.setattr(replica, "_replay_lag", _lag)
+    strict = replica.read_only(max_lag=5)(_count)
+    relaxed = replica.read_only(max_lag=60)(_count)
+
+    assert asyncio.run(strict("t1")) == 1
+    assert asyncio.run(relaxed("t1")) == 2
+
+    lag["secs"] = 1.0
+    asyncio.run(registry.refresh())
+    assert registry.lag("t1") == 1.0
+    assert asyncio.run(strict("t1")) == 2
+
+
+def test_unreachable_replica_falls_back(registry, monkeypatch):
+    async def _down(engine):
+        raise OSError("replica down")
+
+    monkeypatch.setattr(replica, "_replay_lag", _down)
+    assert asyncio.run(replica.read_only(_count)("t1")) == 1
+    assert registry.lag("t1") is None
+
+
+def test_streamed_export_reads_from_replica(registry):
+    app = FastAPI()
+    app.include_router(routes_exports.router)
+    app.state.redis = fakeredis.aioredis.FakeRedis()
+
+    with TestClient(app) as client:
+        resp = client.get("/api/outlet/t1/exports/invoices.csv")
+    assert resp.status_code == 200
+    # rows are read while the response streams, after the endpoint returned
+    assert resp.text.count("INV") == 2
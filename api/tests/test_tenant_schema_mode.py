@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event, func, select
+
+from api.app.db import tenant
+from api.app.models_tenant import Base, Category
+
+
+@pytest.fixture
+def schema_mode(tmp_path, monkeypatch):
+    monkeypatch.setenv(tenant.MODE_ENV, "schema")
+    monkeypatch.setenv(
+        tenant.SCHEMA_DSN_ENV, f"sqlite+aiosqlite:///{tmp_path}/shared.db"
+    )
+    monkeypatch.delenv(tenant.SCHEMA_TEMPLATE_ENV, raising=False)
+
+    # SQLite has no schemas; attach one database file per tenant instead.
+    @event.listens_for(tenant.shared_engine().sync_engine, "connect")
+    def _attach(dbapi_conn, record):
+        cursor = dbapi_conn.cursor()
+        for name in ("tenant_a", "tenant_b_1"):
+            cursor.execute(f"ATTACH DATABASE '{tmp_path}/{name}.db' AS {name}")
+        cursor.close()
+
+    async def _create() -> None:
+        for tenant_id in ("a", "b-1"):
+            async with tenant.get_engine(tenant_id).begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(_create())
+    yield
+    asyncio.run(tenant.dispose_shared_engines())
+
+
+def test_schema_name_validation(monkeypatch):
+    monkeypatch.delenv(tenant.SCHEMA_TEMPLATE_ENV, raising=False)
+    assert tenant.schema_name("Demo-1") == "tenant_demo_1"
+    with pytest.raises(ValueError):
+        tenant.schema_name('x"; drop schema public; --')
+
+
+def test_tenants_share_one_pool_and_stay_isolated(schema_mode):
+    async def scenario():
+        async with tenant.get_tenant_session("a") as session:
+            session.add(Category(name="Drinks", sort=1))
+            await session.commit()
+        counts = {}
+        for tenant_id in ("a", "b-1"):
+            async with tenant.get_tenant_session(tenant_id) as session:
+                counts[tenant_id] = await session.scalar(
+                    select(func.count(Category.id))
+                )
+        return counts
+
+    assert asyncio.run(scenario()) == {"a": 1, "b-1": 0}
+    a, b = tenant.get_engine("a"), tenant.get_engine("b-1")
+    assert a.sync_engine.pool is b.sync_engine.pool
+    assert a.sync_engine.pool is tenant.shared_engine().sync_engine.pool
+    # callers dispose tenant engines after use; the shared pool survives
+    assert a.sync_engine.pool.checkedin() >= 1
@@ -0,0 +1,133 @@
+import asyncio
+
+import fakeredis.aioredis
+import pytest
+from redis.exceptions import ResponseError
+
+from api.app.middleware.rate_limit import _parse_limit
+from api.app.security import ratelimit
+
+
+class _NoScriptRedis:
+    """Minimal Redis double without scripting support."""
+
+    def __init__(self):
+        self.store = {}
+        self.calls = 0
+
+    async def get(self, key):
+        self.calls += 1
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.calls += 1
+        self.store[key] = value
+
+
+def _redis(kind: str):
+    if kind == "lua":
+        # fakeredis runs the script with lupa (the fakeredis[lua] extra)
+        return fakeredis.aioredis.FakeRedis()
+    return _NoScriptRedis()
+
+
+@pytest.fixture(autouse=True)
+def _clear_leases():
+    ratelimit.reset_local()
+    yield
+    ratelimit.reset_local()
+
+
+@pytest.mark.parametrize("kind", ["lua", "fallback"])
+def test_bucket_allows_burst_then_reports_retry(kind, monkeypatch):
+    redis = _redis(kind)
+    now = [1_000_000]
+    monkeypatch.setattr(ratelimit, "_now_ms", lambda: now[0])
+
+    async def take():
+        return await ratelimit.consume(redis, "rl:t", rate_per_min=6, burst=3)
+
+    results = [asyncio.run(take()) for _ in range(3)]
+    assert [r.remaining for r in results] == [2, 1, 0]
+    denied = asyncio.run(take())
+    assert denied.allowed is False
+    assert denied.retry_after == 10
+
+    # one token refills every 10 seconds
+    now[0] += 10_000
+    assert asyncio.run(take()).allowed is True
+    assert asyncio.run(take()).allowed is False
+
+
+@pytest.mark.parametrize("kind", ["lua", "fallback"])
+def test_local_lease_skips_redis(kind, monkeypatch):
+    redis = _redis(kind)
+    monkeypatch.setattr(ratelimit, "_now_ms", lambda: 1_000_000)
+
+    async def take():
+        return await ratelimit.consume(
+            redis, "rl:lease", rate_per_min=60, burst=20, lease=4
+        )
+
+    first = asyncio.run(take())
+    assert first.allowed and first.remaining == 19
+    raw = asyncio.run(redis.get("rl:lease"))
+    assert float((raw.decode() if isinstance(raw, bytes) else raw).split(":")[0]) == 15
+
+    async def _fail(*args, **kwargs):
+        raise AssertionError("lease should be served locally")
+
+    with monkeypatch.context() as m:
+        m.setattr(ratelimit, "_eval", _fail)
+        m.setattr(redis, "get", _fail)
+        for expected in (18, 17, 16, 15):
+            assert asyncio.run(take()).remaining == expected
+    assert asyncio.run(take()).remaining == 14
+
+
+class _ZsetRedis(_NoScriptRedis):
+    """Fallback double whose bucket key still holds a sorted set."""
+
+    def __init__(self, key):
+        super().__init__()
+        self.zset = key
+
+    async def get(self, key):
+        if key == self.zset:
+            raise ResponseError(
+                "WRONGTYPE Operation against a key holding the wrong kind of value"
+            )
+        return await super().get(key)
+
+    async def set(self, key, value, ex=None):
+        if key == self.zset:
+            self.zset = None
+        await super().set(key, value, ex=ex)
+
+
+@pytest.mark.parametrize("kind", ["lua", "fallback"])
+def test_leftover_sorted_set_key_is_replaced(kind):
+    if kind == "lua":
+        redis = fakeredis.aioredis.FakeRedis()
+        asyncio.run(redis.zadd("rl:old", {"1700000000000": 1700000000000}))
+    else:
+        redis = _ZsetRedis("rl:old")
+
+    async def take():
+        return await ratelimit.consume(redis, "rl:old", rate_per_min=6, burst=3)
+
+    assert [asyncio.run(take()).remaining for _ in range(3)] == [2, 1, 0]
+    assert asyncio.run(take()).allowed is False
+
+
+def test_non_positive_rate_is_rejected():
+    redis = fakeredis.aioredis.FakeRedis()
+    for rate in (0, -1):
+        with pytest.raises(ValueError):
+            asyncio.run(ratelimit.consume(redis, "rl:z", rate_per_min=rate, burst=3))
+
+
+def test_zero_auth_limits_fall_back_to_defaults():
+    assert _parse_limit("0/5m", (10, 300)) == (10, 300)
+    assert _parse_limit("10/0m", (10, 300)) == (10, 300)
+    assert _parse_limit("5/1m", (10, 300)) == (5, 60)
@@ -4,12 +4,33 @@ import uuid
 from datetime import datetime, timedelta, timezone
 
 import fakeredis
-import responses
+import httpx
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session
 
+from api.app.security.dns_cache import DNSCache
+from api.app.security.egress_client import SyncEgressClient
 
-def _load_worker(monkeypatch):
+
+class _Hook:
+    """Webhook endpoint answering ``status`` and recording pinned requests."""
+
+    def __init__(self):
+        self.status = 200
+        self.requests = []
+
+    def __call__(self, request):
+        assert request.url.host == "93.184.216.34"
+        assert request.headers["Host"] == "example.com"
+        self.requests.append(request)
+        return httpx.Response(self.status)
+
+    def take(self):
+        count, self.requests = len(self.requests), []
+        return count
+
+
+def _load_worker(monkeypatch, hook):
     monkeypatch.setenv("CB_FAILURE_THRESHOLD", "1")
     monkeypatch.setenv("CB_COOLDOWN_SEC", "1")
     monkeypatch.setenv("CB_HALFOPEN_TRIALS", "1")
@@ -20,11 +41,14 @@ def _load_worker(monkeypatch):
     mod = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(mod)
     mod.REDIS_CLIENT = fakeredis.FakeRedis()
+    dns = DNSCache(sync_resolver=lambda host: (["93.184.216.34"], None))
+    mod.EGRESS = SyncEgressClient(dns, transport=httpx.MockTransport(hook))
     return mod
 
 
 def test_webhook_breaker(monkeypatch):
-    notify_worker = _load_worker(monkeypatch)
+    hook = _Hook()
+    notify_worker = _load_worker(monkeypatch, hook)
 
     engine = create_engine("sqlite:///:memory:")
     notify_worker.NotificationRule.__table__.create(engine)
@@ -56,10 +80,9 @@ def test_webhook_breaker(monkeypatch):
         )
         session.commit()
 
-    with responses.RequestsMock() as rsps:
-        rsps.add(responses.POST, url, status=500)
-        notify_worker.process_once(engine)
-        assert len(rsps.calls) == 1
+    hook.status = 500
+    notify_worker.process_once(engine)
+    assert hook.take() == 1
 
     assert (
         notify_worker.webhook_attempts_total.labels(destination=url_hash)._value.get()
@@ -74,9 +97,8 @@ def test_webhook_breaker(monkeypatch):
     )
 
     # --- Open breaker blocks further attempts ---
-    with responses.RequestsMock() as rsps:
-        notify_worker.process_once(engine)
-        assert len(rsps.calls) == 0
+    notify_worker.process_once(engine)
+    assert hook.take() == 0
 
     # --- Half-open trial succeeds and closes breaker ---
     notify_worker.REDIS_CLIENT.set(f"cb:{url_hash}:until", int(time.time()) - 1)
@@ -86,10 +108,9 @@ def test_webhook_breaker(monkeypatch):
         session.add(evt)
         session.commit()
 
-    with responses.RequestsMock() as rsps:
-        rsps.add(responses.POST, url, status=200)
-        notify_worker.process_once(engine)
-        assert len(rsps.calls) == 1
+    hook.status = 200
+    notify_worker.process_once(engine)
+    assert hook.take() == 1
 
     assert (
         notify_worker.webhook_attempts_total.labels(destination=url_hash)._value.get()
@@ -116,10 +137,9 @@ def test_webhook_breaker(monkeypatch):
         )
         session.commit()
 
-    with responses.RequestsMock() as rsps:
-        rsps.add(responses.POST, url, status=500)
-        notify_worker.process_once(engine)
-        assert len(rsps.calls) == 1
+    hook.status = 500
+    notify_worker.process_once(engine)
+    assert hook.take() == 1
 
     assert (
         notify_worker.webhook_attempts_total.labels(destination=url_hash)._value.get()
@@ -141,10 +161,9 @@ def test_webhook_breaker(monkeypatch):
         session.add(evt)
         session.commit()
 
-    with responses.RequestsMock() as rsps:
-        rsps.add(responses.POST, url, status=500)
-        notify_worker.process_once(engine)
-        assert len(rsps.calls) == 1
+    hook.status = 500
+    notify_worker.process_once(engine)
+    assert hook.take() == 1
 
     assert (
         notify_worker.webhook_attempts_total.labels(destination=url_hash)._value.get()
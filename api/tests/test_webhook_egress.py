@@ -1,8 +1,18 @@
 import socket
 
+import pytest
+
+from api.app.security.dns_cache import default_cache
 from api.app.security.webhook_egress import is_allowed_url
 
 
+@pytest.fixture(autouse=True)
+def _clear_dns_cache():
+    default_cache().clear()
+    yield
+    default_cache().clear()
+
+
 def _patch_dns(monkeypatch, host: str, addr: str) -> None:
     def fake_getaddrinfo(target, *args, **kwargs):  # pragma: no cover - simple stub
         assert target == host
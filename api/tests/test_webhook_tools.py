@@ -3,6 +3,7 @@ import pathlib
 import sys
 from contextlib import asynccontextmanager
 import base64
+from ipaddress import ip_address
 
 sys.path.append(str(pathlib.Path(__file__).resolve().parents[2]))  # noqa: E402
 
@@ -33,10 +34,19 @@ from api.app import routes_webhook_tools  # noqa: E402
 from api.app.auth import create_access_token  # noqa: E402
 from api.app.main import app  # noqa: E402
 from api.app.models_tenant import NotificationOutbox  # noqa: E402
+from api.app.security.webhook_egress import Destination  # noqa: E402
 
 app.state.redis = fakeredis.aioredis.FakeRedis()
 
 
+async def _allowed(url):
+    return Destination(url=url, host="example.com", ip=ip_address("93.184.216.34"))
+
+
+async def _blocked(url):
+    return None
+
+
 def test_scrub_payload_removes_secrets():
     from api.app.utils.scrub import scrub_payload
 
@@ -51,27 +61,14 @@ def test_webhook_test_endpoint(monkeypatch):
     called = {}
 
     class DummyClient:
-        def __init__(self, *args, **kwargs):
-            pass
-
-        async def __aenter__(self):
-            return self
-
-        async def __aexit__(self, exc_type, exc, tb):
-            pass
-
         async def post(self, url, content=None, headers=None):
             called["url"] = url
             called["body"] = content
             called["headers"] = headers
             return httpx.Response(200, json={"msg": "ok"})
 
-    class FakeHttpx:
-        AsyncClient = DummyClient
-        HTTPError = httpx.HTTPError
-
-    monkeypatch.setattr(routes_webhook_tools, "httpx", FakeHttpx)
-    monkeypatch.setattr(routes_webhook_tools, "is_allowed_url", lambda url: True)
+    monkeypatch.setattr(routes_webhook_tools, "shared_client", DummyClient)
+    monkeypatch.setattr(routes_webhook_tools, "resolve_destination", _allowed)
 
     token = create_access_token({"sub": "admin@example.com", "role": "super_admin"})
 
@@ -101,15 +98,6 @@ def test_webhook_test_endpoint(monkeypatch):
 
 def test_webhook_test_endpoint_binary(monkeypatch):
     class DummyClient:
-        def __init__(self, *args, **kwargs):
-            pass
-
-        async def __aenter__(self):
-            return self
-
-        async def __aexit__(self, exc_type, exc, tb):
-            pass
-
         async def post(self, url, content=None, headers=None):
             return httpx.Response(
                 200,
@@ -117,12 +105,8 @@ def test_webhook_test_endpoint_binary(monkeypatch):
                 headers={"Content-Type": "application/octet-stream"},
             )
 
-    class FakeHttpx:
-        AsyncClient = DummyClient
-        HTTPError = httpx.HTTPError
-
-    monkeypatch.setattr(routes_webhook_tools, "httpx", FakeHttpx)
-    monkeypatch.setattr(routes_webhook_tools, "is_allowed_url", lambda url: True)
+    monkeypatch.setattr(routes_webhook_tools, "shared_client", DummyClient)
+    monkeypatch.setattr(routes_webhook_tools, "resolve_destination", _allowed)
 
     token = create_access_token({"sub": "admin@example.com", "role": "super_admin"})
 
@@ -166,7 +150,7 @@ def test_webhook_test_blocked(monkeypatch):
                 headers={"Authorization": f"Bearer {token}"},
             )
 
-    monkeypatch.setattr(routes_webhook_tools, "is_allowed_url", lambda url: False)
+    monkeypatch.setattr(routes_webhook_tools, "resolve_destination", _blocked)
 
     resp = asyncio.run(_run())
     assert resp.status_code == 400
@@ -175,31 +159,22 @@ def test_webhook_test_blocked(monkeypatch):
 
 def test_webhook_test_ratelimit(monkeypatch):
     class DummyClient:
-        def __init__(self, *args, **kwargs):
-            pass
-
-        async def __aenter__(self):
-            return self
-
-        async def __aexit__(self, exc_type, exc, tb):
-            pass
-
         async def post(self, url, content=None, headers=None):
             return httpx.Response(200, text="ok")
 
-    class FakeHttpx:
-        AsyncClient = DummyClient
-
-    monkeypatch.setattr(routes_webhook_tools, "httpx", FakeHttpx)
-    monkeypatch.setattr(routes_webhook_tools, "is_allowed_url", lambda url: True)
+    monkeypatch.setattr(routes_webhook_tools, "shared_client", DummyClient)
+    monkeypatch.setattr(routes_webhook_tools, "resolve_destination", _allowed)
 
     calls = {"n": 0}
 
-    async def _allow(redis, ip, key, rate_per_min=60, burst=1):
+    async def _hit(redis, ip, key, rate_per_min=60, burst=1):
         calls["n"] += 1
-        return calls["n"] == 1
+        allowed = calls["n"] == 1
+        return routes_webhook_tools.ratelimit.RateLimitResult(
+            allowed, 0, 0 if allowed else 30
+        )
 
-    monkeypatch.setattr(routes_webhook_tools.ratelimit, "allow", _allow)
+    monkeypatch.setattr(routes_webhook_tools.ratelimit, "hit", _hit)
 
     token = create_access_token({"sub": "admin@example.com", "role": "super_admin"})
 
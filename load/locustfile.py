@@ -1,4 +1,5 @@
 import os
+import random
 import uuid
 
 import gevent
@@ -10,6 +11,9 @@ ORDER_PATH = f"/g/{TABLE_TOKEN}/order"
 BILL_PATH = f"/g/{TABLE_TOKEN}/bill"
 TENANT = os.getenv("TENANT", "demo")
 SSE_PATH = f"/api/outlet/{TENANT}/tables/map/stream"
+ROOM_TOKENS = os.getenv("ROOM_TOKENS", "R-101").split(",")
+ROOM_MENU_NAME = "/h/[room]/menu"
+ROOM_ORDER_NAME = "/h/[room]/order"
 
 P95_MENU_MS = 200
 P95_ORDER_MS = 400
@@ -49,6 +53,49 @@ class GuestUser(HttpUser):
         self.client.get(BILL_PATH, params={"coupon": "SAVE5"})
 
 
+class RoomServiceUser(HttpUser):
+    """Simulate hotel guests browsing the room-service menu at check-in peaks.
+
+    Each user picks a room from ``ROOM_TOKENS``; most requests are
+    revalidations that should be answered with ``304``.
+    """
+
+    host = os.environ.get("HOST", "http://localhost:8000")
+    wait_time = between(1, 3)
+    _etag: str | None = None
+
+    def on_start(self) -> None:
+        self.room = random.choice(ROOM_TOKENS)
+
+    @task(10)
+    def view_menu(self) -> None:
+        """Load the room menu, revalidating with the last ETag."""
+
+        headers = {}
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        with self.client.get(
+            f"/h/{self.room}/menu",
+            headers=headers,
+            name=ROOM_MENU_NAME,
+            catch_response=True,
+        ) as resp:
+            if resp.status_code == 304:
+                resp.success()
+            elif resp.status_code == 200:
+                self._etag = resp.headers.get("ETag")
+
+    @task(1)
+    def order_room_service(self) -> None:
+        """Place a room-service order."""
+
+        payload = {"items": [{"item_id": "1", "qty": 1}]}
+        headers = {"Idempotency-Key": str(uuid.uuid4())}
+        self.client.post(
+            f"/h/{self.room}/order", json=payload, headers=headers, name=ROOM_ORDER_NAME
+        )
+
+
 class TableStreamUser(HttpUser):
     """Maintain a steady SSE connection for table map updates."""
 
@@ -80,6 +127,9 @@ def verify_thresholds(environment, **kwargs) -> None:
     order = environment.stats.get(ORDER_PATH, "POST")
     if order and order.get_response_time_percentile(0.95) > P95_ORDER_MS:
         failures.append(f"order p95>{P95_ORDER_MS}ms")
+    room_menu = environment.stats.get(ROOM_MENU_NAME, "GET")
+    if room_menu and room_menu.get_response_time_percentile(0.95) > P95_MENU_MS:
+        failures.append(f"room menu p95>{P95_MENU_MS}ms")
     if failures:
         print("Performance thresholds not met:", ", ".join(failures))
         environment.process_exit_code = 1
@@ -13,17 +13,20 @@ Usage::
 Environment variables:
 
 - ``POSTGRES_TENANT_DSN_TEMPLATE``: DSN template for tenant databases.
+- ``PII_DAYS``: Retention window used by the scheduled ``JOB`` (default: 30).
 """
 
 from __future__ import annotations
 
 import argparse
 import asyncio
+import os
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Ensure ``api`` package is importable when running as a standalone script
 BASE_DIR = Path(__file__).resolve().parents[1]
@@ -33,8 +36,12 @@ sys.path.append(str(BASE_DIR / "api"))
 from app.db.tenant import get_tenant_session  # type: ignore  # noqa: E402
 from app.models_tenant import AuditTenant  # type: ignore  # noqa: E402
 
+from api.app.jobs import JobContext, TenantJob  # type: ignore  # noqa: E402
 
-async def anonymize(tenant: str, days: int = 30) -> None:
+
+async def anonymize(
+    tenant: str, days: int = 30, session: AsyncSession | None = None
+) -> None:
     """Anonymize guest PII for ``tenant``.
 
     Parameters
@@ -43,41 +50,57 @@ async def anonymize(tenant: str, days: int = 30) -> None:
         Tenant identifier whose database should be updated.
     days:
         Rows older than this many days will be anonymized.
+    session:
+        Optional open tenant session; a new one is created when omitted.
     """
 
+    if session is None:
+        async with get_tenant_session(tenant) as session:
+            return await _anonymize(session, days)
+    return await _anonymize(session, days)
+
+
+async def _anonymize(session: AsyncSession, days: int) -> None:
     cutoff = datetime.utcnow() - timedelta(days=days)
 
-    async with get_tenant_session(tenant) as session:
-        cust_res = await session.execute(
-            text(
-                "UPDATE customers SET name = NULL, phone = NULL, email = NULL "
-                "WHERE created_at < :cutoff"
-            ),
-            {"cutoff": cutoff},
-        )
-        cust_count = cust_res.rowcount or 0
-
-        inv_res = await session.execute(
-            text(
-                "UPDATE invoices SET name = NULL, phone = NULL, email = NULL "
-                "WHERE created_at < :cutoff"
-            ),
-            {"cutoff": cutoff},
-        )
-        inv_count = inv_res.rowcount or 0
-
-        session.add(
-            AuditTenant(
-                actor="system",
-                action="anonymize_pii",
-                meta={
-                    "customers": cust_count,
-                    "invoices": inv_count,
-                    "cutoff": cutoff.isoformat(),
-                },
-            )
+    cust_res = await session.execute(
+        text(
+            "UPDATE customers SET name = NULL, phone = NULL, email = NULL "
+            "WHERE created_at < :cutoff"
+        ),
+        {"cutoff": cutoff},
+    )
+    cust_count = cust_res.rowcount or 0
+
+    inv_res = await session.execute(
+        text(
+            "UPDATE invoices SET name = NULL, phone = NULL, email = NULL "
+            "WHERE created_at < :cutoff"
+        ),
+        {"cutoff": cutoff},
+    )
+    inv_count = inv_res.rowcount or 0
+
+    session.add(
+        AuditTenant(
+            actor="system",
+            action="anonymize_pii",
+            meta={
+                "customers": cust_count,
+                "invoices": inv_count,
+                "cutoff": cutoff.isoformat(),
+            },
         )
-        await session.commit()
+    )
+    await session.commit()
+
+
+async def _run_job(ctx: JobContext) -> None:
+    async with ctx.session() as session:
+        await anonymize(ctx.tenant_id, int(os.getenv("PII_DAYS", "30")), session)
+
+
+JOB = TenantJob("anonymize_pii", _run_job, interval=86400, concurrency=2, jitter=1800)
 
 
 def _cli() -> None:
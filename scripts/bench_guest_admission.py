@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Benchmark guest order POST latency with and without guest admission.
+
+Creates ``--tables`` tables (a tenth of them locked) in an in-memory SQLite
+database and posts ``--requests`` guest orders to random table codes from
+``--concurrency`` clients against two stacks that differ only in their
+pre-checks:
+
+* ``before``: :class:`RoomStateGuard`, :class:`TableStateGuardMiddleware`
+  and :class:`GuestBlockMiddleware`, each doing its own database query or
+  Redis round-trip;
+* ``after``: :class:`GuestAdmissionMiddleware` answering every check from
+  one Redis pipeline behind the in-process cache.
+
+Example::
+
+    python scripts/bench_guest_admission.py --tables 1000 --requests 20000
+    python scripts/bench_guest_admission.py --redis-url redis://localhost:6379/15
+
+Without ``--redis-url`` an in-process fakeredis is used, which understates
+the cost of the extra Redis round-trips of the ``before`` stack.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+
+# Ensure ``api`` package is importable when running as a standalone script
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
+
+for _name, _value in {
+    "ALLOWED_ORIGINS": "*",
+    "DATABASE_URL": "sqlite+aiosqlite://",
+    "DB_URL": "sqlite://",
+    "REDIS_URL": "redis://localhost",
+    "SECRET_KEY": "x" * 32,
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from api.app import db as app_db  # noqa: E402
+
+app_db.SessionLocal, app_db.engine = app_db.create_test_session()
+
+from api.app.middlewares.guest_admission import GuestAdmissionMiddleware  # noqa: E402
+from api.app.middlewares.guest_block import GuestBlockMiddleware  # noqa: E402
+from api.app.middlewares.room_state_guard import RoomStateGuard  # noqa: E402
+from api.app.middlewares.table_state_guard import (  # noqa: E402
+    TableStateGuardMiddleware,
+)
+from api.app.models_tenant import Table  # noqa: E402
+
+
+def _seed(count: int) -> list[str]:
+    tenant_id = uuid.uuid4()
+    codes = []
+    with app_db.SessionLocal() as session:
+        for i in range(count):
+            code = f"T-{i:04d}"
+            codes.append(code)
+            session.add(
+                Table(
+                    id=uuid.uuid4(),
+                    tenant_id=tenant_id,
+                    name=f"Table {i}",
+                    code=code,
+                    state="LOCKED" if i % 10 == 0 else "AVAILABLE",
+                )
+            )
+        session.commit()
+    return codes
+
+
+def _app(stack: str, redis) -> FastAPI:
+    app = FastAPI()
+    app.state.redis = redis
+    if stack == "before":
+        app.add_middleware(GuestBlockMiddleware)
+        app.add_middleware(TableStateGuardMiddleware)
+        app.add_middleware(RoomStateGuard)
+    else:
+        app.add_middleware(GuestAdmissionMiddleware)
+
+    @app.post("/g/{token}/order")
+    async def order(token: str) -> dict:
+        return {"ok": True, "data": {"token": token}}
+
+    return app
+
+
+async def _run(app: FastAPI, codes: list[str], requests: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    timings: list[float] = []
+    statuses: dict[int, int] = {}
+    rng = random.Random(7)
+    queue = [rng.choice(codes) for _ in range(requests)]
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker() -> None:
+            while queue:
+                code = queue.pop()
+                started = time.perf_counter()
+                resp = await client.post(
+                    f"/g/{code}/order", headers={"X-Tenant-ID": "bench"}
+                )
+                timings.append(time.perf_counter() - started)
+                statuses[resp.status_code] = statuses.get(resp.status_code, 0) + 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    timings.sort()
+    return {
+        "p50_ms": statistics.median(timings) * 1000,
+        "p99_ms": timings[int(len(timings) * 0.99) - 1] * 1000,
+        "statuses": dict(sorted(statuses.items())),
+    }
+
+
+async def main(tables: int, requests: int, concurrency: int, redis_url: str | None):
+    if redis_url:
+        import redis.asyncio as redis_asyncio
+
+        redis = redis_asyncio.from_url(redis_url)
+    else:
+        import fakeredis.aioredis
+
+        redis = fakeredis.aioredis.FakeRedis()
+    codes = _seed(tables)
+    for stack in ("before", "after"):
+        await redis.flushdb()
+        app = _app(stack, redis)
+        await _run(app, codes, min(requests, 500), concurrency)  # warm up
+        result = await _run(app, codes, requests, concurrency)
+        print(
+            f"{stack:>6}: p50={result['p50_ms']:.2f}ms p99={result['p99_ms']:.2f}ms "
+            f"statuses={result['statuses']}"
+        )
+    await redis.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=1000, help="Tables to seed")
+    parser.add_argument("--requests", type=int, default=5000, help="Orders per stack")
+    parser.add_argument("--concurrency", type=int, default=20, help="Parallel clients")
+    parser.add_argument("--redis-url", help="Redis to use instead of fakeredis")
+    args = parser.parse_args()
+    asyncio.run(main(args.tables, args.requests, args.concurrency, args.redis_url))
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Measure invoice number contention under concurrent checkouts.
+
+Fires ``--concurrency`` concurrent :func:`generate_invoice` calls against one
+invoice series, repeated ``--rounds`` times, and reports p50/p99 latency of a
+whole checkout together with the time spent in the counter increment (lock
+wait) and the time the counter row stays locked until the commit (lock hold).
+
+Run it against a scratch tenant database, for example::
+
+    python scripts/bench_invoice_contention.py \
+        --dsn postgresql+asyncpg://postgres@localhost/bench -c 32 -r 20
+
+Without ``--dsn`` a temporary SQLite file is used, which only serves as a
+smoke test since SQLite locks the whole database for every writer.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextvars
+import os
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Ensure ``api`` package is importable when running as a standalone script
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
+
+from api.app.models_tenant import Base, Invoice, InvoiceCounter  # noqa: E402
+from api.app.repos_sqlalchemy import invoices_repo_sql  # noqa: E402
+from api.app.utils import invoice_counter  # noqa: E402
+
+_allocated_at: contextvars.ContextVar[float] = contextvars.ContextVar("allocated_at")
+
+
+class _Tenant:
+    inv_prefix = "BENCH"
+    inv_reset = "never"
+    timezone = "UTC"
+
+
+@asynccontextmanager
+async def _master_session():
+    class _Session:
+        async def get(self, model, tenant_id):
+            return _Tenant()
+
+    yield _Session()
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _summary(name: str, values: list[float]) -> str:
+    return (
+        f"{name:<12} p50={_percentile(values, 50) * 1000:8.2f}ms "
+        f"p99={_percentile(values, 99) * 1000:8.2f}ms "
+        f"max={max(values) * 1000:8.2f}ms"
+    )
+
+
+async def run(dsn: str, concurrency: int, rounds: int) -> dict[str, list[float]]:
+    """Run the benchmark and return the raw timings in seconds."""
+
+    connect_args = {"timeout": 30} if dsn.startswith("sqlite") else {}
+    engine = create_async_engine(
+        dsn, pool_size=concurrency, max_overflow=0, connect_args=connect_args
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(delete(Invoice))
+        await conn.execute(delete(InvoiceCounter))
+    sessions = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+    timings: dict[str, list[float]] = {"checkout": [], "lock_wait": [], "lock_hold": []}
+    allocate = invoice_counter.allocate_invoice_number
+
+    async def timed_allocate(session, series):
+        start = time.perf_counter()
+        number = await allocate(session, series)
+        now = time.perf_counter()
+        timings["lock_wait"].append(now - start)
+        _allocated_at.set(now)
+        return number
+
+    async def checkout() -> None:
+        async with sessions() as session:
+            start = time.perf_counter()
+            await invoices_repo_sql.generate_invoice(
+                session, 0, "unreg", "nearest_1", "bench"
+            )
+            await session.commit()
+            end = time.perf_counter()
+        timings["checkout"].append(end - start)
+        timings["lock_hold"].append(end - _allocated_at.get(end))
+
+    invoice_counter.allocate_invoice_number = timed_allocate
+    invoices_repo_sql.get_master_session = _master_session
+    try:
+        for _ in range(rounds):
+            await asyncio.gather(*(checkout() for _ in range(concurrency)))
+    finally:
+        invoice_counter.allocate_invoice_number = allocate
+        await engine.dispose()
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dsn", help="async SQLAlchemy URL of a scratch database")
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-r", "--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dsn = args.dsn or f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        timings = asyncio.run(run(dsn, args.concurrency, args.rounds))
+
+    total = len(timings["checkout"])
+    print(f"{total} checkouts, concurrency {args.concurrency}")
+    for name, values in timings.items():
+        print(_summary(name, values))
+    print(f"mean lock wait {statistics.mean(timings['lock_wait']) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
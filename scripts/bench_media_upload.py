@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Benchmark concurrent image uploads and the event-loop lag they cause.
+
+Generates ``--uploads`` distinct JPEGs of ``--size`` pixels and processes
+them ``--concurrency`` at a time, as the media upload route does, in two
+modes:
+
+* ``inline``: decode and encode on the event loop, as uploads used to;
+* ``pool``: through :func:`api.app.media.images.process` with
+  ``--workers`` worker processes.
+
+Meanwhile a ticker coroutine sleeps 10ms at a time and records how late it
+wakes up; the report shows uploads per second and the p50/p99/max lag.
+Example::
+
+    python scripts/bench_media_upload.py --uploads 40 --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+
+# Ensure ``api`` package is importable when running as a standalone script
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
+
+from api.app.media import images  # noqa: E402
+
+TICK = 0.01
+
+
+def build_jpeg(size: int, seed: int) -> bytes:
+    img = Image.effect_mandelbrot(
+        (size, size * 3 // 4), (-2 + seed * 0.001, -1.5, 1, 1.5), 100
+    ).convert("RGB")
+    out = BytesIO()
+    img.save(out, format="JPEG", quality=90)
+    return out.getvalue()
+
+
+async def _ticker(lags: list, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        started = loop.time()
+        await asyncio.sleep(TICK)
+        lags.append(loop.time() - started - TICK)
+
+
+async def run(mode: str, uploads: list, concurrency: int) -> None:
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(data: bytes) -> int:
+        async with limit:
+            if mode == "inline":
+                processed = images.process_image(data, "JPEG")
+            else:
+                processed = await images.process(data, "JPEG")
+            return processed.size
+
+    if mode == "pool":
+        # Start the workers outside the measurement
+        await images.process(uploads[0], "JPEG")
+    lags: list = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(lags, stop))
+    await asyncio.sleep(TICK)
+    started = time.perf_counter()
+    sizes = await asyncio.gather(*(one(data) for data in uploads))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+    lags.sort()
+    p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+    print(
+        f"{mode:>6}: {len(uploads) / elapsed:6.2f} uploads/s "
+        f"({sum(sizes) / len(uploads) / 1024:.0f} KiB stored each), "
+        f"loop lag p50 {statistics.median(lags) * 1000:.1f}ms "
+        f"p99 {p99 * 1000:.1f}ms max {lags[-1] * 1000:.1f}ms"
+    )
+
+
+async def main(count: int, size: int, concurrency: int, modes: list) -> None:
+    uploads = [build_jpeg(size, i) for i in range(count)]
+    print(
+        f"{count} uploads of {size}px, {concurrency} concurrent, "
+        f"{images.WORKERS} workers, widths {images.WIDTHS}, "
+        f"formats {images.FORMATS}"
+    )
+    try:
+        for mode in modes:
+            await run(mode, uploads, concurrency)
+    finally:
+        images.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=20, help="Images to upload")
+    parser.add_argument("--size", type=int, default=1600, help="Image width")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel uploads")
+    parser.add_argument("--workers", type=int, default=2, help="Worker processes")
+    parser.add_argument(
+        "--mode", choices=["inline", "pool", "both"], default="both", help="Modes"
+    )
+    args = parser.parse_args()
+    images.WORKERS = max(args.workers, 1)
+    modes = ["inline", "pool"] if args.mode == "both" else [args.mode]
+    asyncio.run(main(args.uploads, args.size, args.concurrency, modes))
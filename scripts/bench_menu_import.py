@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Benchmark the bulk menu import on a generated menu.
+
+Builds a CSV of ``--items`` items spread over ``--categories`` categories and
+times, against a fresh tenant database:
+
+* ``initial``: importing the file into an empty menu;
+* ``noop``: importing the same file again, which must write nothing;
+* ``diff``: importing a copy with 10% of the prices changed and 5% of the
+  items removed (soft-deleted);
+* ``per-item``: for comparison, ``--per-item`` items inserted one by one with
+  a commit and menu version bump each, as the admin menu routes do.
+
+Uses a temporary SQLite database unless ``--db-url`` is given (its menu tables
+are created if missing, not emptied). Example::
+
+    python scripts/bench_menu_import.py --items 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+# Ensure ``api`` package is importable when running as a standalone script
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
+
+from api.app.menu import importer  # noqa: E402
+from api.app.models_tenant import Base, Category, MenuItem  # noqa: E402
+from api.app.repos_sqlalchemy.menu_repo_sql import MenuRepoSQL  # noqa: E402
+
+
+def build_csv(items: int, categories: int, changed: bool = False) -> bytes:
+    out = io.StringIO()
+    out.write("category,name,price,is_veg,dietary,modifiers\n")
+    for i in range(items):
+        if changed and i % 20 == 0:
+            continue
+        price = 100 + i % 400 + (5 if changed and i % 10 == 1 else 0)
+        veg = "yes" if i % 2 else "no"
+        out.write(
+            f"Category {i % categories},Item {i},{price},{veg},vegan,"
+            f"Large:{i % 50}|Extra:{i % 7}\n"
+        )
+    return out.getvalue().encode()
+
+
+async def _import(engine, data: bytes) -> tuple[float, dict]:
+    started = time.perf_counter()
+    parsed = importer.parse(io.BytesIO(data))
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        changes = await importer.diff(session, parsed)
+        await importer.apply(session, changes)
+    return time.perf_counter() - started, changes.summary()
+
+
+async def _per_item(engine, count: int) -> float:
+    repo = MenuRepoSQL()
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        category = Category(name="Per item", sort=0)
+        session.add(category)
+        await session.commit()
+        started = time.perf_counter()
+        for i in range(count):
+            session.add(MenuItem(category_id=category.id, name=f"Single {i}", price=1))
+            await repo._bump_menu_version(session)
+            await session.commit()
+    return time.perf_counter() - started
+
+
+async def main(db_url: str, items: int, categories: int, per_item: int) -> None:
+    engine = create_async_engine(db_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    original = build_csv(items, categories)
+    print(f"{items} items, {len(original) / 1024:.0f} KiB CSV")
+    try:
+        for label, data in (
+            ("initial", original),
+            ("noop", original),
+            ("diff", build_csv(items, categories, changed=True)),
+        ):
+            elapsed, summary = await _import(engine, data)
+            print(f"{label:>8}: {elapsed * 1000:8.1f}ms {summary}")
+        if per_item:
+            elapsed = await _per_item(engine, per_item)
+            print(
+                f"per-item: {elapsed * 1000:8.1f}ms for {per_item} items "
+                f"(~{elapsed / per_item * items * 1000:.0f}ms for {items})"
+            )
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db-url", help="Tenant database URL")
+    parser.add_argument("--items", type=int, default=10000, help="Menu items")
+    parser.add_argument("--categories", type=int, default=50, help="Categories")
+    parser.add_argument(
+        "--per-item", type=int, default=500, help="Items for the per-item baseline"
+    )
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.db_url or f"sqlite+aiosqlite:///{os.path.join(tmp, 'menu.db')}"
+        asyncio.run(main(url, args.items, args.categories, args.per_item))
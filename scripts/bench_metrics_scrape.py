@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Measure Redis time of a /metrics scrape as unrelated keys grow.
+
+Seeds ``--tenants`` print retry queues, then for each keyspace size in
+``--sizes`` adds unrelated keys and times ``--scrapes`` reads of the retry
+gauges two ways:
+
+* ``keys``: the previous scrape, ``KEYS print:retry:*`` followed by LLEN and
+  LINDEX per queue;
+* ``registry``: :func:`api.app.redis_registry.print_retry_totals`, one
+  ``SMEMBERS`` of the registry and one pipeline.
+
+Runs against an in-process fakeredis unless ``--redis-url`` is given (the
+database is flushed). Example::
+
+    python scripts/bench_metrics_scrape.py --sizes 0 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import fakeredis.aioredis
+from redis.asyncio import from_url
+
+# Ensure ``api`` package is importable when running as a standalone script
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
+
+from api.app import redis_registry  # noqa: E402
+
+
+async def _legacy(redis) -> tuple[int, int]:
+    total = 0
+    for key in await redis.keys("print:retry:*"):
+        total += await redis.llen(key)
+        await redis.lindex(key, 0)
+    return total, 0
+
+
+async def _time(fn, redis, scrapes: int) -> float:
+    samples = []
+    for _ in range(scrapes):
+        started = time.perf_counter()
+        await fn(redis)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+async def main(redis_url: str | None, tenants: int, sizes: list[int], scrapes: int):
+    redis = from_url(redis_url) if redis_url else fakeredis.aioredis.FakeRedis()
+    await redis.flushdb()
+    now = datetime.now(timezone.utc).isoformat()
+    for i in range(tenants):
+        await redis_registry.enqueue_print_retry(redis, f"t{i}", now)
+    seeded = 0
+    for size in sorted(sizes):
+        for start in range(seeded, size, 10000):
+            stop = min(start + 10000, size)
+            await redis.mset({f"unrelated:{i}": i for i in range(start, stop)})
+        seeded = max(seeded, size)
+        legacy = await _time(_legacy, redis, scrapes)
+        registry = await _time(redis_registry.print_retry_totals, redis, scrapes)
+        print(
+            f"{size:>7} unrelated keys: keys={legacy:.2f}ms "
+            f"registry={registry:.2f}ms per scrape"
+        )
+    await redis.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--redis-url", help="Benchmark a real Redis server")
+    parser.add_argument("--tenants", type=int, default=20, help="Retry queues")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[0, 10000, 100000],
+        help="Unrelated key counts",
+    )
+    parser.add_argument("--scrapes", type=int, default=20, help="Scrapes per size")
+    args = parser.parse_args()
+    asyncio.run(main(args.redis_url, args.tenants, args.sizes, args.scrapes))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Measure peak memory of the streaming Parquet export.
+
+Seeds a SQLite database with synthetic ``orders`` and then dumps the first
+N rows for each ``--rows`` value in a fresh subprocess, reporting wall time,
+row groups and the child's peak RSS. With streaming row groups the peak RSS
+should stay roughly flat as N grows; the script exits non-zero if the largest
+run needs more than ``--max-growth`` times the memory of the smallest.
+
+Example::
+
+    python scripts/bench_parquet_dump.py --rows 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pyarrow.parquet as pq
+from sqlalchemy import create_engine
+
+# Ensure ``api`` package is importable when running as a standalone script
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
+
+from api.app.bi_dump import DATASETS, dump_dataset  # noqa: E402
+from api.app.models_tenant import Base, Order  # noqa: E402
+
+_BASE = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+def _seed(path: Path, rows: int, chunk: int = 50_000) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine, tables=[Order.__table__])
+    with engine.begin() as conn:
+        for offset in range(0, rows, chunk):
+            conn.execute(
+                Order.__table__.insert(),
+                [
+                    {
+                        "id": i + 1,
+                        "table_id": i % 40 + 1,
+                        "status": "SERVED",
+                        "placed_at": _BASE + timedelta(seconds=i),
+                        "served_at": _BASE + timedelta(seconds=i + 900),
+                    }
+                    for i in range(offset, min(offset + chunk, rows))
+                ],
+            )
+    engine.dispose()
+
+
+def _child(db: Path, rows: int, out: Path) -> None:
+    engine = create_engine(f"sqlite:///{db}")
+    started = time.perf_counter()
+    stats = dump_dataset(
+        engine,
+        DATASETS["orders"],
+        _BASE,
+        _BASE + timedelta(seconds=rows),
+        out,
+    )
+    elapsed = time.perf_counter() - started
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{stats.rows} {elapsed:.2f} {peak_kb}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--max-growth", type=float, default=1.5)
+    parser.add_argument("--child", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        db, rows, out = args.child
+        _child(Path(db), int(rows), Path(out))
+        return
+
+    sizes = sorted(args.rows)
+    peaks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "bench.db"
+        _seed(db, sizes[-1])
+        for rows in sizes:
+            out = Path(tmp) / f"orders_{rows}.parquet"
+            result = subprocess.run(
+                [sys.executable, __file__, "--child", str(db), str(rows), str(out)],
+                check=True,
+                capture_output=True,
+                text=True,
+                env=os.environ.copy(),
+            )
+            dumped, elapsed, peak_kb = result.stdout.split()[-3:]
+            peaks.append(int(peak_kb))
+            groups = pq.ParquetFile(out).metadata.num_row_groups
+            print(
+                f"rows={dumped} row_groups={groups} time={elapsed}s "
+                f"peak_rss={int(peak_kb) / 1024:.1f}MiB"
+            )
+
+    growth = peaks[-1] / peaks[0]
+    print(f"peak RSS growth {sizes[0]} -> {sizes[-1]} rows: {growth:.2f}x")
+    if growth > args.max_growth:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
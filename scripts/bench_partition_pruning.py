@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Compare date-range queries on partitioned and unpartitioned orders.
+
+Copies the ``orders`` rows of a seeded tenant (see
+``scripts/seed_large_outlet.py``) into two scratch tables, spreading
+``placed_at`` over the last ``--months`` months: ``bench_orders_flat`` is a
+plain table with an index on ``placed_at`` and ``bench_orders_part`` is
+partitioned by month with the layout :mod:`api.app.db.partitions` maintains.
+It then runs ``--runs`` one-month ``COUNT``/``SUM`` range queries against
+both and reports the median latency and the partitions scanned according to
+``EXPLAIN``.
+
+Example::
+
+    python scripts/seed_large_outlet.py --tenant bench --orders 200000
+    python scripts/bench_partition_pruning.py --tenant bench --months 24
+
+The scratch tables are dropped afterwards unless ``--keep`` is given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from sqlalchemy import text
+
+# Ensure ``api`` package is importable when running as a standalone script
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
+
+from api.app.db.partitions import add_months, create_sql  # noqa: E402
+from api.app.db.tenant import get_tenant_session  # noqa: E402
+
+FLAT = "bench_orders_flat"
+PART = "bench_orders_part"
+_COLUMNS = "id BIGINT NOT NULL, table_id UUID, status TEXT, placed_at TIMESTAMPTZ NOT NULL"
+_COPY = (
+    "INSERT INTO {table} (id, table_id, status, placed_at) "
+    "SELECT id, table_id, status::text, "
+    "date_trunc('month', now()) - (id % :months) * interval '1 month' "
+    "+ (id % 28) * interval '1 day' FROM orders"
+)
+_QUERY = (
+    "SELECT COUNT(*), COUNT(DISTINCT table_id) FROM {table} "
+    "WHERE placed_at >= :start AND placed_at < :end"
+)
+
+
+async def _setup(session, months: int) -> int:
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    for table in (FLAT, PART):
+        await session.execute(text(f"DROP TABLE IF EXISTS {table} CASCADE"))
+    await session.execute(text(f"CREATE TABLE {FLAT} ({_COLUMNS})"))
+    await session.execute(
+        text(f"CREATE TABLE {PART} ({_COLUMNS}) PARTITION BY RANGE (placed_at)")
+    )
+    for offset in range(-months, 2):
+        await session.execute(text(create_sql(PART, add_months(current, offset))))
+    for table in (FLAT, PART):
+        await session.execute(text(_COPY.format(table=table)), {"months": months})
+        await session.execute(
+            text(f"CREATE INDEX ON {table} (placed_at)")  # nosec B608
+        )
+        await session.execute(text(f"ANALYZE {table}"))
+    await session.commit()
+    return (await session.execute(text(f"SELECT COUNT(*) FROM {FLAT}"))).scalar()
+
+
+def _scanned(plan: list) -> int:
+    """Count the relations scanned in an ``EXPLAIN (FORMAT JSON)`` plan."""
+
+    def walk(node: dict) -> int:
+        own = 1 if "Relation Name" in node else 0
+        return own + sum(walk(child) for child in node.get("Plans", []))
+
+    return walk(plan[0]["Plan"])
+
+
+async def _bench(session, table: str, ranges: list[tuple[date, date]]) -> dict:
+    sql = _QUERY.format(table=table)
+    timings = []
+    for start, end in ranges:
+        params = {"start": start, "end": end}
+        began = time.perf_counter()
+        await session.execute(text(sql), params)
+        timings.append(time.perf_counter() - began)
+    start, end = ranges[0]
+    plan = (
+        await session.execute(
+            text(f"EXPLAIN (FORMAT JSON) {sql}"), {"start": start, "end": end}
+        )
+    ).scalar()
+    plan = json.loads(plan) if isinstance(plan, str) else plan
+    return {
+        "median_ms": statistics.median(timings) * 1000,
+        "relations": _scanned(plan),
+    }
+
+
+async def main(tenant: str, months: int, runs: int, keep: bool) -> None:
+    async with get_tenant_session(tenant) as session:
+        if session.bind.dialect.name != "postgresql":
+            raise SystemExit("partition pruning requires PostgreSQL")
+        rows = await _setup(session, months)
+        current = datetime.now(timezone.utc).date().replace(day=1)
+        ranges = [
+            (add_months(current, -(i % months)), add_months(current, 1 - (i % months)))
+            for i in range(runs)
+        ]
+        try:
+            for label, table in (("unpruned", FLAT), ("pruned", PART)):
+                result = await _bench(session, table, ranges)
+                print(
+                    f"{label:>8}: rows={rows} median={result['median_ms']:.2f}ms "
+                    f"relations_scanned={result['relations']}"
+                )
+        finally:
+            if not keep:
+                for table in (FLAT, PART):
+                    await session.execute(text(f"DROP TABLE IF EXISTS {table} CASCADE"))
+                await session.commit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tenant", required=True, help="Seeded tenant identifier")
+    parser.add_argument("--months", type=int, default=24, help="Months of history")
+    parser.add_argument("--runs", type=int, default=50, help="Queries per table")
+    parser.add_argument("--keep", action="store_true", help="Keep scratch tables")
+    args = parser.parse_args()
+    asyncio.run(main(args.tenant, args.months, args.runs, args.keep))
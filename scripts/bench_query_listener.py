@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Measure the per-query overhead of the SQLAlchemy query listeners.
+
+Runs ``--queries`` primary-key selects and ``--batches`` executemany inserts
+of ``--batch-size`` rows against an in-memory SQLite database, once per
+listener setup, and reports the best of ``--rounds`` interleaved rounds:
+
+* ``none``: no listener attached;
+* ``legacy``: the previous listener, which re-joined the SQL and hashed
+  ``repr(parameters)`` on every execute;
+* ``stats``: :func:`api.app.obs.add_query_logger`, which records query
+  fingerprint statistics.
+
+Example::
+
+    python scripts/bench_query_listener.py --queries 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import random
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    bindparam,
+    create_engine,
+    event,
+    insert,
+    select,
+)
+from sqlalchemy.orm import declarative_base
+
+# Ensure ``api`` package is importable when running as a standalone script
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
+
+from api.app.obs import add_query_logger  # noqa: E402
+from api.app.obs.query_stats import query_stats  # noqa: E402
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = "bench_items"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50), nullable=False)
+
+
+def _add_legacy_logger(engine, tenant: str) -> None:
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_start_time = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        total_ms = (time.perf_counter() - context._query_start_time) * 1000
+        sql = " ".join(statement.split())
+        if len(sql) > 200:
+            sql = sql[:197] + "..."
+        hashlib.sha256(repr(parameters).encode()).hexdigest()[:8]
+        if total_ms > 200 or random.random() < 0.01:
+            pass
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+
+def _engine(setup: str):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    if setup == "legacy":
+        _add_legacy_logger(engine, "bench")
+    elif setup == "stats":
+        add_query_logger(engine, "bench")
+    return engine
+
+
+def _run(setup: str, queries: int, batches: int, batch_size: int) -> dict:
+    engine = _engine(setup)
+    with engine.begin() as conn:
+        conn.execute(insert(Item), [{"name": f"item {i}"} for i in range(1000)])
+    stmt = select(Item.name).where(Item.id == bindparam("id"))
+    with engine.connect() as conn:
+        started = time.perf_counter()
+        for i in range(queries):
+            conn.execute(stmt, {"id": i % 1000 + 1}).scalar_one()
+        select_secs = time.perf_counter() - started
+    rows = [{"name": f"bulk {i}"} for i in range(batch_size)]
+    with engine.begin() as conn:
+        started = time.perf_counter()
+        for _ in range(batches):
+            conn.execute(insert(Item), rows)
+        insert_secs = time.perf_counter() - started
+    engine.dispose()
+    return {
+        "select_us": select_secs / queries * 1e6,
+        "insert_ms": insert_secs / batches * 1e3,
+    }
+
+
+def main(queries: int, batches: int, batch_size: int, rounds: int) -> None:
+    setups = ("none", "legacy", "stats")
+    results: dict[str, dict] = {}
+    for setup in setups:
+        _run(setup, min(queries, 1000), 1, batch_size)  # warm up
+    for _ in range(rounds):
+        for setup in setups:
+            query_stats.reset()
+            result = _run(setup, queries, batches, batch_size)
+            best = results.setdefault(setup, result)
+            for key, value in result.items():
+                best[key] = min(best[key], value)
+    base = results["none"]
+    for setup, result in results.items():
+        print(
+            f"{setup:>6}: select={result['select_us']:.1f}us/query "
+            f"(+{result['select_us'] - base['select_us']:.1f}us) "
+            f"insertmany={result['insert_ms']:.1f}ms/batch "
+            f"(+{result['insert_ms'] - base['insert_ms']:.1f}ms)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=20000, help="Selects to run")
+    parser.add_argument("--batches", type=int, default=20, help="Bulk inserts to run")
+    parser.add_argument("--batch-size", type=int, default=2000, help="Rows per insert")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds per setup")
+    args = parser.parse_args()
+    main(args.queries, args.batches, args.batch_size, args.rounds)
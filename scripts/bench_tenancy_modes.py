@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Compare database-per-tenant and schema-per-tenant modes.
+
+Provisions ``--tenants`` tenants in both layouts on one PostgreSQL cluster,
+then issues ``--requests`` small tenant reads through
+:func:`api.app.db.tenant.get_tenant_session` from ``--concurrency`` workers
+against randomly chosen tenants. For each mode it reports requests per second
+and the peak number of client connections observed in ``pg_stat_activity``.
+
+Example::
+
+    python scripts/bench_tenancy_modes.py --setup \
+        --dsn postgresql+asyncpg://postgres@localhost/bench --tenants 500
+
+``--dsn`` names the shared database used by schema mode; database mode uses
+``<database>_t<N>`` databases on the same server. ``--setup`` creates missing
+databases and schemas; drop them manually afterwards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+# Ensure ``api`` package is importable when running as a standalone script
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
+
+from api.app.db import tenant  # noqa: E402
+from api.app.models_tenant import Base, Category  # noqa: E402
+
+_TABLES = [Category.__table__]
+
+
+def _tenant_ids(count: int) -> list[str]:
+    return [f"t{i}" for i in range(count)]
+
+
+def _database_template(dsn: str) -> str:
+    url = make_url(dsn)
+    return url.set(database=f"{url.database}_{{tenant_id}}").render_as_string(
+        hide_password=False
+    )
+
+
+async def _setup(dsn: str, tenants: list[str]) -> None:
+    url = make_url(dsn)
+    admin = create_async_engine(
+        url.set(database="postgres"), isolation_level="AUTOCOMMIT", poolclass=NullPool
+    )
+    template = _database_template(dsn)
+    async with admin.connect() as conn:
+        existing = set(
+            (await conn.execute(text("SELECT datname FROM pg_database"))).scalars()
+        )
+        for name in [url.database] + [f"{url.database}_{t}" for t in tenants]:
+            if name not in existing:
+                await conn.execute(text(f'CREATE DATABASE "{name}"'))
+    await admin.dispose()
+
+    for tenant_id in tenants:
+        engine = create_async_engine(
+            template.format(tenant_id=tenant_id), poolclass=NullPool
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=_TABLES)
+        await engine.dispose()
+
+    shared = create_async_engine(dsn, poolclass=NullPool)
+    async with shared.begin() as conn:
+        for tenant_id in tenants:
+            schema = tenant.schema_name(tenant_id)
+            await conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+            await conn.execution_options(
+                schema_translate_map={None: schema}
+            ).run_sync(Base.metadata.create_all, tables=_TABLES)
+    await shared.dispose()
+
+
+async def _peak_connections(dsn: str, stop: asyncio.Event) -> int:
+    monitor = create_async_engine(dsn, poolclass=NullPool)
+    peak = 0
+    query = text(
+        "SELECT count(*) - 1 FROM pg_stat_activity "
+        "WHERE backend_type = 'client backend' AND usename = current_user"
+    )
+    async with monitor.connect() as conn:
+        while not stop.is_set():
+            peak = max(peak, (await conn.execute(query)).scalar_one())
+            await conn.rollback()
+            await asyncio.sleep(0.05)
+    await monitor.dispose()
+    return peak
+
+
+async def _run(
+    dsn: str, tenants: list[str], requests: int, concurrency: int
+) -> tuple[float, int]:
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            async with tenant.get_tenant_session(random.choice(tenants)) as session:
+                await session.scalar(select(func.count(Category.id)))
+
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_peak_connections(dsn, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    peak = await monitor
+    await tenant.dispose_shared_engines()
+    return requests / elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--dsn", required=True, help="asyncpg DSN of the shared database"
+    )
+    parser.add_argument("--tenants", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("-c", "--concurrency", type=int, default=50)
+    parser.add_argument("--setup", action="store_true", help="provision tenants first")
+    args = parser.parse_args()
+
+    tenants = _tenant_ids(args.tenants)
+    if args.setup:
+        asyncio.run(_setup(args.dsn, tenants))
+
+    os.environ[tenant.TEMPLATE_ENV] = _database_template(args.dsn)
+    os.environ[tenant.SCHEMA_DSN_ENV] = args.dsn
+    print(
+        f"{args.tenants} tenants, {args.requests} requests, "
+        f"concurrency {args.concurrency}"
+    )
+    for mode in ("database", "schema"):
+        os.environ[tenant.MODE_ENV] = mode
+        rps, peak = asyncio.run(
+            _run(args.dsn, tenants, args.requests, args.concurrency)
+        )
+        print(f"{mode:<9} {rps:10.1f} req/s  peak connections {peak}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 #!/usr/bin/env python3
-"""Nightly parquet dumps for BI."""
+"""Nightly parquet dumps for BI.
+
+Rows are streamed into Parquet row groups by :func:`api.app.bi_dump.dump_dataset`.
+"""
 
 from __future__ import annotations
 
@@ -10,11 +13,9 @@ from datetime import date, datetime, time, timedelta, timezone
 from pathlib import Path
 
 import boto3
-import pyarrow as pa
-import pyarrow.parquet as pq
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine
 
-from api.app.bi_dump import build_manifest
+from api.app.bi_dump import DATASETS, build_manifest, dump_dataset
 
 
 def _daterange(day: date) -> tuple[datetime, datetime]:
@@ -23,14 +24,6 @@ def _daterange(day: date) -> tuple[datetime, datetime]:
     return start, end
 
 
-def _dump_dataset(engine, query: str, params: dict, out_path: Path) -> None:
-    with engine.begin() as conn:
-        result = conn.execute(text(query), params)
-        rows = [dict(row._mapping) for row in result]
-    table = pa.Table.from_pylist(rows)
-    pq.write_table(table, out_path)
-
-
 def _upload(client: boto3.client, bucket: str, path: Path, key: str) -> str:
     client.upload_file(str(path), bucket, key)
     return key
@@ -54,18 +47,18 @@ def main(day: date) -> dict:
     tmp_dir.mkdir(parents=True, exist_ok=True)
 
     datasets = {
-        "orders": "SELECT * FROM orders WHERE placed_at >= :start AND placed_at < :end",
-        "items": "SELECT i.* FROM order_items i JOIN orders o ON o.id = i.order_id WHERE o.placed_at >= :start AND o.placed_at < :end",
-        "payments": "SELECT * FROM payments WHERE created_at >= :start AND created_at < :end",
+        "orders": DATASETS["orders"],
+        "items": DATASETS["order_items"],
+        "payments": DATASETS["payments"],
     }
 
     files = []
-    for name, query in datasets.items():
+    for name, dataset in datasets.items():
         out_path = tmp_dir / f"{name}.parquet"
-        _dump_dataset(engine, query, {"start": start, "end": end}, out_path)
+        stats = dump_dataset(engine, dataset, start, end, out_path)
         key = f"{name}/d={day.isoformat()}/{name}.parquet"
         _upload(s3, bucket, out_path, key)
-        files.append({"dataset": name, "s3_key": key})
+        files.append({"dataset": name, "s3_key": key, "rows": stats.rows})
 
     manifest = build_manifest(day, files)
     manifest_key = f"manifest/{day.isoformat()}.json"
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Backfill and reconcile coupon usage counters.
+
+Billing keeps ``coupon_usage_counters`` current incrementally (see
+``app.repos_sqlalchemy.coupon_usage_repo_sql``). This script rebuilds the
+counters of a tenant from the ``coupon_usage`` audit log: guest and outlet
+counters completely, day counters for the last ``--days`` days. Run it once
+after the migration to backfill existing redemptions and periodically to
+correct drift.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+# Ensure ``api`` package is importable when running as a standalone script
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
+sys.path.append(str(BASE_DIR / "api"))
+
+from app.db.tenant import get_engine as get_tenant_engine  # type: ignore  # noqa: E402
+from app.repos_sqlalchemy import coupon_usage_repo_sql  # type: ignore  # noqa: E402
+
+
+async def main(tenant: str, days: int) -> int:
+    """Reconcile counters for ``tenant`` and return the number of rows written."""
+
+    since = datetime.now(timezone.utc).date() - timedelta(days=max(days - 1, 0))
+    engine = get_tenant_engine(tenant)
+    sessionmaker = async_sessionmaker(
+        engine, expire_on_commit=False, class_=AsyncSession
+    )
+    try:
+        async with sessionmaker() as session:
+            written = await coupon_usage_repo_sql.reconcile(session, since)
+            await session.commit()
+    finally:
+        await engine.dispose()
+    logging.info("tenant %s: %d coupon usage counters rebuilt", tenant, written)
+    return written
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Reconcile coupon usage counters")
+    parser.add_argument("--tenant", required=True, help="Tenant identifier")
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=2,
+        help="Number of UTC days of per-day counters to rebuild (default: 2)",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    asyncio.run(main(args.tenant, args.days))
+
+
+if __name__ == "__main__":
+    _cli()
@@ -78,31 +78,39 @@ PROVIDERS = {
 }
 
 
-async def build_digest_line(tenant: str, day: date) -> str:
-    """Return a formatted digest line for ``tenant`` on ``day``."""
+async def build_digest_line(
+    tenant: str, day: date, session: AsyncSession | None = None
+) -> str:
+    """Return a formatted digest line for ``tenant`` on ``day``.
+
+    Uses ``session`` when given instead of creating a tenant engine.
+    """
+    if session is None:
+        engine = get_tenant_engine(tenant)
+        sessionmaker = async_sessionmaker(
+            engine, expire_on_commit=False, class_=AsyncSession
+        )
+        try:
+            async with sessionmaker() as session:
+                return await build_digest_line(tenant, day, session)
+        finally:
+            await engine.dispose()
+
     tz = os.getenv("DEFAULT_TZ", "UTC")
     tzinfo = ZoneInfo(tz)
     start = datetime.combine(day, time.min, tzinfo).astimezone(timezone.utc)
     end = datetime.combine(day, time.max, tzinfo).astimezone(timezone.utc)
 
-    engine = get_tenant_engine(tenant)
-    sessionmaker = async_sessionmaker(
-        engine, expire_on_commit=False, class_=AsyncSession
-    )
-    try:
-        async with sessionmaker() as session:
-            orders = await _orders_count(session, start, end)
-            sales = await _sales_total(session, start, end)
-            avg_ticket = float(sales / orders) if orders else 0.0
-            avg_prep = await _avg_prep_minutes(session, start, end)
-            top_items = await _top_items(session, start, end)
-            payments = await _payment_split(session, start, end)
-            comps = await _comps_count(session, start, end)
-            tips = await _tips_total(session, start, end)
-            gateway = await _gateway_fees(session, start, end)
-            logins, cleaned = await _staff_activity(session, start, end)
-    finally:
-        await engine.dispose()
+    orders = await _orders_count(session, start, end)
+    sales = await _sales_total(session, start, end)
+    avg_ticket = float(sales / orders) if orders else 0.0
+    avg_prep = await _avg_prep_minutes(session, start, end)
+    top_items = await _top_items(session, start, end)
+    payments = await _payment_split(session, start, end)
+    comps = await _comps_count(session, start, end)
+    tips = await _tips_total(session, start, end)
+    gateway = await _gateway_fees(session, start, end)
+    logins, cleaned = await _staff_activity(session, start, end)
 
     top_str = ", ".join(f"{name}({qty})" for name, qty in top_items)
     pay_str = ", ".join(
@@ -235,7 +243,10 @@ async def _staff_activity(
 
 
 async def main(
-    tenant: str, date_str: str | None = None, providers: Iterable[str] | None = None
+    tenant: str,
+    date_str: str | None = None,
+    providers: Iterable[str] | None = None,
+    session: AsyncSession | None = None,
 ) -> str:
     """Compute digest for ``tenant``/``date`` and send via ``providers``.
 
@@ -248,7 +259,7 @@ async def main(
     else:
         day = datetime.strptime(date_str, "%Y-%m-%d").date()
 
-    line = await build_digest_line(tenant, day)
+    line = await build_digest_line(tenant, day, session)
 
     for name in providers or ("console", "whatsapp", "email"):
         provider = PROVIDERS.get(name)
@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
-"""Trigger the daily KPI digest for each active tenant at 09:00 local time."""
+"""Trigger the daily KPI digest for each active tenant at 09:00 local time.
+
+``JOB`` performs the same check per tenant every five minutes from
+``scripts/maintenance_scheduler.py``.
+"""
 
 from __future__ import annotations
 
@@ -21,6 +25,8 @@ sys.path.append(str(BASE_DIR / "api"))
 from app.models_master import Tenant  # type: ignore  # noqa: E402
 from scripts import daily_digest  # type: ignore  # noqa: E402
 
+from api.app.jobs import JobContext, TenantJob  # type: ignore  # noqa: E402
+
 try:  # Optional Redis client
     import redis.asyncio as redis  # type: ignore
 except Exception:  # pragma: no cover - redis not installed
@@ -43,18 +49,38 @@ async def run_once(engine, redis_client) -> None:
         tenants = rows.all()
 
     for name, tz in tenants:
-        tzinfo = ZoneInfo(tz or "UTC")
-        now_local = _now(tzinfo)
-        if now_local.time() < time(9, 0):
-            continue
-        yesterday = (now_local.date() - timedelta(days=1)).isoformat()
-        key = f"{REDIS_KEY_PREFIX}{name}"
-        last = await redis_client.get(key)
-        if last is not None and last.decode() == yesterday:
-            continue
-        providers = tuple(daily_digest.PROVIDERS.keys())
-        await daily_digest.main(name, yesterday, providers=providers)
-        await redis_client.set(key, yesterday)
+        await send_if_due(name, tz, redis_client)
+
+
+async def send_if_due(
+    name: str, tz: str | None, redis_client, session: AsyncSession | None = None
+) -> bool:
+    """Send yesterday's digest for ``name`` once it is past 09:00 locally.
+
+    Returns ``True`` if a digest was sent.
+    """
+    tzinfo = ZoneInfo(tz or "UTC")
+    now_local = _now(tzinfo)
+    if now_local.time() < time(9, 0):
+        return False
+    yesterday = (now_local.date() - timedelta(days=1)).isoformat()
+    key = f"{REDIS_KEY_PREFIX}{name}"
+    last = await redis_client.get(key)
+    if last is not None and last.decode() == yesterday:
+        return False
+    providers = tuple(daily_digest.PROVIDERS.keys())
+    extra: dict[str, Any] = {"session": session} if session is not None else {}
+    await daily_digest.main(name, yesterday, providers=providers, **extra)
+    await redis_client.set(key, yesterday)
+    return True
+
+
+async def _run_job(ctx: JobContext) -> None:
+    async with ctx.session() as session:
+        await send_if_due(ctx.tenant_id, ctx.tenant.timezone, ctx.redis, session)
+
+
+JOB = TenantJob("daily_digest", _run_job, interval=300, concurrency=4, jitter=30)
 
 
 async def run() -> None:
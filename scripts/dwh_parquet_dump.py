@@ -1,6 +1,11 @@
 #!/usr/bin/env python3
 """Nightly export of BI-friendly tables to Parquet or CSV.
 
+Rows are streamed in row groups (see :mod:`api.app.bi_dump`), so memory use
+does not grow with the size of the export. ``--incremental`` exports only
+rows newer than the watermarks recorded in ``manifest/latest.json`` by the
+previous run.
+
 This script auto-configures ``PYTHONPATH`` to include the repository root so
 imports work when executed directly.
 """
@@ -8,29 +13,20 @@ imports work when executed directly.
 from __future__ import annotations
 
 import argparse
-import csv
-import gzip
 import json
 import os
 import sys
 from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
 
 import boto3
-from sqlalchemy import create_engine, text
-
-try:  # optional dependency
-    import pyarrow as pa
-    import pyarrow.parquet as pq
-except Exception:  # pragma: no cover - runtime optional
-    pa = None  # type: ignore[assignment]
-
-from pathlib import Path
+from sqlalchemy import create_engine
 
 ROOT = Path(__file__).resolve().parent.parent
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from api.app.bi_dump import build_manifest
+from api.app.bi_dump import DATASETS, build_manifest, dump_dataset, pa  # noqa: E402
 
 
 def _required_env(name: str) -> str:
@@ -47,22 +43,14 @@ def _daterange(day: date) -> tuple[datetime, datetime]:
     return start, end
 
 
-def _dump_dataset(engine, query: str, params: dict, out_path: Path) -> str:
-    with engine.begin() as conn:
-        result = conn.execute(text(query), params)
-        rows = [dict(row._mapping) for row in result]
-
-    if pa is not None:
-        table = pa.Table.from_pylist(rows)
-        pq.write_table(table, out_path)
-        return "parquet"
-    else:
-        fieldnames = rows[0].keys() if rows else []
-        with gzip.open(out_path, "wt", newline="") as fh:
-            writer = csv.DictWriter(fh, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(rows)
-        return "csv.gz"
+def _previous_watermarks(client, bucket: str, key: str) -> dict[str, datetime]:
+    """Return the watermarks of the last run or ``{}`` if there is none."""
+    try:
+        body = client.get_object(Bucket=bucket, Key=key)["Body"].read()
+    except client.exceptions.NoSuchKey:
+        return {}
+    marks = json.loads(body).get("watermarks") or {}
+    return {name: datetime.fromisoformat(v) for name, v in marks.items() if v}
 
 
 def _upload(client: boto3.client, bucket: str, path: Path, key: str) -> str:
@@ -70,7 +58,7 @@ def _upload(client: boto3.client, bucket: str, path: Path, key: str) -> str:
     return key
 
 
-def main(day: date) -> dict:
+def main(day: date, incremental: bool = False) -> dict:
     dsn = _required_env("DWH_DB_DSN")
     engine = create_engine(dsn)
 
@@ -84,34 +72,52 @@ def main(day: date) -> dict:
     prefix = os.getenv("DWH_PREFIX", "").strip("/")
     if prefix:
         prefix = f"{prefix}/"
+    latest_key = f"{prefix}manifest/latest.json"
 
     start, end = _daterange(day)
+    previous: dict[str, datetime] = {}
+    if incremental:
+        # rows up to "now" are exported; a missing watermark falls back to the day
+        end = datetime.now(timezone.utc)
+        previous = _previous_watermarks(s3, bucket, latest_key)
     tmp_dir = Path(os.getenv("DWH_TMP_DIR", "/tmp")) / day.isoformat()  # nosec B108
     tmp_dir.mkdir(parents=True, exist_ok=True)
 
-    datasets = {
-        "orders": "SELECT * FROM orders WHERE placed_at >= :start AND placed_at < :end",
-        "order_items": "SELECT i.* FROM order_items i JOIN orders o ON o.id = i.order_id WHERE o.placed_at >= :start AND o.placed_at < :end",
-        "payments": "SELECT * FROM payments WHERE created_at >= :start AND created_at < :end",
-    }
-
     files = []
-    for name, query in datasets.items():
-        suffix = "parquet" if pa is not None else "csv.gz"
+    watermarks: dict[str, datetime | None] = {}
+    suffix = "parquet" if pa is not None else "csv.gz"
+    for name, dataset in DATASETS.items():
+        since = previous.get(name)
         out_path = tmp_dir / f"{name}.{suffix}"
-        _dump_dataset(engine, query, {"start": start, "end": end}, out_path)
+        stats = dump_dataset(
+            engine,
+            dataset,
+            since or start,
+            end,
+            out_path,
+            incremental=since is not None,
+        )
         key = f"{prefix}{name}/dt={day.isoformat()}/{name}.{suffix}"
         _upload(s3, bucket, out_path, key)
-        files.append({"dataset": name, "s3_key": key})
-
-    manifest = build_manifest(day, files)
-    manifest_key = f"{prefix}manifest/{day.isoformat()}.json"
-    s3.put_object(
-        Bucket=bucket,
-        Key=manifest_key,
-        Body=json.dumps(manifest).encode("utf-8"),
-        ContentType="application/json",
-    )
+        watermarks[name] = stats.watermark or since
+        files.append(
+            {
+                "dataset": name,
+                "s3_key": key,
+                "rows": stats.rows,
+                "watermark": stats.watermark.isoformat() if stats.watermark else None,
+            }
+        )
+
+    manifest = build_manifest(day, files, watermarks=watermarks)
+    body = json.dumps(manifest).encode("utf-8")
+    for manifest_key in (f"{prefix}manifest/{day.isoformat()}.json", latest_key):
+        s3.put_object(
+            Bucket=bucket,
+            Key=manifest_key,
+            Body=body,
+            ContentType="application/json",
+        )
     return manifest
 
 
@@ -123,8 +129,13 @@ def _cli() -> None:
         default=date.today() - timedelta(days=1),
         help="Day to export (defaults to yesterday)",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Export rows newer than the previous run's watermarks",
+    )
     args = parser.parse_args()
-    main(args.day)
+    main(args.day, incremental=args.incremental)
 
 
 if __name__ == "__main__":  # pragma: no cover - script entry
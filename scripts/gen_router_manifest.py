@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Refresh the path templates recorded in ``api/app/router_manifest.py``.
+
+Imports every router listed in the manifest and rewrites the file with the
+paths each one serves, keeping the groups and their order. Run it after
+adding or changing routes; ``--check`` exits non-zero instead of writing when
+the manifest is stale, as the test suite does. Example::
+
+    python scripts/gen_router_manifest.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import os
+import sys
+from pathlib import Path
+
+# Ensure ``api`` package is importable when running as a standalone script
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
+# Route modules need these at import time; their values do not matter here
+for name, value in {
+    "DATABASE_URL": "sqlite+aiosqlite://",
+    "REDIS_URL": "redis://localhost:6379/0",
+    "SECRET_KEY": "x" * 32,
+    "ALLOWED_ORIGINS": "http://localhost",
+}.items():
+    os.environ.setdefault(name, value)
+
+# main sets up the module aliases some route modules import through
+from api.app import main, router_manifest  # noqa: E402,F401
+from api.app.lazy_routers import Router  # noqa: E402
+
+MANIFEST = BASE_DIR / "api" / "app" / "router_manifest.py"
+PACKAGE = "api.app"
+
+HEADER = '''"""Routers mounted by :mod:`.main`, in registration order.
+
+Each entry names a route module and the path templates its router serves,
+which lets :mod:`.lazy_routers` route requests without importing the module.
+Generated by ``scripts/gen_router_manifest.py``: add new routers to their
+group with any paths and run the script to fill them in.
+"""
+
+from .lazy_routers import Router
+
+ROUTERS = {
+'''
+
+
+def router_paths(spec: Router) -> tuple[str, ...]:
+    module = importlib.import_module(f"{PACKAGE}.{spec.module}")
+    paths: dict[str, None] = {}
+    for route in getattr(module, spec.attr).routes:
+        paths.setdefault(route.path)
+    return tuple(paths)
+
+
+def _entry(spec: Router) -> str:
+    attr = "" if spec.attr == "router" else f', "{spec.attr}"'
+    paths = ", ".join(f'"{p}"' for p in spec.paths)
+    if len(spec.paths) == 1:
+        paths += ","
+    line = f'        Router("{spec.module}", ({paths}){attr}),'
+    if len(line) <= 88:
+        return line + "\n"
+    out = f'        Router(\n            "{spec.module}",\n'
+    # Black keeps the tuple on one line when it fits at this depth
+    inner = f"            ({paths}),"
+    if len(inner) <= 88:
+        out += inner + "\n"
+    else:
+        out += "            (\n"
+        out += "".join(f'                "{p}",\n' for p in spec.paths)
+        out += "            ),\n"
+    if attr:
+        out += f'            "{spec.attr}",\n'
+    return out + "        ),\n"
+
+
+def render(groups: dict[str, list[Router]]) -> str:
+    out = HEADER
+    for group, specs in groups.items():
+        out += f'    "{group}": [\n'
+        out += "".join(_entry(spec) for spec in specs)
+        out += "    ],\n"
+    return out + "}\n"
+
+
+def main(check: bool) -> int:
+    groups = {
+        group: [spec._replace(paths=router_paths(spec)) for spec in specs]
+        for group, specs in router_manifest.ROUTERS.items()
+    }
+    text = render(groups)
+    if MANIFEST.read_text() == text:
+        return 0
+    if check:
+        print(f"{MANIFEST} is stale; run scripts/gen_router_manifest.py")
+        return 1
+    MANIFEST.write_text(text)
+    print(f"updated {MANIFEST}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--check", action="store_true", help="Fail instead of writing when stale"
+    )
+    sys.exit(main(parser.parse_args().check))
@@ -4,7 +4,10 @@
 This script looks for indexes in ``pg_stat_user_indexes`` that have
 ``idx_scan = 0`` for at least 30 days. When the ``pgstattuple`` extension is
 installed, the report also includes bloat percentage and dead tuple counts.
-Indexes with more than 40% bloat are flagged as ``CRITICAL``.
+Indexes with more than 40% bloat are flagged as ``CRITICAL``. A second table
+lists the partitions of every partitioned table with their bounds, estimated
+row counts and total size, so missing future months or oversized partitions
+(see ``scripts/partition_maintenance.py``) show up in the same report.
 
 The output is a Markdown table written to ``index_health_report.md`` by
 default, intended for upload as a CI artifact.
@@ -86,6 +89,45 @@ def generate_markdown(rows: list[dict]) -> str:
     return "\n".join(lines) + "\n"
 
 
+def fetch_partition_sizes(cur: psycopg2.extensions.cursor) -> list[dict]:
+    """Return the partitions of all partitioned tables with their sizes."""
+    cur.execute(
+        """
+        SELECT n.nspname AS schemaname,
+               p.relname AS table_name,
+               c.relname AS partition_name,
+               pg_get_expr(c.relpartbound, c.oid) AS bounds,
+               c.reltuples::bigint AS row_estimate,
+               pg_total_relation_size(c.oid) AS total_size
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        JOIN pg_namespace n ON n.oid = p.relnamespace
+        JOIN pg_partitioned_table pt ON pt.partrelid = p.oid
+        ORDER BY n.nspname, p.relname, c.relname
+        """
+    )
+    return cur.fetchall()
+
+
+def generate_partition_markdown(rows: list[dict]) -> str:
+    """Return a Markdown table for the given partition rows."""
+    lines = [
+        "| Schema | Table | Partition | Bounds | Rows (est.) | Size (MB) |",
+        "| --- | --- | --- | --- | --- | --- |",
+    ]
+    if not rows:
+        lines.append("| - | - | - | - | - | - |")
+    for row in rows:
+        size_mb = float(row["total_size"]) / 1024 / 1024
+        rows_est = max(int(row["row_estimate"] or 0), 0)
+        lines.append(
+            f"| {row['schemaname']} | {row['table_name']} | {row['partition_name']} | "
+            f"{row['bounds']} | {rows_est} | {size_mb:.2f} |"
+        )
+    return "\n".join(lines) + "\n"
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Report unused or bloated indexes")
     parser.add_argument("--dsn", default=os.environ.get("DATABASE_URL"), help="PostgreSQL DSN")
@@ -104,12 +146,15 @@ def main() -> None:
             )
             has_pgstattuple = cur.fetchone() is not None
             rows = fetch_index_health(cur, has_pgstattuple)
+            partitions = fetch_partition_sizes(cur)
     finally:
         conn.close()
 
     with open(args.output, "w", encoding="utf8") as fh:
         fh.write("# Index Health Report\n\n")
         fh.write(generate_markdown(rows))
+        fh.write("\n## Partitions\n\n")
+        fh.write(generate_partition_markdown(partitions))
     print(f"Wrote {args.output}")
 
 
@@ -4,6 +4,9 @@
 Environment variables:
 - POSTGRES_URL: SQLAlchemy URL for the master database.
 - POSTGRES_TENANT_DSN_TEMPLATE: DSN template for tenant databases.
+
+``JOB`` runs the scan every minute for every tenant from
+``scripts/maintenance_scheduler.py``.
 """
 
 from __future__ import annotations
@@ -29,17 +32,14 @@ from app.models_master import Tenant  # type: ignore  # noqa: E402
 from app.models_tenant import Order, OrderItem  # type: ignore  # noqa: E402
 from app.services import notifications  # type: ignore  # noqa: E402
 
+from api.app.jobs import JobContext, TenantJob  # type: ignore  # noqa: E402
+
 
 def _now() -> datetime:
     return datetime.now(timezone.utc)
 
 
-async def scan(tenant: str) -> int:
-    """Scan ``tenant`` for items exceeding their SLA.
-
-    Returns the number of breach notifications enqueued.
-    """
-
+async def _tenant_sla(tenant: str) -> int:
     master_url = os.environ["POSTGRES_URL"]
     master_engine = create_async_engine(master_url)
     async with AsyncSession(master_engine) as msession:
@@ -49,42 +49,61 @@ async def scan(tenant: str) -> int:
             )
         ).scalar_one_or_none() or 900
     await master_engine.dispose()
+    return sla
+
+
+async def scan(
+    tenant: str, sla: int | None = None, session: AsyncSession | None = None
+) -> int:
+    """Scan ``tenant`` for items exceeding their SLA.
 
+    ``sla`` is looked up in the master database and ``session`` opened when
+    not supplied. Returns the number of breach notifications enqueued.
+    """
+
+    if sla is None:
+        sla = await _tenant_sla(tenant)
+    if session is None:
+        async with get_tenant_session(tenant) as session:
+            return await _scan(session, tenant, sla)
+    return await _scan(session, tenant, sla)
+
+
+async def _scan(session: AsyncSession, tenant: str, sla: int) -> int:
     now = _now()
     breaches = 0
     delayed: list[tuple[int, int, float]] = []
-    async with get_tenant_session(tenant) as session:
-        result = await session.execute(
-            select(OrderItem.id, Order.table_id)
-                .join(Order, Order.id == OrderItem.order_id)
-                .where(OrderItem.status == "in_progress")
+    result = await session.execute(
+        select(OrderItem.id, Order.table_id)
+            .join(Order, Order.id == OrderItem.order_id)
+            .where(OrderItem.status == "in_progress")
+    )
+    for item_id, table_id in result.all():
+        path = f"/api/outlet/{tenant}/kds/item/{item_id}/progress"
+        last = await session.execute(
+            text(
+                "SELECT max(at) FROM audit_tenant "
+                "WHERE action='progress_item' "
+                "AND json_extract(meta, '$.path') = :p"
+            ),
+            {"p": path},
         )
-        for item_id, table_id in result.all():
-            path = f"/api/outlet/{tenant}/kds/item/{item_id}/progress"
-            last = await session.execute(
-                text(
-                    "SELECT max(at) FROM audit_tenant "
-                    "WHERE action='progress_item' "
-                    "AND json_extract(meta, '$.path') = :p"
-                ),
-                {"p": path},
+        last_at = last.scalar_one_or_none()
+        if isinstance(last_at, str):
+            last_at = datetime.fromisoformat(last_at)
+        if last_at is None:
+            continue
+        if last_at.tzinfo is None:
+            last_at = last_at.replace(tzinfo=timezone.utc)
+        delay = (now - last_at).total_seconds()
+        if delay > sla:
+            await notifications.enqueue(
+                tenant,
+                "kds.sla_breach",
+                {"order_item_id": item_id, "status": "in_progress"},
             )
-            last_at = last.scalar_one_or_none()
-            if isinstance(last_at, str):
-                last_at = datetime.fromisoformat(last_at)
-            if last_at is None:
-                continue
-            if last_at.tzinfo is None:
-                last_at = last_at.replace(tzinfo=timezone.utc)
-            delay = (now - last_at).total_seconds()
-            if delay > sla:
-                await notifications.enqueue(
-                    tenant,
-                    "kds.sla_breach",
-                    {"order_item_id": item_id, "status": "in_progress"},
-                )
-                delayed.append((item_id, table_id, delay))
-                breaches += 1
+            delayed.append((item_id, table_id, delay))
+            breaches += 1
     if delayed:
         top_items = [
             i for i, _, _ in sorted(delayed, key=lambda x: x[2], reverse=True)[:3]
@@ -99,6 +118,14 @@ async def scan(tenant: str) -> int:
     return breaches
 
 
+async def _run_job(ctx: JobContext) -> None:
+    async with ctx.session() as session:
+        await scan(ctx.tenant_id, ctx.tenant.kds_sla_secs or 900, session)
+
+
+JOB = TenantJob("kds_sla_watch", _run_job, interval=60, concurrency=8, jitter=10)
+
+
 def _cli() -> None:
     parser = argparse.ArgumentParser(description="Scan for KDS SLA breaches")
     parser.add_argument("--tenant", required=True, help="Tenant identifier")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Run all per-tenant maintenance jobs from one asyncio process.
+
+Replaces the per-tenant systemd loops for rollups, digests, KDS SLA scans,
+soft-delete purges, PII anonymization, retention and partition maintenance. See
+:mod:`api.app.jobs.scheduler` for leases, jitter and concurrency limits.
+
+Environment variables:
+- POSTGRES_URL: SQLAlchemy URL for the master database.
+- REDIS_URL: Redis used for job leases.
+- POSTGRES_TENANT_DSN_TEMPLATE: DSN template for tenant databases.
+- JOB_TENANT_REFRESH_SECS: Seconds between tenant list reloads (default: 300).
+
+Usage::
+
+    python scripts/maintenance_scheduler.py             # run forever
+    python scripts/maintenance_scheduler.py --once --job rollup_daily
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
+sys.path.append(str(BASE_DIR / "api"))
+
+from api.app.jobs import Scheduler, load_active_tenants  # noqa: E402
+from scripts import (  # type: ignore  # noqa: E402
+    anonymize_pii,
+    digest_scheduler,
+    kds_sla_watch,
+    partition_maintenance,
+    purge_soft_deleted,
+    retention_enforce,
+    rollup_daily,
+)
+
+try:  # Optional Redis client
+    import redis.asyncio as redis  # type: ignore
+except Exception:  # pragma: no cover - redis not installed
+    redis = None  # type: ignore
+
+JOBS = [
+    rollup_daily.JOB,
+    digest_scheduler.JOB,
+    kds_sla_watch.JOB,
+    purge_soft_deleted.JOB,
+    anonymize_pii.JOB,
+    retention_enforce.JOB,
+    partition_maintenance.JOB,
+]
+
+
+async def main(names: list[str] | None = None, once: bool = False) -> None:
+    master_url = os.environ["POSTGRES_URL"]
+    redis_url = os.environ.get("REDIS_URL")
+    if redis is None or redis_url is None:
+        raise RuntimeError("redis client not available")
+
+    jobs = [job for job in JOBS if not names or job.name in names]
+    master_engine = create_async_engine(master_url)
+    redis_client = redis.from_url(redis_url)
+    scheduler = Scheduler(
+        jobs,
+        redis_client,
+        lambda: load_active_tenants(master_engine),
+        tenant_refresh=float(os.getenv("JOB_TENANT_REFRESH_SECS", "300")),
+    )
+    try:
+        if once:
+            for key, outcome in (await scheduler.run_once()).items():
+                print(f"{key} {outcome}")
+            return
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        await scheduler.run_forever(stop)
+    finally:
+        await scheduler.engines.dispose()
+        await master_engine.dispose()
+        await redis_client.aclose()
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(description="Run tenant maintenance jobs")
+    parser.add_argument(
+        "--job",
+        action="append",
+        choices=[job.name for job in JOBS],
+        help="Only run this job (repeatable)",
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="Run the jobs once for every tenant"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.job, args.once))
+
+
+if __name__ == "__main__":
+    _cli()
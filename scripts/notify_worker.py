@@ -20,7 +20,7 @@ import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
-import requests
+import httpx
 from sqlalchemy import create_engine, select
 from sqlalchemy.orm import Session
 
@@ -35,9 +35,9 @@ from app.models_master import (  # type: ignore  # noqa: E402
     NotificationRule,
 )
 from app.obs import capture_exception, init_sentry  # type: ignore  # noqa: E402
-from app.security.webhook_egress import is_allowed_url  # type: ignore  # noqa: E402
 from app.utils.webhook_signing import sign  # type: ignore  # noqa: E402
 
+from api.app.redis_registry import OPEN_BREAKERS  # type: ignore  # noqa: E402
 from api.app.routes_metrics import (  # type: ignore  # noqa: E402
     notifications_outbox_delivered_total,
     notifications_outbox_failed_total,
@@ -45,6 +45,10 @@ from api.app.routes_metrics import (  # type: ignore  # noqa: E402
     webhook_breaker_state,
     webhook_failures_total,
 )
+from api.app.security.egress_client import (  # type: ignore  # noqa: E402
+    EgressBlocked,
+    SyncEgressClient,
+)
 
 PROVIDER_REGISTRY = {
     "whatsapp": os.getenv("ALERTS_WHATSAPP_PROVIDER", "app.providers.whatsapp_stub"),
@@ -63,6 +67,9 @@ CB_KEY_PREFIX = os.getenv("CB_KEY_PREFIX", "cb:")
 
 BREAKERS: dict[str, dict] = {}
 
+# Pooled keep-alive clients per webhook host, pinned to the checked address
+EGRESS = SyncEgressClient()
+
 
 def _url_hash(url: str) -> str:
     """Stable hash for metric labels and Redis keys."""
@@ -142,6 +149,7 @@ def breaker_on_success(r, url_hash: str) -> None:
     pipe.delete(_cb_key(url_hash, "fails"))
     pipe.delete(_cb_key(url_hash, "until"))
     pipe.delete(_cb_key(url_hash, "trial"))
+    pipe.hdel(OPEN_BREAKERS, url_hash)
     pipe.execute()
 
 
@@ -164,6 +172,8 @@ def breaker_on_failure(
         pipe.set(_cb_key(url_hash, "state"), "open")
         pipe.set(_cb_key(url_hash, "until"), now + cooldown)
         pipe.delete(_cb_key(url_hash, "trial"))
+        # registry read by /api/admin/ops/summary instead of a KEYS scan
+        pipe.hset(OPEN_BREAKERS, url_hash, now + cooldown)
         pipe.execute()
     return fails
 
@@ -226,9 +236,6 @@ def _deliver(rule: NotificationRule, event: NotificationOutbox) -> None:
         url = (rule.config or {}).get("url")
         if not url:
             raise ValueError("webhook rule missing url")
-        if not is_allowed_url(url):
-            raise PermissionError("EGRESS_BLOCKED")
-
         secret = os.getenv("WEBHOOK_SIGNING_SECRET")
         body = json.dumps(payload, separators=(",", ":"))
         headers = {"Content-Type": "application/json"}
@@ -243,9 +250,7 @@ def _deliver(rule: NotificationRule, event: NotificationOutbox) -> None:
                     REDIS_CLIENT.setex(f"wh:nonce:{ts}:{digest}", 300, "1")
                 except RedisError:  # pragma: no cover - redis failure
                     pass
-        requests.post(
-            url, data=body.encode(), headers=headers, timeout=5
-        ).raise_for_status()
+        EGRESS.post(url, content=body.encode(), headers=headers).raise_for_status()
     elif rule.channel == "email":
         template = payload.get("template")
         vars = payload.get("vars", {})
@@ -317,7 +322,7 @@ def process_once(engine) -> None:
 
             try:
                 _deliver(rule, event)
-            except requests.exceptions.RequestException as exc:  # network or HTTP error
+            except (httpx.HTTPError, EgressBlocked) as exc:  # network, HTTP or egress
                 if url_hash:
                     webhook_failures_total.labels(destination=url_hash).inc()
                     breaker_on_failure(
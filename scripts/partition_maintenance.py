@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Pre-create and expire monthly partitions of hot tenant tables.
+
+For every partitioned table among ``orders``, ``order_items``, ``invoices``,
+``payments`` and ``audit_tenant`` the current month and the next
+``PARTITION_MONTHS_AHEAD`` months (default: 3) are created. Partitions older
+than the table's retention horizon (``ORDERS_RETENTION_MONTHS`` and
+``AUDIT_RETENTION_MONTHS``, unset by default) are detached and dropped;
+without a horizon, and for invoices and payments, nothing is expired. See
+:mod:`api.app.db.partitions`.
+
+``JOB`` runs the maintenance daily for every tenant from
+``scripts/maintenance_scheduler.py``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Ensure ``api`` package is importable when running as a standalone script
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
+sys.path.append(str(BASE_DIR / "api"))
+
+from app.db.tenant import get_tenant_session  # type: ignore  # noqa: E402
+
+from api.app.db.partitions import (  # type: ignore  # noqa: E402
+    MONTHS_AHEAD,
+    ensure_partitions,
+)
+from api.app.jobs import JobContext, TenantJob  # type: ignore  # noqa: E402
+
+
+async def maintain(
+    tenant: str,
+    ahead: int = MONTHS_AHEAD,
+    drop: bool = True,
+    dry_run: bool = False,
+    session: AsyncSession | None = None,
+) -> None:
+    """Create upcoming and expire old partitions for ``tenant``.
+
+    With ``dry_run`` the DDL is printed instead of executed.
+    """
+
+    if session is None:
+        async with get_tenant_session(tenant) as session:
+            return await maintain(tenant, ahead, drop, dry_run, session)
+    plans = await ensure_partitions(session, ahead=ahead, drop=drop, dry_run=dry_run)
+    for plan in plans:
+        if dry_run:
+            for stmt in plan.statements(drop=drop):
+                print(f"{stmt};")
+        else:
+            print(
+                f"{plan.table}: created={len(plan.create)} "
+                f"expired={len(plan.expire)}"
+            )
+
+
+async def _run_job(ctx: JobContext) -> None:
+    async with ctx.session() as session:
+        await maintain(ctx.tenant_id, session=session)
+
+
+JOB = TenantJob("partitions", _run_job, interval=86400, concurrency=2, jitter=1800)
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(
+        description="Maintain monthly partitions of hot tenant tables"
+    )
+    parser.add_argument("--tenant", required=True, help="Tenant identifier")
+    parser.add_argument(
+        "--ahead",
+        type=int,
+        default=MONTHS_AHEAD,
+        help=f"Future months to create (default: {MONTHS_AHEAD})",
+    )
+    parser.add_argument(
+        "--detach-only",
+        action="store_true",
+        help="Detach expired partitions but keep them as standalone tables",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Print the DDL without running it"
+    )
+    args = parser.parse_args()
+    asyncio.run(maintain(args.tenant, args.ahead, not args.detach_only, args.dry_run))
+
+
+if __name__ == "__main__":
+    _cli()
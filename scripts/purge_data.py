@@ -19,8 +19,15 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Purge tenant data")
     parser.add_argument("--tenant", required=True, help="Tenant identifier")
     parser.add_argument("--days", type=int, required=True, help="Retention window in days")
+    parser.add_argument(
+        "--drop-partitions",
+        action="store_true",
+        help="Drop monthly order partitions that end before the cutoff first",
+    )
     args = parser.parse_args()
-    asyncio.run(retention.apply(args.tenant, args.days))
+    asyncio.run(
+        retention.apply(args.tenant, args.days, drop_partitions=args.drop_partitions)
+    )
 
 
 if __name__ == "__main__":
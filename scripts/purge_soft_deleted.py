@@ -3,8 +3,13 @@
 
 Rows in ``tables`` and ``menu_items`` with a ``deleted_at`` timestamp older
 than the specified retention window are permanently removed. A summary of the
-operation is recorded in ``audit_tenant`` for each tenant. A dry-run mode is
-available to log would-delete counts without modifying data.
+operation is recorded in ``audit_tenant`` for each tenant. Deletes run in
+checkpointed chunks of ``BATCH_CHUNK_SIZE`` rows, committing after each chunk,
+so an interrupted purge resumes where it stopped. A dry-run mode is available
+to log would-delete counts without modifying data.
+
+``JOB`` runs the purge nightly for every tenant from
+``scripts/maintenance_scheduler.py``.
 """
 
 from __future__ import annotations
@@ -16,17 +21,26 @@ from datetime import datetime, timedelta
 from pathlib import Path
 
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Ensure ``api`` package is importable when running as a standalone script
 BASE_DIR = Path(__file__).resolve().parents[1]
 sys.path.append(str(BASE_DIR))
 sys.path.append(str(BASE_DIR / "api"))
 
+from app.db.chunked import Chunked, run_chunked  # type: ignore  # noqa: E402
 from app.db.tenant import get_tenant_session  # type: ignore  # noqa: E402
 from app.models_tenant import AuditTenant  # type: ignore  # noqa: E402
 
+from api.app.jobs import JobContext, TenantJob  # type: ignore  # noqa: E402
+
 
-async def purge(tenant: str, days: int = 90, dry_run: bool = False) -> None:
+async def purge(
+    tenant: str,
+    days: int = 90,
+    dry_run: bool = False,
+    session: AsyncSession | None = None,
+) -> None:
     """Hard delete long-soft-deleted rows for ``tenant``.
 
     Parameters
@@ -37,52 +51,69 @@ async def purge(tenant: str, days: int = 90, dry_run: bool = False) -> None:
         Rows with ``deleted_at`` older than this many days will be removed.
     dry_run:
         If ``True``, only log counts of rows that would be deleted.
+    session:
+        Optional open tenant session; a new one is created when omitted.
     """
 
+    if session is None:
+        async with get_tenant_session(tenant) as session:
+            return await _purge(session, days, dry_run)
+    return await _purge(session, days, dry_run)
+
+
+async def _purge(session: AsyncSession, days: int, dry_run: bool) -> None:
     cutoff = datetime.utcnow() - timedelta(days=days)
 
-    async with get_tenant_session(tenant) as session:
-        if dry_run:
-            tables_count = (
-                await session.execute(
-                    text("SELECT COUNT(*) FROM tables WHERE deleted_at < :cutoff"),
-                    {"cutoff": cutoff},
-                )
-            ).scalar() or 0
-            items_count = (
-                await session.execute(
-                    text("SELECT COUNT(*) FROM menu_items WHERE deleted_at < :cutoff"),
-                    {"cutoff": cutoff},
-                )
-            ).scalar() or 0
-            print(f"[dry-run] tables={tables_count} menu_items={items_count}")
-            return
-
-        tables_res = await session.execute(
-            text("DELETE FROM tables WHERE deleted_at < :cutoff"),
-            {"cutoff": cutoff},
-        )
-        items_res = await session.execute(
-            text("DELETE FROM menu_items WHERE deleted_at < :cutoff"),
-            {"cutoff": cutoff},
-        )
-        session.add(
-            AuditTenant(
-                actor="system",
-                action="purge_soft_deleted",
-                meta={
-                    "tables": tables_res.rowcount or 0,
-                    "menu_items": items_res.rowcount or 0,
-                    "cutoff": cutoff.isoformat(),
-                },
+    if dry_run:
+        tables_count = (
+            await session.execute(
+                text("SELECT COUNT(*) FROM tables WHERE deleted_at < :cutoff"),
+                {"cutoff": cutoff},
             )
-        )
-        await session.commit()
-        print(
-            "Deleted tables={} menu_items={}".format(
-                tables_res.rowcount or 0, items_res.rowcount or 0
+        ).scalar() or 0
+        items_count = (
+            await session.execute(
+                text("SELECT COUNT(*) FROM menu_items WHERE deleted_at < :cutoff"),
+                {"cutoff": cutoff},
             )
+        ).scalar() or 0
+        print(f"[dry-run] tables={tables_count} menu_items={items_count}")
+        return
+
+    params = {"cutoff": cutoff}
+    tables = await run_chunked(
+        session,
+        Chunked("tables", "deleted_at < :cutoff", params),
+        checkpoint="purge_soft_deleted:tables",
+    )
+    items = await run_chunked(
+        session,
+        Chunked("menu_items", "deleted_at < :cutoff", params),
+        checkpoint="purge_soft_deleted:menu_items",
+    )
+    session.add(
+        AuditTenant(
+            actor="system",
+            action="purge_soft_deleted",
+            meta={
+                "tables": tables,
+                "menu_items": items,
+                "cutoff": cutoff.isoformat(),
+            },
         )
+    )
+    await session.commit()
+    print("Deleted tables={} menu_items={}".format(tables, items))
+
+
+async def _run_job(ctx: JobContext) -> None:
+    async with ctx.session() as session:
+        await purge(ctx.tenant_id, session=session)
+
+
+JOB = TenantJob(
+    "purge_soft_deleted", _run_job, interval=86400, concurrency=2, jitter=1800
+)
 
 
 def _cli() -> None:
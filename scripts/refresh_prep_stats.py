@@ -1,19 +1,38 @@
 from __future__ import annotations
 
-"""Nightly job to refresh per-item prep time statistics."""
+"""Nightly job to refresh per-item prep time statistics.
 
+Quantiles come from the per-item DDSketches that the KDS updates on every
+served transition (:mod:`api.app.eta.prep_stats`), so the job reads one
+merged sketch per item instead of 30 days of order items, and copies
+p50/p80/p95 into ``PrepStats``.
+
+Example::
+
+    REDIS_URL=redis://localhost/0 python scripts/refresh_prep_stats.py \\
+        --tenant demo --outlet-id 1
+"""
+
+import argparse
 import asyncio
+import os
 import statistics
-from collections import defaultdict
-from datetime import datetime, timedelta
+import sys
+from datetime import datetime
+from pathlib import Path
 from typing import Iterable
 
-from sqlalchemy import select
+from redis.asyncio import from_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
-from api.app.models_master import PrepStats
+# Ensure ``api`` package is importable when running as a standalone script
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(BASE_DIR))
 
-MIN_SAMPLES = 5
+from api.app.eta import prep_stats  # noqa: E402
+from api.app.models_master import PrepStats  # noqa: E402
+
+MIN_SAMPLES = prep_stats.MIN_SAMPLES
 
 
 def summarize(samples: Iterable[float]) -> dict | None:
@@ -31,31 +50,61 @@ def summarize(samples: Iterable[float]) -> dict | None:
     }
 
 
-async def refresh(session: AsyncSession) -> None:
-    """Placeholder implementation scanning recent items and upserting stats."""
-    # In a real implementation this would query completed order items from the
-    # last 30 days and aggregate durations by ``item_id`` and ``outlet_id``.
-    # Here we simply demonstrate the upsert logic on existing ``prep_stats``.
-    yesterday = datetime.utcnow() - timedelta(days=1)
-    result = await session.execute(select(PrepStats))
-    rows = result.scalars().all()
-    for row in rows:
-        stats = summarize([row.p50_s])
-        if not stats:
+async def refresh(session: AsyncSession, redis, tenant: str, outlet_id: int) -> int:
+    """Upsert ``PrepStats`` rows of ``outlet_id`` from the sketches of ``tenant``.
+
+    Returns the number of rows written. Items whose sketches all expired are
+    dropped from the sketch registry.
+    """
+    item_ids = await prep_stats.items(redis, tenant)
+    sketches = await prep_stats.load(redis, tenant, item_ids)
+    now = datetime.utcnow()
+    expired = []
+    written = 0
+    for item_id, sketch in sketches.items():
+        if not sketch.count:
+            expired.append(item_id)
+            continue
+        stats = prep_stats.summarize(sketch)
+        if stats is None:
             continue
-        row.p50_s = stats["p50_s"]
-        row.p80_s = stats["p80_s"]
-        row.p95_s = stats["p95_s"]
-        row.sample_n = stats["sample_n"]
-        row.updated_at = datetime.utcnow()
+        row = await session.get(PrepStats, (item_id, outlet_id))
+        if row is None:
+            row = PrepStats(item_id=item_id, outlet_id=outlet_id, **stats)
+            session.add(row)
+        else:
+            for field, value in stats.items():
+                setattr(row, field, value)
+        row.updated_at = now
+        written += 1
+    if expired:
+        await redis.srem(prep_stats.ITEMS_KEY.format(tenant=tenant), *expired)
     await session.commit()
+    return written
 
 
-async def main() -> None:
-    engine = create_async_engine("sqlite+aiosqlite:///./dev_master.db")
-    async with AsyncSession(engine) as session:
-        await refresh(session)
+async def main(tenant: str, outlet_id: int, db_url: str) -> None:
+    engine = create_async_engine(db_url)
+    redis = from_url(os.environ.get("REDIS_URL", "redis://localhost/0"))
+    try:
+        async with AsyncSession(engine) as session:
+            written = await refresh(session, redis, tenant, outlet_id)
+        print(f"refreshed {written} items")
+    finally:
+        await redis.aclose()
+        await engine.dispose()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Refresh per-item prep time stats")
+    parser.add_argument("--tenant", required=True, help="Tenant of the sketches")
+    parser.add_argument("--outlet-id", type=int, required=True, help="PrepStats outlet")
+    parser.add_argument(
+        "--db-url",
+        default=os.getenv(
+            "POSTGRES_MASTER_URL", "sqlite+aiosqlite:///./dev_master.db"
+        ),
+        help="Master database URL (default $POSTGRES_MASTER_URL)",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.tenant, args.outlet_id, args.db_url))
@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
-"""Apply tenant-specific data retention policies."""
+"""Apply tenant-specific data retention policies.
+
+``JOB`` applies the policy daily for every tenant from
+``scripts/maintenance_scheduler.py``.
+"""
 
 from __future__ import annotations
 
@@ -20,6 +24,8 @@ from app.models_master import Tenant  # type: ignore  # noqa: E402
 from anonymize_pii import anonymize  # type: ignore  # noqa: E402
 from retention_sweep import sweep  # type: ignore  # noqa: E402
 
+from api.app.jobs import JobContext, TenantJob  # type: ignore  # noqa: E402
+
 
 async def enforce(tenant_name: str) -> None:
     """Apply retention settings for ``tenant_name``."""
@@ -28,13 +34,30 @@ async def enforce(tenant_name: str) -> None:
         tenant = await session.scalar(select(Tenant).where(Tenant.name == tenant_name))
     if tenant is None:
         raise ValueError(f"Unknown tenant: {tenant_name}")
+    await apply_policy(tenant)
+
+
+async def apply_policy(tenant, session=None) -> None:
+    """Apply the retention windows configured on the ``tenant`` row."""
 
     tenant_id = str(tenant.id)
 
     if tenant.retention_days_customers:
-        await anonymize(tenant_id, tenant.retention_days_customers)
+        await anonymize(tenant_id, tenant.retention_days_customers, session)
     if tenant.retention_days_outbox:
-        await sweep(tenant_id, tenant.retention_days_outbox)
+        await sweep(tenant_id, tenant.retention_days_outbox, session)
+
+
+async def _run_job(ctx: JobContext) -> None:
+    tenant = ctx.tenant
+    if not (tenant.retention_days_customers or tenant.retention_days_outbox):
+        return
+    # tenant databases are addressed by id here, unlike the other jobs
+    async with ctx.session(str(tenant.id)) as session:
+        await apply_policy(tenant, session)
+
+
+JOB = TenantJob("retention", _run_job, interval=86400, concurrency=2, jitter=1800)
 
 
 def _cli() -> None:
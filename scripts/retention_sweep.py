@@ -24,6 +24,7 @@ from pathlib import Path
 import sys
 
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Ensure ``api`` package is importable when running as a standalone script
 BASE_DIR = Path(__file__).resolve().parents[1]
@@ -33,7 +34,9 @@ sys.path.append(str(BASE_DIR / "api"))
 from app.db.tenant import get_tenant_session  # type: ignore  # noqa: E402
 
 
-async def sweep(tenant: str, days: int = 30) -> None:
+async def sweep(
+    tenant: str, days: int = 30, session: AsyncSession | None = None
+) -> None:
     """Delete rows older than ``days`` for ``tenant``.
 
     Parameters
@@ -42,27 +45,35 @@ async def sweep(tenant: str, days: int = 30) -> None:
         Tenant identifier whose database should be cleaned.
     days:
         Retention window; rows older than this will be removed.
+    session:
+        Optional open tenant session; a new one is created when omitted.
     """
 
+    if session is None:
+        async with get_tenant_session(tenant) as session:
+            return await _sweep(session, days)
+    return await _sweep(session, days)
+
+
+async def _sweep(session: AsyncSession, days: int) -> None:
     cutoff = datetime.utcnow() - timedelta(days=days)
 
-    async with get_tenant_session(tenant) as session:
-        await session.execute(
-            text("DELETE FROM audit_tenant WHERE at < :cutoff"),
-            {"cutoff": cutoff},
-        )
-        await session.execute(
-            text(
-                "DELETE FROM notifications_outbox "
-                "WHERE status = 'delivered' AND delivered_at < :cutoff"
-            ),
-            {"cutoff": cutoff},
-        )
-        await session.execute(
-            text("DELETE FROM access_logs WHERE created_at < :cutoff"),
-            {"cutoff": cutoff},
-        )
-        await session.commit()
+    await session.execute(
+        text("DELETE FROM audit_tenant WHERE at < :cutoff"),
+        {"cutoff": cutoff},
+    )
+    await session.execute(
+        text(
+            "DELETE FROM notifications_outbox "
+            "WHERE status = 'delivered' AND delivered_at < :cutoff"
+        ),
+        {"cutoff": cutoff},
+    )
+    await session.execute(
+        text("DELETE FROM access_logs WHERE created_at < :cutoff"),
+        {"cutoff": cutoff},
+    )
+    await session.commit()
 
 
 def _cli() -> None:
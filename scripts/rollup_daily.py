@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
-"""Recompute daily sales rollups.
+"""Reconcile daily sales rollups.
 
-Aggregates orders, sales, tax, tip and payment mix for a given tenant and
-stores them in the ``sales_rollup`` table. Intended to run hourly to refresh
-yesterday and today's rows."""
+Billing keeps ``sales_rollup``, ``sales_rollup_hourly`` and
+``sales_rollup_modes`` current incrementally (see
+``app.repos_sqlalchemy.rollup_repo_sql``). This script recomputes those rows
+from raw invoices and payments for a given tenant so any drift is corrected.
+Only closed days are reconciled: billing still writes increments into
+today's rows, which rewriting them could lose. Intended to run periodically
+over yesterday's rows."""
 
 from __future__ import annotations
 
@@ -15,7 +19,7 @@ from datetime import date, datetime, time, timedelta, timezone
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import func, select
+from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 try:  # Optional Redis client
@@ -36,15 +40,21 @@ sys.path.append(str(BASE_DIR / "api"))
 from app.db.tenant import get_engine as get_tenant_engine  # type: ignore  # noqa: E402
 from app.models_tenant import (  # type: ignore  # noqa: E402
     Invoice,
-    Order,
     Payment,
     SalesRollup,
+    SalesRollupHourly,
+    SalesRollupMode,
 )
 
 from api.app.routes_metrics import (  # type: ignore  # noqa: E402
     rollup_failures_total,
     rollup_runs_total,
 )
+from api.app.jobs import JobContext, TenantJob  # type: ignore  # noqa: E402
+from api.app.repos_sqlalchemy.rollup_repo_sql import (  # type: ignore  # noqa: E402
+    tenant_tz,
+)
+from api.app.utils.fanout import invalidate_outlet  # type: ignore  # noqa: E402
 
 try:  # Optional Redis client for idempotency lock
     import redis.asyncio as redis  # type: ignore
@@ -67,36 +77,39 @@ else:  # pragma: no cover - metrics disabled
 
 
 async def rollup_day(session: AsyncSession, tenant: str, day: date, tz: str) -> None:
-    """Compute and store rollup for ``tenant`` on ``day``."""
+    """Recompute and store rollups for ``tenant`` on ``day``.
+
+    Each invoice counts as one order, as in the incremental rollup.
+    """
     tzinfo = ZoneInfo(tz)
     start = datetime.combine(day, time.min, tzinfo).astimezone(timezone.utc)
     end = datetime.combine(day, time.max, tzinfo).astimezone(timezone.utc)
 
-    orders = await session.scalar(
-        select(func.count())
-        .select_from(Order)
-        .where(Order.placed_at >= start, Order.placed_at <= end)
-    )
-    orders = int(orders or 0)
-
-    sales = await session.scalar(
-        select(func.coalesce(func.sum(Invoice.total), 0)).where(
-            Invoice.created_at >= start, Invoice.created_at <= end
-        )
-    )
-    sales = float(sales or 0)
-
+    # One pass over the day's invoices yields both daily and hourly totals.
+    orders = 0
+    sales = 0.0
     tax = 0.0
     tip = 0.0
+    hourly: dict[int, dict[str, float]] = {}
     result = await session.execute(
-        select(Invoice.gst_breakup, Invoice.tip).where(
-            Invoice.created_at >= start, Invoice.created_at <= end
-        )
+        select(Invoice.created_at, Invoice.total, Invoice.gst_breakup, Invoice.tip)
+        .where(Invoice.created_at >= start, Invoice.created_at <= end)
     )
-    for gst, tp in result.all():
-        if gst:
-            tax += sum(float(v) for v in gst.values())
-        tip += float(tp or 0)
+    for created_at, total, gst, tp in result.all():
+        inv_tax = sum(float(v) for v in gst.values()) if gst else 0.0
+        inv_tip = float(tp or 0)
+        orders += 1
+        sales += float(total or 0)
+        tax += inv_tax
+        tip += inv_tip
+        bucket = hourly.setdefault(
+            created_at.astimezone(tzinfo).hour,
+            {"orders": 0, "sales": 0.0, "tax": 0.0, "tip": 0.0},
+        )
+        bucket["orders"] += 1
+        bucket["sales"] += float(total or 0)
+        bucket["tax"] += inv_tax
+        bucket["tip"] += inv_tip
 
     result = await session.execute(
         select(Payment.mode, func.coalesce(func.sum(Payment.amount), 0))
@@ -124,13 +137,28 @@ async def rollup_day(session: AsyncSession, tenant: str, day: date, tz: str) ->
                 modes_json=modes,
             )
         )
+
+    await session.execute(delete(SalesRollupHourly).where(SalesRollupHourly.d == day))
+    await session.execute(delete(SalesRollupMode).where(SalesRollupMode.d == day))
+    session.add_all(
+        SalesRollupHourly(d=day, h=h, **vals) for h, vals in sorted(hourly.items())
+    )
+    session.add_all(
+        SalesRollupMode(d=day, mode=mode, amount=amt) for mode, amt in modes.items()
+    )
     await session.commit()
 
 
-async def main(tenant: str) -> None:
-    tz = os.getenv("DEFAULT_TZ", "UTC")
+def _days(tz: str) -> list[date]:
+    # Today's rows still receive billing increments; reconcile closed days only
     today = datetime.now(ZoneInfo(tz)).date()
-    days = [today - timedelta(days=1), today]
+    return [today - timedelta(days=1)]
+
+
+async def main(tenant: str) -> None:
+    # Billing buckets by the tenant's timezone; reconcile the same days
+    tz = await tenant_tz(tenant)
+    days = _days(tz)
 
     engine = get_tenant_engine(tenant)
     sessionmaker = async_sessionmaker(
@@ -152,6 +180,7 @@ async def main(tenant: str) -> None:
                     continue
                 try:
                     await rollup_day(session, tenant, day, tz)
+                    await invalidate_outlet(redis_client, tenant)
                     if rollup_runs_total:
                         rollup_runs_total.inc()
                 except Exception:
@@ -174,8 +203,20 @@ async def main(tenant: str) -> None:
 
 
 
+async def _run_job(ctx: JobContext) -> None:
+    # the scheduler's lease replaces the per-day Redis lock used by ``main``
+    tz = await tenant_tz(ctx.tenant_id)
+    async with ctx.session() as session:
+        for day in _days(tz):
+            await rollup_day(session, ctx.tenant_id, day, tz)
+    await invalidate_outlet(ctx.redis, ctx.tenant_id)
+
+
+JOB = TenantJob("rollup_daily", _run_job, interval=3600, concurrency=4, jitter=300)
+
+
 def _cli() -> None:
-    parser = argparse.ArgumentParser(description="Recompute daily sales rollups")
+    parser = argparse.ArgumentParser(description="Reconcile daily sales rollups")
     parser.add_argument("--tenant", required=True, help="Tenant identifier")
     args = parser.parse_args()
     asyncio.run(main(args.tenant))
@@ -19,7 +19,7 @@ from sqlalchemy.ext.asyncio import create_async_engine
 # Ensure project root is on the import path so ``api.app`` resolves when
 # invoked as ``python scripts/tenant_create_db.py`` with ``PYTHONPATH=api/app``.
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
-from api.app.db.tenant import build_dsn
+from api.app.db.tenant import build_dsn, schema_mode, schema_name, shared_dsn
 
 
 async def ensure_schema(engine, tenant_id: str) -> None:
@@ -70,6 +70,15 @@ async def run_tenant_migrations(engine) -> None:  # pragma: no cover - placehold
 
 
 async def main(tenant_id: str) -> None:
+    if schema_mode():
+        engine = create_async_engine(shared_dsn(), isolation_level="AUTOCOMMIT")
+        try:
+            await ensure_schema(engine, schema_name(tenant_id))
+            await run_tenant_migrations(engine)
+        finally:
+            await engine.dispose()
+        print("READY")
+        return
     dsn = build_dsn(tenant_id)
     await ensure_database_exists(dsn)
     engine = create_async_engine(dsn, isolation_level="AUTOCOMMIT")
@@ -9,6 +9,10 @@ environment. If neither is provided, the DSN template is derived from
 template must contain a ``{tenant_id}`` placeholder, for example::
 
     postgresql+asyncpg://u:p@host:5432/tenant_{tenant_id}
+
+In schema-per-tenant mode (``TENANCY_MODE=schema`` or ``--schema-mode``) the
+migrations run against the tenant's schema in ``POSTGRES_TENANT_SCHEMA_DSN``;
+the schema is created if missing.
 """
 
 from __future__ import annotations
@@ -25,12 +29,26 @@ from sqlalchemy.ext.asyncio import create_async_engine
 # Ensure project root is on the import path so ``api`` resolves when invoked
 # as ``python scripts/tenant_migrate.py``.
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
-from api.app.db.tenant import build_dsn, TEMPLATE_ENV
+from api.app.db.tenant import (
+    TEMPLATE_ENV,
+    build_dsn,
+    schema_mode,
+    schema_name,
+    shared_dsn,
+)
+
 
+def migrate(
+    tenant_id: str, dsn_template: str | None = None, *, schema: bool | None = None
+) -> None:
+    """Run Alembic migrations for ``tenant_id``.
 
-def migrate(tenant_id: str, dsn_template: str | None = None) -> None:
-    """Run Alembic migrations for ``tenant_id``."""
-    if dsn_template:
+    ``schema`` selects schema-per-tenant mode and defaults to ``TENANCY_MODE``.
+    """
+    schema = schema_mode() if schema is None else schema
+    if schema:
+        dsn = shared_dsn()
+    elif dsn_template:
         try:
             dsn = dsn_template.format(tenant_id=tenant_id)
         except Exception as exc:  # pragma: no cover - invalid format string
@@ -42,6 +60,8 @@ def migrate(tenant_id: str, dsn_template: str | None = None) -> None:
     cfg.set_main_option("script_location", "api/alembic_tenant")
     cfg.set_main_option("sqlalchemy.url", dsn)
     cfg.attributes["engine"] = engine
+    if schema:
+        cfg.attributes["schema"] = schema_name(tenant_id)
     try:
         command.upgrade(cfg, "head")
     finally:
@@ -55,8 +75,14 @@ def main() -> None:
         "--dsn-template",
         help=f"DSN template for tenant databases (overrides {TEMPLATE_ENV})",
     )
+    parser.add_argument(
+        "--schema-mode",
+        action="store_true",
+        default=None,
+        help="Migrate the tenant schema in POSTGRES_TENANT_SCHEMA_DSN",
+    )
     args = parser.parse_args()
-    migrate(args.tenant, args.dsn_template)
+    migrate(args.tenant, args.dsn_template, schema=args.schema_mode)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""Migrate all tenant databases in parallel and resumably.
+
+Upgrades many tenants to the ``alembic_tenant`` head with bounded
+concurrency. Each tenant is migrated in a worker process (Alembic keeps its
+migration context in module globals, so migrations cannot share a process)
+with PostgreSQL ``lock_timeout`` and ``statement_timeout`` applied to the
+migration connection.
+
+Progress is recorded in the master ``tenant_migrations`` table: every tenant's
+revision, outcome, last error and attempt count. A re-run skips tenants that
+are already recorded at the target revision, so an interrupted deploy resumes
+where it stopped. Tenants passed with ``--canary`` are migrated first and the
+run stops before touching the rest of the fleet if any of them fails.
+
+``--dry-run`` reports each tenant's current revision and the revisions it
+still needs without changing anything.
+
+Examples::
+
+    python scripts/tenant_migrate_fleet.py --all --concurrency 16 \
+        --canary demo,pilot --lock-timeout 5s --statement-timeout 10min
+    python scripts/tenant_migrate_fleet.py --sqlite-dir /tmp/tenants --dry-run
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+# Ensure project root is on the import path so ``api`` resolves when invoked
+# as ``python scripts/tenant_migrate_fleet.py``.
+BASE_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BASE_DIR))
+
+from api.app.db import tenant as tenant_db  # noqa: E402
+from api.app.models_master import Tenant, TenantMigration  # noqa: E402
+
+SCRIPT_LOCATION = str(BASE_DIR / "api" / "alembic_tenant")
+
+logger = logging.getLogger("tenant_migrate_fleet")
+
+
+@dataclass(frozen=True)
+class Target:
+    """Connection details of one tenant."""
+
+    tenant_id: str
+    dsn: str
+    schema: str | None = None
+
+
+@dataclass
+class Report:
+    """Outcome of a fleet run."""
+
+    migrated: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+    pending: dict[str, list[str]] = field(default_factory=dict)
+    aborted: bool = False
+
+
+def _alembic_config() -> Config:
+    cfg = Config()
+    cfg.set_main_option("script_location", SCRIPT_LOCATION)
+    return cfg
+
+
+def head_revision() -> str:
+    """Return the head revision of the tenant migrations."""
+
+    return ScriptDirectory.from_config(_alembic_config()).get_current_head()
+
+
+def pending_revisions(current: str | None, head: str) -> list[str]:
+    """Return revisions between ``current`` and ``head``, oldest first."""
+
+    script = ScriptDirectory.from_config(_alembic_config())
+    revs = script.iterate_revisions(head, current)
+    return [rev.revision for rev in reversed(list(revs))]
+
+
+def _engine(target: Target, lock_timeout: str | None, statement_timeout: str | None):
+    connect_args: dict = {}
+    if target.dsn.startswith("postgresql"):
+        settings = {}
+        if lock_timeout:
+            settings["lock_timeout"] = lock_timeout
+        if statement_timeout:
+            settings["statement_timeout"] = statement_timeout
+        if settings:
+            connect_args["server_settings"] = settings
+    return create_async_engine(
+        target.dsn, poolclass=NullPool, connect_args=connect_args
+    )
+
+
+def _current_revision(target: Target) -> str | None:
+    engine = _engine(target, None, None)
+
+    async def _read() -> str | None:
+        try:
+            async with engine.connect() as conn:
+
+                def _get(sync_conn):
+                    opts = {}
+                    if target.schema:
+                        opts["version_table_schema"] = target.schema
+                    return MigrationContext.configure(
+                        sync_conn, opts=opts
+                    ).get_current_revision()
+
+                return await conn.run_sync(_get)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(_read())
+
+
+def inspect_tenant(target: Target) -> str | None:
+    """Worker entry point: return the tenant's current revision."""
+
+    return _current_revision(target)
+
+
+def migrate_tenant(
+    target: Target,
+    revision: str,
+    lock_timeout: str | None,
+    statement_timeout: str | None,
+) -> str | None:
+    """Worker entry point: upgrade one tenant and return its new revision."""
+
+    engine = _engine(target, lock_timeout, statement_timeout)
+    cfg = _alembic_config()
+    cfg.set_main_option("sqlalchemy.url", target.dsn.replace("%", "%%"))
+    cfg.attributes["engine"] = engine
+    if target.schema:
+        cfg.attributes["schema"] = target.schema
+    try:
+        command.upgrade(cfg, revision)
+    finally:
+        asyncio.run(engine.dispose())
+    return _current_revision(target)
+
+
+class StateStore:
+    """Access to the master ``tenant_migrations`` table."""
+
+    def __init__(self, url: str) -> None:
+        self.engine = create_async_engine(url)
+        self.sessions = async_sessionmaker(
+            self.engine, expire_on_commit=False, class_=AsyncSession
+        )
+
+    async def load(self) -> dict[str, TenantMigration]:
+        async with self.sessions() as session:
+            rows = await session.scalars(select(TenantMigration))
+            return {row.tenant_id: row for row in rows}
+
+    async def tenant_ids(self) -> list[str]:
+        async with self.sessions() as session:
+            rows = await session.scalars(
+                select(Tenant.id).where(Tenant.status == "active")
+            )
+            return sorted(str(tid) for tid in rows)
+
+    async def record(
+        self,
+        tenant_id: str,
+        *,
+        status: str,
+        revision: str | None = None,
+        error: str | None = None,
+        attempt: bool = False,
+    ) -> None:
+        async with self.sessions() as session:
+            row = await session.get(TenantMigration, tenant_id)
+            if row is None:
+                row = TenantMigration(tenant_id=tenant_id, attempts=0)
+                session.add(row)
+            row.status = status
+            row.error = error
+            if revision is not None:
+                row.revision = revision
+            if attempt:
+                row.attempts = (row.attempts or 0) + 1
+            await session.commit()
+
+    async def dispose(self) -> None:
+        await self.engine.dispose()
+
+
+def order_tenants(
+    tenants: list[str], canaries: list[str]
+) -> tuple[list[str], list[str]]:
+    """Split ``tenants`` into canaries (in the given order) and the rest."""
+
+    known = set(tenants)
+    first = [t for t in canaries if t in known]
+    chosen = set(first)
+    return first, [t for t in tenants if t not in chosen]
+
+
+async def run(
+    targets: list[Target],
+    state: StateStore,
+    *,
+    canaries: list[str] | None = None,
+    concurrency: int = 4,
+    revision: str | None = None,
+    lock_timeout: str | None = "5s",
+    statement_timeout: str | None = None,
+    dry_run: bool = False,
+    executor: ProcessPoolExecutor | None = None,
+) -> Report:
+    """Migrate ``targets`` and return a :class:`Report`."""
+
+    head = revision or head_revision()
+    by_id = {t.tenant_id: t for t in targets}
+    first, rest = order_tenants(list(by_id), canaries or [])
+    report = Report()
+    loop = asyncio.get_running_loop()
+    own_executor = executor is None
+    if executor is None:
+        executor = ProcessPoolExecutor(
+            max_workers=max(concurrency, 1),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    limit = asyncio.Semaphore(max(concurrency, 1))
+    done = {} if dry_run else await state.load()
+
+    async def one(tenant_id: str) -> None:
+        target = by_id[tenant_id]
+        row = done.get(tenant_id)
+        if row is not None and row.status == "ok" and row.revision == head:
+            report.skipped.append(tenant_id)
+            return
+        async with limit:
+            if dry_run:
+                try:
+                    current = await loop.run_in_executor(
+                        executor, inspect_tenant, target
+                    )
+                except Exception as exc:
+                    report.failed[tenant_id] = f"{type(exc).__name__}: {exc}"
+                    return
+                todo = pending_revisions(current, head)
+                if todo:
+                    report.pending[tenant_id] = todo
+                else:
+                    report.skipped.append(tenant_id)
+                return
+            await state.record(tenant_id, status="running", attempt=True)
+            try:
+                new_rev = await loop.run_in_executor(
+                    executor,
+                    migrate_tenant,
+                    target,
+                    head,
+                    lock_timeout,
+                    statement_timeout,
+                )
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"
+                logger.error("tenant %s failed: %s", tenant_id, error)
+                report.failed[tenant_id] = error
+                await state.record(tenant_id, status="failed", error=error[:2000])
+                return
+            report.migrated.append(tenant_id)
+            logger.info("tenant %s at %s", tenant_id, new_rev)
+            await state.record(tenant_id, status="ok", revision=new_rev)
+
+    try:
+        await asyncio.gather(*(one(t) for t in first))
+        if any(t in report.failed for t in first):
+            report.aborted = True
+            return report
+        await asyncio.gather(*(one(t) for t in rest))
+    finally:
+        if own_executor:
+            executor.shutdown()
+    return report
+
+
+def _targets(args: argparse.Namespace, tenant_ids: list[str]) -> list[Target]:
+    targets = []
+    for tenant_id in tenant_ids:
+        if args.sqlite_dir:
+            dsn = f"sqlite+aiosqlite:///{Path(args.sqlite_dir) / tenant_id}.db"
+            targets.append(Target(tenant_id, dsn))
+        elif tenant_db.schema_mode():
+            targets.append(
+                Target(
+                    tenant_id,
+                    tenant_db.shared_dsn(),
+                    tenant_db.schema_name(tenant_id),
+                )
+            )
+        elif args.dsn_template:
+            dsn = args.dsn_template.format(tenant_id=tenant_id)
+            targets.append(Target(tenant_id, dsn))
+        else:
+            targets.append(Target(tenant_id, tenant_db.build_dsn(tenant_id)))
+    return targets
+
+
+def _split(value: str | None) -> list[str]:
+    return [v.strip() for v in (value or "").split(",") if v.strip()]
+
+
+async def main(args: argparse.Namespace) -> int:
+    state_url = args.state_url or os.getenv("DATABASE_URL") or os.getenv(
+        "POSTGRES_MASTER_URL"
+    )
+    if not state_url:
+        raise SystemExit("--state-url, DATABASE_URL or POSTGRES_MASTER_URL required")
+    state = StateStore(state_url)
+    try:
+        if args.tenants:
+            tenant_ids = _split(args.tenants)
+        elif args.sqlite_dir:
+            tenant_ids = sorted(p.stem for p in Path(args.sqlite_dir).glob("*.db"))
+        else:
+            tenant_ids = await state.tenant_ids()
+        report = await run(
+            _targets(args, tenant_ids),
+            state,
+            canaries=_split(args.canary or os.getenv("MIGRATION_CANARY_TENANTS")),
+            concurrency=args.concurrency,
+            revision=args.revision,
+            lock_timeout=args.lock_timeout,
+            statement_timeout=args.statement_timeout,
+            dry_run=args.dry_run,
+        )
+    finally:
+        await state.dispose()
+
+    if args.dry_run:
+        for tenant_id, revs in sorted(report.pending.items()):
+            print(f"{tenant_id}: {len(revs)} pending ({', '.join(revs)})")
+        print(
+            f"{len(report.pending)} tenants need migrations, "
+            f"{len(report.skipped)} up to date"
+        )
+    else:
+        print(
+            f"migrated {len(report.migrated)}, skipped {len(report.skipped)}, "
+            f"failed {len(report.failed)}"
+        )
+    for tenant_id, error in sorted(report.failed.items()):
+        print(f"FAILED {tenant_id}: {error}")
+    if report.aborted:
+        print("canary failed; remaining tenants were not migrated")
+    return 1 if report.failed else 0
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(
+        description="Migrate tenant databases in parallel"
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--tenants", help="Comma-separated tenant identifiers")
+    source.add_argument(
+        "--sqlite-dir", help="Directory of <tenant_id>.db SQLite tenant databases"
+    )
+    source.add_argument(
+        "--all",
+        action="store_true",
+        help="All active tenants in the master DB (default)",
+    )
+    parser.add_argument("--dsn-template", help="DSN template with {tenant_id}")
+    parser.add_argument("--state-url", help="Master DB URL holding tenant_migrations")
+    parser.add_argument("--canary", help="Comma-separated tenants migrated first")
+    parser.add_argument("-c", "--concurrency", type=int, default=4)
+    parser.add_argument("--revision", help="Target revision (default: head)")
+    parser.add_argument("--lock-timeout", default="5s")
+    parser.add_argument("--statement-timeout", default="15min")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    sys.exit(asyncio.run(main(args)))
+
+
+if __name__ == "__main__":
+    _cli()
@@ -13,6 +13,7 @@ import uvicorn
 from dotenv import load_dotenv
 
 import config
+from api.app import multiproc
 from api.app.utils.video_stream import get_backend
 
 
@@ -25,6 +26,12 @@ def main(argv: list[str] | None = None) -> None:
         action="store_true",
         help="Start without running Alembic migrations",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=multiproc.workers(),
+        help="Worker processes (default $WEB_CONCURRENCY or 1)",
+    )
     args = parser.parse_args(argv)
 
     load_dotenv()  # load environment variables from a .env file
@@ -100,11 +107,14 @@ def main(argv: list[str] | None = None) -> None:
     backend = get_backend()
     print(f"Using {backend} for video streaming")
 
+    workers = max(args.workers, 1)
+    multiproc.prepare(workers)
     try:
         uvicorn.run(
             "api.app.main:app",
             host="0.0.0.0",  # nosec B104: bind for local development
             port=int(os.getenv("PORT", "8000")),
+            workers=workers,
             log_level="info",
         )
     except ModuleNotFoundError as exc:
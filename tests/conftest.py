@@ -27,7 +27,10 @@ os.environ.setdefault("ALLOWED_ORIGINS", "http://example.com")
 
 import api.app.db as app_db
 
-app_db.SessionLocal, app_db.engine = app_db.create_test_session()
+# Share one database with api/tests: route modules are imported lazily and
+# bind whichever session factory is current when they first load
+if app_db.SessionLocal is None:
+    app_db.SessionLocal, app_db.engine = app_db.create_test_session()
 
 try:  # pragma: no cover - fallback for broken app imports
     from api.app.main import app  # noqa: E402
@@ -102,13 +105,18 @@ class DummyRedis:
         return len(s) - before
 
     async def incr(self, key):
+        return await self.incrby(key, 1)
+
+    async def incrby(self, key, amount):
         val = self._cleanup(key)
         num = int(val[0]) if val else 0
-        num += 1
+        num += amount
         self.store[key] = (num, val[1] if val else None)
         return num
 
-    async def set(self, key, value, ex=None):
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and self._cleanup(key):
+            return None
         expire_at = time.time() + ex if ex else None
         self.store[key] = (value, expire_at)
         return True
@@ -1,6 +1,10 @@
-from datetime import date
+import json
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
 
-from api.app.bi_dump import build_manifest
+import pytest
+
+from api.app.bi_dump import DATASETS, arrow_schema, build_manifest, dump_dataset
 
 
 def test_build_manifest_structure() -> None:
@@ -12,3 +16,95 @@ def test_build_manifest_structure() -> None:
     manifest = build_manifest(day, files)
     assert manifest["date"] == "2023-01-01"
     assert manifest["files"] == files
+
+
+def _seed_orders(tmp_path, count: int):
+    from sqlalchemy import create_engine
+
+    from api.app.models_tenant import Base, Order, OrderItem
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'dwh.db'}")
+    Base.metadata.create_all(engine, tables=[Order.__table__, OrderItem.__table__])
+    base = datetime(2023, 1, 1, 10, tzinfo=timezone.utc)
+    with engine.begin() as conn:
+        conn.execute(
+            Order.__table__.insert(),
+            [
+                {
+                    "id": i,
+                    "table_id": 1,
+                    "status": "NEW",
+                    "placed_at": base + timedelta(minutes=i),
+                }
+                for i in range(1, count + 1)
+            ],
+        )
+        conn.execute(
+            OrderItem.__table__.insert(),
+            [
+                {
+                    "order_id": i,
+                    "item_id": 1,
+                    "name_snapshot": "Tea",
+                    "price_snapshot": Decimal("12.50"),
+                    "qty": 2,
+                    "status": "NEW",
+                    "mods_snapshot": [{"name": "sugar"}],
+                }
+                for i in range(1, count + 1)
+            ],
+        )
+    return engine, base
+
+
+def test_dump_dataset_streams_row_groups(tmp_path) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    engine, base = _seed_orders(tmp_path, 7)
+    out = tmp_path / "order_items.parquet"
+
+    stats = dump_dataset(
+        engine,
+        DATASETS["order_items"],
+        base,
+        base + timedelta(days=1),
+        out,
+        batch_rows=3,
+    )
+
+    assert stats.rows == 7
+    assert stats.watermark == base + timedelta(minutes=7)
+    parquet = pq.ParquetFile(out)
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.schema_arrow == arrow_schema(DATASETS["order_items"].table)
+    rows = parquet.read().to_pylist()
+    assert rows[0]["price_snapshot"] == Decimal("12.50")
+    assert json.loads(rows[0]["mods_snapshot"]) == [{"name": "sugar"}]
+
+
+def test_incremental_dump_resumes_after_watermark(tmp_path) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    engine, base = _seed_orders(tmp_path, 5)
+    dataset = DATASETS["orders"]
+    end = base + timedelta(days=1)
+
+    first = dump_dataset(engine, dataset, base, end, tmp_path / "a.parquet")
+    again = dump_dataset(
+        engine, dataset, first.watermark, end, tmp_path / "b.parquet", incremental=True
+    )
+
+    assert first.rows == 5
+    assert again.rows == 0 and again.watermark is None
+    assert pq.read_table(tmp_path / "b.parquet").schema == arrow_schema(dataset.table)
+
+
+def test_build_manifest_row_counts_and_watermarks() -> None:
+    mark = datetime(2023, 1, 1, 23, 59, tzinfo=timezone.utc)
+    files = [
+        {"dataset": "orders", "s3_key": "o.parquet", "rows": 3},
+        {"dataset": "payments", "s3_key": "p.parquet", "rows": 2},
+    ]
+    manifest = build_manifest(
+        date(2023, 1, 1), files, watermarks={"orders": mark, "payments": None}
+    )
+    assert manifest["row_count"] == 5
+    assert manifest["watermarks"] == {"orders": mark.isoformat(), "payments": None}
@@ -46,6 +46,9 @@ def client():
         def add(self, obj):
             pass
 
+        async def execute(self, stmt, params=None):
+            pass
+
         async def commit(self):
             pass
 
@@ -93,7 +93,7 @@ async def test_e2e_smoke(app, monkeypatch):
         orders_state[order_id] = "placed"
         return order_id
 
-    async def _fake_transition_order(tenant_id: str, order_id: int, dest):
+    async def _fake_transition_order(tenant_id: str, order_id: int, dest, redis=None):
         orders_state[order_id] = dest.value
         return routes_kds.ok({"status": dest.value})
 
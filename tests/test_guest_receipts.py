@@ -1,5 +1,4 @@
 import asyncio
-from contextlib import asynccontextmanager
 
 import fakeredis.aioredis
 from fastapi import FastAPI
@@ -31,9 +30,12 @@ def test_guest_receipts_flow(monkeypatch):
     app.include_router(routes_guest_bill.router)
     app.include_router(routes_guest_receipts.router)
 
-    @asynccontextmanager
+    class _Session:
+        async def commit(self):
+            pass
+
     async def _session_override():
-        yield None
+        yield _Session()
 
     app.dependency_overrides[routes_guest_bill.get_tenant_id] = lambda: "t1"
     app.dependency_overrides[routes_guest_bill.get_tenant_session] = _session_override
@@ -106,6 +106,7 @@ def test_s3_presign(monkeypatch):
     assert client.last["Params"]["ResponseCacheControl"] == "public, max-age=86400"
     assert get_url == f"https://example.com/get_object/{key}"
     assert etag == "abc"
+    assert asyncio.run(backend.urls_async([key, key])) == {key: (get_url, "abc")}
 
 
 def test_s3_urls_scoped_and_signed(monkeypatch):
@@ -1,7 +1,6 @@
 import asyncio
 import sys
 from pathlib import Path
-from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
@@ -43,7 +42,6 @@ def test_bill_enqueue_outbox(tmp_path, monkeypatch):
 
     SessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
-    @asynccontextmanager
     async def _session_override():
         async with SessionLocal() as session:
             yield session
@@ -15,8 +15,8 @@ class DummyRedis:
     async def sadd(self, *args, **kwargs):
         return 0
 
-    async def keys(self, *args, **kwargs):
-        return []
+    async def smembers(self, *args, **kwargs):
+        return set()
 
     async def llen(self, *args, **kwargs):
         return 0
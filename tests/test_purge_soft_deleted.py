@@ -16,7 +16,10 @@ sys.path.append(str(ROOT / "api"))
 
 from app.db.tenant import get_engine  # type: ignore  # noqa: E402
 
-from api.app.models_tenant import AuditTenant  # type: ignore  # noqa: E402
+from api.app.models_tenant import (  # type: ignore  # noqa: E402
+    AuditTenant,
+    BatchCheckpoint,
+)
 
 
 @pytest.fixture
@@ -42,6 +45,7 @@ async def _prepare(tmp_path, monkeypatch):
             )
         )
         await conn.run_sync(AuditTenant.__table__.create)
+        await conn.run_sync(BatchCheckpoint.__table__.create)
 
     Session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
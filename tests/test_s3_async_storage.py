@@ -0,0 +1,200 @@
+import asyncio
+import sys
+import threading
+from io import BytesIO
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import boto3
+import fakeredis.aioredis
+import pytest
+from botocore.stub import ANY, Stubber
+from starlette.datastructures import Headers, UploadFile
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from api.app.storage.s3_async import AsyncS3Backend  # noqa: E402
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _client():
+    return boto3.client(
+        "s3",
+        region_name="us-east-1",
+        aws_access_key_id="test",
+        aws_secret_access_key="test",
+    )
+
+
+def _backend(monkeypatch, client=None, redis=None, clock=None):
+    monkeypatch.setenv("S3_BUCKET", "bkt")
+    return AsyncS3Backend(
+        client=client or _client(),
+        redis=redis,
+        url_ttl=3600,
+        refresh=300,
+        clock=clock or Clock(),
+    )
+
+
+def _upload(name="dish.jpg", data=b"jpeg"):
+    headers = Headers({"content-type": "image/jpeg"})
+    return UploadFile(filename=name, file=BytesIO(data), headers=headers)
+
+
+def test_save_uploads_and_url_needs_no_head(monkeypatch):
+    client = _client()
+    stub = Stubber(client)
+    stub.add_response(
+        "put_object",
+        {"ETag": '"etag-1"'},
+        {
+            "Bucket": "bkt",
+            "Key": ANY,
+            "Body": b"jpeg",
+            "CacheControl": "public, max-age=86400",
+            "ContentType": "image/jpeg",
+        },
+    )
+    backend = _backend(monkeypatch, client, fakeredis.aioredis.FakeRedis())
+
+    async def run():
+        with stub:
+            url, key = await backend.save("t1", _upload())
+            # No head_object response is queued: a HEAD would raise here
+            again, etag = await backend.url_async(key)
+        return url, key, again, etag
+
+    url, key, again, etag = asyncio.run(run())
+    stub.assert_no_pending_responses()
+    assert key.startswith("t1/") and key.endswith("_dish.jpg")
+    assert url == again
+    assert etag == "etag-1"
+    query = parse_qs(urlparse(url).query)
+    assert query["response-cache-control"] == ["public, max-age=86400"]
+    assert "Signature" in query or "X-Amz-Signature" in query
+
+
+class SigningClient:
+    """Client that numbers every presigned URL it generates."""
+
+    def __init__(self):
+        self.signed = 0
+
+    def generate_presigned_url(self, op, Params, ExpiresIn):
+        self.signed += 1
+        return f"https://s3.test/{Params['Key']}?X-Amz-Signature={self.signed}"
+
+
+def test_presigned_urls_shared_through_redis_until_refresh(monkeypatch):
+    redis = fakeredis.aioredis.FakeRedis()
+    clock = Clock()
+    client = SigningClient()
+    first = _backend(monkeypatch, client, redis, clock)
+    second = _backend(monkeypatch, client, redis, clock)
+
+    async def run():
+        await redis.set("media:etag:t1/a.jpg", "e1")
+        url, etag = await first.url_async("t1/a.jpg")
+        assert etag == "e1"
+        clock.now += 60
+        assert await second.url_async("t1/a.jpg") == (url, "e1")
+        # 300s before expiry the URL is re-signed rather than served
+        clock.now += 3600 - 300 - 60
+        return url, await second.url_async("t1/a.jpg"), await redis.ttl(
+            "media:url:t1/a.jpg"
+        )
+
+    url, (fresh, _), ttl = asyncio.run(run())
+    assert fresh != url
+    assert client.signed == 2
+    assert 0 < ttl <= 3300
+
+
+def test_urls_async_heads_only_unknown_objects_once(monkeypatch):
+    calls = []
+
+    class StubClient:
+        def generate_presigned_url(self, op, Params, ExpiresIn):
+            return f"https://s3.test/{Params['Key']}?X-Amz-Signature=sig"
+
+        def head_object(self, Bucket, Key):
+            calls.append((Key, threading.current_thread().name))
+            return {"ETag": f'"{Key}-etag"'}
+
+    redis = fakeredis.aioredis.FakeRedis()
+    backend = _backend(monkeypatch, StubClient(), redis)
+
+    async def run():
+        await redis.set("media:etag:t1/known.jpg", "k")
+        keys = ["t1/known.jpg", "t1/old-1.jpg", "t1/old-2.jpg"]
+        first = await backend.urls_async(keys)
+        second = await _backend(monkeypatch, StubClient(), redis).urls_async(keys)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first == second
+    assert first["t1/known.jpg"][1] == "k"
+    assert first["t1/old-1.jpg"][1] == "t1/old-1.jpg-etag"
+    assert sorted(key for key, _ in calls) == ["t1/old-1.jpg", "t1/old-2.jpg"]
+    assert all(name.startswith("s3") for _, name in calls)
+
+
+def test_blocking_calls_run_on_bounded_pool(monkeypatch):
+    active = {"now": 0, "max": 0}
+    lock = threading.Lock()
+    release = threading.Event()
+
+    class SlowClient:
+        def put_object(self, **params):
+            with lock:
+                active["now"] += 1
+                active["max"] = max(active["max"], active["now"])
+            release.wait(1)
+            with lock:
+                active["now"] -= 1
+            return {"ETag": '"x"'}
+
+        def generate_presigned_url(self, op, Params, ExpiresIn):
+            return "https://s3.test/x"
+
+    monkeypatch.setenv("S3_BUCKET", "bkt")
+    backend = AsyncS3Backend(client=SlowClient(), max_workers=2)
+
+    async def run():
+        tasks = [
+            asyncio.create_task(backend.save("t1", _upload(f"{i}.jpg")))
+            for i in range(6)
+        ]
+        # The loop stays responsive while uploads block their threads
+        await asyncio.sleep(0.05)
+        release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert active["max"] == 2
+
+
+@pytest.mark.parametrize("backend_name", ["local", "s3"])
+def test_storage_selector(monkeypatch, tmp_path, backend_name):
+    import importlib
+
+    import api.app.storage as storage_module
+
+    monkeypatch.setenv("STORAGE_BACKEND", backend_name)
+    monkeypatch.setenv("MEDIA_DIR", str(tmp_path))
+    monkeypatch.setenv("S3_REGION", "us-east-1")
+    importlib.reload(storage_module)
+    try:
+        assert hasattr(storage_module.storage, "url_async")
+        assert hasattr(storage_module.storage, "read_async")
+    finally:
+        monkeypatch.setenv("STORAGE_BACKEND", "local")
+        importlib.reload(storage_module)
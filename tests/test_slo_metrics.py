@@ -9,8 +9,8 @@ from api.app.routes_metrics import router as metrics_router
 
 
 class DummyRedis:
-    async def keys(self, *args, **kwargs):
-        return []
+    async def smembers(self, *args, **kwargs):
+        return set()
 
     async def llen(self, *args, **kwargs):
         return 0
@@ -0,0 +1,95 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from api.app.models_master import TenantMigration
+from scripts import tenant_migrate_fleet as fleet
+
+
+@pytest.fixture(scope="module")
+def executor():
+    pool = ProcessPoolExecutor(
+        max_workers=2, mp_context=multiprocessing.get_context("spawn")
+    )
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def fleet_dir(tmp_path):
+    tenants = tmp_path / "tenants"
+    tenants.mkdir()
+    for name in ("alpha", "beta"):
+        (tenants / f"{name}.db").touch()
+    (tenants / "broken.db").write_bytes(b"this is not a sqlite database" * 10)
+    fleet.migrate_tenant(_target(tenants, "beta"), "0014_i18n", None, None)
+    return tenants
+
+
+@pytest.fixture
+def state(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path}/master.db"
+
+    async def _create():
+        engine = create_async_engine(url)
+        async with engine.begin() as conn:
+            await conn.run_sync(TenantMigration.__table__.create)
+        await engine.dispose()
+
+    asyncio.run(_create())
+    store = fleet.StateStore(url)
+    yield store
+    asyncio.run(store.dispose())
+
+
+def _target(directory, tenant_id):
+    return fleet.Target(tenant_id, f"sqlite+aiosqlite:///{directory}/{tenant_id}.db")
+
+
+def _run(directory, state, executor, **kwargs):
+    targets = [_target(directory, t) for t in ("alpha", "beta", "broken")]
+    return asyncio.run(
+        fleet.run(targets, state, concurrency=2, executor=executor, **kwargs)
+    )
+
+
+def test_dry_run_reports_pending_revisions(fleet_dir, state, executor):
+    head = fleet.head_revision()
+    report = _run(fleet_dir, state, executor, dry_run=True)
+
+    assert report.pending["alpha"][0] == "0001_initial_tenant"
+    assert report.pending["alpha"][-1] == head
+    assert report.pending["beta"] == fleet.pending_revisions("0014_i18n", head)
+    assert report.pending["beta"][0] == "0015_menu_item_sort"
+    assert "broken" in report.failed
+    assert asyncio.run(state.load()) == {}
+
+
+def test_failed_canary_stops_the_fleet(fleet_dir, state, executor):
+    report = _run(fleet_dir, state, executor, canaries=["broken"])
+
+    assert report.aborted
+    assert report.migrated == []
+    rows = asyncio.run(state.load())
+    assert set(rows) == {"broken"}
+    assert rows["broken"].status == "failed"
+
+
+def test_rerun_skips_finished_tenants(fleet_dir, state, executor):
+    head = fleet.head_revision()
+    first = _run(fleet_dir, state, executor, canaries=["alpha"])
+
+    assert sorted(first.migrated) == ["alpha", "beta"]
+    assert set(first.failed) == {"broken"}
+    rows = asyncio.run(state.load())
+    assert rows["alpha"].revision == rows["beta"].revision == head
+    assert rows["alpha"].status == "ok"
+    assert fleet.inspect_tenant(_target(fleet_dir, "beta")) == head
+
+    second = _run(fleet_dir, state, executor)
+    assert sorted(second.skipped) == ["alpha", "beta"]
+    assert second.migrated == []
+    assert asyncio.run(state.load())["broken"].attempts == 2